@@ -0,0 +1,886 @@
+import heapq
+import math
+from array import array
+from datetime import date, datetime, timedelta
+from operator import itemgetter
+from typing import Any
+
+from app.bitmaps import Bitmap
+from app.config import get_config
+from app.hyperloglog import HyperLogLog
+from app.models.survey import (
+    DailyRespondents,
+    HistogramBucket,
+    HistogramGranularity,
+    Question,
+    QuestionType,
+    RatingStats,
+    ResponseHistogram,
+    SurveyResponse,
+)
+
+# Szerokość przedziału (sekundy) i liczba przedziałów w buforze dla każdej
+# rozdzielczości histogramu - ostatnia doba, tydzień i rok
+HISTOGRAM_SLOTS: dict[HistogramGranularity, tuple[int, int]] = {
+    HistogramGranularity.MINUTE: (60, 1440),
+    HistogramGranularity.HOUR: (3600, 168),
+    HistogramGranularity.DAY: (86400, 366),
+}
+
+# Maksymalna liczba przedziałów szkicu ocen (szersze skale są grupowane)
+RATING_MAX_BINS = 1000
+
+# Liczba liczników najczęstszych odpowiedzi tekstowych na jedną zwracaną
+# w statystykach (zapas zmniejszający błąd oszacowania)
+TEXT_COUNTERS_PER_TOP = 4
+
+# Precyzja szkiców unikalnych respondentów (ankieta: 4 KB, ~1.6% błędu;
+# dzień: 1 KB, ~3.3% błędu) i liczba zachowanych dni
+RESPONDENTS_PRECISION = 12
+DAILY_RESPONDENTS_PRECISION = 10
+RESPONDENTS_DAYS = 31
+
+# Początek numeracji przedziałów (czas lokalny, jak submitted_at)
+_EPOCH = datetime(1970, 1, 1)
+
+
+# Liczba sekund od początku numeracji przedziałów
+def _seconds_of(moment: datetime) -> int:
+    delta = moment.replace(tzinfo=None) - _EPOCH
+    return delta.days * 86400 + delta.seconds
+
+
+# Zamiana wartości odpowiedzi na klucze rozkładu (tak samo jak w statystykach)
+def distribution_keys(question_type: QuestionType, value: Any) -> list[str]:
+    match question_type:
+        # Wielokrotny wybór -> każda zaznaczona opcja liczona osobno
+        case QuestionType.MULTIPLE_CHOICE:
+            if isinstance(value, list):
+                return [str(v) for v in value]
+            return [str(value)]
+
+        # Tak/nie -> normalizacja do 'yes' lub 'no'
+        case QuestionType.YES_NO:
+            return ["yes" if value in (True, "yes") else "no"]
+
+        case _:
+            return [str(value)]
+
+
+# Liczniki odpowiedzi w przedziałach czasu - bufor cykliczny ostatnich
+# przedziałów (starsze są nadpisywane, gdy pojawia się nowszy przedział)
+class TimeHistogram:
+    __slots__ = ("counts", "latest", "width")
+
+    def __init__(self, width: int, size: int) -> None:
+        self.width = width
+        self.counts = array("I", bytes(4 * size))
+        # Numer najnowszego przedziału z odpowiedziami (None = brak odpowiedzi)
+        self.latest: int | None = None
+
+    # Zliczenie odpowiedzi w przedziale o danym numerze
+    def add_bucket(self, bucket: int, count: int = 1) -> None:
+        counts = self.counts
+        size = len(counts)
+        latest = self.latest
+        if latest is None or bucket > latest:
+            # Wyzerowanie przedziałów pominiętych od poprzedniej odpowiedzi
+            if latest is not None and bucket - latest < size:
+                for skipped in range(latest + 1, bucket + 1):
+                    counts[skipped % size] = 0
+            elif latest is not None:
+                counts[:] = array("I", bytes(4 * size))
+            self.latest = bucket
+        elif bucket <= latest - size:
+            # Odpowiedź starsza niż okno bufora
+            return
+        counts[bucket % size] += count
+
+    # Zliczenie odpowiedzi przesłanej w danym czasie
+    def add(self, moment: datetime) -> None:
+        self.add_bucket(_seconds_of(moment) // self.width)
+
+    # Przedziały od pierwszego niepustego do najnowszego (w kolejności czasu)
+    def buckets(self) -> list[tuple[datetime, int]]:
+        if self.latest is None:
+            return []
+        counts = self.counts
+        size = len(counts)
+        first = self.latest - size + 1
+        while counts[first % size] == 0:
+            first += 1
+        return [
+            (_EPOCH + timedelta(seconds=bucket * self.width), counts[bucket % size])
+            for bucket in range(first, self.latest + 1)
+        ]
+
+    # Kopia histogramu
+    def copy(self) -> "TimeHistogram":
+        clone = TimeHistogram.__new__(TimeHistogram)
+        clone.width = self.width
+        clone.counts = array("I", self.counts)
+        clone.latest = self.latest
+        return clone
+
+    # Zapis histogramu jako słownik (JSON)
+    def to_dict(self) -> dict[str, Any]:
+        return {"latest": self.latest, "counts": self.counts.tolist()}
+
+    # Odtworzenie histogramu ze słownika (bufor o innym rozmiarze jest
+    # wypełniany od najnowszego przedziału)
+    @classmethod
+    def from_dict(cls, width: int, size: int, data: dict[str, Any]) -> "TimeHistogram":
+        histogram = cls(width, size)
+        latest = data["latest"]
+        if latest is not None:
+            saved = data["counts"]
+            for bucket in range(latest - len(saved) + 1, latest + 1):
+                count = saved[bucket % len(saved)]
+                if count:
+                    histogram.add_bucket(bucket, count)
+        return histogram
+
+
+# Bitmapy numerów odpowiedzi (kolejność zapisu w ankiecie) dla każdego pytania
+# i klucza rozkładu - filtrowanie statystyk przez przecięcie bitmap. Odpowiedzi
+# tekstowe nie są indeksowane (liczba różnych wartości jest nieograniczona),
+# zapamiętywane są tylko numery odpowiedzi na te pytania.
+class AnswerBitmaps:
+    __slots__ = ("answered", "numeric", "types", "values")
+
+    def __init__(self, questions: list[Question]) -> None:
+        self.types = {question.id: question.type for question in questions}
+        # Pytanie -> odpowiedzi, w których na nie odpowiedziano
+        self.answered: dict[str, Bitmap] = {q.id: Bitmap() for q in questions}
+        # Pytanie -> klucz rozkładu -> odpowiedzi z tą wartością
+        self.values: dict[str, dict[str, Bitmap]] = {
+            q.id: {} for q in questions if q.type is not QuestionType.TEXT
+        }
+        # Pytanie o ocenę -> klucz rozkładu -> wartość liczbowa (do średniej)
+        self.numeric: dict[str, dict[str, int | float]] = {
+            q.id: {} for q in questions if q.type is QuestionType.RATING
+        }
+
+    # Zapisanie odpowiedzi na pytanie w odpowiedzi o danym numerze
+    def add(self, ordinal: int, question_id: str, value: Any) -> None:
+        answered = self.answered.get(question_id)
+        if answered is None:
+            return
+        answered.add(ordinal)
+        values = self.values.get(question_id)
+        if values is None:
+            return
+
+        question_type = self.types[question_id]
+        for key in distribution_keys(question_type, value):
+            bitmap = values.get(key)
+            if bitmap is None:
+                bitmap = values[key] = Bitmap()
+            bitmap.add(ordinal)
+        if question_type is QuestionType.RATING and isinstance(value, (int, float)):
+            self.numeric[question_id][str(value)] = value
+
+    # Bitmapa odpowiedzi z daną wartością odpowiedzi na pytanie
+    def bitmap(self, question_id: str, value: str) -> Bitmap:
+        if question_id not in self.types:
+            raise ValueError(f"Question with ID {question_id} not found in survey")
+        values = self.values.get(question_id)
+        if values is None:
+            raise ValueError(f"Cannot filter by text question {question_id}")
+        return values.get(value) or Bitmap()
+
+    # Głęboka kopia bitmap z numerami z przedziału [start, limit) - wartości
+    # bez żadnej odpowiedzi w przedziale są pomijane
+    def copy(self, limit: int, start: int = 0) -> "AnswerBitmaps":
+        clone = AnswerBitmaps([])
+        clone.types = dict(self.types)
+        clone.answered = {
+            question_id: bitmap.between(start, limit)
+            for question_id, bitmap in self.answered.items()
+        }
+        clone.values = {}
+        for question_id, values in self.values.items():
+            copies = {
+                key: bitmap.between(start, limit) for key, bitmap in values.items()
+            }
+            clone.values[question_id] = {
+                key: bitmap for key, bitmap in copies.items() if bitmap
+            }
+        clone.numeric = {
+            question_id: dict(numeric) for question_id, numeric in self.numeric.items()
+        }
+        return clone
+
+    # Zapis bitmap jako słownik (JSON)
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "answered": {
+                question_id: bitmap.to_dict()
+                for question_id, bitmap in self.answered.items()
+            },
+            "values": {
+                question_id: {key: bitmap.to_dict() for key, bitmap in values.items()}
+                for question_id, values in self.values.items()
+            },
+            "numeric": self.numeric,
+        }
+
+    # Odtworzenie bitmap ze słownika (pytania spoza ankiety są pomijane)
+    @classmethod
+    def from_dict(
+        cls, questions: list[Question], data: dict[str, Any]
+    ) -> "AnswerBitmaps":
+        bitmaps = cls(questions)
+        for question_id, saved in data["answered"].items():
+            if question_id in bitmaps.answered:
+                bitmaps.answered[question_id] = Bitmap.from_dict(saved)
+        for question_id, saved in data["values"].items():
+            if question_id in bitmaps.values:
+                bitmaps.values[question_id] = {
+                    key: Bitmap.from_dict(bitmap) for key, bitmap in saved.items()
+                }
+        for question_id, saved in data["numeric"].items():
+            if question_id in bitmaps.numeric:
+                bitmaps.numeric[question_id] = dict(saved)
+        return bitmaps
+
+
+# Szkic rozkładu ocen - histogram o stałych przedziałach od min_rating do
+# max_rating (jeden przedział na ocenę, najwyżej RATING_MAX_BINS) oraz liczba,
+# średnia i suma kwadratów odchyleń (Welford) do odchylenia standardowego.
+# Pamięć nie zależy od liczby odpowiedzi, a szkice tej samej skali można łączyć.
+class RatingSketch:
+    __slots__ = ("count", "counts", "high", "low", "m2", "mean", "width")
+
+    def __init__(self, low: int, high: int) -> None:
+        self.low = low
+        self.high = high
+        span = max(1, high - low + 1)
+        bins = min(span, RATING_MAX_BINS)
+        self.width = span / bins
+        self.counts = [0] * bins
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    # Dodanie oceny (count razy)
+    def add(self, value: float, count: int = 1) -> None:
+        index = math.floor((value - self.low + 0.5) / self.width)
+        self.counts[min(max(index, 0), len(self.counts) - 1)] += count
+        # Połączenie z grupą count jednakowych wartości (wzór Chana)
+        total = self.count + count
+        delta = value - self.mean
+        self.mean += delta * count / total
+        self.m2 += delta * delta * self.count * count / total
+        self.count = total
+
+    # Dołączenie szkicu tej samej skali (np. z innego okresu)
+    def merge(self, other: "RatingSketch") -> None:
+        if (other.low, other.high) != (self.low, self.high):
+            raise ValueError("Cannot merge rating sketches of different scales")
+        if other.count == 0:
+            return
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+
+    # Wartość reprezentująca przedział (środek; przy przedziale 1 - ocena)
+    def _value(self, index: int) -> float:
+        return self.low - 0.5 + (index + 0.5) * self.width
+
+    # Ocena na pozycji rank w uporządkowanych ocenach
+    def _value_at(self, rank: int) -> float:
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen > rank:
+                return self._value(index)
+        return self._value(len(self.counts) - 1)
+
+    # Percentyl (q od 0 do 1) z interpolacją liniową między sąsiednimi ocenami
+    def percentile(self, q: float) -> float | None:
+        if self.count == 0:
+            return None
+        position = q * (self.count - 1)
+        rank = math.floor(position)
+        value = self._value_at(rank)
+        fraction = position - rank
+        if fraction:
+            value += (self._value_at(rank + 1) - value) * fraction
+        return value
+
+    # Odchylenie standardowe (populacji)
+    @property
+    def std_dev(self) -> float | None:
+        if self.count == 0:
+            return None
+        return math.sqrt(self.m2 / self.count)
+
+    # Podsumowanie rozkładu ocen do statystyk pytania
+    def stats(self) -> RatingStats:
+        return RatingStats(
+            median=self.percentile(0.5),
+            p90=self.percentile(0.9),
+            std_dev=self.std_dev,
+            histogram={
+                f"{self._value(index):g}": count
+                for index, count in enumerate(self.counts)
+            },
+        )
+
+    # Kopia szkicu
+    def copy(self) -> "RatingSketch":
+        clone = RatingSketch.__new__(RatingSketch)
+        clone.low = self.low
+        clone.high = self.high
+        clone.width = self.width
+        clone.counts = list(self.counts)
+        clone.count = self.count
+        clone.mean = self.mean
+        clone.m2 = self.m2
+        return clone
+
+    # Zapis szkicu jako słownik (JSON)
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "low": self.low,
+            "high": self.high,
+            "counts": self.counts,
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+        }
+
+    # Odtworzenie szkicu ze słownika (zapisanego dla tej samej skali)
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "RatingSketch":
+        sketch = cls(data["low"], data["high"])
+        sketch.counts = list(data["counts"])
+        sketch.count = data["count"]
+        sketch.mean = data["mean"]
+        sketch.m2 = data["m2"]
+        return sketch
+
+
+# Najczęstsze odpowiedzi tekstowe - algorytm Space-Saving: najwyżej capacity
+# liczników, a nowa wartość przy komplecie zastępuje wartość o najmniejszym
+# liczniku (przejmując go). Dopóki różnych wartości jest nie więcej niż
+# capacity, liczniki są dokładne; potem liczba wartości może być zawyżona
+# najwyżej o errors[wartość].
+class SpaceSaving:
+    __slots__ = ("_heap", "capacity", "counts", "errors")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = max(1, capacity)
+        self.counts: dict[str, int] = {}
+        self.errors: dict[str, int] = {}
+        # Kopiec (licznik, wartość) - wpisy nieaktualne pomijane przy usuwaniu
+        self._heap: list[tuple[int, str]] = []
+
+    # Zliczenie wartości (count razy)
+    def add(self, key: str, count: int = 1) -> None:
+        counts = self.counts
+        current = counts.get(key)
+        if current is not None:
+            counts[key] = current + count
+            return
+        if len(counts) < self.capacity:
+            counts[key] = count
+            self.errors[key] = 0
+            heapq.heappush(self._heap, (count, key))
+            return
+
+        # Usunięcie wartości o najmniejszym liczniku (każda wartość ma w kopcu
+        # jeden wpis - zaniżony po zliczeniach jest poprawiany przy usuwaniu)
+        heap = self._heap
+        while True:
+            smallest, evicted = heap[0]
+            current = counts[evicted]
+            if current == smallest:
+                break
+            heapq.heapreplace(heap, (current, evicted))
+        del counts[evicted]
+        del self.errors[evicted]
+
+        counts[key] = smallest + count
+        self.errors[key] = smallest
+        heapq.heapreplace(heap, (smallest + count, key))
+
+    # Najczęstsze wartości (remisy w kolejności pierwszego wystąpienia) - k nie
+    # może przekraczać liczby liczników
+    def top(self, k: int) -> list[tuple[str, int]]:
+        if k > self.capacity:
+            raise ValueError(f"Top {k} exceeds {self.capacity} text counters")
+        return heapq.nlargest(k, self.counts.items(), key=itemgetter(1))
+
+    # Kopia liczników
+    def copy(self) -> "SpaceSaving":
+        clone = SpaceSaving(self.capacity)
+        clone.counts = dict(self.counts)
+        clone.errors = dict(self.errors)
+        clone._heap = list(self._heap)
+        return clone
+
+    # Zapis liczników jako słownik (JSON)
+    def to_dict(self) -> dict[str, Any]:
+        return {"counts": self.counts, "errors": self.errors}
+
+    # Odtworzenie liczników (wartości o największych licznikach, jeśli
+    # zapisano ich więcej niż capacity - np. rozkład sprzed ograniczenia)
+    @classmethod
+    def from_dict(cls, capacity: int, data: dict[str, Any]) -> "SpaceSaving":
+        top = cls(capacity)
+        errors = data.get("errors", {})
+        for key, count in heapq.nlargest(
+            top.capacity, data["counts"].items(), key=itemgetter(1)
+        ):
+            top.counts[key] = count
+            top.errors[key] = errors.get(key, 0)
+        top._heap = [(count, key) for key, count in top.counts.items()]
+        heapq.heapify(top._heap)
+        return top
+
+
+# Liczba liczników odpowiedzi tekstowych pytania (z konfiguracji)
+def default_text_capacity() -> int:
+    return TEXT_COUNTERS_PER_TOP * get_config().get("stats", "text_top_k", 20)
+
+
+# Skala pytania o ocenę (domyślna jak przy walidacji odpowiedzi)
+def rating_range(question: Question) -> tuple[int, int]:
+    return question.min_rating or 1, question.max_rating or 5
+
+
+# Zagregowane statystyki pojedynczego pytania aktualizowane przy każdej odpowiedzi
+class QuestionAggregate:
+    __slots__ = (
+        "count",
+        "distribution",
+        "numeric_count",
+        "numeric_sum",
+        "question_type",
+        "rating",
+        "text",
+    )
+
+    def __init__(
+        self,
+        question_type: QuestionType,
+        rating_range: tuple[int, int] = (1, 5),
+        text_capacity: int | None = None,
+    ) -> None:
+        self.question_type = question_type
+        self.count = 0
+        self.distribution: dict[str, int] = {}
+        # Najczęstsze odpowiedzi tekstowe - rozkład to ich liczniki
+        self.text: SpaceSaving | None = None
+        if question_type is QuestionType.TEXT:
+            self.text = SpaceSaving(text_capacity or default_text_capacity())
+            self.distribution = self.text.counts
+        self.numeric_sum: int | float = 0
+        self.numeric_count = 0
+        # Szkic rozkładu ocen (tylko pytania typu ocena)
+        self.rating = (
+            RatingSketch(*rating_range)
+            if question_type is QuestionType.RATING
+            else None
+        )
+
+    # Dodanie pojedynczej odpowiedzi na pytanie
+    # (rozwinięcie distribution_keys - ścieżka wykonywana dla każdej odpowiedzi)
+    def add(self, value: Any) -> None:
+        self.count += 1
+        question_type = self.question_type
+        distribution = self.distribution
+
+        if question_type is QuestionType.YES_NO:
+            key = "yes" if value in (True, "yes") else "no"
+        elif question_type is QuestionType.TEXT:
+            self.text.add(str(value))
+            return
+        elif question_type is QuestionType.MULTIPLE_CHOICE and isinstance(value, list):
+            for option in value:
+                key = str(option)
+                distribution[key] = distribution.get(key, 0) + 1
+            return
+        else:
+            key = str(value)
+            # Suma i liczba ocen potrzebne do średniej
+            if question_type is QuestionType.RATING and isinstance(value, (int, float)):
+                self.numeric_sum += value
+                self.numeric_count += 1
+                self.rating.add(value)
+
+        distribution[key] = distribution.get(key, 0) + 1
+
+    # Średnia wartość dla pytań o typie ocena
+    @property
+    def average(self) -> float | None:
+        if self.numeric_count == 0:
+            return None
+        return self.numeric_sum / self.numeric_count
+
+    # Kopia agregatu (do odczytu poza blokadą)
+    def copy(self) -> "QuestionAggregate":
+        clone = QuestionAggregate(self.question_type)
+        clone.count = self.count
+        if self.text is not None:
+            clone.text = self.text.copy()
+            clone.distribution = clone.text.counts
+        else:
+            clone.distribution = dict(self.distribution)
+        clone.numeric_sum = self.numeric_sum
+        clone.numeric_count = self.numeric_count
+        clone.rating = self.rating.copy() if self.rating is not None else None
+        return clone
+
+    # Zapis agregatu jako słownik (JSON) - np. do trwałego przechowania
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "distribution": self.distribution,
+            "numeric_sum": self.numeric_sum,
+            "numeric_count": self.numeric_count,
+            "rating": self.rating.to_dict() if self.rating is not None else None,
+            "text_errors": self.text.errors if self.text is not None else None,
+        }
+
+    # Odtworzenie agregatu ze słownika
+    @classmethod
+    def from_dict(
+        cls,
+        question_type: QuestionType,
+        data: dict[str, Any],
+        rating_range: tuple[int, int] = (1, 5),
+        text_capacity: int | None = None,
+    ) -> "QuestionAggregate":
+        aggregate = cls(question_type, rating_range, text_capacity)
+        aggregate.count = data["count"]
+        aggregate.numeric_sum = data["numeric_sum"]
+        aggregate.numeric_count = data["numeric_count"]
+        if aggregate.text is not None:
+            # Rozkład zapisany przed ograniczeniem jest przycinany do
+            # najczęstszych odpowiedzi
+            aggregate.text = SpaceSaving.from_dict(
+                aggregate.text.capacity,
+                {
+                    "counts": data["distribution"],
+                    "errors": data.get("text_errors") or {},
+                },
+            )
+            aggregate.distribution = aggregate.text.counts
+            return aggregate
+        aggregate.distribution = dict(data["distribution"])
+        if aggregate.rating is None:
+            return aggregate
+
+        saved = data.get("rating")
+        if saved is not None and (saved["low"], saved["high"]) == rating_range:
+            aggregate.rating = RatingSketch.from_dict(saved)
+        else:
+            # Agregat zapisany przed dodaniem szkicu (lub dla innej skali) -
+            # szkic odtwarzany z rozkładu odpowiedzi
+            for key, count in aggregate.distribution.items():
+                try:
+                    aggregate.rating.add(float(key), count)
+                except ValueError:
+                    continue
+        return aggregate
+
+
+# Przybliżona liczba unikalnych respondentów (respondent_id) ankiety oraz
+# w kolejnych dniach - szkice HyperLogLog ostatnich RESPONDENTS_DAYS dni
+# można łączyć w dowolny okres. Odpowiedzi anonimowe nie są liczone.
+class RespondentSketches:
+    __slots__ = ("daily", "total")
+
+    def __init__(self) -> None:
+        self.total = HyperLogLog(RESPONDENTS_PRECISION)
+        # Numer dnia (od 1970-01-01, czas lokalny) -> szkic respondentów
+        self.daily: dict[int, HyperLogLog] = {}
+
+    # Zliczenie respondenta odpowiedzi z danego dnia
+    def add(self, respondent_id: str, day: int) -> None:
+        self.total.add(respondent_id)
+        sketch = self.daily.get(day)
+        if sketch is None:
+            latest = max(self.daily, default=day)
+            if day <= latest - RESPONDENTS_DAYS:
+                return
+            sketch = self.daily[day] = HyperLogLog(DAILY_RESPONDENTS_PRECISION)
+            if day > latest:
+                # Usunięcie dni spoza okna
+                for old in [d for d in self.daily if d <= day - RESPONDENTS_DAYS]:
+                    del self.daily[old]
+        sketch.add(respondent_id)
+
+    # Unikalni respondenci w kolejnych dniach
+    def by_day(self) -> list[DailyRespondents]:
+        return [
+            DailyRespondents(
+                day=_EPOCH.date() + timedelta(days=day),
+                unique_respondents=self.daily[day].estimate(),
+            )
+            for day in sorted(self.daily)
+        ]
+
+    # Unikalni respondenci w dniach [start, end] (połączone szkice dni)
+    def between(self, start: date, end: date) -> int:
+        first = (start - _EPOCH.date()).days
+        last = (end - _EPOCH.date()).days
+        merged = HyperLogLog(DAILY_RESPONDENTS_PRECISION)
+        for day, sketch in self.daily.items():
+            if first <= day <= last:
+                merged.merge(sketch)
+        return merged.estimate()
+
+    # Unikalni respondenci w ostatnich days dniach (do dnia ostatniej odpowiedzi)
+    def last_days(self, days: int) -> int | None:
+        if not self.daily:
+            return None
+        latest = _EPOCH.date() + timedelta(days=max(self.daily))
+        return self.between(latest - timedelta(days=days - 1), latest)
+
+    # Kopia szkiców
+    def copy(self) -> "RespondentSketches":
+        clone = RespondentSketches.__new__(RespondentSketches)
+        clone.total = self.total.copy()
+        clone.daily = {day: sketch.copy() for day, sketch in self.daily.items()}
+        return clone
+
+    # Zapis szkiców jako słownik (JSON)
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "total": self.total.to_dict(),
+            "daily": {str(day): sketch.to_dict() for day, sketch in self.daily.items()},
+        }
+
+    # Odtworzenie szkiców ze słownika
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "RespondentSketches":
+        sketches = cls()
+        sketches.total = HyperLogLog.from_dict(data["total"])
+        sketches.daily = {
+            int(day): HyperLogLog.from_dict(sketch)
+            for day, sketch in data["daily"].items()
+        }
+        return sketches
+
+
+# Zagregowane statystyki całej ankiety
+class SurveyAggregate:
+    __slots__ = (
+        "_shared_bitmaps",
+        "bitmaps",
+        "histograms",
+        "last_response_at",
+        "questions",
+        "respondents",
+        "total_responses",
+    )
+
+    def __init__(self, questions: list[Question]) -> None:
+        capacity = default_text_capacity()
+        self.questions: dict[str, QuestionAggregate] = {
+            question.id: QuestionAggregate(
+                question.type, rating_range(question), capacity
+            )
+            for question in questions
+        }
+        self.total_responses = 0
+        self.last_response_at: datetime | None = None
+        # Liczba odpowiedzi w czasie (minuty, godziny, dni)
+        self.histograms: dict[HistogramGranularity, TimeHistogram] = {
+            granularity: TimeHistogram(width, size)
+            for granularity, (width, size) in HISTOGRAM_SLOTS.items()
+        }
+        # Bitmapy odpowiedzi do statystyk filtrowanych
+        self.bitmaps = AnswerBitmaps(questions)
+        # Kopia współdzieli bitmapy z oryginałem (czytane do total_responses)
+        self._shared_bitmaps = False
+        # Unikalni respondenci (ankieta i dni)
+        self.respondents = RespondentSketches()
+
+    # Uwzględnienie nowej odpowiedzi w agregatach
+    def add(self, response: SurveyResponse) -> None:
+        if self._shared_bitmaps:
+            self._own_bitmaps()
+        ordinal = self.total_responses
+        self.total_responses += 1
+        if (
+            self.last_response_at is None
+            or response.submitted_at > self.last_response_at
+        ):
+            self.last_response_at = response.submitted_at
+        seconds = _seconds_of(response.submitted_at)
+        for histogram in self.histograms.values():
+            histogram.add_bucket(seconds // histogram.width)
+        if response.respondent_id is not None:
+            self.respondents.add(response.respondent_id, seconds // 86400)
+
+        # Odpowiedzi na pytania spoza ankiety nie trafiają do statystyk
+        questions = self.questions
+        bitmaps = self.bitmaps
+        for answer in response.answers:
+            aggregate = questions.get(answer.question_id)
+            if aggregate is not None:
+                aggregate.add(answer.value)
+                bitmaps.add(ordinal, answer.question_id, answer.value)
+
+    # Uwzględnienie porcji odpowiedzi (import) - najnowszy czas wyznaczany raz
+    def add_many(self, responses: list[SurveyResponse]) -> None:
+        if not responses:
+            return
+        if self._shared_bitmaps:
+            self._own_bitmaps()
+        ordinal = self.total_responses
+        self.total_responses += len(responses)
+        latest = max(response.submitted_at for response in responses)
+        if self.last_response_at is None or latest > self.last_response_at:
+            self.last_response_at = latest
+        histograms = self.histograms.values()
+
+        questions = self.questions
+        bitmaps = self.bitmaps
+        for response in responses:
+            seconds = _seconds_of(response.submitted_at)
+            for histogram in histograms:
+                histogram.add_bucket(seconds // histogram.width)
+            if response.respondent_id is not None:
+                self.respondents.add(response.respondent_id, seconds // 86400)
+            for answer in response.answers:
+                aggregate = questions.get(answer.question_id)
+                if aggregate is not None:
+                    aggregate.add(answer.value)
+                    bitmaps.add(ordinal, answer.question_id, answer.value)
+            ordinal += 1
+
+    # Odłączenie współdzielonych bitmap przed zapisem do kopii agregatu
+    def _own_bitmaps(self) -> None:
+        self.bitmaps = self.bitmaps.copy(self.total_responses)
+        self._shared_bitmaps = False
+
+    # Usunięcie z bitmap odpowiedzi o numerach < start (zwolnionych przez
+    # retencję) - statystyki filtrowane obejmują tylko pozostałe odpowiedzi.
+    # Bitmapy są kopiowane, więc wcześniejsze kopie agregatu się nie zmieniają.
+    def drop_answers_before(self, start: int) -> None:
+        self.bitmaps = self.bitmaps.copy(self.total_responses, start)
+        self._shared_bitmaps = False
+
+    # Kopia agregatów całej ankiety (bitmapy są współdzielone - kopia widzi
+    # tylko odpowiedzi o numerach < total_responses)
+    def copy(self) -> "SurveyAggregate":
+        clone = SurveyAggregate([])
+        clone.questions = {
+            question_id: aggregate.copy()
+            for question_id, aggregate in self.questions.items()
+        }
+        clone.total_responses = self.total_responses
+        clone.last_response_at = self.last_response_at
+        clone.histograms = {
+            granularity: histogram.copy()
+            for granularity, histogram in self.histograms.items()
+        }
+        clone.bitmaps = self.bitmaps
+        clone._shared_bitmaps = True
+        clone.respondents = self.respondents.copy()
+        return clone
+
+    # Statystyki odpowiedzi spełniających wszystkie warunki (pytanie, klucz
+    # rozkładu) - liczone przecięciem bitmap, bez przeglądania odpowiedzi
+    def filtered(self, filters: list[tuple[str, str]]) -> "SurveyAggregate":
+        bitmaps = self.bitmaps
+        selected: Bitmap | None = None
+        for question_id, value in filters:
+            bitmap = bitmaps.bitmap(question_id, value)
+            selected = bitmap if selected is None else selected & bitmap
+        if selected is None:
+            raise ValueError("At least one filter is required")
+        selected = selected.below(self.total_responses)
+
+        result = SurveyAggregate([])
+        result.total_responses = len(selected)
+        for question_id, aggregate in self.questions.items():
+            question = QuestionAggregate(aggregate.question_type)
+            if aggregate.rating is not None:
+                question.rating = RatingSketch(
+                    aggregate.rating.low, aggregate.rating.high
+                )
+            question.count = selected.intersection_count(bitmaps.answered[question_id])
+            numeric = bitmaps.numeric.get(question_id, {})
+            for key, bitmap in list(bitmaps.values.get(question_id, {}).items()):
+                count = selected.intersection_count(bitmap)
+                if not count:
+                    continue
+                question.distribution[key] = count
+                if key in numeric:
+                    question.numeric_sum += numeric[key] * count
+                    question.numeric_count += count
+                    question.rating.add(numeric[key], count)
+            result.questions[question_id] = question
+        return result
+
+    # Histogram odpowiedzi w czasie o danej rozdzielczości
+    def histogram(self, granularity: HistogramGranularity) -> ResponseHistogram:
+        return ResponseHistogram(
+            granularity=granularity,
+            buckets=[
+                HistogramBucket(start=start, count=count)
+                for start, count in self.histograms[granularity].buckets()
+            ],
+        )
+
+    # Zapis agregatów ankiety jako słownik (JSON)
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "total_responses": self.total_responses,
+            "last_response_at": (
+                self.last_response_at.isoformat() if self.last_response_at else None
+            ),
+            "questions": {
+                question_id: aggregate.to_dict()
+                for question_id, aggregate in self.questions.items()
+            },
+            "histograms": {
+                granularity.value: histogram.to_dict()
+                for granularity, histogram in self.histograms.items()
+            },
+            "bitmaps": self.bitmaps.to_dict(),
+            "respondents": self.respondents.to_dict(),
+        }
+
+    # Odtworzenie agregatów ankiety ze słownika
+    @classmethod
+    def from_dict(
+        cls, questions: list[Question], data: dict[str, Any]
+    ) -> "SurveyAggregate":
+        aggregate = cls(questions)
+        capacity = default_text_capacity()
+        aggregate.total_responses = data["total_responses"]
+        if data["last_response_at"] is not None:
+            aggregate.last_response_at = datetime.fromisoformat(
+                data["last_response_at"]
+            )
+        for question in questions:
+            saved = data["questions"].get(question.id)
+            if saved is not None:
+                aggregate.questions[question.id] = QuestionAggregate.from_dict(
+                    question.type, saved, rating_range(question), capacity
+                )
+        # Agregaty zapisane przed dodaniem histogramów zaczynają od pustych
+        for granularity, saved in data.get("histograms", {}).items():
+            granularity = HistogramGranularity(granularity)
+            width, size = HISTOGRAM_SLOTS[granularity]
+            aggregate.histograms[granularity] = TimeHistogram.from_dict(
+                width, size, saved
+            )
+        # Bez zapisanych bitmap filtry obejmują tylko nowe odpowiedzi
+        if "bitmaps" in data:
+            aggregate.bitmaps = AnswerBitmaps.from_dict(questions, data["bitmaps"])
+        if "respondents" in data:
+            aggregate.respondents = RespondentSketches.from_dict(data["respondents"])
+        return aggregate
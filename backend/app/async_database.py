@@ -0,0 +1,179 @@
+"""
+Asynchroniczny interfejs bazy danych dla pętli zdarzeń FastAPI.
+
+Operacje, które mogą czekać na dysk (SQLite, dziennik WAL, zapis segmentów),
+są wykonywane w puli wątków (asyncio.to_thread), a odczyty z pamięci -
+bezpośrednio w pętli zdarzeń. Zapisy do jednej ankiety są kolejkowane na
+blokadach asyncio, dzięki czemu czekające żądania nie zajmują wątków puli.
+"""
+
+import asyncio
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any, TypeVar
+from uuid import UUID
+from weakref import WeakKeyDictionary
+
+from app.aggregates import SurveyAggregate
+from app.config import get_config
+from app.database import Database, get_database
+from app.models import Survey, SurveyResponse
+
+R = TypeVar("R")
+
+# Blokady zapisu wspólne dla wszystkich nakładek na tę samą bazę
+_write_locks: "WeakKeyDictionary[Any, list[asyncio.Lock]]" = WeakKeyDictionary()
+
+
+# Pobranie blokad zapisu bazy (rozłożonych na paski jak blokady bazy w pamięci)
+def _locks_for(database: Any) -> list[asyncio.Lock]:
+    locks = _write_locks.get(database)
+    if locks is None:
+        stripes = max(1, get_config().get("database", "lock_stripes", 64))
+        locks = _write_locks.setdefault(
+            database, [asyncio.Lock() for _ in range(stripes)]
+        )
+    return locks
+
+
+class AsyncDatabase:
+    """
+    Nakładka udostępniająca metody bazy danych (w pamięci lub SQLite) jako
+    korutyny. Nie przechowuje danych - stan pozostaje w singletonie bazy.
+    """
+
+    def __init__(self, database: "Database | Any | None" = None) -> None:
+        self._db = database or get_database()
+        self._locks = _locks_for(self._db)
+
+    # Pobranie bazy synchronicznej (np. dla zadań działających w wątkach)
+    @property
+    def database(self) -> "Database | Any":
+        return self._db
+
+    # Blokada zapisu danej ankiety
+    def _lock_for(self, survey_id: UUID) -> asyncio.Lock:
+        return self._locks[hash(survey_id) % len(self._locks)]
+
+    # Odczyt - w puli wątków, jeśli baza odczytuje dane z dysku
+    async def _read(self, method: Callable[..., R], *args: Any) -> R:
+        if self._db.blocking_reads:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    # Zapis - kolejno dla danej ankiety, w puli wątków jeśli wymaga I/O
+    async def _write(
+        self, survey_id: UUID, method: Callable[..., R], *args: Any, **kwargs: Any
+    ) -> R:
+        async with self._lock_for(survey_id):
+            if self._db.blocking_writes:
+                return await asyncio.to_thread(method, *args, **kwargs)
+            return method(*args, **kwargs)
+
+    # Pobranie wszystkich ankiet
+    async def get_surveys(self) -> list[Survey]:
+        surveys = await self._read(lambda: self._db.surveys)
+        return list(surveys.values())
+
+    # Stworzenie ankiety
+    async def add_survey(self, survey: Survey) -> None:
+        await self._write(survey.id, self._db.add_survey, survey)
+
+    # Pobranie formularza ankiety
+    async def get_survey(self, survey_id: UUID) -> Survey | None:
+        return await self._read(self._db.get_survey, survey_id)
+
+    # Sprawdzenie czy ankieta istnieje
+    async def survey_exists(self, survey_id: UUID) -> bool:
+        return await self._read(self._db.survey_exists, survey_id)
+
+    # Dodanie odpowiedzi
+    async def add_response(
+        self, response: SurveyResponse, idempotency_key: str | None = None
+    ) -> SurveyResponse:
+        return await self._write(
+            response.survey_id,
+            self._db.add_response,
+            response,
+            idempotency_key=idempotency_key,
+        )
+
+    # Dodanie porcji odpowiedzi jednej ankiety - zawsze w puli wątków
+    # (import dziesiątek tysięcy odpowiedzi nie wstrzymuje innych żądań)
+    async def add_responses(
+        self, survey_id: UUID, responses: list[SurveyResponse]
+    ) -> list[SurveyResponse]:
+        async with self._lock_for(survey_id):
+            return await asyncio.to_thread(self._db.add_responses, responses)
+
+    # Pobranie odpowiedzi zapisanej wcześniej z danym kluczem idempotencji
+    async def get_idempotent_response(
+        self, survey_id: UUID, idempotency_key: str
+    ) -> SurveyResponse | None:
+        return await self._read(
+            self._db.get_idempotent_response, survey_id, idempotency_key
+        )
+
+    # Pobranie odpowiedzi do ankiety
+    async def get_responses(self, survey_id: UUID) -> list[SurveyResponse]:
+        return await self._read(self._db.get_responses, survey_id)
+
+    # Pobranie odpowiedzi następujących po kluczu (submitted_at, id)
+    async def get_responses_after(
+        self,
+        survey_id: UUID,
+        after: tuple[datetime, UUID] | None,
+        limit: int,
+    ) -> list[SurveyResponse]:
+        return await self._read(self._db.get_responses_after, survey_id, after, limit)
+
+    # Pobranie odpowiedzi z przedziału czasu [start, end)
+    async def get_responses_between(
+        self, survey_id: UUID, start: datetime | None, end: datetime | None
+    ) -> list[SurveyResponse]:
+        return await self._read(self._db.get_responses_between, survey_id, start, end)
+
+    # Pobranie odpowiedzi respondenta
+    async def get_responses_by_respondent(
+        self, survey_id: UUID, respondent_id: str
+    ) -> list[SurveyResponse]:
+        return await self._read(
+            self._db.get_responses_by_respondent, survey_id, respondent_id
+        )
+
+    # Sprawdzenie czy respondent odpowiedział już na ankietę
+    async def has_respondent(self, survey_id: UUID, respondent_id: str) -> bool:
+        return await self._read(self._db.has_respondent, survey_id, respondent_id)
+
+    # Pobranie wersji danych ankiety
+    async def get_version(self, survey_id: UUID) -> int | None:
+        return await self._read(self._db.get_version, survey_id)
+
+    # Pobranie agregatów statystyk ankiety
+    async def get_aggregate(self, survey_id: UUID) -> SurveyAggregate | None:
+        return await self._read(self._db.get_aggregate, survey_id)
+
+    # Usunięcie odpowiedzi starszych niż cutoff - zawsze w puli wątków
+    # (przegląd indeksu czasu i usuwanie plików segmentów)
+    async def drop_responses_before(self, survey_id: UUID, cutoff: datetime) -> int:
+        async with self._lock_for(survey_id):
+            return await asyncio.to_thread(
+                self._db.drop_responses_before, survey_id, cutoff
+            )
+
+    # Pobranie ogólnych statystyk ankiet
+    async def get_stats(self) -> dict[str, Any]:
+        return await self._read(self._db.get_stats)
+
+    # Sprawdzenie gotowości bazy do obsługi żądań
+    async def ping(self) -> bool:
+        return await self._read(self._db.ping)
+
+    # Zamknięcie bazy danych (zapis migawki i dziennika na dysk)
+    async def close(self) -> None:
+        await asyncio.to_thread(self._db.close)
+
+
+# Pobranie asynchronicznego interfejsu bazy danych wybranej w konfiguracji
+def get_async_database() -> AsyncDatabase:
+    return AsyncDatabase()
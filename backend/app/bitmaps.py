@@ -0,0 +1,228 @@
+"""
+Skompresowane bitmapy numerów odpowiedzi (indeksy filtrów statystyk).
+
+Numery są dzielone na bloki po 65536. Blok z niewielką liczbą numerów to
+posortowana tablica 16-bitowych przesunięć, a po przekroczeniu 4096
+elementów - mapa bitów (8 KB). Przecięcie bitmap jest liczone blok po bloku.
+
+Numery odpowiedzi są dopisywane rosnąco, więc bitmapa może być czytana
+z ograniczeniem (below) równolegle z dopisywaniem - bity dodane po ustaleniu
+ograniczenia mają numery większe od niego.
+"""
+
+import base64
+from array import array
+from bisect import bisect_left
+
+_CHUNK_BITS = 16
+_LOW_MASK = (1 << _CHUNK_BITS) - 1
+# Rozmiar mapy bitów bloku w bajtach
+_DENSE_BYTES = (1 << _CHUNK_BITS) // 8
+# Liczba elementów, po której tablica bloku zamieniana jest na mapę bitów
+_ARRAY_MAX = 4096
+
+# Pusta mapa bitów bloku (do porównań)
+_EMPTY_DENSE = bytes(_DENSE_BYTES)
+
+# Numery ustawionych bitów każdej wartości bajtu
+_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+# Blok bitmapy: tablica przesunięć ("H") lub mapa bitów
+Container = array | bytearray
+
+
+# Liczba ustawionych bitów bloku
+def _cardinality(container: Container) -> int:
+    if type(container) is bytearray:
+        return int.from_bytes(container, "little").bit_count()
+    return len(container)
+
+
+# Sprawdzenie czy blok nie ma ustawionych bitów
+def _is_empty(container: Container) -> bool:
+    if type(container) is bytearray:
+        return container == _EMPTY_DENSE
+    return not container
+
+
+# Sprawdzenie bitu w mapie bitów bloku
+def _has(dense: bytearray, low: int) -> bool:
+    return bool(dense[low >> 3] >> (low & 7) & 1)
+
+
+# Przecięcie dwóch bloków
+def _intersect(left: Container, right: Container) -> Container:
+    if type(left) is bytearray and type(right) is bytearray:
+        value = int.from_bytes(left, "little") & int.from_bytes(right, "little")
+        return bytearray(value.to_bytes(_DENSE_BYTES, "little"))
+    if type(left) is bytearray:
+        left, right = right, left
+    if type(right) is bytearray:
+        return array("H", (low for low in left if _has(right, low)))
+    return array("H", sorted(set(left).intersection(right)))
+
+
+# Liczba wspólnych bitów dwóch bloków (bez tworzenia przecięcia)
+def _intersection_count(left: Container, right: Container) -> int:
+    if type(left) is bytearray and type(right) is bytearray:
+        value = int.from_bytes(left, "little") & int.from_bytes(right, "little")
+        return value.bit_count()
+    if type(left) is bytearray:
+        left, right = right, left
+    if type(right) is bytearray:
+        return sum(1 for low in left if _has(right, low))
+    return len(set(left).intersection(right))
+
+
+# Blok obcięty do przesunięć < end
+def _truncate(container: Container, end: int) -> Container:
+    if type(container) is bytearray:
+        value = int.from_bytes(container, "little") & ((1 << end) - 1)
+        return bytearray(value.to_bytes(_DENSE_BYTES, "little"))
+    return container[: bisect_left(container, end)]
+
+
+# Blok bez przesunięć < start
+def _drop_low(container: Container, start: int) -> Container:
+    if type(container) is bytearray:
+        value = int.from_bytes(container, "little") >> start << start
+        return bytearray(value.to_bytes(_DENSE_BYTES, "little"))
+    return container[bisect_left(container, start) :]
+
+
+class Bitmap:
+    """
+    Zbiór numerów odpowiedzi zapisany w blokach (tablice lub mapy bitów).
+    """
+
+    __slots__ = ("_chunks",)
+
+    def __init__(self) -> None:
+        self._chunks: dict[int, Container] = {}
+
+    # Dodanie numeru (zwykle większego od dotychczasowych)
+    def add(self, ordinal: int) -> None:
+        key = ordinal >> _CHUNK_BITS
+        low = ordinal & _LOW_MASK
+        container = self._chunks.get(key)
+        if container is None:
+            self._chunks[key] = array("H", (low,))
+        elif type(container) is bytearray:
+            container[low >> 3] |= 1 << (low & 7)
+        elif len(container) + 1 >= _ARRAY_MAX:
+            # Zamiana tablicy na mapę bitów (podmiana całego bloku)
+            dense = bytearray(_DENSE_BYTES)
+            for value in (*container, low):
+                dense[value >> 3] |= 1 << (value & 7)
+            self._chunks[key] = dense
+        elif container[-1] < low:
+            container.append(low)
+        else:
+            position = bisect_left(container, low)
+            if position == len(container) or container[position] != low:
+                container.insert(position, low)
+
+    def __len__(self) -> int:
+        return sum(_cardinality(c) for c in list(self._chunks.values()))
+
+    # Sprawdzenie niepustości bez liczenia bitów map
+    def __bool__(self) -> bool:
+        return not all(_is_empty(c) for c in list(self._chunks.values()))
+
+    def __contains__(self, ordinal: int) -> bool:
+        container = self._chunks.get(ordinal >> _CHUNK_BITS)
+        if container is None:
+            return False
+        low = ordinal & _LOW_MASK
+        if type(container) is bytearray:
+            return _has(container, low)
+        position = bisect_left(container, low)
+        return position < len(container) and container[position] == low
+
+    # Numery w kolejności rosnącej
+    def to_list(self) -> list[int]:
+        ordinals = []
+        for key, container in sorted(self._chunks.items()):
+            base = key << _CHUNK_BITS
+            if type(container) is bytearray:
+                for index, byte in enumerate(container):
+                    if byte:
+                        start = base + (index << 3)
+                        ordinals.extend(start + bit for bit in _BITS[byte])
+            else:
+                ordinals.extend(base + low for low in container)
+        return ordinals
+
+    # Kopia bitmapy z numerami < limit (bloki są kopiowane)
+    def below(self, limit: int) -> "Bitmap":
+        return self.between(0, limit)
+
+    # Kopia bitmapy z numerami z przedziału [start, limit) - bloki sprzed
+    # start są pomijane, pozostałe kopiowane
+    def between(self, start: int, limit: int) -> "Bitmap":
+        first_key = start >> _CHUNK_BITS
+        last_key = limit >> _CHUNK_BITS
+        result = Bitmap()
+        for key, container in list(self._chunks.items()):
+            if key < first_key or key > last_key:
+                continue
+            if key == last_key:
+                if not limit & _LOW_MASK:
+                    continue
+                container = _truncate(container, limit & _LOW_MASK)
+            elif not (key == first_key and start & _LOW_MASK):
+                container = (
+                    bytearray(container)
+                    if type(container) is bytearray
+                    else array("H", container)
+                )
+            if key == first_key and start & _LOW_MASK:
+                container = _drop_low(container, start & _LOW_MASK)
+            # Pusty blok nie jest zapisywany (add zakłada niepustą tablicę)
+            if not _is_empty(container):
+                result._chunks[key] = container
+        return result
+
+    # Przecięcie bitmap
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        result = Bitmap()
+        others = other._chunks
+        for key, container in list(self._chunks.items()):
+            match = others.get(key)
+            if match is not None:
+                result._chunks[key] = _intersect(container, match)
+        return result
+
+    # Liczba numerów wspólnych z inną bitmapą
+    def intersection_count(self, other: "Bitmap") -> int:
+        count = 0
+        others = other._chunks
+        for key, container in list(self._chunks.items()):
+            match = others.get(key)
+            if match is not None:
+                count += _intersection_count(container, match)
+        return count
+
+    # Zapis bitmapy jako słownik (JSON) - blok to tablica lub mapa bitów
+    # zakodowana base64 (mapa bitów ma zawsze 8192 bajty, tablica mniej)
+    def to_dict(self) -> dict[str, str]:
+        return {
+            str(key): base64.b64encode(
+                container if type(container) is bytearray else container.tobytes()
+            ).decode()
+            for key, container in list(self._chunks.items())
+        }
+
+    # Odtworzenie bitmapy ze słownika
+    @classmethod
+    def from_dict(cls, data: dict[str, str]) -> "Bitmap":
+        bitmap = cls()
+        for key, encoded in data.items():
+            raw = base64.b64decode(encoded)
+            if len(raw) == _DENSE_BYTES:
+                bitmap._chunks[int(key)] = bytearray(raw)
+            else:
+                container = array("H")
+                container.frombytes(raw)
+                bitmap._chunks[int(key)] = container
+        return bitmap
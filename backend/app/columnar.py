@@ -0,0 +1,767 @@
+"""
+Kolumnowy magazyn odpowiedzi jednej ankiety.
+
+Zamiast listy obiektów SurveyResponse każda kolumna (pytanie) przechowuje
+wartości w tablicy o stałym typie:
+- array('b') z numerem opcji dla pytań jednokrotnego wyboru i tak/nie,
+- maski bitowe array('q') dla pytań wielokrotnego wyboru,
+- array('d') dla ocen,
+- bufor bajtów z tablicą przesunięć dla odpowiedzi tekstowych.
+
+Obiekty SurveyResponse są odtwarzane dopiero przy odczycie. Odpowiedzi,
+których nie da się wiernie zapisać w kolumnach (np. nietypowa kolejność
+odpowiedzi lub wartość innego typu), trafiają w całości do słownika
+wyjątków, dzięki czemu odczyt zawsze zwraca dokładnie to, co zapisano.
+
+Magazyn dzieli odpowiedzi na porcje o stałej liczbie wierszy - pełne
+porcje mogą być w całości zwalniane przez politykę retencji. Po ustawieniu
+katalogu segmentów w pamięci trzymana jest tylko ostatnia, rosnąca porcja
+("gorący ogon"); pełna porcja jest zapisywana do pliku segmentu o stałym układzie
+(nagłówek + tablica przesunięć + surowe bufory kolumn) i odczytywana
+z powrotem przez mmap - kolumny stają się widokami memoryview na
+zmapowany plik, więc dane starszych odpowiedzi nie zajmują sterty,
+a strony pliku mogą być zwalniane przez system.
+"""
+
+import mmap
+import os
+import shutil
+import struct
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from copy import copy
+from datetime import datetime, timedelta
+from typing import Any
+from uuid import UUID
+
+from app.models.survey import Answer, Question, QuestionType, SurveyResponse
+from app.records import ResponseRecord
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Znacznik braku wartości w kolumnie
+MISSING = -1
+
+# Wartości pytań tak/nie w kolejności kodów
+_YES_NO_VALUES: tuple[Any, ...] = ("yes", "no", True, False)
+
+# Maksymalna dokładna liczba całkowita w float64
+_MAX_EXACT_INT = 2**53
+
+# Nagłówek pliku segmentu: znacznik, wersja, liczba wierszy, liczba buforów
+_SEGMENT_HEADER = struct.Struct("<4sIQI")
+_SEGMENT_MAGIC = b"PLSG"
+_SEGMENT_VERSION = 1
+# Wpis tablicy buforów: przesunięcie i rozmiar w bajtach
+_SEGMENT_ENTRY = struct.Struct("<QQ")
+_SEGMENT_ALIGNMENT = 8
+
+
+# Zamiana daty (bez strefy czasowej) na mikrosekundy od epoki
+def to_micros(value: datetime) -> int:
+    return (value - _EPOCH) // _MICROSECOND
+
+
+# Zamiana mikrosekund od epoki na datę
+def from_micros(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=value)
+
+
+# Kolumna tekstowa: bufor UTF-8 + przesunięcia końców wartości
+class TextColumn:
+    __slots__ = ("data", "offsets", "present")
+
+    # Atrybuty z surowymi buforami zapisywanymi w segmencie
+    BUFFERS = ("data", "offsets", "present")
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+        self.offsets = array("q")
+        self.present = bytearray()
+
+    def accepts(self, value: Any) -> bool:
+        return type(value) is str
+
+    def append(self, value: Any) -> None:
+        self.data += value.encode()
+        self.offsets.append(len(self.data))
+        self.present.append(1)
+
+    def append_missing(self) -> None:
+        self.offsets.append(len(self.data))
+        self.present.append(0)
+
+    def has(self, row: int) -> bool:
+        return self.present[row] == 1
+
+    def get(self, row: int) -> Any:
+        start = self.offsets[row - 1] if row else 0
+        # str() dekoduje zarówno bytearray, jak i widok na zmapowany plik
+        return str(self.data[start : self.offsets[row]], "utf-8")
+
+    def nbytes(self) -> int:
+        return (
+            len(self.data)
+            + len(self.offsets) * self.offsets.itemsize
+            + len(self.present)
+        )
+
+
+# Kolumna z numerem wybranej opcji (jednokrotny wybór, tak/nie)
+class ChoiceColumn:
+    __slots__ = ("_lookup", "codes", "options")
+
+    BUFFERS = ("codes",)
+
+    def __init__(self, options: tuple[Any, ...]) -> None:
+        self.options = options
+        self.codes = array("b")
+        # Klucz uwzględnia typ, aby np. 1 nie zostało zapisane jako True
+        self._lookup = {(type(v), v): code for code, v in enumerate(options)}
+
+    def accepts(self, value: Any) -> bool:
+        try:
+            return (type(value), value) in self._lookup
+        except TypeError:
+            return False
+
+    def append(self, value: Any) -> None:
+        self.codes.append(self._lookup[(type(value), value)])
+
+    def append_missing(self) -> None:
+        self.codes.append(MISSING)
+
+    def has(self, row: int) -> bool:
+        return self.codes[row] != MISSING
+
+    def get(self, row: int) -> Any:
+        return self.options[self.codes[row]]
+
+    def nbytes(self) -> int:
+        return len(self.codes) * self.codes.itemsize
+
+
+# Kolumna wielokrotnego wyboru: maska bitowa zaznaczonych opcji
+class MultiChoiceColumn:
+    __slots__ = ("_lookup", "masks", "options")
+
+    BUFFERS = ("masks",)
+
+    def __init__(self, options: tuple[str, ...]) -> None:
+        self.options = options
+        self.masks = array("q")
+        self._lookup = {option: index for index, option in enumerate(options)}
+
+    # Zapisywane są tylko listy opcji bez powtórzeń, w kolejności z ankiety
+    def accepts(self, value: Any) -> bool:
+        if type(value) is not list:
+            return False
+        previous = -1
+        for option in value:
+            index = self._lookup.get(option) if type(option) is str else None
+            if index is None or index <= previous:
+                return False
+            previous = index
+        return True
+
+    def append(self, value: Any) -> None:
+        mask = 0
+        for option in value:
+            mask |= 1 << self._lookup[option]
+        self.masks.append(mask)
+
+    def append_missing(self) -> None:
+        self.masks.append(MISSING)
+
+    def has(self, row: int) -> bool:
+        return self.masks[row] != MISSING
+
+    def get(self, row: int) -> Any:
+        mask = self.masks[row]
+        return [option for i, option in enumerate(self.options) if mask >> i & 1]
+
+    def nbytes(self) -> int:
+        return len(self.masks) * self.masks.itemsize
+
+
+# Kolumna ocen: wartości float64 + rodzaj wartości (int/float)
+class RatingColumn:
+    __slots__ = ("kinds", "values")
+
+    BUFFERS = ("values", "kinds")
+
+    _MISSING_KIND = 0
+    _INT_KIND = 1
+    _FLOAT_KIND = 2
+
+    def __init__(self) -> None:
+        self.values = array("d")
+        self.kinds = bytearray()
+
+    def accepts(self, value: Any) -> bool:
+        if type(value) is float:
+            return True
+        return type(value) is int and -_MAX_EXACT_INT <= value <= _MAX_EXACT_INT
+
+    def append(self, value: Any) -> None:
+        self.values.append(value)
+        self.kinds.append(self._INT_KIND if type(value) is int else self._FLOAT_KIND)
+
+    def append_missing(self) -> None:
+        self.values.append(0.0)
+        self.kinds.append(self._MISSING_KIND)
+
+    def has(self, row: int) -> bool:
+        return self.kinds[row] != self._MISSING_KIND
+
+    def get(self, row: int) -> Any:
+        value = self.values[row]
+        return int(value) if self.kinds[row] == self._INT_KIND else value
+
+    def nbytes(self) -> int:
+        return len(self.values) * self.values.itemsize + len(self.kinds)
+
+
+Column = TextColumn | ChoiceColumn | MultiChoiceColumn | RatingColumn
+
+
+# Dobranie kolumny do typu pytania
+def column_for(question: Question) -> Column:
+    options = tuple(question.options or ())
+    match question.type:
+        case QuestionType.YES_NO:
+            return ChoiceColumn(_YES_NO_VALUES)
+        case QuestionType.SINGLE_CHOICE if 0 < len(options) <= 127:
+            return ChoiceColumn(options)
+        case QuestionType.MULTIPLE_CHOICE if 0 < len(options) <= 63:
+            return MultiChoiceColumn(options)
+        case QuestionType.RATING:
+            return RatingColumn()
+        case _:
+            return TextColumn()
+
+
+# Typ elementu bufora (bytearray nie ma atrybutu typecode)
+def _typecode(buffer: array | bytearray) -> str:
+    return buffer.typecode if isinstance(buffer, array) else "B"
+
+
+# Kopia kolumny z buforami zastąpionymi widokami na segment
+def _mapped_column(column: Column, views: Iterator[memoryview]) -> Column:
+    mapped = copy(column)
+    for name in column.BUFFERS:
+        setattr(mapped, name, next(views))
+    return mapped
+
+
+class ResponseChunk:
+    """
+    Porcja kolejnych wierszy magazynu kolumnowego.
+
+    Porcja w pamięci przyjmuje nowe wiersze. Porcja zapieczętowana
+    (zapisana w segmencie) ma bufory zastąpione widokami memoryview
+    na zmapowany plik i jest tylko do odczytu.
+    """
+
+    __slots__ = (
+        "_mapping",
+        "columns",
+        "ids",
+        "length",
+        "overflow",
+        "overflow_payloads",
+        "overflow_rows",
+        "respondents",
+        "submitted_at",
+    )
+
+    def __init__(self, columns: dict[str, Column]) -> None:
+        self.columns = columns
+
+        # Metadane odpowiedzi
+        self.ids: bytearray | memoryview = bytearray()
+        self.submitted_at: array | memoryview = array("q")
+        self.respondents = TextColumn()
+
+        # Odpowiedzi, których nie da się wiernie zapisać w kolumnach
+        # (w segmencie: posortowane numery wierszy + odpowiedzi w JSON)
+        self.overflow: dict[int, SurveyResponse] = {}
+        self.overflow_rows: array | memoryview = array("q")
+        self.overflow_payloads = TextColumn()
+
+        self.length = 0
+        self._mapping: mmap.mmap | None = None
+
+    # Dodanie wiersza (answered = None dla odpowiedzi spoza układu kolumnowego,
+    # rekord ResponseRecord tylko dla odpowiedzi mieszczących się w kolumnach)
+    def append(
+        self, response: SurveyResponse | ResponseRecord, answered: dict[str, Any] | None
+    ) -> None:
+        row = self.length
+        fits = answered is not None
+        if not fits:
+            self.overflow[row] = response
+            answered = {}
+
+        for question_id, column in self.columns.items():
+            if question_id in answered:
+                column.append(answered[question_id])
+            else:
+                column.append_missing()
+
+        self.ids += response.id.bytes
+        self.submitted_at.append(to_micros(response.submitted_at) if fits else 0)
+        if fits and response.respondent_id is not None:
+            self.respondents.append(response.respondent_id)
+        else:
+            self.respondents.append_missing()
+
+        # Długość zwiększana na końcu - czytelnicy widzą tylko kompletne wiersze
+        self.length = row + 1
+
+    # Odpowiedź spoza układu kolumnowego zapisana w danym wierszu
+    def _overflow_at(self, row: int) -> SurveyResponse | None:
+        if self._mapping is None:
+            return self.overflow.get(row)
+
+        rows = self.overflow_rows
+        position = bisect_left(rows, row)
+        if position == len(rows) or rows[position] != row:
+            return None
+        return SurveyResponse.model_validate_json(self.overflow_payloads.get(position))
+
+    # Identyfikator odpowiedzi w wierszu (odczyt z kolumny identyfikatorów)
+    def id_at(self, row: int) -> UUID:
+        return UUID(bytes=bytes(self.ids[row * 16 : row * 16 + 16]))
+
+    # Czas wysłania odpowiedzi w wierszu (wiersze spoza układu kolumnowego
+    # mają w kolumnie czasu zero)
+    def time_at(self, row: int) -> datetime:
+        micros = self.submitted_at[row]
+        if micros == 0:
+            overflow = self._overflow_at(row)
+            if overflow is not None:
+                return overflow.submitted_at
+        return from_micros(micros)
+
+    # Sprawdzenie czy klucze czasu (app.indexes.time_key) wszystkich odpowiedzi
+    # porcji są mniejsze niż cutoff_key - kolumna czasu sprawdzana jest jednym
+    # przebiegiem max(), odpowiedzi spoza układu kolumnowego osobno
+    def sent_before(self, cutoff_key: int) -> bool:
+        # Import w funkcji - app.indexes importuje ten moduł
+        from app.indexes import time_key
+
+        if self.length and max(self.submitted_at) >= cutoff_key:
+            return False
+        rows = self.overflow if self._mapping is None else self.overflow_rows
+        return all(time_key(self.time_at(row)) < cutoff_key for row in rows)
+
+    # Odtworzenie obiektu odpowiedzi z kolumn
+    def get(self, survey_id: UUID, row: int) -> SurveyResponse:
+        overflow = self._overflow_at(row)
+        if overflow is not None:
+            return overflow
+
+        answers = [
+            Answer.model_construct(question_id=question_id, value=column.get(row))
+            for question_id, column in self.columns.items()
+            if column.has(row)
+        ]
+
+        respondents = self.respondents
+        return SurveyResponse.model_construct(
+            id=self.id_at(row),
+            survey_id=survey_id,
+            answers=answers,
+            respondent_id=respondents.get(row) if respondents.has(row) else None,
+            submitted_at=from_micros(self.submitted_at[row]),
+        )
+
+    # Bufory porcji w stałej kolejności zapisu do segmentu
+    def _buffers(self) -> list[array | bytearray | memoryview]:
+        buffers = [self.ids, self.submitted_at]
+        buffers += [getattr(self.respondents, name) for name in TextColumn.BUFFERS]
+        for column in self.columns.values():
+            buffers += [getattr(column, name) for name in column.BUFFERS]
+        buffers.append(self.overflow_rows)
+        buffers += [
+            getattr(self.overflow_payloads, name) for name in TextColumn.BUFFERS
+        ]
+        return buffers
+
+    # Zapis porcji do pliku segmentu i zwrócenie porcji zmapowanej z tego pliku
+    def seal(self, path: str) -> "ResponseChunk":
+        for row in sorted(self.overflow):
+            self.overflow_rows.append(row)
+            self.overflow_payloads.append(self.overflow[row].model_dump_json())
+
+        buffers = self._buffers()
+        typecodes = [_typecode(buffer) for buffer in buffers]
+
+        # Układ pliku: nagłówek, tablica buforów, bufory wyrównane do 8 bajtów
+        offset = _SEGMENT_HEADER.size + _SEGMENT_ENTRY.size * len(buffers)
+        entries = []
+        for buffer in buffers:
+            offset += -offset % _SEGMENT_ALIGNMENT
+            size = (
+                len(buffer) * buffer.itemsize
+                if isinstance(buffer, array)
+                else len(buffer)
+            )
+            entries.append((offset, size))
+            offset += size
+
+        with open(path, "wb") as segment:
+            segment.write(
+                _SEGMENT_HEADER.pack(
+                    _SEGMENT_MAGIC, _SEGMENT_VERSION, self.length, len(buffers)
+                )
+            )
+            segment.writelines(_SEGMENT_ENTRY.pack(*entry) for entry in entries)
+            for buffer, (start, _) in zip(buffers, entries):
+                segment.write(b"\0" * (start - segment.tell()))
+                segment.write(buffer)
+
+        return self._map(path, typecodes)
+
+    # Odczyt segmentu przez mmap - bufory stają się widokami na plik
+    def _map(self, path: str, typecodes: list[str]) -> "ResponseChunk":
+        with open(path, "rb") as segment:
+            mapping = mmap.mmap(segment.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, length, count = _SEGMENT_HEADER.unpack_from(mapping)
+        if (
+            magic != _SEGMENT_MAGIC
+            or version != _SEGMENT_VERSION
+            or count != len(typecodes)
+        ):
+            raise ValueError(f"Invalid response segment: {path}")
+
+        data = memoryview(mapping)
+        views = []
+        for index, typecode in enumerate(typecodes):
+            start, size = _SEGMENT_ENTRY.unpack_from(
+                mapping, _SEGMENT_HEADER.size + index * _SEGMENT_ENTRY.size
+            )
+            views.append(data[start : start + size].cast(typecode))
+
+        view_iter = iter(views)
+        ids = next(view_iter)
+        submitted_at = next(view_iter)
+        respondents = _mapped_column(self.respondents, view_iter)
+        columns = {
+            question_id: _mapped_column(column, view_iter)
+            for question_id, column in self.columns.items()
+        }
+
+        chunk = ResponseChunk(columns)
+        chunk.ids = ids
+        chunk.submitted_at = submitted_at
+        chunk.respondents = respondents
+        chunk.overflow_rows = next(view_iter)
+        chunk.overflow_payloads = _mapped_column(self.overflow_payloads, view_iter)
+        chunk.length = length
+        chunk._mapping = mapping
+        return chunk
+
+    # Rozmiar danych porcji trzymanych na stercie (w bajtach)
+    def nbytes(self) -> int:
+        if self._mapping is not None:
+            return 0
+        return (
+            len(self.ids)
+            + len(self.submitted_at) * self.submitted_at.itemsize
+            + self.respondents.nbytes()
+            + sum(column.nbytes() for column in self.columns.values())
+        )
+
+    # Rozmiar zmapowanego pliku segmentu (w bajtach)
+    def mapped_bytes(self) -> int:
+        return len(self._mapping) if self._mapping is not None else 0
+
+
+class ColumnarResponseStore:
+    """
+    Magazyn odpowiedzi jednej ankiety w układzie kolumnowym.
+
+    Co hot_tail_size wierszy gorąca porcja jest pieczętowana. Z katalogiem
+    segmentów trafia do pliku mapowanego przez mmap, bez niego zostaje
+    w pamięci. Zapieczętowane porcje mogą być w całości zwalniane przez
+    politykę retencji (numery pozostałych wierszy się nie zmieniają).
+    """
+
+    def __init__(
+        self,
+        survey_id: UUID,
+        questions: list[Question],
+        segment_dir: str | None = None,
+        hot_tail_size: int = 65536,
+    ) -> None:
+        self._survey_id = survey_id
+        self._questions = questions
+        # Kolumny wzorcowe - używane tylko do sprawdzania wartości
+        self._columns = self._new_columns()
+        self._order = {question_id: i for i, question_id in enumerate(self._columns)}
+
+        # Katalog segmentów tej ankiety (pozostałości po poprzednim procesie
+        # są usuwane - segmenty to tylko odciążenie pamięci, nie trwały zapis)
+        self._segment_dir: str | None = None
+        self._chunk_rows = max(1, hot_tail_size)
+        if segment_dir:
+            self._segment_dir = os.path.join(segment_dir, str(survey_id))
+            shutil.rmtree(self._segment_dir, ignore_errors=True)
+
+        # Zapieczętowane porcje (None = porcja zwolniona przez retencję)
+        self._segments: list[ResponseChunk | None] = []
+        self._dropped_chunks = 0
+        self._hot = ResponseChunk(self._new_columns())
+        self._length = 0
+
+    # Liczba wszystkich dodanych wierszy (także zwolnionych)
+    def __len__(self) -> int:
+        return self._length
+
+    # Numer pierwszego dostępnego wiersza
+    @property
+    def first_row(self) -> int:
+        return self._dropped_chunks * self._chunk_rows
+
+    # Puste kolumny dla nowej porcji
+    def _new_columns(self) -> dict[str, Column]:
+        columns: dict[str, Column] = {}
+        for question in self._questions:
+            columns.setdefault(question.id, column_for(question))
+        return columns
+
+    # Odpowiedzi (pary pytanie, wartość) jako słownik do zapisu w kolumnach
+    # (None, jeśli odpowiedzi nie da się zapisać bez utraty informacji)
+    def _answered(
+        self, submitted_at: datetime, answers: Iterable[tuple[str, Any]]
+    ) -> dict[str, Any] | None:
+        if submitted_at.tzinfo is not None:
+            return None
+
+        answered = {}
+        previous = -1
+        for question_id, value in answers:
+            position = self._order.get(question_id)
+            # Odpowiedzi muszą być unikalne i w kolejności pytań z ankiety
+            if position is None or position <= previous:
+                return None
+            if not self._columns[question_id].accepts(value):
+                return None
+            answered[question_id] = value
+            previous = position
+        return answered
+
+    # Dodanie wiersza do gorącej porcji
+    def _append_row(
+        self, response: SurveyResponse | ResponseRecord, answered: dict[str, Any] | None
+    ) -> None:
+        hot = self._hot
+        hot.append(response, answered)
+        self._length += 1
+
+        if hot.length >= self._chunk_rows:
+            self._seal()
+
+    # Dodanie odpowiedzi
+    def append(self, response: SurveyResponse) -> None:
+        answered = self._answered(
+            response.submitted_at,
+            ((answer.question_id, answer.value) for answer in response.answers),
+        )
+        self._append_row(response, answered)
+
+    # Dodanie odpowiedzi zapisanej jako rekord (bez tworzenia modelu)
+    def append_record(self, record: ResponseRecord) -> None:
+        answers = record.answers
+        answered = self._answered(
+            record.submitted_at, zip(answers[0::2], answers[1::2])
+        )
+        if answered is None:
+            self._append_row(record.to_model(self._survey_id), None)
+        else:
+            self._append_row(record, answered)
+
+    # Ścieżka pliku segmentu o danym numerze
+    def _segment_path(self, index: int) -> str:
+        return os.path.join(self._segment_dir, f"{index:08d}.seg")
+
+    # Zapieczętowanie gorącej porcji (do segmentu, jeśli ustawiono katalog)
+    def _seal(self) -> None:
+        sealed = self._hot
+        if self._segment_dir is not None:
+            os.makedirs(self._segment_dir, exist_ok=True)
+            sealed = sealed.seal(self._segment_path(len(self._segments)))
+
+        # Najpierw publikacja segmentu, potem nowa porcja - czytelnik,
+        # który zobaczy nową porcję, zobaczy też segment
+        self._segments.append(sealed)
+        self._hot = ResponseChunk(self._new_columns())
+
+    # Zwolnienie zapieczętowanych porcji zawierających wyłącznie wiersze < row
+    # (zwraca liczbę zwolnionych wierszy)
+    def drop_before(self, row: int) -> int:
+        first_row = self.first_row
+        # Nowa lista segmentów - widoki utworzone wcześniej czytają poprzednią
+        segments = list(self._segments)
+        while (
+            self._dropped_chunks < len(segments)
+            and (self._dropped_chunks + 1) * self._chunk_rows <= row
+        ):
+            segments[self._dropped_chunks] = None
+            if self._segment_dir is not None:
+                try:
+                    os.remove(self._segment_path(self._dropped_chunks))
+                except FileNotFoundError:
+                    pass
+            self._dropped_chunks += 1
+        self._segments = segments
+        return self.first_row - first_row
+
+    # Koniec początku magazynu złożonego z odpowiedzi, których klucz czasu
+    # jest mniejszy niż cutoff_key. Zwalniane są tylko całe zapieczętowane
+    # porcje, więc sprawdzanie kończy się na pierwszej porcji z nowszą
+    # odpowiedzią (gorąca porcja nie jest przeglądana).
+    def expired_prefix(self, cutoff_key: int) -> int:
+        segments = self._segments
+        index = self._dropped_chunks
+        while index < len(segments) and segments[index].sent_before(cutoff_key):
+            index += 1
+        return index * self._chunk_rows
+
+    # Niezmienny widok obecnych wierszy (kolejne zapisy nie są w nim widoczne;
+    # wywoływany pod blokadą zapisów)
+    def view(self) -> "ColumnarResponseView":
+        return ColumnarResponseView(
+            self._survey_id,
+            (*self._segments, self._hot),
+            self._chunk_rows,
+            self.first_row,
+            self._length,
+        )
+
+    # Porcja zawierająca wiersz i numer wiersza w porcji
+    def _locate(self, row: int) -> tuple[ResponseChunk, int]:
+        if row < 0:
+            row += self._length
+        if not self.first_row <= row < self._length:
+            raise IndexError("response index out of range")
+
+        # Gorąca porcja odczytywana przed listą segmentów (patrz _seal)
+        hot = self._hot
+        index, local_row = divmod(row, self._chunk_rows)
+        chunk = self._segments[index] if index < len(self._segments) else hot
+        return chunk, local_row
+
+    # Odtworzenie obiektu odpowiedzi z kolumn
+    def __getitem__(self, row: int) -> SurveyResponse:
+        chunk, local_row = self._locate(row)
+        return chunk.get(self._survey_id, local_row)
+
+    # Identyfikator odpowiedzi w danym wierszu (bez odtwarzania odpowiedzi)
+    def id_at(self, row: int) -> UUID:
+        chunk, local_row = self._locate(row)
+        return chunk.id_at(local_row)
+
+    # Czas wysłania odpowiedzi w danym wierszu (bez odtwarzania odpowiedzi)
+    def time_at(self, row: int) -> datetime:
+        chunk, local_row = self._locate(row)
+        return chunk.time_at(local_row)
+
+    def __iter__(self) -> Iterator[SurveyResponse]:
+        for row in range(self.first_row, self._length):
+            yield self[row]
+
+    # Odtworzenie wszystkich dostępnych odpowiedzi
+    def to_list(self) -> list[SurveyResponse]:
+        return list(self)
+
+    # Dostępne odpowiedzi jako rekordy (np. do zapisu migawki)
+    def records(self) -> Iterator[ResponseRecord]:
+        question_ids = {question.id: question.id for question in self._questions}
+        for response in self:
+            yield ResponseRecord.from_model(response, question_ids)
+
+    # Przybliżony rozmiar danych kolumn na stercie (w bajtach)
+    def nbytes(self) -> int:
+        chunks = [chunk for chunk in self._segments if chunk is not None]
+        return self._hot.nbytes() + sum(chunk.nbytes() for chunk in chunks)
+
+    # Rozmiar danych w zmapowanych segmentach (w bajtach)
+    def mapped_bytes(self) -> int:
+        return sum(
+            segment.mapped_bytes() for segment in self._segments if segment is not None
+        )
+
+    # Liczba zapieczętowanych i niezwolnionych porcji
+    @property
+    def segment_count(self) -> int:
+        return len(self._segments) - self._dropped_chunks
+
+    # Usunięcie plików segmentów z dysku (zmapowane dane pozostają czytelne
+    # do zwolnienia magazynu)
+    def close(self) -> None:
+        if self._segment_dir is not None:
+            shutil.rmtree(self._segment_dir, ignore_errors=True)
+
+
+class ColumnarResponseView:
+    """
+    Niezmienny widok wierszy magazynu kolumnowego z chwili jego utworzenia.
+
+    Porcje są tylko dopisywane, a zapieczętowana porcja w pamięci nie jest
+    już zmieniana, więc widok może być czytany bez blokady równolegle
+    z zapisami.
+    """
+
+    __slots__ = ("_chunk_rows", "_chunks", "_first_row", "_length", "_survey_id")
+
+    def __init__(
+        self,
+        survey_id: UUID,
+        chunks: tuple[ResponseChunk | None, ...],
+        chunk_rows: int,
+        first_row: int,
+        length: int,
+    ) -> None:
+        self._survey_id = survey_id
+        self._chunks = chunks
+        self._chunk_rows = chunk_rows
+        self._first_row = first_row
+        self._length = length
+
+    # Liczba wszystkich wierszy w chwili utworzenia widoku (także zwolnionych)
+    def __len__(self) -> int:
+        return self._length
+
+    # Numer pierwszego dostępnego wiersza
+    @property
+    def first_row(self) -> int:
+        return self._first_row
+
+    def _locate(self, row: int) -> tuple[ResponseChunk, int]:
+        if row < 0:
+            row += self._length
+        if not self._first_row <= row < self._length:
+            raise IndexError("response index out of range")
+        index, local_row = divmod(row, self._chunk_rows)
+        return self._chunks[index], local_row
+
+    def __getitem__(self, row: int) -> SurveyResponse:
+        chunk, local_row = self._locate(row)
+        return chunk.get(self._survey_id, local_row)
+
+    def id_at(self, row: int) -> UUID:
+        chunk, local_row = self._locate(row)
+        return chunk.id_at(local_row)
+
+    def __iter__(self) -> Iterator[SurveyResponse]:
+        for row in range(self._first_row, self._length):
+            yield self[row]
+
+    def to_list(self) -> list[SurveyResponse]:
+        return list(self)
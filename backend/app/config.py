@@ -72,6 +72,58 @@ class ConfigManager(metaclass=ConfigMeta):
                 "default_required": False,
                 "allow_anonymous": True,
             },
+            # Ustawienia bazy danych
+            "database": {
+                # Rodzaj bazy: "memory" (singleton w procesie) lub "sqlite"
+                "backend": "memory",
+                "sqlite_path": "polly.db",
+                # Układ odpowiedzi w pamięci: "objects" lub "columnar"
+                "storage_layout": "objects",
+                # Liczba blokad bazy w pamięci (1 = jedna globalna blokada)
+                "lock_stripes": 64,
+                # Katalog dziennika WAL (None = baza tylko w pamięci)
+                "wal_dir": None,
+                # Tryb fsync: "always" (każdy zapis), "interval" (co N ms), "os"
+                "wal_fsync": "interval",
+                "wal_fsync_interval_ms": 100,
+                "wal_segment_max_bytes": 64 * 1024 * 1024,
+                # Katalog segmentów mmap dla układu "columnar" (None = wszystko w RAM)
+                "segment_dir": None,
+                # Plik migawki bazy w pamięci (None = bez migawki)
+                "snapshot_path": None,
+                # Liczba odpowiedzi w porcji (co tyle odpowiedzi porcja jest pieczętowana)
+                "hot_tail_size": 65536,
+            },
+            # Klucze idempotencji (nagłówek Idempotency-Key)
+            "idempotency": {
+                "max_keys": 100_000,
+                "ttl_seconds": 24 * 60 * 60,
+            },
+            # Retencja surowych odpowiedzi (statystyki są zachowywane w agregatach)
+            "retention": {
+                # Domyślny czas przechowywania odpowiedzi w dniach (None = bez limitu)
+                "days": None,
+                # Odstęp między przebiegami retencji
+                "interval_seconds": 3600,
+            },
+            # Pamięć podręczna statystyk ankiet
+            "stats": {
+                # Jak długo (w sekundach) można zwracać statystyki sprzed
+                # nowych odpowiedzi, odświeżając je w tle (domyślnie 0 - zawsze
+                # aktualne, także zaraz po własnym zapisie klienta)
+                "max_staleness_seconds": 0.0,
+                # Największa liczba statystyk w pamięci podręcznej (usuwane są
+                # najdawniej używane)
+                "cache_max_entries": 10000,
+                # Liczba najczęstszych odpowiedzi tekstowych w statystykach
+                # (pozostałe są zliczane łącznie w other_responses)
+                "text_top_k": 20,
+            },
+            # Endpointy stanu aplikacji
+            "health": {
+                # Czas zapamiętania szczegółowej odpowiedzi /health
+                "cache_ttl_seconds": 5.0,
+            },
             # Azure Application Insights
             "azure": {
                 "appinsights_connection_string": None,
@@ -86,6 +138,27 @@ class ConfigManager(metaclass=ConfigMeta):
             "POLLY_DEBUG": ("server", "debug", lambda x: x.lower() == "true"),
             "POLLY_BASE_URL": ("api", "base_url"),
             "POLLY_MAX_QUESTIONS": ("limits", "max_questions_per_survey", int),
+            "POLLY_DB_BACKEND": ("database", "backend"),
+            "POLLY_SQLITE_PATH": ("database", "sqlite_path"),
+            "POLLY_STORAGE_LAYOUT": ("database", "storage_layout"),
+            "POLLY_WAL_DIR": ("database", "wal_dir"),
+            "POLLY_WAL_FSYNC": ("database", "wal_fsync"),
+            "POLLY_WAL_FSYNC_INTERVAL_MS": ("database", "wal_fsync_interval_ms", int),
+            "POLLY_SEGMENT_DIR": ("database", "segment_dir"),
+            "POLLY_HOT_TAIL_SIZE": ("database", "hot_tail_size", int),
+            "POLLY_SNAPSHOT_PATH": ("database", "snapshot_path"),
+            "POLLY_IDEMPOTENCY_MAX_KEYS": ("idempotency", "max_keys", int),
+            "POLLY_IDEMPOTENCY_TTL_SECONDS": ("idempotency", "ttl_seconds", int),
+            "POLLY_RETENTION_DAYS": ("retention", "days", int),
+            "POLLY_RETENTION_INTERVAL_SECONDS": ("retention", "interval_seconds", int),
+            "POLLY_HEALTH_CACHE_TTL_SECONDS": ("health", "cache_ttl_seconds", float),
+            "POLLY_STATS_MAX_STALENESS_SECONDS": (
+                "stats",
+                "max_staleness_seconds",
+                float,
+            ),
+            "POLLY_STATS_CACHE_MAX_ENTRIES": ("stats", "cache_max_entries", int),
+            "POLLY_STATS_TEXT_TOP_K": ("stats", "text_top_k", int),
             "APPLICATIONINSIGHTS_CONNECTION_STRING": (
                 "azure",
                 "appinsights_connection_string",
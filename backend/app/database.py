@@ -1,9 +1,51 @@
+import gc
+import json
+import os
+import time
 from datetime import datetime
 from threading import Lock
-from typing import Any
+from typing import TYPE_CHECKING, Any
 from uuid import UUID
 
+from app import snapshot, wal
+from app.aggregates import SurveyAggregate
+from app.columnar import ColumnarResponseStore, ColumnarResponseView
+from app.config import get_config
+from app.idempotency import IdempotencyIndex
+from app.indexes import RespondentIndex, TimeIndex, time_key
 from app.models.survey import Survey, SurveyResponse
+from app.records import ResponseRecord, ResponseRecordStore, ResponseRecordView
+from app.wal import PendingSync, WriteAheadLog
+
+if TYPE_CHECKING:
+    from app.sqlite_database import SQLiteDatabase
+
+# Magazyn odpowiedzi jednej ankiety: lista zwartych rekordów lub układ kolumnowy
+ResponseStore = ResponseRecordStore | ColumnarResponseStore
+# Niezmienny widok wierszy magazynu odpowiedzi
+ResponseView = ResponseRecordView | ColumnarResponseView
+
+
+class SurveyView:
+    """
+    Niezmienny, wersjonowany widok ankiety: odpowiedzi i agregaty statystyk
+    z tej samej chwili. Czytelnicy pobierają go bez blokady i nie widzą
+    zapisów wykonanych po jego utworzeniu (nie wolno go modyfikować).
+    """
+
+    __slots__ = ("aggregate", "responses", "survey", "version")
+
+    def __init__(
+        self,
+        survey: Survey,
+        version: int,
+        responses: ResponseView,
+        aggregate: SurveyAggregate,
+    ) -> None:
+        self.survey = survey
+        self.version = version
+        self.responses = responses
+        self.aggregate = aggregate
 
 
 # Metaklasa niezbędna aby stworzyć singletona
@@ -27,39 +69,515 @@ class Database(metaclass=DatabaseMeta):
     # Konstruktor
     def __init__(self) -> None:
         self._surveys: dict[UUID, Survey] = {}
-        self._responses: dict[UUID, list[SurveyResponse]] = {}
-        self._lock = Lock()
+        self._responses: dict[UUID, ResponseStore] = {}
+        self._aggregates: dict[UUID, SurveyAggregate] = {}
+        self._time_indexes: dict[UUID, TimeIndex] = {}
+        self._respondent_indexes: dict[UUID, RespondentIndex] = {}
+        # Wersja danych ankiety (zwiększana przy każdej zmianie) i ostatnio
+        # utworzony widok - czytelnicy korzystają z niego, dopóki wersja się
+        # nie zmieni
+        self._versions: dict[UUID, int] = {}
+        self._views: dict[UUID, SurveyView] = {}
+        # Słownik ankiet jest kopiowany przy zapisie - czytelnicy dostają
+        # niezmienny słownik bez blokady
+        self._catalog_lock = Lock()
         self._initialized_at = datetime.now()
+        database_config = get_config().get_section("database")
+
+        # Układ przechowywania odpowiedzi: "objects" lub "columnar"
+        self._columnar = database_config.get("storage_layout") == "columnar"
+        # Segmenty mmap ograniczają pamięć zajętą przez starsze odpowiedzi
+        self._segment_dir = database_config.get("segment_dir")
+        self._hot_tail_size = database_config.get("hot_tail_size", 65536)
+
+        # Blokady rozłożone na paski - zapisy do różnych ankiet nie czekają na siebie
+        stripes = max(1, database_config.get("lock_stripes", 64))
+        self._locks = [Lock() for _ in range(stripes)]
+        # Liczniki zapisanych odpowiedzi (po jednym na pasek, zmieniane pod jego
+        # blokadą) - get_stats nie przegląda ankiet
+        self._response_counts = [0] * stripes
+
+        # Klucze idempotencji ponawianych zapisów odpowiedzi
+        idempotency_config = get_config().get_section("idempotency")
+        self._idempotency = IdempotencyIndex(
+            max_keys=idempotency_config.get("max_keys", 100_000),
+            ttl_seconds=idempotency_config.get("ttl_seconds", 24 * 60 * 60),
+        )
+
+        # Opcjonalna migawka - odczyt przy starcie, zapis przy zamknięciu bazy
+        # (wczytywana przed dziennikiem WAL, który zawiera tylko nowsze zapisy)
+        self._snapshot_path = database_config.get("snapshot_path")
+        self._snapshot_stats: dict[str, Any] | None = None
+        # Pierwszy segment WAL nieobjęty wczytaną migawką
+        self._wal_start = 0
+        if self._snapshot_path and os.path.exists(self._snapshot_path):
+            self.load_snapshot(self._snapshot_path)
+
+        # Opcjonalny dziennik WAL - odtworzenie danych zapisanych przed restartem
+        self._wal: WriteAheadLog | None = None
+        if database_config.get("wal_dir"):
+            self._wal = WriteAheadLog(
+                database_config["wal_dir"],
+                fsync=database_config.get("wal_fsync", "interval"),
+                fsync_interval_ms=database_config.get("wal_fsync_interval_ms", 100),
+                segment_max_bytes=database_config.get(
+                    "wal_segment_max_bytes", 64 * 1024 * 1024
+                ),
+            )
+            self._recover()
+            self._wal.open(self._wal_start)
+            # Segmenty objęte migawką (np. po awarii tuż po jej zapisie)
+            self._wal.truncate_before(self._wal_start)
+
+    # Odtworzenie stanu bazy z dziennika WAL
+    def _recover(self) -> None:
+        # Odtwarzanie tworzy miliony obiektów, które i tak żyją do końca procesu -
+        # wyłączenie GC na ten czas eliminuje kosztowne pełne przebiegi kolektora
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for record_type, payload in self._wal.replay(self._wal_start):
+                if record_type == wal.RECORD_SURVEY:
+                    self._apply_survey(Survey.model_validate_json(payload))
+                elif record_type == wal.RECORD_RESPONSE:
+                    response = SurveyResponse.model_validate_json(payload)
+                    if response.survey_id in self._responses:
+                        self._apply_response(response)
+                elif record_type == wal.RECORD_RETENTION:
+                    retention = json.loads(payload)
+                    survey_id = UUID(retention["survey_id"])
+                    store = self._responses.get(survey_id)
+                    if store is not None:
+                        cutoff_key = time_key(
+                            datetime.fromisoformat(retention["cutoff"])
+                        )
+                        self._apply_retention(
+                            survey_id, store.expired_prefix(cutoff_key), cutoff_key
+                        )
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    # Wczytanie migawki do pustej bazy - zwraca liczbę wczytanych odpowiedzi
+    def load_snapshot(self, path: str) -> int:
+        if self._surveys:
+            raise ValueError("Snapshot can only be loaded into an empty database")
+
+        started = time.perf_counter()
+        count = 0
+        # Jak przy odtwarzaniu WAL - obiekty żyją do końca procesu
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for record_type, value in snapshot.read_snapshot(path):
+                if record_type == snapshot.RECORD_SURVEY:
+                    self._apply_survey(value)
+                elif record_type == snapshot.RECORD_AGGREGATE:
+                    survey_id, data = value
+                    aggregate = SurveyAggregate.from_dict(
+                        self._surveys[survey_id].questions, data
+                    )
+                    self._aggregates[survey_id] = aggregate
+                    self._versions[survey_id] += 1
+                    # Licznik obejmuje też odpowiedzi usunięte przez retencję
+                    stripe = self._stripe(survey_id)
+                    self._response_counts[stripe] += aggregate.total_responses
+                elif record_type == snapshot.RECORD_RESPONSES:
+                    survey_id, records = value
+                    self._apply_records(survey_id, records)
+                    count += len(records)
+                elif record_type == snapshot.RECORD_WAL_START:
+                    self._wal_start = value
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+        self._snapshot_stats = {
+            "path": path,
+            "restored_responses": count,
+            "restore_seconds": round(time.perf_counter() - started, 3),
+        }
+        return count
+
+    # Zapis migawki całej bazy - zwraca liczbę zapisanych odpowiedzi.
+    # Dziennik WAL zaczyna przed migawką nowy segment, którego numer trafia do
+    # migawki - po restarcie odtwarzane są tylko segmenty od tego numeru, więc
+    # awaria między podmianą migawki a usunięciem starych segmentów nie
+    # powtarza zapisów zawartych już w migawce.
+    def save_snapshot(self, path: str) -> int:
+        # Zajęcie wszystkich blokad - spójny stan wszystkich ankiet
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            wal_start = self._wal.rotate() if self._wal is not None else None
+            count = snapshot.write_snapshot(
+                path,
+                (
+                    (
+                        survey,
+                        self._aggregates[survey_id],
+                        self._responses[survey_id].records(),
+                    )
+                    for survey_id, survey in self._surveys.items()
+                ),
+                wal_start=wal_start,
+            )
+            if self._wal is not None:
+                self._wal.truncate_before(wal_start)
+            return count
+        finally:
+            for lock in reversed(self._locks):
+                lock.release()
+
+    # Numer paska blokady danej ankiety (wybierany na podstawie hasha UUID)
+    def _stripe(self, survey_id: UUID) -> int:
+        return hash(survey_id) % len(self._locks)
+
+    # Blokada chroniąca dane danej ankiety
+    def _lock_for(self, survey_id: UUID) -> Lock:
+        return self._locks[self._stripe(survey_id)]
+
+    # Zapis ankiety w pamięci (wywoływany pod blokadą)
+    def _apply_survey(self, survey: Survey) -> None:
+        self._responses[survey.id] = (
+            ColumnarResponseStore(
+                survey.id,
+                survey.questions,
+                segment_dir=self._segment_dir,
+                hot_tail_size=self._hot_tail_size,
+            )
+            if self._columnar
+            else ResponseRecordStore(survey.id, survey.questions)
+        )
+        self._aggregates[survey.id] = SurveyAggregate(survey.questions)
+        self._time_indexes[survey.id] = TimeIndex()
+        self._respondent_indexes[survey.id] = RespondentIndex()
+        self._versions[survey.id] = 0
+
+        # Publikacja ankiety na końcu - widoczna dopiero z kompletnymi danymi
+        with self._catalog_lock:
+            surveys = dict(self._surveys)
+            surveys[survey.id] = survey
+            self._surveys = surveys
+
+    # Zapis porcji odpowiedzi z migawki (agregaty i liczniki są wczytywane osobno)
+    def _apply_records(self, survey_id: UUID, records: list[ResponseRecord]) -> None:
+        store = self._responses[survey_id]
+        time_index = self._time_indexes[survey_id]
+        respondent_index = self._respondent_indexes[survey_id]
+        id_at = store.id_at
+
+        row = len(store)
+        for record in records:
+            store.append_record(record)
+            time_index.add(time_key(record.submitted_at), row, record.id, id_at)
+            respondent_index.add(record.respondent_id, row)
+            row += 1
+        self._versions[survey_id] += 1
+
+    # Zapis odpowiedzi w pamięci (wywoływany pod blokadą)
+    def _apply_response(self, response: SurveyResponse) -> None:
+        store = self._responses[response.survey_id]
+        row = len(store)
+        store.append(response)
+        # Aktualizacja agregatów statystyk i indeksów razem z zapisem odpowiedzi
+        self._aggregates[response.survey_id].add(response)
+        self._time_indexes[response.survey_id].add(
+            time_key(response.submitted_at), row, response.id, store.id_at
+        )
+        self._respondent_indexes[response.survey_id].add(response.respondent_id, row)
+        self._response_counts[self._stripe(response.survey_id)] += 1
+        # Nowa wersja ogłaszana po zakończeniu wszystkich zmian
+        self._versions[response.survey_id] += 1
+
+    # Odczyty z pamięci mogą działać w pętli zdarzeń - poza segmentami
+    # odpowiedzi, których odczyt może czekać na doczytanie stron z dysku
+    @property
+    def blocking_reads(self) -> bool:
+        return self._columnar and self._segment_dir is not None
 
-    # Pobranie wszystkich ankiet
+    # Zapis czeka na dysk, gdy włączono dziennik WAL lub segmenty odpowiedzi
+    @property
+    def blocking_writes(self) -> bool:
+        return self._wal is not None or (
+            self._columnar and self._segment_dir is not None
+        )
+
+    # Pobranie wszystkich ankiet (niezmienny słownik - nowe ankiety trafiają
+    # do jego kopii)
     @property
     def surveys(self) -> dict[UUID, Survey]:
         return self._surveys
 
+    # Pobranie wersji danych ankiety - rośnie z każdą zmianą odpowiedzi
+    # (None jeśli ankieta nie istnieje)
+    def get_version(self, survey_id: UUID) -> int | None:
+        return self._versions.get(survey_id)
+
+    # Pobranie aktualnego widoku ankiety (None jeśli ankieta nie istnieje).
+    # Blokada jest zajmowana tylko gdy od utworzenia ostatniego widoku
+    # ankieta się zmieniła - na czas skopiowania agregatów.
+    def get_view(self, survey_id: UUID) -> SurveyView | None:
+        view = self._views.get(survey_id)
+        if view is not None and view.version == self._versions.get(survey_id):
+            return view
+
+        with self._lock_for(survey_id):
+            version = self._versions.get(survey_id)
+            if version is None:
+                return None
+            view = self._views.get(survey_id)
+            if view is None or view.version != version:
+                view = SurveyView(
+                    self._surveys[survey_id],
+                    version,
+                    self._responses[survey_id].view(),
+                    self._aggregates[survey_id].copy(),
+                )
+                self._views[survey_id] = view
+            return view
+
     # Pobranie wszystkich odpowiedzi
     @property
-    def responses(self) -> dict[UUID, list[SurveyResponse]]:
+    def responses(self) -> dict[UUID, ResponseStore]:
         return self._responses
 
+    # Zapis rekordów do dziennika bez czekania na fsync (wywoływany pod
+    # blokadą, żeby kolejność w dzienniku odpowiadała kolejności w pamięci)
+    def _write_wal(self, record_type: int, payloads: list[bytes]) -> PendingSync | None:
+        if self._wal is None:
+            return None
+        return self._wal.write_many(record_type, payloads)
+
+    # Oczekiwanie na utrwalenie zapisu w dzienniku (po zwolnieniu blokady -
+    # odczyty ankiety nie czekają na fsync zapisu)
+    def _wait_durable(self, pending: PendingSync | None) -> None:
+        if pending is not None:
+            self._wal.wait_durable(pending)
+
     # Stworzenie ankiety
     def add_survey(self, survey: Survey) -> None:
-        with self._lock:
-            self._surveys[survey.id] = survey
-            self._responses[survey.id] = []
+        pending = None
+        try:
+            with self._lock_for(survey.id):
+                pending = self._write_wal(
+                    wal.RECORD_SURVEY, [survey.model_dump_json().encode()]
+                )
+                self._apply_survey(survey)
+        finally:
+            self._wait_durable(pending)
 
     # Pobranie formularza ankiety
     def get_survey(self, survey_id: UUID) -> Survey | None:
         return self._surveys.get(survey_id)
 
-    # Dodanie odpowiedzi do ankiety
-    def add_response(self, response: SurveyResponse) -> None:
-        with self._lock:
-            if response.survey_id in self._responses:
-                self._responses[response.survey_id].append(response)
+    # Dodanie odpowiedzi do ankiety - zwraca zapisaną odpowiedź
+    # (przy powtórzonym kluczu idempotencji: odpowiedź zapisaną za pierwszym razem)
+    def add_response(
+        self, response: SurveyResponse, idempotency_key: str | None = None
+    ) -> SurveyResponse:
+        pending = None
+        try:
+            with self._lock_for(response.survey_id):
+                if idempotency_key is not None:
+                    # Ponowne sprawdzenie pod blokadą - równoległe powtórzenia
+                    # zapisują raz
+                    existing = self._idempotent_response(
+                        response.survey_id, idempotency_key
+                    )
+                    if existing is not None:
+                        return existing
+
+                if response.survey_id in self._responses:
+                    pending = self._write_wal(
+                        wal.RECORD_RESPONSE, [response.model_dump_json().encode()]
+                    )
+                    self._apply_response(response)
+                    if idempotency_key is not None:
+                        self._idempotency.put(
+                            response.survey_id,
+                            idempotency_key,
+                            len(self._responses[response.survey_id]) - 1,
+                            response.id,
+                        )
+        finally:
+            self._wait_durable(pending)
+        return response
+
+    # Dodanie porcji odpowiedzi (import) - jedna blokada, jeden zapis do
+    # dziennika i jedna aktualizacja agregatów na ankietę. Odpowiedzi do
+    # nieistniejących ankiet są pomijane, jak w add_response.
+    def add_responses(self, responses: list[SurveyResponse]) -> list[SurveyResponse]:
+        batches: dict[UUID, list[SurveyResponse]] = {}
+        for response in responses:
+            batches.setdefault(response.survey_id, []).append(response)
+
+        for survey_id, batch in batches.items():
+            pending = None
+            try:
+                with self._lock_for(survey_id):
+                    if survey_id not in self._responses:
+                        continue
+                    pending = self._write_wal(
+                        wal.RECORD_RESPONSE,
+                        [response.model_dump_json().encode() for response in batch],
+                    )
+                    self._apply_batch(survey_id, batch)
+            finally:
+                self._wait_durable(pending)
+        return responses
+
+    # Zapis porcji odpowiedzi jednej ankiety w pamięci (wywoływany pod blokadą)
+    def _apply_batch(self, survey_id: UUID, responses: list[SurveyResponse]) -> None:
+        store = self._responses[survey_id]
+        time_index = self._time_indexes[survey_id]
+        respondent_index = self._respondent_indexes[survey_id]
+        id_at = store.id_at
+
+        row = len(store)
+        for response in responses:
+            store.append(response)
+            time_index.add(time_key(response.submitted_at), row, response.id, id_at)
+            respondent_index.add(response.respondent_id, row)
+            row += 1
+        self._aggregates[survey_id].add_many(responses)
+        self._response_counts[self._stripe(survey_id)] += len(responses)
+        self._versions[survey_id] += 1
+
+    # Odtworzenie z magazynu odpowiedzi zapisanej pod kluczem idempotencji
+    # (wywoływane pod blokadą; None, jeśli wiersz zwolniła już retencja)
+    def _idempotent_response(
+        self, survey_id: UUID, idempotency_key: str
+    ) -> SurveyResponse | None:
+        entry = self._idempotency.get(survey_id, idempotency_key)
+        store = self._responses.get(survey_id)
+        if entry is None or store is None:
+            return None
+        row, response_id = entry
+        if row < store.first_row or store.id_at(row) != response_id:
+            return None
+        return store[row]
+
+    # Pobranie odpowiedzi zapisanej wcześniej z tym samym kluczem idempotencji
+    def get_idempotent_response(
+        self, survey_id: UUID, idempotency_key: str
+    ) -> SurveyResponse | None:
+        with self._lock_for(survey_id):
+            return self._idempotent_response(survey_id, idempotency_key)
 
     # Pobranie odpowiedzi do danej ankiety
+    # (modele odpowiedzi są odtwarzane z magazynu dopiero tutaj)
     def get_responses(self, survey_id: UUID) -> list[SurveyResponse]:
-        return self._responses.get(survey_id, [])
+        view = self.get_view(survey_id)
+        if view is None:
+            return []
+        return view.responses.to_list()
+
+    # Pobranie co najwyżej limit odpowiedzi posortowanych według (submitted_at, id),
+    # następujących po kursorze after
+    def get_responses_after(
+        self,
+        survey_id: UUID,
+        after: tuple[datetime, UUID] | None,
+        limit: int,
+    ) -> list[SurveyResponse]:
+        cursor = (time_key(after[0]), after[1]) if after is not None else None
+        with self._lock_for(survey_id):
+            store = self._responses.get(survey_id)
+            if store is None:
+                return []
+            rows = self._time_indexes[survey_id].rows_after(cursor, limit, store.id_at)
+            responses = store.view()
+        # Widok magazynu jest niezmienny - odczyt obiektów poza blokadą
+        return [responses[row] for row in rows]
+
+    # Pobranie odpowiedzi z przedziału czasu [start, end) posortowanych według czasu
+    def get_responses_between(
+        self, survey_id: UUID, start: datetime | None, end: datetime | None
+    ) -> list[SurveyResponse]:
+        start_key = time_key(start) if start is not None else None
+        end_key = time_key(end) if end is not None else None
+        with self._lock_for(survey_id):
+            store = self._responses.get(survey_id)
+            if store is None:
+                return []
+            rows = self._time_indexes[survey_id].rows_between(start_key, end_key)
+            responses = store.view()
+        return [responses[row] for row in rows]
+
+    # Pobranie odpowiedzi respondenta w kolejności zapisu
+    def get_responses_by_respondent(
+        self, survey_id: UUID, respondent_id: str
+    ) -> list[SurveyResponse]:
+        with self._lock_for(survey_id):
+            store = self._responses.get(survey_id)
+            if store is None:
+                return []
+            rows = self._respondent_indexes[survey_id].rows_for(respondent_id)
+            responses = store.view()
+        return [responses[row] for row in rows]
+
+    # Sprawdzenie czy respondent odpowiedział już na ankietę
+    def has_respondent(self, survey_id: UUID, respondent_id: str) -> bool:
+        with self._lock_for(survey_id):
+            index = self._respondent_indexes.get(survey_id)
+            return index is not None and respondent_id in index
+
+    # Pobranie agregatów statystyk ankiety z aktualnego widoku (współdzielone
+    # między czytelnikami - tylko do odczytu)
+    def get_aggregate(self, survey_id: UUID) -> SurveyAggregate | None:
+        view = self.get_view(survey_id)
+        return view.aggregate if view is not None else None
+
+    # Usunięcie surowych odpowiedzi wysłanych przed cutoff (retencja) - zwraca
+    # liczbę usuniętych odpowiedzi. Agregaty statystyk pozostają bez zmian.
+    # Zwalniany jest tylko początek magazynu (w kolejności zapisu) złożony
+    # wyłącznie ze starych odpowiedzi - starsza odpowiedź zapisana po nowszej
+    # zostanie usunięta przy kolejnym przebiegu.
+    def drop_responses_before(self, survey_id: UUID, cutoff: datetime) -> int:
+        cutoff_key = time_key(cutoff)
+        pending = None
+        try:
+            with self._lock_for(survey_id):
+                store = self._responses.get(survey_id)
+                if store is None:
+                    return 0
+                # Koniec początku magazynu złożonego ze starych odpowiedzi
+                row = store.expired_prefix(cutoff_key)
+                if row <= store.first_row:
+                    return 0
+                # Retencja trafia do dziennika - inaczej odtworzenie WAL po
+                # restarcie przywróciłoby usunięte odpowiedzi
+                pending = self._write_wal(
+                    wal.RECORD_RETENTION,
+                    [
+                        json.dumps(
+                            {"survey_id": str(survey_id), "cutoff": cutoff.isoformat()}
+                        ).encode()
+                    ],
+                )
+                return self._apply_retention(survey_id, row, cutoff_key)
+        finally:
+            self._wait_durable(pending)
+
+    # Usunięcie wierszy < row wraz z wpisami indeksów starszymi niż cutoff_key
+    # (wywoływane pod blokadą; także przy odtwarzaniu WAL)
+    def _apply_retention(self, survey_id: UUID, row: int, cutoff_key: int) -> int:
+        store = self._responses[survey_id]
+        dropped = store.drop_before(row)
+        if dropped:
+            self._time_indexes[survey_id].prune(store.first_row, cutoff_key)
+            self._respondent_indexes[survey_id].prune(store.first_row)
+            # Numery odpowiedzi w agregacie liczone są od pierwszej
+            # odpowiedzi ankiety (także sprzed migawki)
+            aggregate = self._aggregates[survey_id]
+            aggregate.drop_answers_before(
+                aggregate.total_responses - (len(store) - store.first_row)
+            )
+            self._versions[survey_id] += 1
+            # Zapamiętany widok trzyma zwolnione wiersze - usuwany od razu
+            self._views.pop(survey_id, None)
+        return dropped
 
     # Sprawdzenie czy ankieta istnieje
     def survey_exists(self, survey_id: UUID) -> bool:
@@ -69,17 +587,59 @@ class Database(metaclass=DatabaseMeta):
     def get_stats(self) -> dict[str, Any]:
         return {
             "total_surveys": len(self._surveys),
-            "total_responses": sum(len(r) for r in self._responses.values()),
+            # Liczniki obejmują też odpowiedzi usunięte przez retencję
+            "total_responses": sum(self._response_counts),
             "initialized_at": self._initialized_at.isoformat(),
+            "snapshot": self._snapshot_stats,
         }
 
+    # Sprawdzenie gotowości bazy do obsługi żądań
+    def ping(self) -> bool:
+        return True
+
     # Wyczyszczenie bazy danych
     def clear(self) -> None:
-        with self._lock:
-            self._surveys.clear()
+        # Zajęcie wszystkich blokad (zawsze w tej samej kolejności)
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            with self._catalog_lock:
+                self._surveys = {}
+            self._versions.clear()
+            self._views.clear()
+            self._close_stores()
             self._responses.clear()
+            self._aggregates.clear()
+            self._time_indexes.clear()
+            self._respondent_indexes.clear()
+            self._idempotency.clear()
+            self._response_counts = [0] * len(self._locks)
+            if self._wal is not None:
+                self._wal.reset()
+        finally:
+            for lock in reversed(self._locks):
+                lock.release()
+
+    # Usunięcie segmentów odpowiedzi z dysku
+    def _close_stores(self) -> None:
+        for store in self._responses.values():
+            if isinstance(store, ColumnarResponseStore):
+                store.close()
+
+    # Zamknięcie bazy danych (zapisanie migawki i dziennika na dysk,
+    # usunięcie segmentów)
+    def close(self) -> None:
+        if self._snapshot_path:
+            self.save_snapshot(self._snapshot_path)
+        if self._wal is not None:
+            self._wal.close()
+        self._close_stores()
+
 
+# Pobranie obiektu bazy danych (rodzaj bazy wybierany w konfiguracji)
+def get_database() -> "Database | SQLiteDatabase":
+    if get_config().get("database", "backend", "memory") == "sqlite":
+        from app.sqlite_database import SQLiteDatabase
 
-# Pobranie obiektu bazy danych
-def get_database() -> Database:
+        return SQLiteDatabase()
     return Database()
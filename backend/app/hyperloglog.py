@@ -0,0 +1,83 @@
+"""
+Przybliżona liczba unikalnych wartości (HyperLogLog).
+
+Wartość jest haszowana do 64 bitów (blake2b - wynik stały między procesami,
+w przeciwieństwie do hash()). Pierwsze precision bitów wybiera rejestr, a
+rejestr zapamiętuje największą pozycję pierwszego ustawionego bitu reszty.
+Szkic zajmuje 2^precision bajtów niezależnie od liczby wartości; błąd
+względny oszacowania to około 1.04 / sqrt(2^precision). Szkice o tej samej
+precyzji można łączyć (maksimum rejestrów) - np. dni w dłuższy okres.
+"""
+
+import base64
+import math
+from hashlib import blake2b
+
+# Wartości 2^-rejestr dla wszystkich możliwych rejestrów
+_INVERSE_POWERS = [2.0**-rank for rank in range(66)]
+
+
+# Hasz 64-bitowy wartości
+def _hash64(value: str) -> int:
+    return int.from_bytes(blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """
+    Szkic liczby unikalnych wartości o stałym rozmiarze.
+    """
+
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision: int = 12) -> None:
+        if not 4 <= precision <= 16:
+            raise ValueError("HyperLogLog precision must be between 4 and 16")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    # Dodanie wartości
+    def add(self, value: str) -> None:
+        hashed = _hash64(value)
+        bits = 64 - self.precision
+        index = hashed >> bits
+        rank = bits - (hashed & ((1 << bits) - 1)).bit_length() + 1
+        self.registers[index] = max(self.registers[index], rank)
+
+    # Dołączenie szkicu o tej samej precyzji
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    # Oszacowanie liczby unikalnych wartości
+    def estimate(self) -> int:
+        registers = self.registers
+        size = len(registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        raw = alpha * size * size / sum(map(_INVERSE_POWERS.__getitem__, registers))
+        zeros = registers.count(0)
+        # Dla małych liczności - zliczanie liniowe pustych rejestrów
+        if raw <= 2.5 * size and zeros:
+            return round(size * math.log(size / zeros))
+        return round(raw)
+
+    # Kopia szkicu
+    def copy(self) -> "HyperLogLog":
+        clone = HyperLogLog.__new__(HyperLogLog)
+        clone.precision = self.precision
+        clone.registers = bytearray(self.registers)
+        return clone
+
+    # Zapis szkicu jako słownik (JSON)
+    def to_dict(self) -> dict[str, int | str]:
+        return {
+            "precision": self.precision,
+            "registers": base64.b64encode(self.registers).decode(),
+        }
+
+    # Odtworzenie szkicu ze słownika
+    @classmethod
+    def from_dict(cls, data: dict[str, int | str]) -> "HyperLogLog":
+        sketch = cls(int(data["precision"]))
+        sketch.registers = bytearray(base64.b64decode(data["registers"]))
+        return sketch
@@ -0,0 +1,77 @@
+"""
+Indeks kluczy idempotencji (nagłówek Idempotency-Key) dla bazy w pamięci.
+
+Klucz wysłany przez klienta wskazuje odpowiedź zapisaną przy pierwszym
+żądaniu - indeks trzyma tylko wiersz magazynu i identyfikator odpowiedzi,
+a sama odpowiedź jest odczytywana z magazynu przy powtórzeniu. Indeks ma ograniczony rozmiar (najstarsze klucze są usuwane
+jako pierwsze) i czas życia wpisów - wygasłe wpisy są usuwane leniwie
+przy odczycie i przy dodawaniu nowych kluczy.
+"""
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from threading import Lock
+from uuid import UUID
+
+
+class IdempotencyIndex:
+    """
+    Ograniczony indeks (ankieta, klucz) -> (wiersz, identyfikator odpowiedzi)
+    z czasem wygaśnięcia.
+    """
+
+    def __init__(
+        self,
+        max_keys: int = 100_000,
+        ttl_seconds: float = 24 * 60 * 60,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_keys = max(1, max_keys)
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._lock = Lock()
+        # Kolejność wstawiania = kolejność wygasania (stały czas życia)
+        self._entries: OrderedDict[tuple[UUID, str], tuple[float, int, UUID]] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # Usunięcie wygasłych wpisów z początku kolejki
+    def _evict_expired(self, now: float) -> None:
+        entries = self._entries
+        while entries:
+            key, (expires_at, _, _) = next(iter(entries.items()))
+            if expires_at > now:
+                break
+            del entries[key]
+
+    # Pobranie wiersza i identyfikatora odpowiedzi zapisanej pod kluczem
+    # (None jeśli brak lub wygasł)
+    def get(self, survey_id: UUID, key: str) -> tuple[int, UUID] | None:
+        with self._lock:
+            entry = self._entries.get((survey_id, key))
+            if entry is None:
+                return None
+            expires_at, row, response_id = entry
+            if expires_at <= self._clock():
+                del self._entries[(survey_id, key)]
+                return None
+            return row, response_id
+
+    # Zapisanie wiersza i identyfikatora odpowiedzi pod kluczem
+    def put(self, survey_id: UUID, key: str, row: int, response_id: UUID) -> None:
+        with self._lock:
+            now = self._clock()
+            self._evict_expired(now)
+            self._entries[(survey_id, key)] = (now + self._ttl, row, response_id)
+            self._entries.move_to_end((survey_id, key))
+            while len(self._entries) > self._max_keys:
+                self._entries.popitem(last=False)
+
+    # Usunięcie wszystkich kluczy
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,158 @@
+"""
+Indeksy pomocnicze bazy danych w pamięci.
+
+TimeIndex utrzymuje numery wierszy magazynu odpowiedzi posortowane
+według klucza (submitted_at, id). Odpowiedzi zwykle przychodzą
+w kolejności czasu, więc dodanie to najczęściej dopisanie na koniec
+tablicy; wyszukiwanie odbywa się przez bisect.
+
+RespondentIndex to indeks haszujący identyfikator respondenta na numery
+wierszy jego odpowiedzi.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable
+from datetime import UTC, datetime
+from uuid import UUID
+
+from app.columnar import to_micros
+
+# Pobranie identyfikatora odpowiedzi zapisanej w danym wierszu magazynu
+IdLookup = Callable[[int], UUID]
+
+
+# Klucz czasu odpowiedzi (daty ze strefą czasową sprowadzane do UTC)
+def time_key(value: datetime) -> int:
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC).replace(tzinfo=None)
+    return to_micros(value)
+
+
+class TimeIndex:
+    """
+    Indeks wierszy posortowanych według (submitted_at, id).
+    """
+
+    __slots__ = ("_keys", "_rows")
+
+    def __init__(self) -> None:
+        self._keys = array("q")
+        self._rows = array("q")
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # Dodanie wiersza do indeksu
+    def add(self, key: int, row: int, response_id: UUID, id_at: IdLookup) -> None:
+        keys = self._keys
+        if not keys or key > keys[-1]:
+            keys.append(key)
+            self._rows.append(row)
+            return
+
+        # Remis znaczników czasu rozstrzygany identyfikatorem odpowiedzi
+        position = bisect_right(keys, key)
+        while (
+            position > 0
+            and keys[position - 1] == key
+            and id_at(self._rows[position - 1]) > response_id
+        ):
+            position -= 1
+        keys.insert(position, key)
+        self._rows.insert(position, row)
+
+    # Pozycja pierwszego wiersza większego od (key, response_id)
+    def _position_after(self, after: tuple[int, UUID] | None, id_at: IdLookup) -> int:
+        if after is None:
+            return 0
+
+        key, response_id = after
+        keys = self._keys
+        position = bisect_left(keys, key)
+        while (
+            position < len(keys)
+            and keys[position] == key
+            and id_at(self._rows[position]) <= response_id
+        ):
+            position += 1
+        return position
+
+    # Numery co najwyżej limit wierszy następujących po kursorze
+    def rows_after(
+        self, after: tuple[int, UUID] | None, limit: int, id_at: IdLookup
+    ) -> list[int]:
+        position = self._position_after(after, id_at)
+        return self._rows[position : position + limit].tolist()
+
+    # Usunięcie wierszy o numerach < first_row (zwolnionych przez retencję).
+    # Zwolnione wiersze mają klucze < end, więc przeglądany jest tylko
+    # początek indeksu.
+    def prune(self, first_row: int, end: int | None = None) -> None:
+        keys = self._keys
+        rows = self._rows
+        high = bisect_left(keys, end) if end is not None else len(keys)
+        keep = [i for i in range(high) if rows[i] >= first_row]
+        if len(keep) == high:
+            return
+        self._keys = array("q", (keys[i] for i in keep)) + keys[high:]
+        self._rows = array("q", (rows[i] for i in keep)) + rows[high:]
+
+    # Numery wierszy z przedziału czasu [start, end)
+    def rows_between(self, start: int | None, end: int | None) -> list[int]:
+        keys = self._keys
+        low = bisect_left(keys, start) if start is not None else 0
+        high = bisect_left(keys, end) if end is not None else len(keys)
+        return self._rows[low:high].tolist()
+
+
+class RespondentIndex:
+    """
+    Indeks numerów wierszy odpowiedzi według identyfikatora respondenta.
+    """
+
+    __slots__ = ("_rows",)
+
+    def __init__(self) -> None:
+        # Pojedynczy wiersz jako int - tablica tworzona dopiero przy kolejnej odpowiedzi
+        self._rows: dict[str, int | array] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # Dodanie wiersza do indeksu (odpowiedzi anonimowe nie są indeksowane)
+    def add(self, respondent_id: str | None, row: int) -> None:
+        if respondent_id is None:
+            return
+        rows = self._rows.get(respondent_id)
+        if rows is None:
+            self._rows[respondent_id] = row
+        elif type(rows) is int:
+            self._rows[respondent_id] = array("q", (rows, row))
+        else:
+            rows.append(row)
+
+    # Usunięcie wierszy o numerach < first_row (zwolnionych przez retencję)
+    def prune(self, first_row: int) -> None:
+        pruned: dict[str, int | array] = {}
+        for respondent_id, rows in self._rows.items():
+            if type(rows) is int:
+                if rows >= first_row:
+                    pruned[respondent_id] = rows
+                continue
+            kept = [row for row in rows if row >= first_row]
+            if len(kept) > 1:
+                pruned[respondent_id] = array("q", kept)
+            elif kept:
+                pruned[respondent_id] = kept[0]
+        self._rows = pruned
+
+    def __contains__(self, respondent_id: str) -> bool:
+        return respondent_id in self._rows
+
+    # Numery wierszy odpowiedzi respondenta w kolejności zapisu
+    def rows_for(self, respondent_id: str) -> list[int]:
+        rows = self._rows.get(respondent_id)
+        if rows is None:
+            return []
+        return [rows] if type(rows) is int else rows.tolist()
@@ -1,34 +1,67 @@
+import asyncio
+import sqlite3
+import time
 from contextlib import asynccontextmanager
+from typing import Any
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
+from app.async_database import get_async_database
 from app.config import get_config
-from app.database import get_database
 from app.logger import get_logger
 from app.middleware import TelemetryMiddleware
 from app.routers import survey_router
+from app.services import SurveyService
+from app.stats_cache import get_stats_cache
 from app.telemetry import get_telemetry
 
 
+# Okresowe usuwanie starych odpowiedzi (usuwanie w puli wątków - nie blokuje
+# pętli zdarzeń)
+async def run_retention(interval_seconds: float) -> None:
+    logger = get_logger()
+    while True:
+        try:
+            await SurveyService().apply_retention()
+        except (OSError, sqlite3.Error) as exc:
+            # Błąd magazynu danych - ponowienie w kolejnym przebiegu
+            logger.error(f"Retention failed: {exc}", module="retention")
+        except Exception:
+            logger.exception("Retention failed unexpectedly", module="retention")
+        await asyncio.sleep(interval_seconds)
+
+
 # Zainicjowanie wszystkich singletonów przy starcie aplikacji
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Inicjalizacja singletonów
-    db = get_database()
+    db = get_async_database()
     logger = get_logger()
     config = get_config()
     telemetry = get_telemetry()
 
     logger.info("Application starting...", module="startup")
-    logger.info(f"Database initialized: {db.get_stats()}", module="startup")
+    # Baza w pamięci wczytuje migawkę (POLLY_SNAPSHOT_PATH) przy inicjalizacji,
+    # a zapisuje ją przy zamknięciu
+    db_stats = await db.get_stats()
+    if db_stats.get("snapshot"):
+        logger.info(f"Snapshot restored: {db_stats['snapshot']}", module="startup")
+    logger.info(f"Database initialized: {db_stats}", module="startup")
     logger.info(f"Config loaded: {config.get_stats()}", module="startup")
     logger.info(f"Logger initialized: {logger.get_stats()}", module="startup")
     logger.info(f"Telemetry initialized: {telemetry.get_stats()}", module="startup")
 
+    retention_task = asyncio.create_task(
+        run_retention(config.get("retention", "interval_seconds", 3600))
+    )
+
     yield
 
     logger.info("Application shutting down...", module="shutdown")
+    retention_task.cancel()
+    await db.close()
 
 
 # Uruchomienie serwera
@@ -90,17 +123,37 @@ def create_app() -> FastAPI:
             "redoc": "/redoc",
         }
 
+    # Endpoint dla sondy liveness - proces odpowiada (bez dostępu do bazy)
+    @app.get("/health/live", tags=["health"])
+    async def liveness():
+        return {"status": "alive"}
+
+    # Endpoint dla sondy readiness - baza danych gotowa do obsługi żądań
+    @app.get("/health/ready", tags=["health"])
+    async def readiness():
+        if not await get_async_database().ping():
+            return JSONResponse(status_code=503, content={"status": "not ready"})
+        return {"status": "ready"}
+
+    # Szczegółowy stan aplikacji jest zapamiętywany na krótki czas
+    health_ttl = config.get("health", "cache_ttl_seconds", 5.0)
+    health_cache: dict[str, Any] = {"expires_at": 0.0, "payload": None}
+
     # Endpoint /health aby sprawdzić czy baza danych działą
     @app.get("/health", tags=["health"])
     async def health_check():
-        db = get_database()
+        now = time.monotonic()
+        if health_cache["payload"] is not None and now < health_cache["expires_at"]:
+            return health_cache["payload"]
+
+        db = get_async_database()
         logger = get_logger()
         config = get_config()
         telemetry = get_telemetry()
 
-        db_stats = db.get_stats()
+        db_stats = await db.get_stats()
 
-        return {
+        payload = {
             "status": "healthy",
             # Backward/Frontend-compatible shortcut fields
             "database": {
@@ -112,8 +165,12 @@ def create_app() -> FastAPI:
                 "logger": logger.get_stats(),
                 "config": config.get_stats(),
                 "telemetry": telemetry.get_stats(),
+                "stats_cache": get_stats_cache().get_stats(),
             },
         }
+        health_cache["payload"] = payload
+        health_cache["expires_at"] = now + health_ttl
+        return payload
 
     return app
 
@@ -4,11 +4,21 @@ from .survey import (
     SurveyCreate,
     Survey,
     SurveyResponse,
+    SurveyResponsePage,
     Answer,
     AnswerSubmit,
+    AnswerSubmitBatch,
+    SurveyResponseBatchResult,
     SurveyStats,
     QuestionStats,
     SurveyLinks,
+    HistogramGranularity,
+    HistogramBucket,
+    ResponseHistogram,
+    AnswerFilter,
+    FilteredSurveyStats,
+    RatingStats,
+    DailyRespondents,
 )
 
 __all__ = [
@@ -17,9 +27,19 @@ __all__ = [
     "SurveyCreate",
     "Survey",
     "SurveyResponse",
+    "SurveyResponsePage",
     "Answer",
     "AnswerSubmit",
+    "AnswerSubmitBatch",
+    "SurveyResponseBatchResult",
     "SurveyStats",
     "QuestionStats",
     "SurveyLinks",
+    "HistogramGranularity",
+    "HistogramBucket",
+    "ResponseHistogram",
+    "AnswerFilter",
+    "FilteredSurveyStats",
+    "RatingStats",
+    "DailyRespondents",
 ]
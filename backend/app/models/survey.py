@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 from typing import Any
 from uuid import UUID
@@ -42,6 +42,11 @@ class SurveyCreate(BaseModel):
     questions: list[Question] = Field(
         ..., min_length=1, description="List of survey questions"
     )
+    retention_days: int | None = Field(
+        default=None,
+        ge=1,
+        description="Days to keep raw responses (None = server default)",
+    )
 
     @field_validator("questions")
     @classmethod
@@ -65,6 +70,9 @@ class Survey(BaseModel):
     questions: list[Question] = Field(..., description="List of survey questions")
     created_at: datetime = Field(..., description="Survey creation timestamp")
     links: SurveyLinks = Field(..., description="Survey URLs")
+    retention_days: int | None = Field(
+        default=None, description="Days to keep raw responses (None = server default)"
+    )
 
 
 # Klasa reprezentująca odpowiedz w bazie danych
@@ -81,6 +89,25 @@ class AnswerSubmit(BaseModel):
     )
 
 
+# Porcja odpowiedzi importowanych jednym żądaniem (np. ankiety papierowe, kioski)
+class AnswerSubmitBatch(BaseModel):
+    responses: list[AnswerSubmit] = Field(
+        ...,
+        min_length=1,
+        max_length=50_000,
+        description="Responses to import (validated and stored together)",
+    )
+
+
+# Wynik importu porcji odpowiedzi
+class SurveyResponseBatchResult(BaseModel):
+    survey_id: UUID = Field(..., description="Associated survey ID")
+    accepted: int = Field(..., description="Number of stored responses")
+    response_ids: list[UUID] = Field(
+        ..., description="Identifiers of stored responses in submission order"
+    )
+
+
 # Klasa reprezentująca odpowiedzi na ankietę w bazie danych
 class SurveyResponse(BaseModel):
     id: UUID = Field(..., description="Unique response identifier")
@@ -90,6 +117,27 @@ class SurveyResponse(BaseModel):
     submitted_at: datetime = Field(..., description="Response submission timestamp")
 
 
+# Strona odpowiedzi na ankietę (stronicowanie kursorem)
+class SurveyResponsePage(BaseModel):
+    items: list[SurveyResponse] = Field(..., description="Responses on this page")
+    next_cursor: str | None = Field(
+        default=None, description="Cursor of the next page (None on the last page)"
+    )
+
+
+# Rozkład odpowiedzi na pytanie o ocenę (ze szkicu o stałych przedziałach)
+class RatingStats(BaseModel):
+    median: float | None = Field(default=None, description="Median rating")
+    p90: float | None = Field(default=None, description="90th percentile rating")
+    std_dev: float | None = Field(
+        default=None, description="Standard deviation of ratings (population)"
+    )
+    histogram: dict[str, int] = Field(
+        default_factory=dict,
+        description="Number of ratings per bin from min_rating to max_rating",
+    )
+
+
 # Klasa reprezentująca statystyki pytania z ankiety
 class QuestionStats(BaseModel):
     question_id: str = Field(..., description="Question identifier")
@@ -107,6 +155,47 @@ class QuestionStats(BaseModel):
         default=None, description="Average value for numeric questions"
     )
 
+    # Odpowiedzi tekstowe spoza najczęstszych zwróconych w rozkładzie
+    other_responses: int | None = Field(
+        default=None,
+        description="Text answers not listed in answer_distribution (top-K)",
+    )
+
+    # Mediana, percentyl 90, odchylenie i histogram (pytania o ocenę)
+    rating_stats: RatingStats | None = Field(
+        default=None, description="Rating distribution summary for rating questions"
+    )
+
+
+# Rozdzielczość histogramu odpowiedzi w czasie
+class HistogramGranularity(str, Enum):
+    MINUTE = "minute"
+    HOUR = "hour"
+    DAY = "day"
+
+
+# Liczba odpowiedzi w jednym przedziale czasu
+class HistogramBucket(BaseModel):
+    start: datetime = Field(..., description="Start of the time bucket")
+    count: int = Field(..., description="Number of responses in the bucket")
+
+
+# Liczba odpowiedzi w kolejnych przedziałach czasu
+class ResponseHistogram(BaseModel):
+    granularity: HistogramGranularity = Field(..., description="Bucket width")
+    buckets: list[HistogramBucket] = Field(
+        default_factory=list,
+        description="Buckets from the first non-empty one to the latest response",
+    )
+
+
+# Przybliżona liczba unikalnych respondentów w dniu
+class DailyRespondents(BaseModel):
+    day: date = Field(..., description="Day (server local time)")
+    unique_respondents: int = Field(
+        ..., description="Estimated number of distinct respondent IDs"
+    )
+
 
 # Statystyki odpowiedzi
 class SurveyStats(BaseModel):
@@ -124,3 +213,35 @@ class SurveyStats(BaseModel):
     last_response_at: datetime | None = Field(
         default=None, description="Timestamp of last response"
     )
+
+    # Przybliżona liczba unikalnych respondentów (HyperLogLog)
+    unique_respondents: int | None = Field(
+        default=None, description="Estimated number of distinct respondent IDs"
+    )
+    unique_respondents_last_7_days: int | None = Field(
+        default=None,
+        description="Estimated distinct respondents in the 7 days up to the last response",
+    )
+    daily_unique_respondents: list[DailyRespondents] | None = Field(
+        default=None, description="Estimated distinct respondents per day (last 31)"
+    )
+
+    # Liczba odpowiedzi w czasie (tylko na żądanie)
+    response_histogram: ResponseHistogram | None = Field(
+        default=None, description="Response counts per time bucket"
+    )
+
+
+# Warunek statystyk filtrowanych - odpowiedź z daną wartością na pytanie
+class AnswerFilter(BaseModel):
+    question_id: str = Field(..., description="Filtered question identifier")
+    value: str = Field(
+        ..., description="Required answer (an option, rating, 'yes' or 'no')"
+    )
+
+
+# Statystyki odpowiedzi spełniających wszystkie warunki
+class FilteredSurveyStats(SurveyStats):
+    filters: list[AnswerFilter] = Field(
+        ..., description="Conditions the counted responses satisfy"
+    )
@@ -0,0 +1,214 @@
+"""
+Zwarte rekordy odpowiedzi przechowywane w bazie w pamięci (układ "objects").
+
+Model SurveyResponse niesie narzut pydantic na każdy obiekt (słownik pól,
+zbiór ustawionych pól, osobny obiekt Answer na każdą odpowiedź). Baza
+przechowuje zamiast niego ResponseRecord z __slots__: odpowiedzi są jedną
+krotką (id pytania, wartość, id pytania, wartość, ...), a identyfikatory
+pytań są współdzielone z definicją ankiety. Model SurveyResponse jest
+odtwarzany dopiero przy odczycie (na granicy API).
+
+Ankiety pozostają modelami Survey - jest ich niewiele, a są czytane przy
+każdym wysłaniu odpowiedzi, więc konwersja kosztowałaby więcej niż oszczędza.
+"""
+
+from collections.abc import Iterator
+from datetime import datetime
+from uuid import UUID
+
+from app.models.survey import Answer, Question, SurveyResponse
+
+
+class ResponseRecord:
+    """
+    Odpowiedź na ankietę zapisana bez narzutu modelu pydantic.
+    """
+
+    __slots__ = ("answers", "id", "respondent_id", "submitted_at")
+
+    def __init__(
+        self,
+        id: UUID,
+        answers: tuple,
+        respondent_id: str | None,
+        submitted_at: datetime,
+    ) -> None:
+        self.id = id
+        self.answers = answers
+        self.respondent_id = respondent_id
+        self.submitted_at = submitted_at
+
+    # Stworzenie rekordu z modelu (question_ids - współdzielone id pytań ankiety)
+    @classmethod
+    def from_model(
+        cls, response: SurveyResponse, question_ids: dict[str, str]
+    ) -> "ResponseRecord":
+        answers = []
+        for answer in response.answers:
+            answers.append(question_ids.get(answer.question_id, answer.question_id))
+            answers.append(answer.value)
+        return cls(
+            response.id, tuple(answers), response.respondent_id, response.submitted_at
+        )
+
+    # Odtworzenie modelu odpowiedzi (bez ponownej walidacji)
+    def to_model(self, survey_id: UUID) -> SurveyResponse:
+        answers = self.answers
+        return SurveyResponse.model_construct(
+            id=self.id,
+            survey_id=survey_id,
+            answers=[
+                Answer.model_construct(question_id=answers[i], value=answers[i + 1])
+                for i in range(0, len(answers), 2)
+            ],
+            respondent_id=self.respondent_id,
+            submitted_at=self.submitted_at,
+        )
+
+
+class ResponseRecordStore:
+    """
+    Magazyn odpowiedzi jednej ankiety w postaci listy rekordów.
+    """
+
+    __slots__ = ("_first_row", "_question_ids", "_records", "_survey_id")
+
+    def __init__(self, survey_id: UUID, questions: list[Question]) -> None:
+        self._survey_id = survey_id
+        self._question_ids = {question.id: question.id for question in questions}
+        self._records: list[ResponseRecord] = []
+        # Numer pierwszego zachowanego wiersza (wcześniejsze zwolniła retencja)
+        self._first_row = 0
+
+    # Liczba wszystkich dodanych wierszy (także zwolnionych)
+    def __len__(self) -> int:
+        return self._first_row + len(self._records)
+
+    # Numer pierwszego dostępnego wiersza
+    @property
+    def first_row(self) -> int:
+        return self._first_row
+
+    # Pozycja wiersza na liście rekordów
+    def _position(self, row: int) -> int:
+        if row < 0:
+            row += len(self)
+        if row < self._first_row:
+            raise IndexError("response index out of range")
+        return row - self._first_row
+
+    # Dodanie odpowiedzi
+    def append(self, response: SurveyResponse) -> None:
+        self._records.append(ResponseRecord.from_model(response, self._question_ids))
+
+    # Dodanie odpowiedzi zapisanej już jako rekord
+    def append_record(self, record: ResponseRecord) -> None:
+        self._records.append(record)
+
+    # Zwolnienie rekordów wierszy < row (zwraca liczbę zwolnionych wierszy).
+    # Lista rekordów jest zastępowana nową - widoki utworzone wcześniej
+    # nadal czytają poprzednią listę.
+    def drop_before(self, row: int) -> int:
+        count = min(row, len(self)) - self._first_row
+        if count <= 0:
+            return 0
+        self._records = self._records[count:]
+        self._first_row += count
+        return count
+
+    # Koniec początku magazynu złożonego z odpowiedzi, których klucz czasu
+    # (app.indexes.time_key) jest mniejszy niż cutoff_key
+    def expired_prefix(self, cutoff_key: int) -> int:
+        # Import w funkcji - app.indexes importuje pośrednio ten moduł
+        from app.indexes import time_key
+
+        row = self._first_row
+        for record in self._records:
+            if time_key(record.submitted_at) >= cutoff_key:
+                break
+            row += 1
+        return row
+
+    # Niezmienny widok obecnych wierszy (kolejne zapisy nie są w nim widoczne;
+    # wywoływany pod blokadą zapisów)
+    def view(self) -> "ResponseRecordView":
+        return ResponseRecordView(
+            self._survey_id, self._records, self._first_row, len(self._records)
+        )
+
+    # Odtworzenie obiektu odpowiedzi z rekordu
+    def __getitem__(self, row: int) -> SurveyResponse:
+        return self._records[self._position(row)].to_model(self._survey_id)
+
+    # Identyfikator odpowiedzi bez odtwarzania modelu
+    def id_at(self, row: int) -> UUID:
+        return self._records[self._position(row)].id
+
+    # Czas wysłania odpowiedzi bez odtwarzania modelu
+    def time_at(self, row: int) -> datetime:
+        return self._records[self._position(row)].submitted_at
+
+    def __iter__(self) -> Iterator[SurveyResponse]:
+        for record in self._records:
+            yield record.to_model(self._survey_id)
+
+    # Odtworzenie wszystkich dostępnych odpowiedzi
+    def to_list(self) -> list[SurveyResponse]:
+        return list(self)
+
+    # Dostępne odpowiedzi jako rekordy (np. do zapisu migawki)
+    def records(self) -> Iterator[ResponseRecord]:
+        return iter(self._records)
+
+
+class ResponseRecordView:
+    """
+    Niezmienny widok wierszy magazynu rekordów z chwili jego utworzenia.
+
+    Lista rekordów jest tylko dopisywana (retencja tworzy nową listę),
+    więc widok może być czytany bez blokady równolegle z zapisami.
+    """
+
+    __slots__ = ("_first_row", "_length", "_records", "_survey_id")
+
+    def __init__(
+        self,
+        survey_id: UUID,
+        records: list[ResponseRecord],
+        first_row: int,
+        length: int,
+    ) -> None:
+        self._survey_id = survey_id
+        self._records = records
+        self._first_row = first_row
+        self._length = length
+
+    # Liczba wszystkich wierszy w chwili utworzenia widoku (także zwolnionych)
+    def __len__(self) -> int:
+        return self._first_row + self._length
+
+    # Numer pierwszego dostępnego wiersza
+    @property
+    def first_row(self) -> int:
+        return self._first_row
+
+    # Pozycja wiersza na liście rekordów
+    def _position(self, row: int) -> int:
+        position = row - self._first_row if row >= 0 else self._length + row
+        if not 0 <= position < self._length:
+            raise IndexError("response index out of range")
+        return position
+
+    def __getitem__(self, row: int) -> SurveyResponse:
+        return self._records[self._position(row)].to_model(self._survey_id)
+
+    def id_at(self, row: int) -> UUID:
+        return self._records[self._position(row)].id
+
+    def __iter__(self) -> Iterator[SurveyResponse]:
+        records = self._records
+        for position in range(self._length):
+            yield records[position].to_model(self._survey_id)
+
+    def to_list(self) -> list[SurveyResponse]:
+        return list(self)
@@ -1,17 +1,33 @@
+from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
 
 from app.database import Database, get_database
 from app.decorators import handle_exceptions, log_execution, rate_limit
 from app.models import (
     AnswerSubmit,
+    AnswerSubmitBatch,
+    FilteredSurveyStats,
+    HistogramGranularity,
     Survey,
     SurveyCreate,
     SurveyResponse,
+    SurveyResponseBatchResult,
+    SurveyResponsePage,
     SurveyStats,
 )
 from app.services import SurveyService
+from app.services.survey_service import parse_filter
 
 router = APIRouter(prefix="/surveys", tags=["surveys"])
 
@@ -20,6 +36,18 @@ def get_survey_service(db: Database = Depends(get_database)) -> SurveyService:
     return SurveyService(db)
 
 
+ServiceDep = Annotated[SurveyService, Depends(get_survey_service)]
+
+
+# Pobranie ankiety z endpointu (404, jeśli nie istnieje) - przekazywana dalej
+# do serwisu, aby nie wyszukiwać jej drugi raz
+async def fetch_survey(service: SurveyService, survey_id: UUID) -> Survey:
+    try:
+        return await service.get_survey(survey_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
 # Endpoint na stworzenie ankiety
 @router.post(
     "/",
@@ -33,7 +61,7 @@ def get_survey_service(db: Database = Depends(get_database)) -> SurveyService:
 async def create_survey(
     survey_data: SurveyCreate, service: SurveyService = Depends(get_survey_service)
 ) -> Survey:
-    return service.create_survey(survey_data)
+    return await service.create_survey(survey_data)
 
 
 # Endpoint na pobranie wszystkich ankiet
@@ -48,7 +76,7 @@ async def create_survey(
 async def get_all_surveys(
     service: SurveyService = Depends(get_survey_service),
 ) -> list[Survey]:
-    return service.get_all_surveys()
+    return await service.get_all_surveys()
 
 
 # Endpoint na pobranie ankiety do wypełnienia na podstawie jej identyfikatora
@@ -65,7 +93,7 @@ async def get_survey(
     service: SurveyService = Depends(get_survey_service),
 ) -> Survey:
     try:
-        return service.get_survey(survey_id)
+        return await service.get_survey(survey_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -76,7 +104,7 @@ async def get_survey(
     response_model=SurveyResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Submit survey response",
-    description="Submit answers for a specific survey.",
+    description="Submit answers for a specific survey. Retries with the same Idempotency-Key header return the original response.",
 )
 @handle_exceptions
 @log_execution
@@ -84,28 +112,137 @@ async def get_survey(
 async def submit_response(
     survey_id: UUID,
     answer_data: AnswerSubmit,
+    idempotency_key: str | None = Header(
+        default=None, alias="Idempotency-Key", max_length=255
+    ),
     service: SurveyService = Depends(get_survey_service),
 ) -> SurveyResponse:
     try:
-        return service.submit_response(survey_id, answer_data)
+        return await service.submit_response(survey_id, answer_data, idempotency_key)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# Endpoint na import porcji odpowiedzi (bez log_execution - logowanie
+# argumentów kopiowałoby całą porcję do logu; serwis zapisuje jedną linię)
+@router.post(
+    "/{survey_id}/responses/batch",
+    response_model=SurveyResponseBatchResult,
+    status_code=status.HTTP_201_CREATED,
+    summary="Import survey responses",
+    description="Submit many responses in one request. The whole batch is validated first and rejected if any response is invalid.",
+)
+@handle_exceptions
+@rate_limit(max_calls=10, time_window=60)  # 10 batches per minute
+async def submit_responses(
+    survey_id: UUID,
+    batch: AnswerSubmitBatch,
+    service: ServiceDep,
+) -> SurveyResponseBatchResult:
+    try:
+        responses = await service.submit_responses(survey_id, batch.responses)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    return SurveyResponseBatchResult(
+        survey_id=survey_id,
+        accepted=len(responses),
+        response_ids=[response.id for response in responses],
+    )
 
 
-# Endpoint na pobranie statystyk ankiety
+# Endpoint na pobranie strony odpowiedzi (stronicowanie kursorem po (submitted_at, id))
+@router.get(
+    "/{survey_id}/responses",
+    response_model=SurveyResponsePage,
+    summary="List survey responses",
+    description="Retrieve responses ordered by submission time. Pass next_cursor from the previous page to get the next one.",
+)
+@handle_exceptions
+@log_execution
+async def get_responses(
+    survey_id: UUID,
+    service: ServiceDep,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+    cursor: str | None = None,
+) -> SurveyResponsePage:
+    survey = await fetch_survey(service, survey_id)
+    try:
+        return await service.get_responses_page(survey_id, limit, cursor, survey=survey)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# Endpoint na strumieniowe pobranie wszystkich odpowiedzi (NDJSON)
+@router.get(
+    "/{survey_id}/responses/stream",
+    summary="Stream survey responses",
+    description="Stream all responses ordered by submission time as newline-delimited JSON.",
+)
+@handle_exceptions
+@log_execution
+async def stream_responses(
+    survey_id: UUID,
+    service: ServiceDep,
+    cursor: str | None = None,
+) -> StreamingResponse:
+    survey = await fetch_survey(service, survey_id)
+    try:
+        batches = await service.iter_response_batches(survey_id, cursor, survey=survey)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Jedna porcja strumienia na partię odpowiedzi z bazy
+    async def generate():
+        async for batch in batches:
+            yield "".join(response.model_dump_json() + "\n" for response in batch)
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+# Endpoint na pobranie statystyk ankiety (z pamięci podręcznej - wersja danych
+# i wiek statystyk w nagłówkach X-Stats-Version i X-Stats-Age, opcjonalnie
+# z liczbą odpowiedzi na minutę, godzinę lub dzień)
 @router.get(
     "/{survey_id}/stats",
     response_model=SurveyStats,
     summary="Get survey statistics",
-    description="Retrieve statistics for a specific survey including response counts and distributions.",
+    description="Retrieve statistics for a specific survey including response counts and distributions. Results are fresh unless POLLY_STATS_MAX_STALENESS_SECONDS is set, in which case they may lag new responses by up to that many seconds; X-Stats-Version and X-Stats-Age describe the returned snapshot. Pass histogram=minute|hour|day to include response counts per time bucket.",
 )
 @handle_exceptions
 @log_execution
 async def get_survey_stats(
     survey_id: UUID,
+    response: Response,
+    histogram: HistogramGranularity | None = None,
     service: SurveyService = Depends(get_survey_service),
 ) -> SurveyStats:
     try:
-        return service.get_statistics(survey_id)
+        cached = await service.get_cached_statistics(survey_id, histogram)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    response.headers["X-Stats-Version"] = str(cached.version)
+    response.headers["X-Stats-Age"] = f"{cached.age:.3f}"
+    return cached.stats
+
+
+# Endpoint na pobranie statystyk odpowiedzi spełniających warunki
+# (np. rozkład ocen wśród respondentów, którzy odpowiedzieli "yes" na q3)
+@router.get(
+    "/{survey_id}/stats/filtered",
+    response_model=FilteredSurveyStats,
+    summary="Get filtered survey statistics",
+    description="Statistics of the responses matching every where=question_id:value condition (an option, rating, 'yes' or 'no'). Text questions cannot be used as filters and report only response counts.",
+)
+@handle_exceptions
+@log_execution
+async def get_filtered_survey_stats(
+    survey_id: UUID,
+    where: Annotated[list[str], Query(min_length=1)],
+    service: ServiceDep,
+) -> FilteredSurveyStats:
+    survey = await fetch_survey(service, survey_id)
+    try:
+        filters = [parse_filter(raw) for raw in where]
+        return await service.get_filtered_statistics(survey_id, filters, survey=survey)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
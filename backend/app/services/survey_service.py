@@ -1,23 +1,57 @@
-from collections import Counter
-from datetime import datetime
+import asyncio
+import base64
+import binascii
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta
 from uuid import UUID, uuid4
 
+from app.aggregates import QuestionAggregate
+from app.async_database import AsyncDatabase
 from app.config import ConfigManager, get_config
 from app.database import Database, get_database
 from app.decorators import measure_time
 from app.logger import AppLogger, get_logger
 from app.models import (
     Answer,
+    AnswerFilter,
     AnswerSubmit,
+    FilteredSurveyStats,
+    HistogramGranularity,
     Question,
     QuestionStats,
-    QuestionType,
     Survey,
     SurveyCreate,
     SurveyLinks,
     SurveyResponse,
+    SurveyResponsePage,
     SurveyStats,
 )
+from app.stats_cache import CachedStats, get_stats_cache
+from app.validators import get_validator
+
+
+# Zakodowanie kursora stronicowania (ostatnia odpowiedź poprzedniej strony)
+def encode_cursor(response: SurveyResponse) -> str:
+    raw = f"{response.submitted_at.isoformat()}|{response.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+# Odkodowanie kursora stronicowania do klucza (submitted_at, id)
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        submitted_at, response_id = raw.split("|")
+        return datetime.fromisoformat(submitted_at), UUID(response_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+# Odczytanie warunku filtrowania statystyk w postaci "id_pytania:wartość"
+def parse_filter(raw: str) -> AnswerFilter:
+    question_id, separator, value = raw.partition(":")
+    if not separator or not question_id:
+        raise ValueError(f"Invalid filter: {raw} (expected question_id:value)")
+    return AnswerFilter(question_id=question_id, value=value)
 
 
 class SurveyService:
@@ -27,13 +61,14 @@ class SurveyService:
         config: ConfigManager | None = None,
         logger: AppLogger | None = None,
     ) -> None:
-        self._db = database or get_database()
+        # Operacje na bazie są oczekiwane (await) - bez blokowania pętli zdarzeń
+        self._db = AsyncDatabase(database or get_database())
         self._config = config or get_config()
         self._logger = logger or get_logger()
 
     # Funkcja tworząca ankietę
     @measure_time
-    def create_survey(self, survey_data: SurveyCreate) -> Survey:
+    async def create_survey(self, survey_data: SurveyCreate) -> Survey:
         survey_id = uuid4()
 
         # Wygenerowanie linku do ankiety
@@ -47,10 +82,12 @@ class SurveyService:
             questions=survey_data.questions,
             created_at=datetime.now(),
             links=links,
+            retention_days=survey_data.retention_days,
         )
 
-        # Zapisanie ankiety w bazie danych
-        self._db.add_survey(survey)
+        # Zapisanie ankiety w bazie danych i kompilacja walidatora odpowiedzi
+        await self._db.add_survey(survey)
+        get_validator(survey)
         return survey
 
     # Funkcja generująca linki do ankiety i statystyk ankiety
@@ -63,18 +100,30 @@ class SurveyService:
 
     # Pobranie ankiety na podstawie jej identyfikatora
     @measure_time
-    def get_survey(self, survey_id: UUID) -> Survey:
-        survey = self._db.get_survey(survey_id)
+    async def get_survey(self, survey_id: UUID) -> Survey:
+        survey = await self._db.get_survey(survey_id)
         if survey is None:
             raise ValueError(f"Survey with ID {survey_id} not found")
         return survey
 
     # Wysłanie odpowiedzi do ankiety
     @measure_time
-    def submit_response(
-        self, survey_id: UUID, answer_data: AnswerSubmit
+    async def submit_response(
+        self,
+        survey_id: UUID,
+        answer_data: AnswerSubmit,
+        idempotency_key: str | None = None,
     ) -> SurveyResponse:
-        survey = self.get_survey(survey_id)
+        survey = await self.get_survey(survey_id)
+
+        # Powtórzone żądanie z tym samym kluczem - zwrot pierwotnej odpowiedzi
+        # bez ponownej walidacji i zapisu
+        if idempotency_key is not None:
+            existing = await self._db.get_idempotent_response(
+                survey_id, idempotency_key
+            )
+            if existing is not None:
+                return existing
 
         # Sprawdzenie poprawności wypełnionych odpowiedzi
         self._validate_answers(survey, answer_data.answers)
@@ -89,171 +138,249 @@ class SurveyService:
         )
 
         # Dodanie odpowiedzi do bazy danych
-        self._db.add_response(response)
-        return response
+        return await self._db.add_response(response, idempotency_key=idempotency_key)
 
-    # Funkcja sprawdzająca poprawność odpowiedzi
-    def _validate_answers(self, survey: Survey, answers: list[Answer]) -> None:
-        question_map = {q.id: q for q in survey.questions}
-        answered_ids = {a.question_id for a in answers}
-
-        # Sprawdzenie czy wszystkie wymagane pytania mają odpowiedź
-        for question in survey.questions:
-            if question.required and question.id not in answered_ids:
-                raise ValueError(
-                    f"Required question '{question.text}' was not answered"
+    # Import porcji odpowiedzi do ankiety - walidacja całej porcji przed
+    # zapisem (błąd jednej odpowiedzi odrzuca całą porcję) i jeden zapis do bazy.
+    # Walidacja dziesiątek tysięcy odpowiedzi odbywa się w puli wątków, aby nie
+    # wstrzymywać pętli zdarzeń (zapis trafia do puli w AsyncDatabase).
+    @measure_time
+    async def submit_responses(
+        self, survey_id: UUID, answers: list[AnswerSubmit]
+    ) -> list[SurveyResponse]:
+        survey = await self.get_survey(survey_id)
+        responses = await asyncio.to_thread(self._build_responses, survey, answers)
+
+        await self._db.add_responses(survey_id, responses)
+        self._logger.info(
+            f"Imported {len(responses)} responses to survey {survey_id}",
+            module="ingestion",
+        )
+        return responses
+
+    # Walidacja porcji odpowiedzi i stworzenie rekordów dla bazy danych
+    def _build_responses(
+        self, survey: Survey, answers: list[AnswerSubmit]
+    ) -> list[SurveyResponse]:
+        # Walidator pobierany raz dla całej porcji
+        validator = get_validator(survey)
+        responses = []
+        for index, answer_data in enumerate(answers):
+            try:
+                validator.validate(answer_data.answers)
+            except ValueError as e:
+                raise ValueError(f"Response {index}: {e}")
+            responses.append(
+                SurveyResponse(
+                    id=uuid4(),
+                    survey_id=survey.id,
+                    answers=answer_data.answers,
+                    respondent_id=answer_data.respondent_id,
+                    submitted_at=datetime.now(),
                 )
+            )
+        return responses
 
-        # Sprawdzenie czy odpowiedź na pytanie jest poprawna
-        for answer in answers:
-            # Jeżeli nie istnieje pytanie dla ankiety
-            if answer.question_id not in question_map:
-                raise ValueError(
-                    f"Question with ID {answer.question_id} not found in survey"
+    # Pobranie strony odpowiedzi posortowanych według (submitted_at, id) -
+    # ankieta pobrana już przez wywołującego nie jest wyszukiwana ponownie
+    @measure_time
+    async def get_responses_page(
+        self,
+        survey_id: UUID,
+        limit: int,
+        cursor: str | None = None,
+        survey: Survey | None = None,
+    ) -> SurveyResponsePage:
+        if survey is None:
+            await self.get_survey(survey_id)
+        after = decode_cursor(cursor) if cursor else None
+
+        # Pobranie jednej odpowiedzi więcej pozwala sprawdzić, czy jest kolejna strona
+        items = await self._db.get_responses_after(survey_id, after, limit + 1)
+        if len(items) <= limit:
+            return SurveyResponsePage(items=items)
+        items = items[:limit]
+        return SurveyResponsePage(items=items, next_cursor=encode_cursor(items[-1]))
+
+    # Strumień kolejnych porcji odpowiedzi (pamięć stała niezależnie od liczby odpowiedzi)
+    async def iter_response_batches(
+        self,
+        survey_id: UUID,
+        cursor: str | None = None,
+        batch_size: int = 500,
+        survey: Survey | None = None,
+    ) -> AsyncIterator[list[SurveyResponse]]:
+        # Walidacja przed rozpoczęciem strumienia, aby błąd trafił do klienta od razu
+        if survey is None:
+            await self.get_survey(survey_id)
+        after = decode_cursor(cursor) if cursor else None
+
+        async def batches() -> AsyncIterator[list[SurveyResponse]]:
+            position = after
+            while True:
+                batch = await self._db.get_responses_after(
+                    survey_id, position, batch_size
                 )
+                if not batch:
+                    return
+                yield batch
+                position = (batch[-1].submitted_at, batch[-1].id)
+
+        return batches()
+
+    # Sprawdzenie czy respondent odpowiedział już na ankietę (indeks respondentów)
+    async def has_responded(self, survey_id: UUID, respondent_id: str) -> bool:
+        await self.get_survey(survey_id)
+        return await self._db.has_respondent(survey_id, respondent_id)
+
+    # Pobranie odpowiedzi danego respondenta (indeks respondentów)
+    async def get_respondent_responses(
+        self, survey_id: UUID, respondent_id: str
+    ) -> list[SurveyResponse]:
+        await self.get_survey(survey_id)
+        return await self._db.get_responses_by_respondent(survey_id, respondent_id)
+
+    # Pobranie odpowiedzi wysłanych w przedziale czasu [start, end) (indeks czasu)
+    async def get_responses_between(
+        self,
+        survey_id: UUID,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[SurveyResponse]:
+        await self.get_survey(survey_id)
+        return await self._db.get_responses_between(survey_id, start, end)
+
+    # Funkcja sprawdzająca poprawność odpowiedzi (walidator skompilowany
+    # przy tworzeniu ankiety)
+    def _validate_answers(self, survey: Survey, answers: list[Answer]) -> None:
+        get_validator(survey).validate(answers)
 
-            question = question_map[answer.question_id]
-            self._validate_single_answer(question, answer)
-
-    # Funkcja sprawdzająca pojedynczą odpowiedź
-    def _validate_single_answer(self, question: Question, answer: Answer) -> None:
-        value = answer.value
-
-        match question.type:
-            # Jeżeli pytanie jest tekstowe -> sprawdzenie czy pole wypełniono jako string
-            case QuestionType.TEXT:
-                if not isinstance(value, str):
-                    raise ValueError(f"Text answer expected for question {question.id}")
-
-            # Jeżeli pytanie jest jednokrotnego wyboru -> sprawdzenie czy odpowiedź jest możliwa
-            case QuestionType.SINGLE_CHOICE:
-                if question.options and value not in question.options:
-                    raise ValueError(
-                        f"Invalid option '{value}' for question {question.id}"
-                    )
-
-            # Jeżeli pytanie wielokrotnego wyboru -> sprawdzenie czy pole jest listą oraz czy nie posiada niedozwolonych wartości
-            case QuestionType.MULTIPLE_CHOICE:
-                if not isinstance(value, list):
-                    raise ValueError(
-                        f"List of options expected for question {question.id}"
-                    )
-                if question.options:
-                    for v in value:
-                        if v not in question.options:
-                            raise ValueError(
-                                f"Invalid option '{v}' for question {question.id}"
-                            )
-
-            # Jeżeli pole jest oceną -> sprawdzenie czy pole jest cyfrą oraz czy mieści się w zakresie od-do
-            case QuestionType.RATING:
-                if not isinstance(value, (int, float)):
-                    raise ValueError(
-                        f"Numeric value expected for question {question.id}"
-                    )
-                min_val = question.min_rating or 1
-                max_val = question.max_rating or 5
-                if not min_val <= value <= max_val:
-                    raise ValueError(f"Rating must be between {min_val} and {max_val}")
-
-            # Jeżeli pole typu tak/nie -> sprawdzenie czy wartość pola jest 'yes', 'no', True lub False
-            case QuestionType.YES_NO:
-                if value not in ("yes", "no", True, False):
-                    raise ValueError(
-                        f"Yes/No answer expected for question {question.id}"
-                    )
-
-    # Funkcja obliczająca statystyki ankiety
+    # Funkcja obliczająca statystyki ankiety na podstawie agregatów z bazy danych
+    # (opcjonalnie z histogramem liczby odpowiedzi w czasie)
     @measure_time
-    def get_statistics(self, survey_id: UUID) -> SurveyStats:
-        survey = self.get_survey(survey_id)
-        responses = self._db.get_responses(survey_id)
+    async def get_statistics(
+        self, survey_id: UUID, histogram: HistogramGranularity | None = None
+    ) -> SurveyStats:
+        survey = await self.get_survey(survey_id)
+        aggregate = await self._db.get_aggregate(survey_id)
+        if aggregate is None:
+            raise ValueError(f"Survey with ID {survey_id} not found")
 
         # Pobranie statystyk odpowiedzi
         questions_stats = [
-            self._calculate_question_stats(question, responses)
+            self._calculate_question_stats(question, aggregate.questions[question.id])
             for question in survey.questions
         ]
 
-        last_response_at = None
-        if responses:
-            last_response_at = max(r.submitted_at for r in responses)
-
         return SurveyStats(
             survey_id=survey_id,
             survey_title=survey.title,
-            total_responses=len(responses),
+            total_responses=aggregate.total_responses,
             questions_stats=questions_stats,
             created_at=survey.created_at,
-            last_response_at=last_response_at,
+            last_response_at=aggregate.last_response_at,
+            unique_respondents=aggregate.respondents.total.estimate(),
+            unique_respondents_last_7_days=aggregate.respondents.last_days(7),
+            daily_unique_respondents=aggregate.respondents.by_day(),
+            response_histogram=(
+                aggregate.histogram(histogram) if histogram is not None else None
+            ),
+        )
+
+    # Pobranie statystyk z pamięci podręcznej (przeliczane po zmianie wersji
+    # danych ankiety, w granicach max_staleness_seconds - w tle)
+    async def get_cached_statistics(
+        self, survey_id: UUID, histogram: HistogramGranularity | None = None
+    ) -> CachedStats:
+        version = await self._db.get_version(survey_id)
+        if version is None:
+            get_stats_cache().invalidate(survey_id)
+            raise ValueError(f"Survey with ID {survey_id} not found")
+
+        # Wersja odczytana przed przeliczeniem - zapis w trakcie liczenia
+        # spowoduje kolejne odświeżenie, a nie pominięcie odpowiedzi
+        async def compute() -> tuple[int, SurveyStats]:
+            current = await self._db.get_version(survey_id)
+            return current, await self.get_statistics(survey_id, histogram)
+
+        key = survey_id if histogram is None else (survey_id, histogram)
+        return await get_stats_cache().get(key, version, compute)
+
+    # Statystyki odpowiedzi spełniających wszystkie warunki (przecięcie bitmap
+    # odpowiedzi z agregatów - bez przeglądania zapisanych odpowiedzi)
+    @measure_time
+    async def get_filtered_statistics(
+        self,
+        survey_id: UUID,
+        filters: list[AnswerFilter],
+        survey: Survey | None = None,
+    ) -> FilteredSurveyStats:
+        if survey is None:
+            survey = await self.get_survey(survey_id)
+        aggregate = await self._db.get_aggregate(survey_id)
+        if aggregate is None:
+            raise ValueError(f"Survey with ID {survey_id} not found")
+
+        filtered = aggregate.filtered([(f.question_id, f.value) for f in filters])
+        return FilteredSurveyStats(
+            survey_id=survey_id,
+            survey_title=survey.title,
+            total_responses=filtered.total_responses,
+            questions_stats=[
+                self._calculate_question_stats(
+                    question, filtered.questions[question.id]
+                )
+                for question in survey.questions
+            ],
+            created_at=survey.created_at,
+            filters=filters,
         )
 
     # Funkcja obliczająca statystyki dla pytania
+    # (odpowiedzi tekstowe - tylko najczęstsze, reszta łącznie)
     def _calculate_question_stats(
-        self, question: Question, responses: list[SurveyResponse]
+        self, question: Question, aggregate: QuestionAggregate
     ) -> QuestionStats:
-        # Collect all answers for this question
-        answers = []
-        for response in responses:
-            for answer in response.answers:
-                if answer.question_id == question.id:
-                    answers.append(answer.value)
-
-        # Obliczenie rozkładu odpowiedzi
-        distribution = self._calculate_distribution(question.type, answers)
-
-        average = None
-        # Obliczenie średniej wartości dla pytań o typie ocena
-        if question.type == QuestionType.RATING and answers:
-            numeric_answers = [a for a in answers if isinstance(a, (int, float))]
-            if numeric_answers:
-                average = sum(numeric_answers) / len(numeric_answers)
-
-        # Zwrócenie odpowiedzi
+        distribution = aggregate.distribution
+        other = None
+        if aggregate.text is not None:
+            top_k = self._config.get("stats", "text_top_k", 20)
+            distribution = dict(aggregate.text.top(top_k))
+            other = aggregate.count - sum(distribution.values())
+
         return QuestionStats(
             question_id=question.id,
             question_text=question.text,
             question_type=question.type,
-            total_responses=len(answers),
+            total_responses=aggregate.count,
             answer_distribution=distribution,
-            average_value=average,
+            other_responses=other,
+            average_value=aggregate.average,
+            rating_stats=(
+                aggregate.rating.stats() if aggregate.rating is not None else None
+            ),
         )
 
-    # Obliczenie rozkładu odpowiedzi dla pytania
-    def _calculate_distribution(
-        self, question_type: QuestionType, answers: list
-    ) -> dict[str, int]:
-        if not answers:
-            return {}
-
-        match question_type:
-            # Jeżeli odpowiedzią na pytanie jest tekst -> Zliczenie częstotliwości występowania tekstu
-            case QuestionType.TEXT:
-                return dict(Counter(str(a) for a in answers))
-
-            # Jeżeli wielokrotny wybór -> Zliczenie częstotliwości odpowiedzi
-            case QuestionType.MULTIPLE_CHOICE:
-                flat_answers = []
-                for answer in answers:
-                    if isinstance(answer, list):
-                        flat_answers.extend(answer)
-                    else:
-                        flat_answers.append(answer)
-                return dict(Counter(str(a) for a in flat_answers))
-
-            # Jeżeli odpowiedź yes/no -> zliczenie odpowiedzi
-            case QuestionType.YES_NO:
-                normalized = []
-                for a in answers:
-                    if a in (True, "yes"):
-                        normalized.append("yes")
-                    else:
-                        normalized.append("no")
-                return dict(Counter(normalized))
-
-            case _:
-                return dict(Counter(str(a) for a in answers))
+    # Usunięcie surowych odpowiedzi starszych niż czas retencji ankiety
+    # (statystyki pozostają w agregatach) - zwraca liczbę usuniętych odpowiedzi
+    async def apply_retention(self, now: datetime | None = None) -> int:
+        now = now or datetime.now()
+        default_days = self._config.get("retention", "days")
+        dropped = 0
+        for survey in await self.get_all_surveys():
+            days = survey.retention_days or default_days
+            if days is None:
+                continue
+            dropped += await self._db.drop_responses_before(
+                survey.id, now - timedelta(days=days)
+            )
+
+        if dropped:
+            self._logger.info(
+                f"Retention dropped {dropped} responses", module="retention"
+            )
+        return dropped
 
     # Funkcja pobierająca wszystkie ankiety
-    def get_all_surveys(self) -> list[Survey]:
-        return list(self._db.surveys.values())
+    async def get_all_surveys(self) -> list[Survey]:
+        return await self._db.get_surveys()
@@ -0,0 +1,178 @@
+"""
+Binarna migawka bazy danych w pamięci (zapis przy zamknięciu, odczyt przy starcie).
+
+Plik zaczyna się nagłówkiem [magic | wersja], po którym następują rekordy
+[długość | crc32 | typ | dane] - jak w dzienniku WAL. Dane rekordu są
+zakodowane modułem marshal (bez JSON i walidacji pydantic):
+- ankieta: słownik model_dump(mode="json"),
+- agregaty: (id ankiety, SurveyAggregate.to_dict()) - statystyki obejmują
+  też odpowiedzi usunięte przez retencję,
+- porcja odpowiedzi: (id ankiety, lista krotek odpowiedzi),
+- początek dziennika: numer pierwszego segmentu WAL, którego migawka nie
+  obejmuje (zapisywany tylko przy włączonym dzienniku),
+- koniec: pusty rekord zamykający (brak = plik niekompletny).
+
+Odpowiedź zapisywana jest jako krotka (id, respondent, mikrosekundy,
+przesunięcie strefy czasowej, odpowiedzi) i odtwarzana bezpośrednio do
+ResponseRecord, bez tworzenia modeli SurveyResponse.
+"""
+
+import marshal
+import os
+import struct
+import zlib
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import UUID, SafeUUID
+
+from app.aggregates import SurveyAggregate
+from app.columnar import to_micros
+from app.models.survey import Survey
+from app.records import ResponseRecord
+
+# Typy rekordów migawki
+RECORD_END = 0
+RECORD_SURVEY = 1
+RECORD_AGGREGATE = 2
+RECORD_RESPONSES = 3
+RECORD_WAL_START = 4
+
+SNAPSHOT_MAGIC = b"PLSN"
+SNAPSHOT_VERSION = 1
+
+_FILE_HEADER = struct.Struct("<4sI")
+_HEADER = struct.Struct("<IIB")
+# Wersja formatu marshal (stała między wersjami Pythona od 3.4)
+_MARSHAL_VERSION = 4
+_EPOCH = datetime(1970, 1, 1)
+# Liczba odpowiedzi w jednym rekordzie
+_BATCH_SIZE = 10_000
+
+
+# Zamiana rekordu odpowiedzi na krotkę zapisywaną w migawce
+def encode_record(record: ResponseRecord) -> tuple:
+    submitted_at = record.submitted_at
+    offset = submitted_at.utcoffset()
+    return (
+        record.id.bytes,
+        record.respondent_id,
+        to_micros(submitted_at.replace(tzinfo=None)),
+        int(offset.total_seconds()) if offset is not None else None,
+        record.answers,
+    )
+
+
+# Odtworzenie porcji rekordów odpowiedzi z krotek migawki.
+# Przy milionie odpowiedzi najdroższe jest tworzenie obiektów, więc pętla
+# korzysta ze zmiennych lokalnych, a UUID powstaje z pominięciem walidacji
+# UUID.__init__ (bajty pochodzą z poprawnego UUID zapisanego w migawce).
+def decode_records(batch: list[tuple]) -> list[ResponseRecord]:
+    new = object.__new__
+    set_attribute = object.__setattr__
+    from_bytes = int.from_bytes
+    unknown = SafeUUID.unknown
+
+    records = []
+    append = records.append
+    for id_bytes, respondent_id, micros, offset, answers in batch:
+        response_id = new(UUID)
+        set_attribute(response_id, "int", from_bytes(id_bytes, "big"))
+        set_attribute(response_id, "is_safe", unknown)
+
+        submitted_at = _EPOCH + timedelta(0, 0, micros)
+        if offset is not None:
+            submitted_at = submitted_at.replace(
+                tzinfo=timezone(timedelta(seconds=offset))
+            )
+        append(ResponseRecord(response_id, answers, respondent_id, submitted_at))
+    return records
+
+
+# Zapis rekordu migawki do pliku
+def _write(snapshot, record_type: int, value: Any) -> None:
+    payload = marshal.dumps(value, _MARSHAL_VERSION)
+    snapshot.write(_HEADER.pack(len(payload), zlib.crc32(payload), record_type))
+    snapshot.write(payload)
+
+
+# Zapis migawki: dla każdej ankiety (ankieta, agregaty, rekordy odpowiedzi)
+# i opcjonalnie numer pierwszego segmentu WAL zapisanego po migawce.
+# Plik jest podmieniany atomowo - przerwany zapis nie niszczy poprzedniej migawki.
+# Zwraca liczbę zapisanych odpowiedzi.
+def write_snapshot(
+    path: str,
+    surveys: Iterable[tuple[Survey, SurveyAggregate, Iterable[ResponseRecord]]],
+    wal_start: int | None = None,
+) -> int:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    count = 0
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as snapshot:
+        snapshot.write(_FILE_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION))
+        if wal_start is not None:
+            _write(snapshot, RECORD_WAL_START, wal_start)
+        for survey, aggregate, records in surveys:
+            survey_id = survey.id.bytes
+            _write(snapshot, RECORD_SURVEY, survey.model_dump(mode="json"))
+            _write(snapshot, RECORD_AGGREGATE, (survey_id, aggregate.to_dict()))
+
+            batch = []
+            for record in records:
+                batch.append(encode_record(record))
+                if len(batch) >= _BATCH_SIZE:
+                    _write(snapshot, RECORD_RESPONSES, (survey_id, batch))
+                    count += len(batch)
+                    batch = []
+            if batch:
+                _write(snapshot, RECORD_RESPONSES, (survey_id, batch))
+                count += len(batch)
+
+        _write(snapshot, RECORD_END, None)
+        snapshot.flush()
+        os.fsync(snapshot.fileno())
+
+    os.replace(temporary, path)
+    return count
+
+
+# Odczyt rekordów migawki jako (typ, wartość):
+# ankieta -> Survey, agregaty -> (id ankiety, słownik),
+# porcja odpowiedzi -> (id ankiety, lista ResponseRecord),
+# początek dziennika -> numer segmentu WAL
+def read_snapshot(path: str) -> Iterator[tuple[int, Any]]:
+    with open(path, "rb") as snapshot:
+        data = snapshot.read()
+
+    if len(data) < _FILE_HEADER.size:
+        raise ValueError(f"Invalid snapshot: {path}")
+    magic, version = _FILE_HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError(f"Invalid snapshot: {path}")
+
+    position = _FILE_HEADER.size
+    while position + _HEADER.size <= len(data):
+        length, checksum, record_type = _HEADER.unpack_from(data, position)
+        start = position + _HEADER.size
+        payload = data[start : start + length]
+        if len(payload) != length or zlib.crc32(payload) != checksum:
+            break
+        position = start + length
+
+        value = marshal.loads(payload)
+        if record_type == RECORD_END:
+            return
+        if record_type == RECORD_SURVEY:
+            yield record_type, Survey.model_validate(value)
+        elif record_type == RECORD_AGGREGATE:
+            yield record_type, (UUID(bytes=value[0]), value[1])
+        elif record_type == RECORD_RESPONSES:
+            survey_id, batch = value
+            yield record_type, (UUID(bytes=survey_id), decode_records(batch))
+        elif record_type == RECORD_WAL_START:
+            yield record_type, value
+
+    raise ValueError(f"Truncated snapshot: {path}")
@@ -0,0 +1,576 @@
+"""
+Baza danych SQLite z tym samym API co app.database.Database.
+
+Plik bazy może być współdzielony przez wiele procesów (np. workery
+gunicorna) - tryb WAL pozwala na równoległe odczyty przy jednym zapisie.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+from threading import Lock, local
+from typing import Any
+from uuid import UUID
+
+from app.aggregates import SurveyAggregate
+from app.config import get_config
+from app.database import DatabaseMeta
+from app.models.survey import Survey, SurveyResponse
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS surveys (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS responses (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    survey_id TEXT NOT NULL REFERENCES surveys (id) ON DELETE CASCADE,
+    respondent_id TEXT,
+    submitted_at TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_survey_submitted_id
+    ON responses (survey_id, submitted_at, id);
+CREATE INDEX IF NOT EXISTS idx_responses_survey_respondent
+    ON responses (survey_id, respondent_id);
+CREATE INDEX IF NOT EXISTS idx_responses_survey_seq
+    ON responses (survey_id, seq);
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    survey_id TEXT NOT NULL REFERENCES surveys (id) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    response_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (survey_id, key)
+);
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created
+    ON idempotency_keys (created_at);
+CREATE TABLE IF NOT EXISTS aggregate_base (
+    survey_id TEXT PRIMARY KEY REFERENCES surveys (id) ON DELETE CASCADE,
+    last_seq INTEGER NOT NULL,
+    total_responses INTEGER NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO counters (name, value)
+    SELECT 'surveys', COUNT(*) FROM surveys;
+INSERT OR IGNORE INTO counters (name, value)
+    SELECT 'responses', (SELECT COUNT(*) FROM responses)
+        + (SELECT COALESCE(SUM(total_responses), 0) FROM aggregate_base);
+CREATE TRIGGER IF NOT EXISTS trg_surveys_insert AFTER INSERT ON surveys
+BEGIN
+    UPDATE counters SET value = value + 1 WHERE name = 'surveys';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_surveys_delete AFTER DELETE ON surveys
+BEGIN
+    UPDATE counters SET value = value - 1 WHERE name = 'surveys';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_responses_insert AFTER INSERT ON responses
+BEGIN
+    UPDATE counters SET value = value + 1 WHERE name = 'responses';
+END;
+"""
+
+# Zapytania stałe - sqlite3 przechowuje przygotowane instrukcje w cache połączenia
+_INSERT_SURVEY = (
+    "INSERT INTO surveys (id, created_at, payload) VALUES (?, ?, ?) "
+    "ON CONFLICT (id) DO UPDATE SET created_at = excluded.created_at, "
+    "payload = excluded.payload"
+)
+_SELECT_SURVEY = "SELECT payload FROM surveys WHERE id = ?"
+_SELECT_SURVEYS = "SELECT payload FROM surveys ORDER BY created_at"
+_SURVEY_EXISTS = "SELECT 1 FROM surveys WHERE id = ?"
+_INSERT_RESPONSE = (
+    "INSERT INTO responses (id, survey_id, respondent_id, submitted_at, payload) "
+    "SELECT ?, ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM surveys WHERE id = ?)"
+)
+_SELECT_RESPONSES = "SELECT payload FROM responses WHERE survey_id = ? ORDER BY seq"
+_SELECT_RESPONSES_PAGE = (
+    "SELECT payload FROM responses WHERE survey_id = ? "
+    "ORDER BY submitted_at, id LIMIT ?"
+)
+_SELECT_RESPONSES_PAGE_AFTER = (
+    "SELECT payload FROM responses WHERE survey_id = ? AND (submitted_at, id) > (?, ?) "
+    "ORDER BY submitted_at, id LIMIT ?"
+)
+_SELECT_RESPONSES_BETWEEN = (
+    "SELECT payload FROM responses WHERE survey_id = ? "
+    "AND submitted_at >= ? AND submitted_at < ? ORDER BY submitted_at, id"
+)
+_SELECT_RESPONSES_BY_RESPONDENT = (
+    "SELECT payload FROM responses WHERE survey_id = ? AND respondent_id = ? "
+    "ORDER BY seq"
+)
+_RESPONDENT_EXISTS = (
+    "SELECT 1 FROM responses WHERE survey_id = ? AND respondent_id = ? LIMIT 1"
+)
+_SELECT_ALL_RESPONSES = "SELECT survey_id, payload FROM responses ORDER BY seq"
+_SELECT_RESPONSES_AFTER = (
+    "SELECT seq, payload FROM responses WHERE survey_id = ? AND seq > ? ORDER BY seq"
+)
+_SELECT_IDEMPOTENT_RESPONSE = (
+    "SELECT r.payload FROM idempotency_keys k JOIN responses r ON r.id = k.response_id "
+    "WHERE k.survey_id = ? AND k.key = ? AND k.created_at > ?"
+)
+_INSERT_IDEMPOTENCY_KEY = (
+    "INSERT OR REPLACE INTO idempotency_keys (survey_id, key, response_id, created_at) "
+    "VALUES (?, ?, ?, ?)"
+)
+_DELETE_EXPIRED_IDEMPOTENCY_KEYS = "DELETE FROM idempotency_keys WHERE created_at <= ?"
+_SELECT_RESPONSES_RANGE = (
+    "SELECT payload FROM responses WHERE survey_id = ? AND seq > ? AND seq <= ? "
+    "ORDER BY seq"
+)
+_FIRST_RETAINED_SEQ = (
+    "SELECT MIN(seq) FROM responses WHERE survey_id = ? AND submitted_at >= ?"
+)
+_LAST_SEQ = "SELECT MAX(seq) FROM responses WHERE survey_id = ?"
+_SELECT_AGGREGATE_BASE_SEQ = "SELECT last_seq FROM aggregate_base WHERE survey_id = ?"
+_SELECT_AGGREGATE_BASE = (
+    "SELECT last_seq, payload FROM aggregate_base WHERE survey_id = ?"
+)
+_UPSERT_AGGREGATE_BASE = (
+    "INSERT OR REPLACE INTO aggregate_base "
+    "(survey_id, last_seq, total_responses, payload) VALUES (?, ?, ?, ?)"
+)
+_DELETE_RESPONSES_UPTO = "DELETE FROM responses WHERE survey_id = ? AND seq <= ?"
+_SELECT_COUNTERS = "SELECT name, value FROM counters"
+# Wersja danych ankiety: numer ostatniej zapisanej odpowiedzi (także tych
+# przeniesionych do agregatów przez retencję)
+_SELECT_VERSION = (
+    "SELECT MAX("
+    "COALESCE((SELECT MAX(seq) FROM responses WHERE survey_id = ?1), 0), "
+    "COALESCE((SELECT last_seq FROM aggregate_base WHERE survey_id = ?1), 0)"
+    ") FROM surveys WHERE id = ?1"
+)
+
+
+class SQLiteDatabase(metaclass=DatabaseMeta):
+    """
+    Singleton bazy danych przechowującej ankiety i odpowiedzi w pliku SQLite.
+    Każdy wątek korzysta z własnego połączenia z puli.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self._path = path or get_config().get("database", "sqlite_path", "polly.db")
+        self._initialized_at = datetime.now()
+
+        # Pula połączeń - jedno połączenie na wątek
+        self._local = local()
+        self._pool_lock = Lock()
+        self._connections: list[sqlite3.Connection] = []
+        self._pid = os.getpid()
+
+        # Ankiety nie zmieniają się po utworzeniu, więc można je trzymać w cache
+        self._survey_cache: dict[UUID, Survey] = {}
+
+        # Agregaty doliczane przyrostowo od ostatnio przetworzonego wiersza -
+        # osobna blokada na ankietę, żeby odczyty różnych ankiet nie czekały
+        self._aggregate_lock = Lock()
+        self._aggregate_locks: dict[UUID, Lock] = {}
+        self._aggregates: dict[UUID, tuple[int, SurveyAggregate]] = {}
+
+        # Czas życia kluczy idempotencji (czas zegarowy - wspólny dla procesów)
+        self._idempotency_ttl = get_config().get(
+            "idempotency", "ttl_seconds", 24 * 60 * 60
+        )
+
+        self._connection().executescript(_SCHEMA)
+
+    # Pobranie połączenia przypisanego do bieżącego wątku
+    def _connection(self) -> sqlite3.Connection:
+        # Po fork() połączenia rodzica nie mogą być używane w procesie potomnym
+        if os.getpid() != self._pid:
+            with self._pool_lock:
+                self._local = local()
+                self._connections = []
+                self._pid = os.getpid()
+
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self._path,
+                isolation_level=None,
+                check_same_thread=False,
+                cached_statements=128,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA busy_timeout=5000")
+            connection.execute("PRAGMA foreign_keys=ON")
+            self._local.connection = connection
+            with self._pool_lock:
+                self._connections.append(connection)
+        return connection
+
+    # Każda operacja wykonuje zapytanie do pliku bazy (AsyncDatabase
+    # uruchamia je w puli wątków)
+    blocking_reads = True
+    blocking_writes = True
+
+    # Pobranie wszystkich ankiet
+    @property
+    def surveys(self) -> dict[UUID, Survey]:
+        rows = self._connection().execute(_SELECT_SURVEYS).fetchall()
+        surveys = [Survey.model_validate_json(payload) for (payload,) in rows]
+        return {survey.id: survey for survey in surveys}
+
+    # Pobranie wszystkich odpowiedzi
+    @property
+    def responses(self) -> dict[UUID, list[SurveyResponse]]:
+        responses: dict[UUID, list[SurveyResponse]] = {
+            survey_id: [] for survey_id in self.surveys
+        }
+        for survey_id, payload in self._connection().execute(_SELECT_ALL_RESPONSES):
+            responses[UUID(survey_id)].append(
+                SurveyResponse.model_validate_json(payload)
+            )
+        return responses
+
+    # Stworzenie ankiety
+    def add_survey(self, survey: Survey) -> None:
+        self._connection().execute(
+            _INSERT_SURVEY,
+            (str(survey.id), survey.created_at.isoformat(), survey.model_dump_json()),
+        )
+        self._survey_cache[survey.id] = survey
+
+    # Pobranie formularza ankiety
+    def get_survey(self, survey_id: UUID) -> Survey | None:
+        survey = self._survey_cache.get(survey_id)
+        if survey is not None:
+            return survey
+
+        row = self._connection().execute(_SELECT_SURVEY, (str(survey_id),)).fetchone()
+        if row is None:
+            return None
+
+        survey = Survey.model_validate_json(row[0])
+        self._survey_cache[survey_id] = survey
+        return survey
+
+    # Błąd zapisu odpowiedzi do ankiety, której nie ma w pliku bazy (np. po
+    # wyczyszczeniu bazy przez inny proces) - ankieta usuwana z cache procesu
+    def _survey_not_found(self, survey_id: UUID) -> ValueError:
+        self._survey_cache.pop(survey_id, None)
+        return ValueError(f"Survey with ID {survey_id} not found")
+
+    # Dodanie odpowiedzi do ankiety (ValueError jeśli ankieta nie istnieje) -
+    # zwraca zapisaną odpowiedź (przy powtórzonym kluczu idempotencji: pierwotną)
+    def add_response(
+        self, response: SurveyResponse, idempotency_key: str | None = None
+    ) -> SurveyResponse:
+        connection = self._connection()
+        parameters = (
+            str(response.id),
+            str(response.survey_id),
+            response.respondent_id,
+            response.submitted_at.isoformat(),
+            response.model_dump_json(),
+            str(response.survey_id),
+        )
+        if idempotency_key is None:
+            if not connection.execute(_INSERT_RESPONSE, parameters).rowcount:
+                raise self._survey_not_found(response.survey_id)
+            return response
+
+        # Sprawdzenie klucza i zapis w jednej transakcji - także między procesami
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                _SELECT_IDEMPOTENT_RESPONSE,
+                (str(response.survey_id), idempotency_key, now - self._idempotency_ttl),
+            ).fetchone()
+            if row is not None:
+                connection.execute("COMMIT")
+                return SurveyResponse.model_validate_json(row[0])
+
+            connection.execute(
+                _DELETE_EXPIRED_IDEMPOTENCY_KEYS, (now - self._idempotency_ttl,)
+            )
+            if not connection.execute(_INSERT_RESPONSE, parameters).rowcount:
+                raise self._survey_not_found(response.survey_id)
+            connection.execute(
+                _INSERT_IDEMPOTENCY_KEY,
+                (str(response.survey_id), idempotency_key, str(response.id), now),
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return response
+
+    # Dodanie porcji odpowiedzi (import) w jednej transakcji - cała porcja
+    # jest wycofywana, jeśli ankieta nie istnieje
+    def add_responses(self, responses: list[SurveyResponse]) -> list[SurveyResponse]:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            inserted = connection.executemany(
+                _INSERT_RESPONSE,
+                (
+                    (
+                        str(response.id),
+                        str(response.survey_id),
+                        response.respondent_id,
+                        response.submitted_at.isoformat(),
+                        response.model_dump_json(),
+                        str(response.survey_id),
+                    )
+                    for response in responses
+                ),
+            ).rowcount
+            if inserted < len(responses):
+                missing = next(
+                    response.survey_id
+                    for response in responses
+                    if connection.execute(
+                        _SURVEY_EXISTS, (str(response.survey_id),)
+                    ).fetchone()
+                    is None
+                )
+                raise self._survey_not_found(missing)
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return responses
+
+    # Pobranie odpowiedzi zapisanej wcześniej z tym samym kluczem idempotencji
+    def get_idempotent_response(
+        self, survey_id: UUID, idempotency_key: str
+    ) -> SurveyResponse | None:
+        row = (
+            self._connection()
+            .execute(
+                _SELECT_IDEMPOTENT_RESPONSE,
+                (str(survey_id), idempotency_key, time.time() - self._idempotency_ttl),
+            )
+            .fetchone()
+        )
+        return SurveyResponse.model_validate_json(row[0]) if row is not None else None
+
+    # Pobranie odpowiedzi do danej ankiety
+    def get_responses(self, survey_id: UUID) -> list[SurveyResponse]:
+        rows = self._connection().execute(_SELECT_RESPONSES, (str(survey_id),))
+        return [SurveyResponse.model_validate_json(payload) for (payload,) in rows]
+
+    # Pobranie co najwyżej limit odpowiedzi posortowanych według (submitted_at, id),
+    # następujących po kursorze after
+    def get_responses_after(
+        self,
+        survey_id: UUID,
+        after: tuple[datetime, UUID] | None,
+        limit: int,
+    ) -> list[SurveyResponse]:
+        if after is None:
+            rows = self._connection().execute(
+                _SELECT_RESPONSES_PAGE, (str(survey_id), limit)
+            )
+        else:
+            rows = self._connection().execute(
+                _SELECT_RESPONSES_PAGE_AFTER,
+                (str(survey_id), after[0].isoformat(), str(after[1]), limit),
+            )
+        return [SurveyResponse.model_validate_json(payload) for (payload,) in rows]
+
+    # Pobranie odpowiedzi z przedziału czasu [start, end) posortowanych według czasu
+    def get_responses_between(
+        self, survey_id: UUID, start: datetime | None, end: datetime | None
+    ) -> list[SurveyResponse]:
+        # Zapis ISO daty porównywany tekstowo - brak granicy zastępują
+        # wartości mniejsze/większe od każdej daty
+        rows = self._connection().execute(
+            _SELECT_RESPONSES_BETWEEN,
+            (
+                str(survey_id),
+                start.isoformat() if start is not None else "",
+                end.isoformat() if end is not None else "\uffff",
+            ),
+        )
+        return [SurveyResponse.model_validate_json(payload) for (payload,) in rows]
+
+    # Pobranie odpowiedzi respondenta w kolejności zapisu
+    def get_responses_by_respondent(
+        self, survey_id: UUID, respondent_id: str
+    ) -> list[SurveyResponse]:
+        rows = self._connection().execute(
+            _SELECT_RESPONSES_BY_RESPONDENT, (str(survey_id), respondent_id)
+        )
+        return [SurveyResponse.model_validate_json(payload) for (payload,) in rows]
+
+    # Sprawdzenie czy respondent odpowiedział już na ankietę
+    def has_respondent(self, survey_id: UUID, respondent_id: str) -> bool:
+        row = (
+            self._connection()
+            .execute(_RESPONDENT_EXISTS, (str(survey_id), respondent_id))
+            .fetchone()
+        )
+        return row is not None
+
+    # Agregaty odpowiedzi usuniętych przez retencję (baza dla doliczania)
+    def _aggregate_base(
+        self, connection: sqlite3.Connection, survey: Survey
+    ) -> tuple[int, SurveyAggregate]:
+        row = connection.execute(_SELECT_AGGREGATE_BASE, (str(survey.id),)).fetchone()
+        if row is None:
+            return 0, SurveyAggregate(survey.questions)
+        last_seq, payload = row
+        return last_seq, SurveyAggregate.from_dict(
+            survey.questions, json.loads(payload)
+        )
+
+    # Blokada agregatów danej ankiety (tworzona przy pierwszym użyciu)
+    def _aggregate_lock_for(self, survey_id: UUID) -> Lock:
+        with self._aggregate_lock:
+            lock = self._aggregate_locks.get(survey_id)
+            if lock is None:
+                lock = self._aggregate_locks[survey_id] = Lock()
+            return lock
+
+    # Pobranie kopii agregatów statystyk ankiety
+    def get_aggregate(self, survey_id: UUID) -> SurveyAggregate | None:
+        survey = self.get_survey(survey_id)
+        if survey is None:
+            return None
+
+        connection = self._connection()
+        with self._aggregate_lock_for(survey_id):
+            # Odczyt bazy agregatów i nowych wierszy w jednej transakcji -
+            # retencja w innym procesie nie może usunąć wierszy pomiędzy nimi
+            connection.execute("BEGIN")
+            try:
+                last_seq, aggregate = self._aggregates.get(survey_id, (0, None))
+                row = connection.execute(
+                    _SELECT_AGGREGATE_BASE_SEQ, (str(survey_id),)
+                ).fetchone()
+                # Wiersze przetworzone wcześniej mogły zostać usunięte przez
+                # retencję - wtedy doliczanie zaczyna się od bazy agregatów
+                if aggregate is None or (row is not None and row[0] > last_seq):
+                    last_seq, aggregate = self._aggregate_base(connection, survey)
+
+                # Doliczenie tylko odpowiedzi dodanych od poprzedniego odczytu
+                # (także tych zapisanych przez inne procesy)
+                rows = connection.execute(
+                    _SELECT_RESPONSES_AFTER, (str(survey_id), last_seq)
+                )
+                for seq, payload in rows:
+                    aggregate.add(SurveyResponse.model_validate_json(payload))
+                    last_seq = seq
+            finally:
+                connection.execute("COMMIT")
+
+            self._aggregates[survey_id] = (last_seq, aggregate)
+            return aggregate.copy()
+
+    # Usunięcie surowych odpowiedzi wysłanych przed cutoff (retencja) - zwraca
+    # liczbę usuniętych odpowiedzi. Usuwany jest początek odpowiedzi ankiety
+    # (w kolejności zapisu) złożony wyłącznie ze starych odpowiedzi, a ich
+    # wkład w statystyki trafia do tabeli aggregate_base.
+    def drop_responses_before(self, survey_id: UUID, cutoff: datetime) -> int:
+        survey = self.get_survey(survey_id)
+        if survey is None:
+            return 0
+
+        connection = self._connection()
+        key = str(survey_id)
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            first_retained = connection.execute(
+                _FIRST_RETAINED_SEQ, (key, cutoff.isoformat())
+            ).fetchone()[0]
+            if first_retained is not None:
+                upto = first_retained - 1
+            else:
+                upto = connection.execute(_LAST_SEQ, (key,)).fetchone()[0] or 0
+
+            last_seq, aggregate = self._aggregate_base(connection, survey)
+            if upto <= last_seq:
+                connection.execute("COMMIT")
+                return 0
+
+            # Przeniesienie wkładu usuwanych odpowiedzi do bazy agregatów
+            for (payload,) in connection.execute(
+                _SELECT_RESPONSES_RANGE, (key, last_seq, upto)
+            ):
+                aggregate.add(SurveyResponse.model_validate_json(payload))
+            # Baza agregatów obejmuje wyłącznie usunięte odpowiedzi - bez bitmap
+            # statystyk filtrowanych
+            aggregate.drop_answers_before(aggregate.total_responses)
+            connection.execute(
+                _UPSERT_AGGREGATE_BASE,
+                (key, upto, aggregate.total_responses, json.dumps(aggregate.to_dict())),
+            )
+            dropped = connection.execute(_DELETE_RESPONSES_UPTO, (key, upto)).rowcount
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return dropped
+
+    # Pobranie wersji danych ankiety - rośnie z każdą nową odpowiedzią,
+    # także zapisaną przez inny proces (None jeśli ankieta nie istnieje)
+    def get_version(self, survey_id: UUID) -> int | None:
+        row = self._connection().execute(_SELECT_VERSION, (str(survey_id),)).fetchone()
+        return row[0] if row is not None else None
+
+    # Sprawdzenie czy ankieta istnieje
+    def survey_exists(self, survey_id: UUID) -> bool:
+        if survey_id in self._survey_cache:
+            return True
+        row = self._connection().execute(_SURVEY_EXISTS, (str(survey_id),)).fetchone()
+        return row is not None
+
+    # Pobranie ogólnych statystyk ankiet
+    def get_stats(self) -> dict[str, Any]:
+        # Liczniki utrzymywane przez wyzwalacze (bez COUNT(*) po tabelach);
+        # liczba odpowiedzi obejmuje też odpowiedzi usunięte przez retencję
+        counters = dict(self._connection().execute(_SELECT_COUNTERS).fetchall())
+        return {
+            "total_surveys": counters.get("surveys", 0),
+            "total_responses": counters.get("responses", 0),
+            "initialized_at": self._initialized_at.isoformat(),
+            "backend": "sqlite",
+        }
+
+    # Sprawdzenie gotowości bazy do obsługi żądań (dostępność pliku bazy)
+    def ping(self) -> bool:
+        try:
+            self._connection().execute("SELECT 1").fetchone()
+        except sqlite3.Error:
+            return False
+        return True
+
+    # Wyczyszczenie bazy danych
+    def clear(self) -> None:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("DELETE FROM idempotency_keys")
+            connection.execute("DELETE FROM aggregate_base")
+            connection.execute("DELETE FROM responses")
+            connection.execute("DELETE FROM surveys")
+            connection.execute("UPDATE counters SET value = 0")
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+        self._survey_cache.clear()
+        with self._aggregate_lock:
+            self._aggregates.clear()
+
+    # Zamknięcie wszystkich połączeń z puli
+    def close(self) -> None:
+        with self._pool_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+            self._local = local()
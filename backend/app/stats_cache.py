@@ -0,0 +1,171 @@
+"""
+Pamięć podręczna statystyk ankiet (GET /surveys/{id}/stats).
+
+Wpis (ankieta lub ankieta z wybranym histogramem) jest oznaczony wersją
+danych ankiety, z której policzono statystyki. Gdy wersja się zgadza,
+statystyki są zwracane bez przeliczania. Po nowych odpowiedziach wpis jest
+domyślnie przeliczany w żądaniu. Po włączeniu max_staleness_seconds wpis może
+być zwracany jeszcze przez ten czas od policzenia - w tym czasie jedno zadanie
+w tle liczy statystyki od nowa (stale-while-revalidate).
+Przechowywanych jest najwyżej cache_max_entries wpisów (LRU).
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from threading import Lock
+from typing import Any, ClassVar, NamedTuple
+
+from app.config import get_config
+from app.logger import get_logger
+from app.models import SurveyStats
+
+# Funkcja licząca statystyki - zwraca (wersja danych, statystyki)
+Compute = Callable[[], Awaitable[tuple[int, SurveyStats]]]
+
+
+class StatsCacheMeta(type):
+    _instances: ClassVar[dict[type, Any]] = {}
+    _lock: Lock = Lock()
+
+    def __call__(cls, *args, **kwargs):
+        if cls not in cls._instances:
+            with cls._lock:
+                if cls not in cls._instances:
+                    instance = super().__call__(*args, **kwargs)
+                    cls._instances[cls] = instance
+        return cls._instances[cls]
+
+
+# Statystyki zwrócone z pamięci podręcznej (wiek w sekundach)
+class CachedStats(NamedTuple):
+    stats: SurveyStats
+    version: int
+    age: float
+
+
+class _Entry:
+    __slots__ = ("computed_at", "stats", "version")
+
+    def __init__(self, stats: SurveyStats, version: int) -> None:
+        self.stats = stats
+        self.version = version
+        self.computed_at = time.monotonic()
+
+
+# Trwające przeliczenie wpisu - wersja danych, dla której zostało zlecone
+# (przeliczenie widzi tę wersję lub nowszą)
+class _Flight(NamedTuple):
+    version: int
+    task: asyncio.Task
+
+
+class StatsCache(metaclass=StatsCacheMeta):
+    """
+    Singleton przechowujący ostatnio policzone statystyki ankiet.
+
+    Liczba wpisów jest ograniczona (usuwane są najdawniej używane), a każdy
+    klucz ma najwyżej jedno trwające przeliczenie - równoległe żądania
+    czekają na jego wynik.
+    """
+
+    def __init__(self) -> None:
+        stats_config = get_config().get_section("stats")
+        self._max_staleness = stats_config.get("max_staleness_seconds", 0.0)
+        self._max_entries = stats_config.get("cache_max_entries", 10_000)
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._flights: dict[Hashable, _Flight] = {}
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._failures = 0
+
+    # Pobranie statystyk dla bieżącej wersji danych ankiety (klucz to
+    # identyfikator ankiety, ewentualnie z parametrami statystyk)
+    async def get(self, key: Hashable, version: int, compute: Compute) -> CachedStats:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            age = time.monotonic() - entry.computed_at
+            if entry.version == version:
+                self._hits += 1
+                return CachedStats(entry.stats, entry.version, age)
+
+            if age <= self._max_staleness:
+                # Nieaktualny wpis w dopuszczalnym wieku - jedno odświeżenie w tle
+                self._flight(key, version, compute)
+                self._stale_hits += 1
+                return CachedStats(entry.stats, entry.version, age)
+
+        self._misses += 1
+        # shield - anulowanie jednego żądania nie przerywa przeliczenia,
+        # na które czekają inne
+        entry = await asyncio.shield(self._flight(key, version, compute))
+        return CachedStats(entry.stats, entry.version, 0.0)
+
+    # Trwające przeliczenie klucza obejmujące wersję danych (nowe, jeśli go
+    # nie ma lub zlecono je dla starszej wersji)
+    def _flight(self, key: Hashable, version: int, compute: Compute) -> asyncio.Task:
+        flight = self._flights.get(key)
+        if flight is None or flight.version < version:
+            task = asyncio.create_task(self._store(key, compute))
+            task.add_done_callback(lambda task: self._finished(key, task))
+            flight = _Flight(version, task)
+            self._flights[key] = flight
+        return flight.task
+
+    # Przeliczenie statystyk i zapisanie nowego wpisu
+    async def _store(self, key: Hashable, compute: Compute) -> _Entry:
+        version, stats = await compute()
+        entry = _Entry(stats, version)
+        current = self._entries.get(key)
+        # Wolniejsze przeliczenie nie nadpisuje nowszego wpisu
+        if current is None or current.version <= version:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return entry
+
+    # Zakończenie przeliczenia - błąd jest logowany i liczony (żądania
+    # czekające na przeliczenie dostają go jako wyjątek)
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        flight = self._flights.get(key)
+        if flight is not None and flight.task is task:
+            del self._flights[key]
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            self._failures += 1
+            get_logger().error(f"Stats refresh failed: {exc!r}", module="stats")
+
+    # Usunięcie wpisów ankiety (np. po usunięciu ankiety z bazy)
+    def invalidate(self, survey_id: Hashable) -> None:
+        for key in [
+            key
+            for key in self._entries
+            if key == survey_id or (isinstance(key, tuple) and key[0] == survey_id)
+        ]:
+            del self._entries[key]
+
+    # Pobranie statystyk pamięci podręcznej
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self._max_entries,
+            "hits": self._hits,
+            "stale_hits": self._stale_hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "failures": self._failures,
+            "max_staleness_seconds": self._max_staleness,
+        }
+
+
+# Funkcja pomocnicza do pobierania instancji pamięci podręcznej statystyk
+def get_stats_cache() -> StatsCache:
+    return StatsCache()
@@ -0,0 +1,168 @@
+"""
+Walidatory odpowiedzi kompilowane raz dla ankiety.
+
+Zamiast przechodzić instrukcję match dla każdej odpowiedzi, walidator
+przygotowuje przy tworzeniu ankiety funkcję sprawdzającą dla każdego pytania
+(z opcjami w frozenset) oraz zbiór wymaganych pytań. Komunikaty błędów i ich
+kolejność są takie same jak przy sprawdzaniu pytanie po pytaniu.
+"""
+
+from collections.abc import Callable
+from threading import Lock
+from typing import Any
+from uuid import UUID
+
+from app.models import Answer, Question, QuestionType, Survey
+
+# Funkcja sprawdzająca wartość odpowiedzi na pytanie (rzuca ValueError)
+Check = Callable[[Any], None]
+
+# Maksymalna liczba walidatorów w pamięci podręcznej
+_CACHE_SIZE = 10_000
+
+
+# Sprawdzenie czy wartość należy do zbioru opcji (wartości niehashowalne,
+# np. listy, nie są równe żadnej opcji tekstowej)
+def _is_option(value: Any, options: frozenset[str]) -> bool:
+    try:
+        return value in options
+    except TypeError:
+        return False
+
+
+# Przygotowanie funkcji sprawdzającej odpowiedź na pytanie danego typu
+def compile_check(question: Question) -> Check | None:
+    question_id = question.id
+    options = frozenset(question.options) if question.options else None
+
+    match question.type:
+        # Pytanie tekstowe -> wartość musi być napisem
+        case QuestionType.TEXT:
+
+            def check(value: Any) -> None:
+                if not isinstance(value, str):
+                    raise ValueError(f"Text answer expected for question {question_id}")
+
+            return check
+
+        # Jednokrotny wybór -> wartość musi być jedną z opcji (jeśli je podano)
+        case QuestionType.SINGLE_CHOICE:
+            if options is None:
+                return None
+
+            def check(value: Any) -> None:
+                if not _is_option(value, options):
+                    raise ValueError(
+                        f"Invalid option '{value}' for question {question_id}"
+                    )
+
+            return check
+
+        # Wielokrotny wybór -> lista wartości spośród opcji
+        case QuestionType.MULTIPLE_CHOICE:
+
+            def check(value: Any) -> None:
+                if not isinstance(value, list):
+                    raise ValueError(
+                        f"List of options expected for question {question_id}"
+                    )
+                if options is not None:
+                    for v in value:
+                        if not _is_option(v, options):
+                            raise ValueError(
+                                f"Invalid option '{v}' for question {question_id}"
+                            )
+
+            return check
+
+        # Ocena -> liczba z zakresu od-do
+        case QuestionType.RATING:
+            min_val = question.min_rating or 1
+            max_val = question.max_rating or 5
+
+            def check(value: Any) -> None:
+                if not isinstance(value, (int, float)):
+                    raise ValueError(
+                        f"Numeric value expected for question {question_id}"
+                    )
+                if not min_val <= value <= max_val:
+                    raise ValueError(f"Rating must be between {min_val} and {max_val}")
+
+            return check
+
+        # Tak/nie -> 'yes', 'no', True lub False
+        case QuestionType.YES_NO:
+
+            def check(value: Any) -> None:
+                if value not in ("yes", "no", True, False):
+                    raise ValueError(
+                        f"Yes/No answer expected for question {question_id}"
+                    )
+
+            return check
+
+    return None
+
+
+class SurveyValidator:
+    """
+    Skompilowany walidator odpowiedzi na ankietę: funkcje sprawdzające
+    pytań i zbiór wymaganych pytań przygotowane raz dla ankiety.
+    """
+
+    __slots__ = ("_checks", "_required", "_required_ids", "questions")
+
+    def __init__(self, survey: Survey) -> None:
+        # Lista pytań ankiety - pozwala wykryć nieaktualny walidator w cache
+        self.questions = survey.questions
+        # Pytanie -> funkcja sprawdzająca (None = każda wartość poprawna)
+        self._checks: dict[str, Check | None] = {
+            question.id: compile_check(question) for question in survey.questions
+        }
+        self._required_ids = frozenset(q.id for q in survey.questions if q.required)
+        # Wymagane pytania w kolejności ankiety (do komunikatu o brakującym)
+        self._required = [(q.id, q.text) for q in survey.questions if q.required]
+
+    # Sprawdzenie odpowiedzi - rzuca ValueError z opisem pierwszego błędu
+    def validate(self, answers: list[Answer]) -> None:
+        # Sprawdzenie czy wszystkie wymagane pytania mają odpowiedź
+        if self._required_ids:
+            answered_ids = {a.question_id for a in answers}
+            if not self._required_ids <= answered_ids:
+                for question_id, text in self._required:
+                    if question_id not in answered_ids:
+                        raise ValueError(f"Required question '{text}' was not answered")
+
+        # Sprawdzenie czy odpowiedź na pytanie jest poprawna
+        checks = self._checks
+        for answer in answers:
+            try:
+                check = checks[answer.question_id]
+            except KeyError:
+                raise ValueError(
+                    f"Question with ID {answer.question_id} not found in survey"
+                ) from None
+            if check is not None:
+                check(answer.value)
+
+
+# Pamięć podręczna walidatorów (identyfikator ankiety -> walidator)
+_validators: dict[UUID, SurveyValidator] = {}
+_validators_lock = Lock()
+
+
+# Pobranie walidatora ankiety (kompilowany przy pierwszym użyciu, zwykle
+# przy tworzeniu ankiety). Walidator jest ponownie kompilowany, jeśli ankieta
+# o tym identyfikatorze została wczytana na nowo (np. po restarcie bazy).
+def get_validator(survey: Survey) -> SurveyValidator:
+    validator = _validators.get(survey.id)
+    if validator is not None and validator.questions is survey.questions:
+        return validator
+
+    validator = SurveyValidator(survey)
+    with _validators_lock:
+        if survey.id not in _validators and len(_validators) >= _CACHE_SIZE:
+            # Usunięcie najstarszego wpisu (słownik zachowuje kolejność dodania)
+            del _validators[next(iter(_validators))]
+        _validators[survey.id] = validator
+    return validator
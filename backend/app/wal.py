@@ -0,0 +1,277 @@
+"""
+Dziennik zapisu z wyprzedzeniem (WAL) dla bazy danych w pamięci.
+
+Każdy zapis trafia na koniec bieżącego segmentu jako rekord
+[długość | crc32 | typ | dane]. Po restarcie segmenty są odtwarzane
+w kolejności, a urwany ostatni rekord (np. po awarii w trakcie zapisu)
+jest odcinany. Numery segmentów tylko rosną - migawka zapamiętuje numer
+pierwszego segmentu, którego nie obejmuje.
+"""
+
+import os
+import struct
+import zlib
+from collections.abc import Iterator
+from threading import Event, Lock, Thread
+
+# Typy rekordów zapisywanych w dzienniku
+RECORD_SURVEY = 1
+RECORD_RESPONSE = 2
+RECORD_RETENTION = 3
+
+# Dostępne tryby synchronizacji z dyskiem
+FSYNC_ALWAYS = "always"
+FSYNC_INTERVAL = "interval"
+FSYNC_OS = "os"
+FSYNC_MODES = (FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_OS)
+
+_HEADER = struct.Struct("<IIB")
+_SEGMENT_PREFIX = "wal-"
+_SEGMENT_SUFFIX = ".log"
+
+
+# Otwarty segment dziennika. Deskryptor zamykany jest dopiero wtedy, gdy
+# żaden wątek nie wykonuje na nim fsync - rotacja tylko wycofuje segment.
+class _Segment:
+    __slots__ = ("fd", "index", "pins", "retired", "size", "synced")
+
+    def __init__(self, fd: int, index: int) -> None:
+        self.fd = fd
+        self.index = index
+        self.size = os.fstat(fd).st_size
+        # Liczba bajtów utrwalonych przez fsync
+        self.synced = 0
+        # Liczba zapisów czekających na fsync tego segmentu
+        self.pins = 0
+        self.retired = False
+
+
+# Zapis czekający na utrwalenie: segment i pozycja końca zapisu
+PendingSync = tuple[_Segment, int]
+
+
+class WriteAheadLog:
+    """
+    Dziennik tylko do dopisywania podzielony na segmenty.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        fsync: str = FSYNC_INTERVAL,
+        fsync_interval_ms: int = 100,
+        segment_max_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        if fsync not in FSYNC_MODES:
+            raise ValueError(f"Unknown WAL fsync mode: {fsync}")
+
+        self._directory = directory
+        self._fsync = fsync
+        self._fsync_interval = fsync_interval_ms / 1000
+        self._segment_max_bytes = segment_max_bytes
+        self._lock = Lock()
+        self._dirty = False
+        self._closed = Event()
+        self._segment: _Segment | None = None
+        self._flusher: Thread | None = None
+
+        os.makedirs(directory, exist_ok=True)
+
+    # Ścieżka do segmentu o danym numerze
+    def _segment_path(self, index: int) -> str:
+        return os.path.join(
+            self._directory, f"{_SEGMENT_PREFIX}{index:08d}{_SEGMENT_SUFFIX}"
+        )
+
+    # Numery istniejących segmentów w kolejności zapisu
+    def _segment_indexes(self) -> list[int]:
+        indexes = []
+        for name in os.listdir(self._directory):
+            if name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX):
+                indexes.append(int(name[len(_SEGMENT_PREFIX) : -len(_SEGMENT_SUFFIX)]))
+        return sorted(indexes)
+
+    # Odtworzenie rekordów zapisanych w segmentach o numerach >= start
+    def replay(self, start: int = 0) -> Iterator[tuple[int, bytes]]:
+        indexes = [index for index in self._segment_indexes() if index >= start]
+        for position, index in enumerate(indexes):
+            path = self._segment_path(index)
+            with open(path, "rb") as segment:
+                data = segment.read()
+
+            offset = 0
+            end = len(data)
+            while offset + _HEADER.size <= end:
+                length, checksum, record_type = _HEADER.unpack_from(data, offset)
+                start = offset + _HEADER.size
+                payload = data[start : start + length]
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    break
+                yield record_type, payload
+                offset = start + length
+
+            if offset < end:
+                # Urwany rekord może wystąpić tylko na końcu ostatniego segmentu
+                if position != len(indexes) - 1:
+                    raise ValueError(f"Corrupted WAL segment: {path}")
+                with open(path, "r+b") as segment:
+                    segment.truncate(offset)
+
+    # Otwarcie dziennika do zapisu (po odtworzeniu danych) - zapisy trafiają
+    # do ostatniego segmentu, ale nie wcześniejszego niż start
+    def open(self, start: int = 0) -> None:
+        indexes = self._segment_indexes()
+        self._open_segment(max(indexes[-1], start) if indexes else start)
+
+        # Wątek synchronizujący zapisy z dyskiem w trybie "interval"
+        if self._fsync == FSYNC_INTERVAL and self._flusher is None:
+            self._flusher = Thread(
+                target=self._flush_periodically, name="polly-wal-fsync", daemon=True
+            )
+            self._flusher.start()
+
+    def _open_segment(self, index: int) -> None:
+        path = self._segment_path(index)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._segment = _Segment(fd, index)
+
+    # Wycofanie segmentu (wywoływane pod blokadą) - zamknięcie deskryptora
+    # po zakończeniu trwających na nim fsync
+    def _retire(self, segment: _Segment) -> None:
+        segment.retired = True
+        if not segment.pins:
+            os.close(segment.fd)
+
+    # Dopisanie rekordu na koniec dziennika
+    def append(self, record_type: int, payload: bytes) -> None:
+        self.append_many(record_type, [payload])
+
+    # Dopisanie porcji rekordów jednym zapisem (i jednym fsync)
+    def append_many(self, record_type: int, payloads: list[bytes]) -> None:
+        self.wait_durable(self.write_many(record_type, payloads))
+
+    # Dopisanie porcji rekordów bez czekania na fsync - w trybie "always"
+    # zwraca zapis, który trzeba utrwalić przez wait_durable (inaczej None)
+    def write_many(self, record_type: int, payloads: list[bytes]) -> PendingSync | None:
+        record = b"".join(
+            _HEADER.pack(len(payload), zlib.crc32(payload), record_type) + payload
+            for payload in payloads
+        )
+
+        with self._lock:
+            segment = self._segment
+            if segment is None:
+                raise RuntimeError("WAL is not open")
+
+            os.write(segment.fd, record)
+            segment.size += len(record)
+            self._dirty = self._fsync != FSYNC_ALWAYS
+            pending = None
+            if self._fsync == FSYNC_ALWAYS:
+                segment.pins += 1
+                pending = (segment, segment.size)
+
+            # Rozpoczęcie nowego segmentu po przekroczeniu limitu rozmiaru
+            if segment.size >= self._segment_max_bytes:
+                if self._fsync != FSYNC_OS:
+                    os.fsync(segment.fd)
+                    segment.synced = segment.size
+                self._retire(segment)
+                self._open_segment(segment.index + 1)
+        return pending
+
+    # Utrwalenie zapisu zwróconego przez write_many. fsync poza blokadą -
+    # wątki zapisujące do różnych ankiet nie czekają na cudze fsync, a jeden
+    # fsync utrwala wszystkie wcześniejsze zapisy segmentu. Błąd fsync jest
+    # zgłaszany wywołującemu (zapis nie jest utrwalony).
+    def wait_durable(self, pending: PendingSync | None) -> None:
+        if pending is None:
+            return
+        segment, end = pending
+        synced = None
+        try:
+            if segment.synced < end:
+                size = segment.size
+                os.fsync(segment.fd)
+                synced = size
+        finally:
+            with self._lock:
+                if synced is not None and synced > segment.synced:
+                    segment.synced = synced
+                segment.pins -= 1
+                if segment.retired and not segment.pins:
+                    os.close(segment.fd)
+
+    # Wymuszenie zapisu na dysk
+    def sync(self) -> None:
+        with self._lock:
+            self._sync_locked()
+
+    def _sync_locked(self) -> None:
+        segment = self._segment
+        if segment is not None and self._dirty and self._fsync != FSYNC_OS:
+            os.fsync(segment.fd)
+            segment.synced = segment.size
+        self._dirty = False
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(self._fsync_interval):
+            self.sync()
+
+    # Rozpoczęcie nowego segmentu - zwraca jego numer (wszystkie wcześniejsze
+    # zapisy leżą w segmentach o mniejszych numerach)
+    def rotate(self) -> int:
+        with self._lock:
+            segment = self._segment
+            if segment is None:
+                raise RuntimeError("WAL is not open")
+            self._sync_locked()
+            self._retire(segment)
+            self._open_segment(segment.index + 1)
+            return segment.index + 1
+
+    # Usunięcie segmentów o numerach < index (objętych już migawką)
+    def truncate_before(self, index: int) -> None:
+        with self._lock:
+            for existing in self._segment_indexes():
+                if existing < index:
+                    os.remove(self._segment_path(existing))
+
+    # Usunięcie wszystkich segmentów (np. przy czyszczeniu bazy) - numeracja
+    # jest kontynuowana, aby nie kolidować z początkiem zapisanym w migawce
+    def reset(self) -> None:
+        with self._lock:
+            indexes = self._segment_indexes()
+            next_index = indexes[-1] + 1 if indexes else 0
+            if self._segment is not None:
+                self._retire(self._segment)
+                next_index = max(next_index, self._segment.index + 1)
+            for index in indexes:
+                os.remove(self._segment_path(index))
+            self._dirty = False
+            self._open_segment(next_index)
+
+    # Zamknięcie dziennika
+    def close(self) -> None:
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+
+        with self._lock:
+            if self._segment is not None:
+                self._sync_locked()
+                self._retire(self._segment)
+                self._segment = None
+
+    # Pobranie statystyk dziennika
+    def get_stats(self) -> dict[str, object]:
+        with self._lock:
+            return {
+                "directory": self._directory,
+                "fsync": self._fsync,
+                "segments": len(self._segment_indexes()),
+                "current_segment_bytes": (
+                    self._segment.size if self._segment is not None else 0
+                ),
+            }
@@ -0,0 +1 @@
+# Skrypty benchmarków backendu (uruchamiane ręcznie: python -m benchmarks.<nazwa>)
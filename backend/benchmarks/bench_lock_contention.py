@@ -0,0 +1,97 @@
+"""
+Benchmark rywalizacji o blokady bazy danych w pamięci.
+
+Każdy wątek zapisuje odpowiedzi do własnej ankiety. Porównywana jest
+jedna globalna blokada (lock_stripes=1) z blokadami rozłożonymi na paski.
+Zysk jest widoczny przede wszystkim gdy sekcja krytyczna zwalnia GIL,
+np. przy dzienniku WAL z fsync po każdym zapisie (--wal always).
+
+Uruchomienie (z katalogu backend):
+    python -m benchmarks.bench_lock_contention --threads 1 2 4 8 --wal always
+"""
+
+import argparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from uuid import uuid4
+
+from app.config import get_config
+from app.database import DatabaseMeta, get_database
+from app.models import (
+    Answer,
+    Question,
+    QuestionType,
+    Survey,
+    SurveyLinks,
+    SurveyResponse,
+)
+
+
+def build_survey() -> Survey:
+    return Survey(
+        id=uuid4(),
+        title="Benchmark",
+        questions=[
+            Question(id="q1", text="Ocena", type=QuestionType.RATING),
+            Question(id="q2", text="Polecisz?", type=QuestionType.YES_NO),
+        ],
+        created_at=datetime.now(),
+        links=SurveyLinks(survey_url="http://bench", stats_url="http://bench"),
+    )
+
+
+def write_responses(db, survey: Survey, count: int) -> None:
+    for i in range(count):
+        db.add_response(
+            SurveyResponse(
+                id=uuid4(),
+                survey_id=survey.id,
+                answers=[
+                    Answer(question_id="q1", value=i % 5 + 1),
+                    Answer(question_id="q2", value=i % 2 == 0),
+                ],
+                submitted_at=datetime.now(),
+            )
+        )
+
+
+def run(stripes: int, threads: int, per_thread: int, wal: str | None) -> float:
+    DatabaseMeta._instances.clear()
+    with tempfile.TemporaryDirectory() as wal_dir:
+        config = get_config()
+        config.set("database", "lock_stripes", stripes)
+        config.set("database", "wal_dir", wal_dir if wal else None)
+        config.set("database", "wal_fsync", wal or "os")
+
+        db = get_database()
+        surveys = [build_survey() for _ in range(threads)]
+        for survey in surveys:
+            db.add_survey(survey)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(lambda s: write_responses(db, s, per_thread), surveys))
+        elapsed = time.perf_counter() - start
+        db.close()
+
+    return threads * per_thread / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--responses", type=int, default=2000, help="per thread")
+    parser.add_argument("--wal", choices=["always", "interval", "os"], default=None)
+    args = parser.parse_args()
+
+    print(f"{'threads':>8} {'global lock':>14} {'striped':>14}  (responses/s)")
+    for threads in args.threads:
+        single = run(1, threads, args.responses, args.wal)
+        striped = run(64, threads, args.responses, args.wal)
+        print(f"{threads:>8} {single:>14,.0f} {striped:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
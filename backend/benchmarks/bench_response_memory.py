@@ -0,0 +1,147 @@
+"""
+Benchmark pamięci zajmowanej przez zapisane odpowiedzi.
+
+Dla każdego układu przechowywania (rekordy / kolumny) zapisuje N odpowiedzi
+i raportuje liczbę bajtów na odpowiedź zmierzoną przez tracemalloc (tylko
+dane bazy - bez obiektów tymczasowych). Układ "models" to punkt odniesienia:
+lista modeli SurveyResponse, czyli sposób przechowywania sprzed rekordów. Układ
+"segmented" to kolumny z segmentami mmap - na stercie zostaje tylko
+gorący ogon, reszta jest w zmapowanych plikach.
+
+Uruchomienie (z katalogu backend):
+    python -m benchmarks.bench_response_memory --responses 100000
+"""
+
+import argparse
+import gc
+import tempfile
+import tracemalloc
+from datetime import datetime
+from uuid import uuid4
+
+from app.config import get_config
+from app.database import DatabaseMeta, get_database
+from app.models import (
+    Answer,
+    Question,
+    QuestionType,
+    Survey,
+    SurveyLinks,
+    SurveyResponse,
+)
+
+LAYOUTS = ["models", "objects", "columnar", "segmented"]
+HOT_TAIL_SIZE = 4096
+
+
+def build_survey() -> Survey:
+    return Survey(
+        id=uuid4(),
+        title="Benchmark",
+        questions=[
+            Question(id="q1", text="Imię", type=QuestionType.TEXT),
+            Question(
+                id="q2",
+                text="Kolor",
+                type=QuestionType.SINGLE_CHOICE,
+                options=["Czerwony", "Niebieski", "Zielony"],
+            ),
+            Question(
+                id="q3",
+                text="Języki",
+                type=QuestionType.MULTIPLE_CHOICE,
+                options=["Python", "Java", "C++"],
+            ),
+            Question(id="q4", text="Ocena", type=QuestionType.RATING),
+            Question(id="q5", text="Polecisz?", type=QuestionType.YES_NO),
+        ],
+        created_at=datetime.now(),
+        links=SurveyLinks(survey_url="http://bench", stats_url="http://bench"),
+    )
+
+
+def build_response(survey: Survey, i: int) -> SurveyResponse:
+    colors = ["Czerwony", "Niebieski", "Zielony"]
+    return SurveyResponse(
+        id=uuid4(),
+        survey_id=survey.id,
+        answers=[
+            Answer(question_id="q1", value=f"user-{i % 1000}"),
+            Answer(question_id="q2", value=colors[i % 3]),
+            Answer(question_id="q3", value=["Python", "Java"][: i % 3]),
+            Answer(question_id="q4", value=i % 5 + 1),
+            Answer(question_id="q5", value=i % 2 == 0),
+        ],
+        respondent_id=f"respondent-{i}",
+        submitted_at=datetime.now(),
+    )
+
+
+# Lista modeli pydantic przechowywanych bez konwersji
+def measure_models(count: int) -> float:
+    survey = build_survey()
+    stored = []
+
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for i in range(count):
+        stored.append(build_response(survey, i))
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return used / count
+
+
+def measure(layout: str, count: int, segment_dir: str) -> float:
+    if layout == "models":
+        return measure_models(count)
+
+    DatabaseMeta._instances.clear()
+    config = get_config()
+    config.set(
+        "database", "storage_layout", "objects" if layout == "objects" else "columnar"
+    )
+    config.set(
+        "database", "segment_dir", segment_dir if layout == "segmented" else None
+    )
+    config.set("database", "hot_tail_size", HOT_TAIL_SIZE)
+    db = get_database()
+    survey = build_survey()
+    db.add_survey(survey)
+
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for i in range(count):
+        db.add_response(build_response(survey, i))
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    db.clear()
+    return used / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--responses", type=int, default=100_000)
+    parser.add_argument("--layouts", nargs="+", default=LAYOUTS, choices=LAYOUTS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as segment_dir:
+        results = {
+            layout: measure(layout, args.responses, segment_dir)
+            for layout in args.layouts
+        }
+    for layout, per_response in results.items():
+        print(f"{layout:>10}: {per_response:8.1f} bytes/response")
+    baseline = results.get("models")
+    if baseline:
+        for layout, per_response in results.items():
+            if layout != "models":
+                print(f"{layout:>10} vs models: {baseline / per_response:.1f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark zapisu i odczytu binarnej migawki bazy danych.
+
+Zapisuje N odpowiedzi do bazy w pamięci, zamyka ją (zapis migawki),
+a następnie mierzy czas wczytania migawki przy starcie (cel: 1M odpowiedzi
+w kilka sekund).
+
+Uruchomienie (z katalogu backend):
+    python -m benchmarks.bench_snapshot --responses 1000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from app.config import get_config
+from app.database import DatabaseMeta, get_database
+from app.models import Answer, SurveyResponse
+from benchmarks.bench_wal_replay import build_survey
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--responses", type=int, default=1_000_000)
+    parser.add_argument("--layout", default="objects", choices=["objects", "columnar"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "polly.snapshot")
+        config = get_config()
+        config.set("database", "snapshot_path", path)
+        config.set("database", "storage_layout", args.layout)
+
+        db = get_database()
+        survey = build_survey()
+        db.add_survey(survey)
+
+        colors = ["Czerwony", "Niebieski", "Zielony"]
+        for i in range(args.responses):
+            db.add_response(
+                SurveyResponse.model_construct(
+                    id=uuid4(),
+                    survey_id=survey.id,
+                    answers=[
+                        Answer.model_construct(
+                            question_id="q1", value=f"user-{i % 1000}"
+                        ),
+                        Answer.model_construct(question_id="q2", value=colors[i % 3]),
+                        Answer.model_construct(question_id="q3", value=i % 5 + 1),
+                        Answer.model_construct(question_id="q4", value=i % 2 == 0),
+                    ],
+                    respondent_id=f"respondent-{i}",
+                    submitted_at=datetime.now(),
+                )
+            )
+
+        start = time.perf_counter()
+        db.close()
+        save_elapsed = time.perf_counter() - start
+        size = os.path.getsize(path)
+
+        # Restart - wczytanie bazy z migawki
+        DatabaseMeta._instances.clear()
+        start = time.perf_counter()
+        db = get_database()
+        load_elapsed = time.perf_counter() - start
+        restored = db.get_stats()["snapshot"]["restored_responses"]
+
+    print(f"responses:           {args.responses} ({args.layout})")
+    print(f"snapshot size:       {size / 1024 / 1024:.1f} MiB")
+    print(f"save time:           {save_elapsed:.2f}s")
+    print(f"load time:           {load_elapsed:.2f}s")
+    print(f"load throughput:     {restored / load_elapsed:,.0f} responses/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Benchmark statystyk ankiety: przeliczanie z zapisanych odpowiedzi (dawna
+ścieżka GET /surveys/{id}/stats) i odczyt z przyrostowego agregatu.
+
+Dla każdej liczby odpowiedzi mierzy czas jednego żądania statystyk obiema
+ścieżkami oraz koszt budowy agregatu (add po jednej odpowiedzi, jak przy
+zapisie, i add_many porcjami po --batch, jak przy imporcie). Rozkłady,
+liczby odpowiedzi i średnie pytań innych niż tekstowe muszą być takie same
+w obu ścieżkach (pytania tekstowe agregat ogranicza do najczęstszych).
+
+Uruchomienie (z katalogu backend):
+    python -m benchmarks.bench_stats --sizes 10000 100000 1000000
+"""
+
+import argparse
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+
+from app.aggregates import SurveyAggregate
+from app.models import (
+    Answer,
+    Question,
+    QuestionStats,
+    QuestionType,
+    SurveyResponse,
+    SurveyStats,
+)
+from app.services.survey_service import SurveyService
+
+QUESTIONS = [
+    Question(id="q1", text="Wybór", type=QuestionType.SINGLE_CHOICE),
+    Question(id="q2", text="Wielokrotny wybór", type=QuestionType.MULTIPLE_CHOICE),
+    Question(id="q3", text="Polecisz?", type=QuestionType.YES_NO),
+    Question(id="q4", text="Ocena", type=QuestionType.RATING, max_rating=10),
+    Question(id="q5", text="Komentarz", type=QuestionType.TEXT),
+    Question(id="q6", text="Ocena ułamkowa", type=QuestionType.RATING),
+]
+
+
+def build_responses(count: int) -> list[SurveyResponse]:
+    rng = random.Random(count)
+    options = ["a", "b", "c", "d", "e"]
+    survey_id = uuid4()
+    start = datetime(2026, 1, 1)
+    return [
+        SurveyResponse.model_construct(
+            id=uuid4(),
+            survey_id=survey_id,
+            answers=[
+                Answer.model_construct(question_id="q1", value=rng.choice(options)),
+                Answer.model_construct(
+                    question_id="q2", value=rng.sample(options, rng.randint(1, 3))
+                ),
+                Answer.model_construct(question_id="q3", value=rng.random() < 0.7),
+                Answer.model_construct(question_id="q4", value=rng.randint(1, 10)),
+                Answer.model_construct(
+                    question_id="q5", value=f"comment {int(rng.paretovariate(1.2))}"
+                ),
+                Answer.model_construct(
+                    question_id="q6", value=round(rng.uniform(1.0, 5.0), 2)
+                ),
+            ],
+            respondent_id=None,
+            submitted_at=start + timedelta(seconds=i),
+        )
+        for i in range(count)
+    ]
+
+
+# Rozkład odpowiedzi jak w dawnym SurveyService._calculate_distribution
+def baseline_distribution(question_type: QuestionType, answers: list) -> dict:
+    if not answers:
+        return {}
+    match question_type:
+        case QuestionType.MULTIPLE_CHOICE:
+            flat_answers = []
+            for answer in answers:
+                if isinstance(answer, list):
+                    flat_answers.extend(answer)
+                else:
+                    flat_answers.append(answer)
+            return dict(Counter(str(a) for a in flat_answers))
+        case QuestionType.YES_NO:
+            return dict(Counter("yes" if a in (True, "yes") else "no" for a in answers))
+        case _:
+            return dict(Counter(str(a) for a in answers))
+
+
+# Statystyki przeliczane ze wszystkich odpowiedzi przy każdym żądaniu
+# (dawne SurveyService.get_statistics)
+def baseline_stats(responses: list[SurveyResponse]) -> SurveyStats:
+    questions_stats = []
+    for question in QUESTIONS:
+        answers = []
+        for response in responses:
+            for answer in response.answers:
+                if answer.question_id == question.id:
+                    answers.append(answer.value)
+        average = None
+        if question.type == QuestionType.RATING and answers:
+            numeric_answers = [a for a in answers if isinstance(a, (int, float))]
+            if numeric_answers:
+                average = sum(numeric_answers) / len(numeric_answers)
+        questions_stats.append(
+            QuestionStats(
+                question_id=question.id,
+                question_text=question.text,
+                question_type=question.type,
+                total_responses=len(answers),
+                answer_distribution=baseline_distribution(question.type, answers),
+                average_value=average,
+            )
+        )
+    return SurveyStats(
+        survey_id=UUID(int=0),
+        survey_title="Benchmark",
+        total_responses=len(responses),
+        questions_stats=questions_stats,
+        created_at=datetime(2026, 1, 1),
+        last_response_at=max((r.submitted_at for r in responses), default=None),
+    )
+
+
+# Statystyki z agregatu (jak obecne GET /surveys/{id}/stats)
+def aggregate_stats(service: SurveyService, aggregate: SurveyAggregate) -> SurveyStats:
+    return SurveyStats(
+        survey_id=UUID(int=0),
+        survey_title="Benchmark",
+        total_responses=aggregate.total_responses,
+        questions_stats=[
+            service._calculate_question_stats(
+                question, aggregate.questions[question.id]
+            )
+            for question in QUESTIONS
+        ],
+        created_at=datetime(2026, 1, 1),
+        last_response_at=aggregate.last_response_at,
+    )
+
+
+# Porównanie pytań innych niż tekstowe
+def same_stats(expected: SurveyStats, actual: SurveyStats) -> bool:
+    if expected.total_responses != actual.total_responses:
+        return False
+    for left, right in zip(
+        expected.questions_stats, actual.questions_stats, strict=True
+    ):
+        if left.question_type is QuestionType.TEXT:
+            continue
+        if (
+            left.total_responses != right.total_responses
+            or left.answer_distribution != right.answer_distribution
+            or left.average_value != right.average_value
+        ):
+            return False
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--batch", type=int, default=10_000)
+    args = parser.parse_args()
+
+    service = SurveyService()
+    for size in args.sizes:
+        responses = build_responses(size)
+
+        started = time.perf_counter()
+        expected = baseline_stats(responses)
+        baseline_time = time.perf_counter() - started
+
+        aggregate = SurveyAggregate(QUESTIONS)
+        started = time.perf_counter()
+        for response in responses:
+            aggregate.add(response)
+        add_time = time.perf_counter() - started
+
+        batched = SurveyAggregate(QUESTIONS)
+        started = time.perf_counter()
+        for offset in range(0, len(responses), args.batch):
+            batched.add_many(responses[offset : offset + args.batch])
+        add_many_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        actual = aggregate_stats(service, aggregate)
+        aggregate_time = time.perf_counter() - started
+
+        identical = same_stats(expected, actual) and same_stats(
+            expected, aggregate_stats(service, batched)
+        )
+        assert identical, "aggregate statistics differ from recomputed statistics"
+
+        print(
+            f"responses={size:>9}: stats recompute {baseline_time * 1000:9.1f}ms, "
+            f"aggregate {aggregate_time * 1000:6.2f}ms "
+            f"({baseline_time / aggregate_time:.0f}x); ingest add "
+            f"{add_time / size * 1e6:5.1f}us/response, add_many "
+            f"{add_many_time / size * 1e6:5.1f}us/response, "
+            f"identical stats: {identical}"
+        )
+
+
+if __name__ == "__main__":
+    main()
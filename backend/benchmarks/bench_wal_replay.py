@@ -0,0 +1,99 @@
+"""
+Benchmark odtwarzania bazy danych z dziennika WAL.
+
+Zapisuje N odpowiedzi do dziennika, a następnie mierzy czas odtworzenia
+bazy danych przy starcie (cel: 1M odpowiedzi w kilka sekund).
+
+Uruchomienie (z katalogu backend):
+    python -m benchmarks.bench_wal_replay --responses 1000000
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from app.config import get_config
+from app.database import DatabaseMeta, get_database
+from app.models import (
+    Answer,
+    Question,
+    QuestionType,
+    Survey,
+    SurveyLinks,
+    SurveyResponse,
+)
+
+
+def build_survey() -> Survey:
+    return Survey(
+        id=uuid4(),
+        title="Benchmark",
+        questions=[
+            Question(id="q1", text="Imię", type=QuestionType.TEXT),
+            Question(
+                id="q2",
+                text="Kolor",
+                type=QuestionType.SINGLE_CHOICE,
+                options=["Czerwony", "Niebieski", "Zielony"],
+            ),
+            Question(id="q3", text="Ocena", type=QuestionType.RATING),
+            Question(id="q4", text="Polecisz?", type=QuestionType.YES_NO),
+        ],
+        created_at=datetime.now(),
+        links=SurveyLinks(survey_url="http://bench", stats_url="http://bench"),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--responses", type=int, default=1_000_000)
+    parser.add_argument("--fsync", default="os", choices=["always", "interval", "os"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as wal_dir:
+        config = get_config()
+        config.set("database", "wal_dir", wal_dir)
+        config.set("database", "wal_fsync", args.fsync)
+
+        db = get_database()
+        survey = build_survey()
+        db.add_survey(survey)
+
+        colors = ["Czerwony", "Niebieski", "Zielony"]
+        start = time.perf_counter()
+        for i in range(args.responses):
+            db.add_response(
+                SurveyResponse(
+                    id=uuid4(),
+                    survey_id=survey.id,
+                    answers=[
+                        Answer(question_id="q1", value=f"user-{i % 1000}"),
+                        Answer(question_id="q2", value=colors[i % 3]),
+                        Answer(question_id="q3", value=i % 5 + 1),
+                        Answer(question_id="q4", value=i % 2 == 0),
+                    ],
+                    respondent_id=f"respondent-{i}",
+                    submitted_at=datetime.now(),
+                )
+            )
+        write_elapsed = time.perf_counter() - start
+        db.close()
+
+        # Restart - odtworzenie bazy z dziennika
+        DatabaseMeta._instances.clear()
+        start = time.perf_counter()
+        db = get_database()
+        replay_elapsed = time.perf_counter() - start
+        recovered = db.get_stats()["total_responses"]
+        db.close()
+
+    print(f"responses written:   {args.responses}")
+    print(f"write time:          {write_elapsed:.2f}s (fsync={args.fsync})")
+    print(f"replay time:         {replay_elapsed:.2f}s")
+    print(f"replay throughput:   {recovered / replay_elapsed:,.0f} responses/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Benchmark przepustowości API przy 1 i N workerach gunicorna.
+
+Dla każdej liczby workerów uruchamia gunicorna (gunicorn.conf.py) ze
+wspólną bazą SQLite, zapisuje kilka odpowiedzi przez API, a następnie
+procesy klientów przez zadany czas odpytują GET /surveys/{id}/stats.
+Każda odpowiedź jest sprawdzana - wszystkie workery muszą widzieć
+te same zapisy (niezależnie od tego, który worker je przyjął).
+
+Klienci działają na tej samej maszynie co serwer, więc zysk z N workerów
+jest ograniczony liczbą wolnych rdzeni.
+
+Uruchomienie (z katalogu backend):
+    python -m benchmarks.bench_workers --workers 1 4 --clients 8 --duration 10
+"""
+
+import argparse
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SUBMITTED_RESPONSES = 20
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def request(port: int, method: str, path: str, body: dict | None = None):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        payload = json.dumps(body) if body is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        connection.request(method, path, body=payload, headers=headers)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read() or b"null")
+    finally:
+        connection.close()
+
+
+def start_server(workers: int, port: int, directory: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        POLLY_WORKERS=str(workers),
+        POLLY_DB_BACKEND="sqlite",
+        POLLY_SQLITE_PATH=os.path.join(directory, "polly.db"),
+        PORT=str(port),
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if request(port, "GET", "/health")[0] == 200:
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("gunicorn did not start")
+
+
+def create_survey(port: int) -> str:
+    _, survey = request(
+        port,
+        "POST",
+        "/surveys/",
+        {
+            "title": "Benchmark",
+            "questions": [
+                {"id": "q1", "text": "Ocena", "type": "rating", "required": True},
+                {"id": "q2", "text": "Polecisz?", "type": "yes_no", "required": True},
+            ],
+        },
+    )
+    for i in range(SUBMITTED_RESPONSES):
+        status, _ = request(
+            port,
+            "POST",
+            f"/surveys/{survey['id']}/responses",
+            {
+                "answers": [
+                    {"question_id": "q1", "value": i % 5 + 1},
+                    {"question_id": "q2", "value": i % 2 == 0},
+                ]
+            },
+        )
+        assert status == 201, status
+    return survey["id"]
+
+
+# Pętla jednego klienta: liczba żądań i liczba niespójnych odpowiedzi
+def client_loop(args: tuple[int, str, float]) -> tuple[int, int]:
+    port, survey_id, duration = args
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    path = f"/surveys/{survey_id}/stats"
+    done = inconsistent = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        connection.request("GET", path)
+        stats = json.loads(connection.getresponse().read())
+        if stats["total_responses"] != SUBMITTED_RESPONSES:
+            inconsistent += 1
+        done += 1
+    connection.close()
+    return done, inconsistent
+
+
+def run(workers: int, clients: int, duration: float) -> tuple[float, int]:
+    port = free_port()
+    with tempfile.TemporaryDirectory() as directory:
+        server = start_server(workers, port, directory)
+        try:
+            survey_id = create_survey(port)
+            with Pool(clients) as pool:
+                results = pool.map(client_loop, [(port, survey_id, duration)] * clients)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait()
+
+    requests = sum(done for done, _ in results)
+    inconsistent = sum(bad for _, bad in results)
+    return requests / duration, inconsistent
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count()])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"cores: {os.cpu_count()}, clients: {args.clients}")
+    baseline = None
+    for workers in args.workers:
+        throughput, inconsistent = run(workers, args.clients, args.duration)
+        baseline = baseline or throughput
+        print(
+            f"workers={workers:>3}: {throughput:9.1f} req/s "
+            f"({throughput / baseline:.2f}x), inconsistent stats: {inconsistent}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Konfiguracja gunicorna (workery uvicorn).
+
+Uruchomienie (z katalogu backend):
+    POLLY_WORKERS=4 gunicorn -c gunicorn.conf.py app.main:app
+
+Każdy worker to osobny proces z własnymi singletonami, więc przy więcej niż
+jednym workerze ankiety i odpowiedzi muszą być we wspólnym magazynie -
+domyślnie wybierana jest wtedy baza SQLite (plik POLLY_SQLITE_PATH
+w trybie WAL współdzielony przez wszystkie workery).
+"""
+
+import multiprocessing
+import os
+
+# Liczba workerów (0 = liczba rdzeni procesora)
+workers = int(os.environ.get("POLLY_WORKERS", "1")) or multiprocessing.cpu_count()
+
+if workers > 1:
+    backend = os.environ.setdefault("POLLY_DB_BACKEND", "sqlite")
+    if backend != "sqlite":
+        raise SystemExit(
+            f"POLLY_DB_BACKEND={backend} keeps data inside one process; "
+            "use POLLY_DB_BACKEND=sqlite with POLLY_WORKERS > 1"
+        )
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Aplikacja ładowana osobno w każdym workerze (połączenia SQLite po fork)
+preload_app = False
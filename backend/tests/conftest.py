@@ -38,6 +38,11 @@ def reset_singletons():
     if hasattr(TelemetryMeta, "_instances"):
         TelemetryMeta._instances.clear()
 
+    # Reset StatsCache singleton
+    from app.stats_cache import StatsCacheMeta
+
+    StatsCacheMeta._instances.clear()
+
     yield
 
     # Cleanup po teście
@@ -45,6 +50,7 @@ def reset_singletons():
     ConfigMeta._instances.clear()
     LoggerMeta._instances.clear()
     TelemetryMeta._instances.clear()
+    StatsCacheMeta._instances.clear()
 
 
 @pytest.fixture
@@ -208,9 +214,9 @@ def sample_survey_create_all_types(
 
 
 @pytest.fixture
-def created_survey(survey_service, sample_survey_create):
+async def created_survey(survey_service, sample_survey_create):
     """Fixture zwracający utworzoną ankietę."""
-    return survey_service.create_survey(sample_survey_create)
+    return await survey_service.create_survey(sample_survey_create)
 
 
 @pytest.fixture
@@ -2,6 +2,7 @@
 Testy End-to-End - pełne żądania HTTP przez API.
 """
 
+import json
 from uuid import uuid4
 
 
@@ -29,6 +30,34 @@ class TestHealthEndpoints:
         assert "logger" in data["singletons"]
         assert "config" in data["singletons"]
 
+    def test_liveness_and_readiness(self, client):
+        """Sprawdza lekkie endpointy sond liveness i readiness."""
+        assert client.get("/health/live").json() == {"status": "alive"}
+        assert client.get("/health/ready").json() == {"status": "ready"}
+
+    def test_readiness_when_database_unavailable(self, client, database, monkeypatch):
+        """Sprawdza odpowiedź 503, gdy baza nie jest gotowa."""
+        monkeypatch.setattr(database, "ping", lambda: False)
+
+        response = client.get("/health/ready")
+
+        assert response.status_code == 503
+        assert response.json() == {"status": "not ready"}
+
+    def test_health_payload_cached(self, client):
+        """Sprawdza zapamiętanie szczegółowej odpowiedzi /health."""
+        first = client.get("/health").json()
+        client.post(
+            "/surveys/",
+            json={
+                "title": "Cache",
+                "questions": [{"id": "q1", "text": "Pytanie?", "type": "text"}],
+            },
+        )
+
+        assert client.get("/health").json() == first
+        assert first["database"]["surveys"] == 0
+
 
 class TestSurveyCreationE2E:
     """Testy E2E tworzenia ankiet."""
@@ -198,6 +227,29 @@ class TestSubmitResponseE2E:
         assert data["survey_id"] == survey_id
         assert data["respondent_id"] == "user-123"
 
+    def test_submit_response_idempotency_key(self, client):
+        """Sprawdza ponowienie żądania z nagłówkiem Idempotency-Key."""
+        survey_data = {
+            "title": "Idempotency Test",
+            "questions": [{"id": "q1", "text": "Name?", "type": "text"}],
+        }
+        survey_id = client.post("/surveys/", json=survey_data).json()["id"]
+        answer_data = {"answers": [{"question_id": "q1", "value": "John"}]}
+        headers = {"Idempotency-Key": "mobile-retry-1"}
+
+        first = client.post(
+            f"/surveys/{survey_id}/responses", json=answer_data, headers=headers
+        )
+        retry = client.post(
+            f"/surveys/{survey_id}/responses", json=answer_data, headers=headers
+        )
+
+        assert first.status_code == 201
+        assert retry.status_code == 201
+        assert retry.json() == first.json()
+        stats = client.get(f"/surveys/{survey_id}/stats").json()
+        assert stats["total_responses"] == 1
+
     def test_submit_response_missing_required(self, client):
         """Sprawdza błąd przy brakującej wymaganej odpowiedzi."""
         # Tworzenie ankiety
@@ -268,9 +320,7 @@ class TestSubmitResponseE2E:
 
         # Ocena poza zakresem
         answer_data = {
-            "answers": [
-                {"question_id": "q1", "value": 10}  # Max to 5
-            ],
+            "answers": [{"question_id": "q1", "value": 10}],  # Max to 5
         }
 
         response = client.post(f"/surveys/{survey_id}/responses", json=answer_data)
@@ -311,6 +361,128 @@ class TestSubmitResponseE2E:
         data = response.json()
         assert data["respondent_id"] is None
 
+    def test_submit_response_batch(self, client):
+        """Sprawdza import porcji odpowiedzi jednym żądaniem."""
+        survey_data = {
+            "title": "Batch Test",
+            "questions": [{"id": "q1", "text": "Rating?", "type": "rating"}],
+        }
+        survey_id = client.post("/surveys/", json=survey_data).json()["id"]
+        batch = {
+            "responses": [
+                {"answers": [{"question_id": "q1", "value": value}]}
+                for value in (1, 3, 5)
+            ]
+        }
+
+        response = client.post(f"/surveys/{survey_id}/responses/batch", json=batch)
+
+        assert response.status_code == 201
+        data = response.json()
+        assert data["accepted"] == 3
+        assert len(data["response_ids"]) == 3
+        stats = client.get(f"/surveys/{survey_id}/stats").json()
+        assert stats["total_responses"] == 3
+        assert stats["questions_stats"][0]["average_value"] == 3
+
+    def test_submit_response_batch_rejected_as_whole(self, client):
+        """Sprawdza odrzucenie całej porcji z jedną błędną odpowiedzią."""
+        survey_data = {
+            "title": "Batch Test",
+            "questions": [{"id": "q1", "text": "Rating?", "type": "rating"}],
+        }
+        survey_id = client.post("/surveys/", json=survey_data).json()["id"]
+        batch = {
+            "responses": [
+                {"answers": [{"question_id": "q1", "value": 2}]},
+                {"answers": [{"question_id": "q1", "value": 9}]},
+            ]
+        }
+
+        response = client.post(f"/surveys/{survey_id}/responses/batch", json=batch)
+        empty = client.post(
+            f"/surveys/{survey_id}/responses/batch", json={"responses": []}
+        )
+
+        assert response.status_code == 400
+        assert response.json()["detail"].startswith("Response 1:")
+        assert empty.status_code == 422
+        stats = client.get(f"/surveys/{survey_id}/stats").json()
+        assert stats["total_responses"] == 0
+
+
+class TestResponsesListingE2E:
+    """Testy E2E pobierania odpowiedzi."""
+
+    def create_survey_with_responses(self, client, count):
+        survey_data = {
+            "title": "Listing Test",
+            "questions": [{"id": "q1", "text": "Name?", "type": "text"}],
+        }
+        survey_id = client.post("/surveys/", json=survey_data).json()["id"]
+        for i in range(count):
+            client.post(
+                f"/surveys/{survey_id}/responses",
+                json={"answers": [{"question_id": "q1", "value": f"User {i}"}]},
+            )
+        return survey_id
+
+    def test_list_responses_pages(self, client):
+        """Sprawdza stronicowanie odpowiedzi kursorem."""
+        survey_id = self.create_survey_with_responses(client, 3)
+
+        first = client.get(f"/surveys/{survey_id}/responses", params={"limit": 2})
+        assert first.status_code == 200
+        assert len(first.json()["items"]) == 2
+
+        second = client.get(
+            f"/surveys/{survey_id}/responses",
+            params={"limit": 2, "cursor": first.json()["next_cursor"]},
+        )
+        assert second.status_code == 200
+        assert len(second.json()["items"]) == 1
+        assert second.json()["next_cursor"] is None
+
+    def test_stream_responses(self, client):
+        """Sprawdza strumień odpowiedzi w formacie NDJSON."""
+        survey_id = self.create_survey_with_responses(client, 3)
+
+        response = client.get(f"/surveys/{survey_id}/responses/stream")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = response.text.splitlines()
+        assert [json.loads(line)["answers"][0]["value"] for line in lines] == [
+            "User 0",
+            "User 1",
+            "User 2",
+        ]
+
+    def test_list_responses_errors(self, client):
+        """Sprawdza błędy pobierania odpowiedzi."""
+        survey_id = self.create_survey_with_responses(client, 0)
+
+        assert client.get(f"/surveys/{uuid4()}/responses").status_code == 404
+        assert client.get(f"/surveys/{uuid4()}/responses/stream").status_code == 404
+        assert (
+            client.get(
+                f"/surveys/{survey_id}/responses", params={"cursor": "x"}
+            ).status_code
+            == 400
+        )
+        assert (
+            client.get(
+                f"/surveys/{survey_id}/responses/stream", params={"cursor": "x"}
+            ).status_code
+            == 400
+        )
+        assert (
+            client.get(
+                f"/surveys/{survey_id}/responses", params={"limit": 0}
+            ).status_code
+            == 422
+        )
+
 
 class TestStatisticsE2E:
     """Testy E2E statystyk ankiet."""
@@ -335,6 +507,90 @@ class TestStatisticsE2E:
         assert data["survey_id"] == survey_id
         assert data["total_responses"] == 0
 
+    def test_get_statistics_cache_headers(self, client, config):
+        """Sprawdza nagłówki wersji i wieku statystyk oraz statystyki z cache."""
+        config.set("stats", "max_staleness_seconds", 60.0)
+        survey_data = {
+            "title": "Cache Test",
+            "questions": [{"id": "q1", "text": "Test?", "type": "text"}],
+        }
+        survey_id = client.post("/surveys/", json=survey_data).json()["id"]
+
+        first = client.get(f"/surveys/{survey_id}/stats")
+        client.post(
+            f"/surveys/{survey_id}/responses",
+            json={"answers": [{"question_id": "q1", "value": "a"}]},
+        )
+        stale = client.get(f"/surveys/{survey_id}/stats")
+
+        assert first.headers["X-Stats-Version"] == "0"
+        assert float(first.headers["X-Stats-Age"]) == 0.0
+        # Nowa odpowiedź w granicach dopuszczalnego wieku - poprzednie statystyki
+        assert stale.headers["X-Stats-Version"] == "0"
+        assert stale.json()["total_responses"] == 0
+
+    def test_get_statistics_histogram(self, client):
+        """Sprawdza histogram liczby odpowiedzi w czasie w statystykach."""
+        survey_data = {
+            "title": "Histogram Test",
+            "questions": [{"id": "q1", "text": "Test?", "type": "text"}],
+        }
+        survey_id = client.post("/surveys/", json=survey_data).json()["id"]
+        for value in ("a", "b"):
+            client.post(
+                f"/surveys/{survey_id}/responses",
+                json={"answers": [{"question_id": "q1", "value": value}]},
+            )
+
+        plain = client.get(f"/surveys/{survey_id}/stats").json()
+        hourly = client.get(f"/surveys/{survey_id}/stats?histogram=hour").json()
+        invalid = client.get(f"/surveys/{survey_id}/stats?histogram=week")
+
+        assert plain["response_histogram"] is None
+        assert hourly["response_histogram"]["granularity"] == "hour"
+        assert sum(b["count"] for b in hourly["response_histogram"]["buckets"]) == 2
+        assert invalid.status_code == 422
+
+    def test_get_filtered_statistics(self, client):
+        """Sprawdza statystyki filtrowane odpowiedzią na inne pytanie."""
+        survey_data = {
+            "title": "Filter Test",
+            "questions": [
+                {"id": "q1", "text": "Ocena?", "type": "rating"},
+                {"id": "q2", "text": "Polecisz?", "type": "yes_no"},
+                {"id": "q3", "text": "Uwagi?", "type": "text", "required": False},
+            ],
+        }
+        survey_id = client.post("/surveys/", json=survey_data).json()["id"]
+        for rating, recommend in [(5, "yes"), (2, "no"), (4, "yes")]:
+            client.post(
+                f"/surveys/{survey_id}/responses",
+                json={
+                    "answers": [
+                        {"question_id": "q1", "value": rating},
+                        {"question_id": "q2", "value": recommend},
+                    ]
+                },
+            )
+
+        url = f"/surveys/{survey_id}/stats/filtered"
+        response = client.get(url, params={"where": "q2:yes"})
+        data = response.json()
+
+        assert response.status_code == 200
+        assert data["total_responses"] == 2
+        assert data["filters"] == [{"question_id": "q2", "value": "yes"}]
+        assert data["questions_stats"][0]["answer_distribution"] == {"5": 1, "4": 1}
+        assert data["questions_stats"][0]["average_value"] == 4.5
+        assert client.get(url, params={"where": "q3:x"}).status_code == 400
+        assert client.get(url, params={"where": "q2"}).status_code == 400
+        assert client.get(url).status_code == 422
+        missing = client.get(
+            "/surveys/00000000-0000-0000-0000-000000000000/stats/filtered",
+            params={"where": "q2:yes"},
+        )
+        assert missing.status_code == 404
+
     def test_get_statistics_with_responses(self, client):
         """Sprawdza statystyki z odpowiedziami."""
         # Tworzenie ankiety
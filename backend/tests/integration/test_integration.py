@@ -10,12 +10,12 @@ from uuid import uuid4
 class TestDatabaseServiceIntegration:
     """Testy integracji Database z SurveyService."""
 
-    def test_service_uses_database(
+    async def test_service_uses_database(
         self, survey_service, database, sample_survey_create
     ):
         """Sprawdza czy serwis poprawnie używa bazy danych."""
         # Tworzenie ankiety przez serwis
-        survey = survey_service.create_survey(sample_survey_create)
+        survey = await survey_service.create_survey(sample_survey_create)
 
         # Weryfikacja w bazie danych
         db_survey = database.get_survey(survey.id)
@@ -23,12 +23,12 @@ class TestDatabaseServiceIntegration:
         assert db_survey == survey
         assert database.survey_exists(survey.id)
 
-    def test_responses_persist_in_database(
+    async def test_responses_persist_in_database(
         self, survey_service, database, created_survey, sample_answer_submit
     ):
         """Sprawdza trwałość odpowiedzi w bazie danych."""
         # Wysłanie odpowiedzi
-        response = survey_service.submit_response(
+        response = await survey_service.submit_response(
             created_survey.id, sample_answer_submit
         )
 
@@ -38,67 +38,69 @@ class TestDatabaseServiceIntegration:
         assert len(db_responses) == 1
         assert db_responses[0].id == response.id
 
-    def test_statistics_reflect_database_state(
+    async def test_statistics_reflect_database_state(
         self, survey_service, database, created_survey, sample_answer_submit
     ):
         """Sprawdza czy statystyki odzwierciedlają stan bazy."""
         # Początkowe statystyki
-        initial_stats = survey_service.get_statistics(created_survey.id)
+        initial_stats = await survey_service.get_statistics(created_survey.id)
         assert initial_stats.total_responses == 0
 
         # Dodanie odpowiedzi
-        survey_service.submit_response(created_survey.id, sample_answer_submit)
+        await survey_service.submit_response(created_survey.id, sample_answer_submit)
 
         # Zaktualizowane statystyki
-        updated_stats = survey_service.get_statistics(created_survey.id)
+        updated_stats = await survey_service.get_statistics(created_survey.id)
         assert updated_stats.total_responses == 1
 
-    def test_multiple_responses_accumulate(
+    async def test_multiple_responses_accumulate(
         self, survey_service, database, created_survey, sample_answer_submit
     ):
         """Sprawdza akumulację wielu odpowiedzi."""
         for _ in range(5):
-            survey_service.submit_response(created_survey.id, sample_answer_submit)
+            await survey_service.submit_response(
+                created_survey.id, sample_answer_submit
+            )
 
         responses = database.get_responses(created_survey.id)
-        stats = survey_service.get_statistics(created_survey.id)
+        stats = await survey_service.get_statistics(created_survey.id)
 
         assert len(responses) == 5
         assert stats.total_responses == 5
 
-    def test_clear_database_affects_service(
+    async def test_clear_database_affects_service(
         self, survey_service, database, sample_survey_create
     ):
         """Sprawdza wpływ czyszczenia bazy na serwis."""
         # Tworzenie danych
-        survey = survey_service.create_survey(sample_survey_create)
+        survey = await survey_service.create_survey(sample_survey_create)
 
         # Czyszczenie bazy
         database.clear()
 
         # Serwis nie powinien znaleźć ankiety
         with pytest.raises(ValueError, match="not found"):
-            survey_service.get_survey(survey.id)
+            await survey_service.get_survey(survey.id)
 
 
 class TestConfigServiceIntegration:
     """Testy integracji ConfigManager z SurveyService."""
 
-    def test_links_use_config_base_url(
+    async def test_links_use_config_base_url(
         self, survey_service, config, sample_survey_create
     ):
         """Sprawdza czy linki używają URL z konfiguracji."""
-        survey = survey_service.create_survey(sample_survey_create)
+        survey = await survey_service.create_survey(sample_survey_create)
 
         assert config.base_url in survey.links.survey_url
         assert config.base_url in survey.links.stats_url
 
-    def test_config_change_affects_new_surveys(
+    async def test_config_change_affects_new_surveys(
         self, survey_service, config, sample_survey_create
     ):
         """Sprawdza czy zmiana konfiguracji wpływa na nowe ankiety."""
         # Pierwsza ankieta
-        survey1 = survey_service.create_survey(sample_survey_create)
+        survey1 = await survey_service.create_survey(sample_survey_create)
         _ = survey1.links.survey_url
 
         # Zmiana konfiguracji
@@ -108,7 +110,7 @@ class TestConfigServiceIntegration:
         from app.services import SurveyService
 
         new_service = SurveyService()
-        survey2 = new_service.create_survey(sample_survey_create)
+        survey2 = await new_service.create_survey(sample_survey_create)
 
         assert "new-domain.com" in survey2.links.survey_url
 
@@ -156,18 +158,18 @@ class TestLoggerServiceIntegration:
 class TestFullWorkflowIntegration:
     """Testy pełnego przepływu aplikacji."""
 
-    def test_complete_survey_workflow(
+    async def test_complete_survey_workflow(
         self, survey_service, database, sample_survey_create
     ):
         """Sprawdza kompletny przepływ: tworzenie -> odpowiedzi -> statystyki."""
         from app.models import AnswerSubmit, Answer
 
         # 1. Tworzenie ankiety
-        survey = survey_service.create_survey(sample_survey_create)
+        survey = await survey_service.create_survey(sample_survey_create)
         assert survey.id is not None
 
         # 2. Weryfikacja istnienia
-        retrieved = survey_service.get_survey(survey.id)
+        retrieved = await survey_service.get_survey(survey.id)
         assert retrieved.title == survey.title
 
         # 3. Wysyłanie odpowiedzi
@@ -181,10 +183,10 @@ class TestFullWorkflowIntegration:
                 ],
                 respondent_id=f"user-{i}",
             )
-            survey_service.submit_response(survey.id, answers)
+            await survey_service.submit_response(survey.id, answers)
 
         # 4. Pobieranie statystyk
-        stats = survey_service.get_statistics(survey.id)
+        stats = await survey_service.get_statistics(survey.id)
 
         assert stats.total_responses == 3
         assert len(stats.questions_stats) == 4
@@ -198,13 +200,15 @@ class TestFullWorkflowIntegration:
         assert yes_no_stats.answer_distribution["yes"] == 2
         assert yes_no_stats.answer_distribution["no"] == 1
 
-    def test_multiple_surveys_isolation(self, survey_service, sample_survey_create):
+    async def test_multiple_surveys_isolation(
+        self, survey_service, sample_survey_create
+    ):
         """Sprawdza izolację danych między ankietami."""
         from app.models import AnswerSubmit, Answer
 
         # Tworzenie dwóch ankiet
-        survey1 = survey_service.create_survey(sample_survey_create)
-        survey2 = survey_service.create_survey(sample_survey_create)
+        survey1 = await survey_service.create_survey(sample_survey_create)
+        survey2 = await survey_service.create_survey(sample_survey_create)
 
         # Odpowiedzi tylko dla ankiety 1
         for _ in range(3):
@@ -216,25 +220,25 @@ class TestFullWorkflowIntegration:
                     Answer(question_id="q5", value="yes"),
                 ],
             )
-            survey_service.submit_response(survey1.id, answers)
+            await survey_service.submit_response(survey1.id, answers)
 
         # Statystyki
-        stats1 = survey_service.get_statistics(survey1.id)
-        stats2 = survey_service.get_statistics(survey2.id)
+        stats1 = await survey_service.get_statistics(survey1.id)
+        stats2 = await survey_service.get_statistics(survey2.id)
 
         assert stats1.total_responses == 3
         assert stats2.total_responses == 0
 
-    def test_list_all_surveys(self, survey_service, sample_survey_create):
+    async def test_list_all_surveys(self, survey_service, sample_survey_create):
         """Sprawdza listowanie wszystkich ankiet."""
         # Tworzenie kilku ankiet
         surveys = []
         for i in range(5):
-            survey = survey_service.create_survey(sample_survey_create)
+            survey = await survey_service.create_survey(sample_survey_create)
             surveys.append(survey)
 
         # Pobieranie wszystkich
-        all_surveys = survey_service.get_all_surveys()
+        all_surveys = await survey_service.get_all_surveys()
 
         assert len(all_surveys) == 5
         for survey in surveys:
@@ -283,12 +287,12 @@ class TestSingletonsIntegration:
         logger2 = get_logger()
         assert logger2.get_stats()["total_logs"] >= 1
 
-    def test_service_uses_all_singletons(
+    async def test_service_uses_all_singletons(
         self, survey_service, database, config, logger, sample_survey_create
     ):
         """Sprawdza czy serwis używa wszystkich singletonów."""
         # Tworzenie ankiety (używa wszystkich)
-        survey = survey_service.create_survey(sample_survey_create)
+        survey = await survey_service.create_survey(sample_survey_create)
 
         # Weryfikacja bazy
         assert database.survey_exists(survey.id)
@@ -0,0 +1,678 @@
+"""
+Testy jednostkowe dla agregatów statystyk (app.aggregates).
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from app.aggregates import (
+    QuestionAggregate,
+    RatingSketch,
+    RespondentSketches,
+    SpaceSaving,
+    SurveyAggregate,
+    TimeHistogram,
+    distribution_keys,
+)
+from app.models import (
+    Answer,
+    HistogramGranularity,
+    Question,
+    QuestionType,
+    SurveyResponse,
+)
+
+
+def make_response(survey_id, answers, submitted_at=None, respondent_id=None):
+    return SurveyResponse(
+        id=uuid4(),
+        survey_id=survey_id,
+        answers=[Answer(question_id=qid, value=value) for qid, value in answers],
+        respondent_id=respondent_id,
+        submitted_at=submitted_at or datetime.now(),
+    )
+
+
+class TestDistributionKeys:
+    """Testy normalizacji wartości odpowiedzi."""
+
+    def test_multiple_choice_list(self):
+        """Sprawdza rozbicie listy opcji."""
+        keys = distribution_keys(QuestionType.MULTIPLE_CHOICE, ["a", "b"])
+        assert keys == ["a", "b"]
+
+    def test_multiple_choice_scalar(self):
+        """Sprawdza pojedynczą wartość w wielokrotnym wyborze."""
+        assert distribution_keys(QuestionType.MULTIPLE_CHOICE, "a") == ["a"]
+
+    def test_yes_no_normalization(self):
+        """Sprawdza normalizację odpowiedzi tak/nie."""
+        assert distribution_keys(QuestionType.YES_NO, True) == ["yes"]
+        assert distribution_keys(QuestionType.YES_NO, "yes") == ["yes"]
+        assert distribution_keys(QuestionType.YES_NO, False) == ["no"]
+        assert distribution_keys(QuestionType.YES_NO, "no") == ["no"]
+
+    def test_rating_keeps_str_representation(self):
+        """Sprawdza że oceny int i float mają różne klucze."""
+        assert distribution_keys(QuestionType.RATING, 5) == ["5"]
+        assert distribution_keys(QuestionType.RATING, 5.0) == ["5.0"]
+
+
+class TestQuestionAggregate:
+    """Testy agregatu pojedynczego pytania."""
+
+    def test_empty(self):
+        """Sprawdza pusty agregat."""
+        aggregate = QuestionAggregate(QuestionType.RATING)
+
+        assert aggregate.count == 0
+        assert aggregate.distribution == {}
+        assert aggregate.average is None
+
+    def test_rating_average(self):
+        """Sprawdza średnią ocen."""
+        aggregate = QuestionAggregate(QuestionType.RATING)
+        for value in [3, 5, 7, 9]:
+            aggregate.add(value)
+
+        assert aggregate.count == 4
+        assert aggregate.average == 6.0
+
+    def test_average_only_for_rating(self):
+        """Sprawdza że średnia liczona jest tylko dla ocen."""
+        aggregate = QuestionAggregate(QuestionType.SINGLE_CHOICE)
+        aggregate.add(1)
+
+        assert aggregate.average is None
+
+    def test_copy_is_independent(self):
+        """Sprawdza niezależność kopii."""
+        aggregate = QuestionAggregate(QuestionType.TEXT)
+        aggregate.add("a")
+        clone = aggregate.copy()
+        aggregate.add("a")
+
+        assert clone.count == 1
+        assert clone.distribution == {"a": 1}
+
+
+class TestSurveyAggregate:
+    """Testy agregatu całej ankiety."""
+
+    def test_tracks_total_and_last_response(self):
+        """Sprawdza liczbę odpowiedzi i datę ostatniej odpowiedzi."""
+        survey_id = uuid4()
+        aggregate = SurveyAggregate(
+            [Question(id="q1", text="Imię?", type=QuestionType.TEXT)]
+        )
+        now = datetime.now()
+
+        aggregate.add(make_response(survey_id, [("q1", "a")], now))
+        aggregate.add(make_response(survey_id, [("q1", "b")], now - timedelta(1)))
+
+        assert aggregate.total_responses == 2
+        assert aggregate.last_response_at == now
+
+    def test_ignores_unknown_questions(self):
+        """Sprawdza pomijanie odpowiedzi na nieznane pytania."""
+        aggregate = SurveyAggregate(
+            [Question(id="q1", text="Imię?", type=QuestionType.TEXT)]
+        )
+        aggregate.add(make_response(uuid4(), [("q1", "a"), ("qx", "b")]))
+
+        assert set(aggregate.questions) == {"q1"}
+        assert aggregate.questions["q1"].count == 1
+
+    def test_matches_full_recalculation(self):
+        """Sprawdza zgodność agregatów z przeliczeniem wszystkich odpowiedzi."""
+        questions = [
+            Question(id="q1", text="Tekst", type=QuestionType.TEXT),
+            Question(
+                id="q2",
+                text="Wybór",
+                type=QuestionType.MULTIPLE_CHOICE,
+                options=["a", "b", "c"],
+            ),
+            Question(id="q3", text="Ocena", type=QuestionType.RATING),
+            Question(id="q4", text="Tak/nie", type=QuestionType.YES_NO),
+        ]
+        survey_id = uuid4()
+        responses = [
+            make_response(
+                survey_id,
+                [("q1", "x"), ("q2", ["a", "b"]), ("q3", 4), ("q4", True)],
+            ),
+            make_response(survey_id, [("q1", "y"), ("q2", ["c"]), ("q3", 2.5)]),
+            make_response(survey_id, [("q1", "x"), ("q4", "no"), ("q3", 5)]),
+        ]
+
+        aggregate = SurveyAggregate(questions)
+        for response in responses:
+            aggregate.add(response)
+
+        for question in questions:
+            values = [
+                a.value
+                for r in responses
+                for a in r.answers
+                if a.question_id == question.id
+            ]
+            expected = Counter(
+                key for v in values for key in distribution_keys(question.type, v)
+            )
+            assert aggregate.questions[question.id].count == len(values)
+            assert aggregate.questions[question.id].distribution == dict(expected)
+
+        assert aggregate.questions["q3"].average == (4 + 2.5 + 5) / 3
+
+    def test_add_many_matches_add(self):
+        """Sprawdza zgodność agregacji porcji z dodawaniem pojedynczym."""
+        questions = [
+            Question(id="q1", text="Ocena", type=QuestionType.RATING),
+            Question(id="q2", text="Tak/nie", type=QuestionType.YES_NO),
+        ]
+        now = datetime.now()
+        responses = [
+            make_response(uuid4(), [("q1", 4), ("q2", "yes")], now),
+            make_response(uuid4(), [("q1", 2)], now + timedelta(1)),
+            make_response(uuid4(), [("q2", False), ("qx", 1)], now - timedelta(1)),
+        ]
+        single = SurveyAggregate(questions)
+        for response in responses:
+            single.add(response)
+        batched = SurveyAggregate(questions)
+        batched.add_many(responses)
+        batched.add_many([])
+
+        assert batched.to_dict() == single.to_dict()
+        assert batched.last_response_at == now + timedelta(1)
+
+    def test_copy_is_independent(self):
+        """Sprawdza niezależność kopii agregatu ankiety."""
+        aggregate = SurveyAggregate(
+            [Question(id="q1", text="Imię?", type=QuestionType.TEXT)]
+        )
+        clone = aggregate.copy()
+        aggregate.add(make_response(uuid4(), [("q1", "a")]))
+
+        assert clone.total_responses == 0
+        assert clone.questions["q1"].count == 0
+
+    def test_dict_roundtrip(self):
+        """Sprawdza zapis agregatów do JSON i odtworzenie."""
+        import json
+
+        questions = [
+            Question(id="q1", text="Kolor?", type=QuestionType.SINGLE_CHOICE),
+            Question(id="q2", text="Ocena?", type=QuestionType.RATING),
+        ]
+        aggregate = SurveyAggregate(questions)
+        aggregate.add(make_response(uuid4(), [("q1", "a"), ("q2", 4)]))
+        aggregate.add(make_response(uuid4(), [("q1", "b"), ("q2", 2.5)]))
+
+        data = json.loads(json.dumps(aggregate.to_dict()))
+        restored = SurveyAggregate.from_dict(questions, data)
+
+        assert restored.total_responses == 2
+        assert restored.last_response_at == aggregate.last_response_at
+        assert restored.questions["q1"].distribution == {"a": 1, "b": 1}
+        assert restored.questions["q2"].average == aggregate.questions["q2"].average
+        assert (
+            SurveyAggregate.from_dict(
+                questions, SurveyAggregate(questions).to_dict()
+            ).last_response_at
+            is None
+        )
+
+
+class TestTimeHistogram:
+    """Testy histogramu odpowiedzi w czasie (bufor cykliczny)."""
+
+    def test_counts_per_bucket_in_order(self):
+        """Sprawdza zliczanie w przedziałach i kolejność zwracanych przedziałów."""
+        start = datetime(2024, 3, 1, 12, 0)
+        histogram = TimeHistogram(60, 10)
+        for minute in (0, 0, 2, 1, 2, 2):
+            histogram.add(start + timedelta(minutes=minute, seconds=30))
+
+        assert histogram.buckets() == [
+            (start, 2),
+            (start + timedelta(minutes=1), 1),
+            (start + timedelta(minutes=2), 3),
+        ]
+        assert TimeHistogram(60, 10).buckets() == []
+
+    def test_ring_drops_buckets_outside_window(self):
+        """Sprawdza nadpisywanie przedziałów starszych niż okno bufora."""
+        start = datetime(2024, 3, 1)
+        histogram = TimeHistogram(3600, 4)
+        histogram.add(start)
+        histogram.add(start + timedelta(hours=2))
+        histogram.add(start + timedelta(hours=5))
+        # Odpowiedź spoza okna (starsza niż 4 godziny od najnowszej)
+        histogram.add(start + timedelta(hours=1))
+
+        assert histogram.buckets() == [
+            (start + timedelta(hours=2), 1),
+            (start + timedelta(hours=3), 0),
+            (start + timedelta(hours=4), 0),
+            (start + timedelta(hours=5), 1),
+        ]
+
+        histogram.add(start + timedelta(days=1))
+        assert histogram.buckets() == [(start + timedelta(days=1), 1)]
+
+    def test_survey_aggregate_histograms(self):
+        """Sprawdza histogramy ankiety, kopię i zapis do słownika."""
+        import json
+
+        questions = [Question(id="q1", text="Imię?", type=QuestionType.TEXT)]
+        start = datetime(2024, 3, 1, 23, 59)
+        aggregate = SurveyAggregate(questions)
+        aggregate.add(make_response(uuid4(), [("q1", "a")], start))
+        aggregate.add_many(
+            [make_response(uuid4(), [("q1", "b")], start + timedelta(minutes=1))] * 2
+        )
+        clone = aggregate.copy()
+        aggregate.add(make_response(uuid4(), [("q1", "c")], start))
+
+        daily = clone.histogram(HistogramGranularity.DAY)
+        assert [(b.start, b.count) for b in daily.buckets] == [
+            (datetime(2024, 3, 1), 1),
+            (datetime(2024, 3, 2), 2),
+        ]
+        assert len(clone.histogram(HistogramGranularity.MINUTE).buckets) == 2
+
+        data = json.loads(json.dumps(aggregate.to_dict()))
+        restored = SurveyAggregate.from_dict(questions, data)
+        for granularity in HistogramGranularity:
+            assert restored.histogram(granularity) == aggregate.histogram(granularity)
+
+        # Agregaty zapisane przed dodaniem histogramów
+        del data["histograms"]
+        legacy = SurveyAggregate.from_dict(questions, data)
+        assert legacy.histogram(HistogramGranularity.HOUR).buckets == []
+
+    def test_restored_into_smaller_ring(self):
+        """Sprawdza odtworzenie histogramu w buforze o innym rozmiarze."""
+        start = datetime(2024, 3, 1)
+        histogram = TimeHistogram(60, 8)
+        for minute in (0, 3, 5, 7):
+            histogram.add(start + timedelta(minutes=minute))
+
+        restored = TimeHistogram.from_dict(60, 4, histogram.to_dict())
+
+        assert restored.buckets() == [
+            (start + timedelta(minutes=5), 1),
+            (start + timedelta(minutes=6), 0),
+            (start + timedelta(minutes=7), 1),
+        ]
+
+
+class TestFilteredAggregate:
+    """Testy statystyk filtrowanych przez przecięcie bitmap."""
+
+    QUESTIONS = (
+        Question(id="q1", text="Imię", type=QuestionType.TEXT),
+        Question(
+            id="q2", text="Kolor", type=QuestionType.SINGLE_CHOICE, options=["a", "b"]
+        ),
+        Question(
+            id="q3",
+            text="Języki",
+            type=QuestionType.MULTIPLE_CHOICE,
+            options=["py", "js"],
+        ),
+        Question(id="q4", text="Ocena", type=QuestionType.RATING, max_rating=10),
+        Question(id="q5", text="Polecisz?", type=QuestionType.YES_NO),
+    )
+
+    def make_responses(self, count):
+        import random
+
+        rng = random.Random(3)
+        responses = []
+        for i in range(count):
+            answers = [("q1", f"name-{i % 7}"), ("q2", rng.choice("ab"))]
+            if rng.random() < 0.7:
+                answers.append(("q3", rng.sample(["py", "js"], rng.randint(0, 2))))
+            answers.append(("q4", rng.choice([1, 4, 7, 10, 2.5])))
+            answers.append(("q5", rng.choice(["yes", "no", True, False])))
+            responses.append(make_response(uuid4(), answers))
+        return responses
+
+    def expected(self, responses, filters):
+        """Statystyki policzone przez przegląd odpowiedzi spełniających warunki."""
+        types = {q.id: q.type for q in self.QUESTIONS}
+        matching = [
+            r
+            for r in responses
+            if all(
+                any(
+                    a.question_id == qid
+                    and value in distribution_keys(types[qid], a.value)
+                    for a in r.answers
+                )
+                for qid, value in filters
+            )
+        ]
+        aggregate = SurveyAggregate(self.QUESTIONS)
+        aggregate.add_many(matching)
+        return aggregate
+
+    @pytest.mark.parametrize(
+        "filters",
+        [
+            [("q5", "yes")],
+            [("q2", "a"), ("q3", "py")],
+            [("q4", "2.5")],
+            [("q3", "js"), ("q3", "py"), ("q5", "no")],
+            [("q2", "missing")],
+        ],
+    )
+    def test_matches_rescan(self, filters):
+        """Sprawdza zgodność z przeliczeniem odpowiedzi spełniających warunki."""
+        responses = self.make_responses(1_000)
+        aggregate = SurveyAggregate(self.QUESTIONS)
+        aggregate.add_many(responses[:400])
+        for response in responses[400:]:
+            aggregate.add(response)
+
+        filtered = aggregate.filtered(filters)
+        expected = self.expected(responses, filters)
+
+        assert filtered.total_responses == expected.total_responses
+        for question in self.QUESTIONS:
+            actual = filtered.questions[question.id]
+            reference = expected.questions[question.id]
+            assert actual.count == reference.count
+            assert actual.average == pytest.approx(reference.average)
+            if question.type is not QuestionType.TEXT:
+                assert actual.distribution == reference.distribution
+            else:
+                assert actual.distribution == {}
+
+    def test_copy_sees_only_earlier_responses(self):
+        """Sprawdza, że kopia agregatu filtruje tylko odpowiedzi sprzed kopii."""
+        responses = self.make_responses(100)
+        aggregate = SurveyAggregate(self.QUESTIONS)
+        aggregate.add_many(responses[:60])
+        clone = aggregate.copy()
+        aggregate.add_many(responses[60:])
+
+        assert clone.filtered([("q5", "yes")]).total_responses == (
+            self.expected(responses[:60], [("q5", "yes")]).total_responses
+        )
+
+        # Zapis do kopii nie zmienia bitmap oryginału
+        clone.add(responses[99])
+        assert aggregate.filtered([("q2", "a")]).total_responses == (
+            self.expected(responses, [("q2", "a")]).total_responses
+        )
+        assert (
+            clone.filtered([("q2", "a")]).total_responses
+            == (
+                self.expected(responses[:60] + [responses[99]], [("q2", "a")])
+            ).total_responses
+        )
+
+    def test_drop_answers_before(self):
+        """Sprawdza usunięcie z bitmap odpowiedzi zwolnionych przez retencję."""
+        import json
+
+        responses = self.make_responses(300)
+        aggregate = SurveyAggregate(self.QUESTIONS)
+        aggregate.add_many(responses[:200])
+        clone = aggregate.copy()
+        stats = json.loads(json.dumps(aggregate.to_dict()))
+
+        aggregate.drop_answers_before(120)
+        aggregate.add_many(responses[200:])
+
+        for filters in ([("q5", "yes")], [("q2", "a"), ("q4", "2.5")]):
+            expected = self.expected(responses[120:], filters)
+            filtered = aggregate.filtered(filters)
+            assert filtered.total_responses == expected.total_responses
+            assert filtered.questions["q2"].distribution == (
+                expected.questions["q2"].distribution
+            )
+        # Statystyki bez filtrów i wcześniejsze kopie bez zmian
+        assert aggregate.questions["q2"].to_dict() != stats["questions"]["q2"]
+        assert json.loads(json.dumps(clone.to_dict())) == stats
+
+        aggregate.drop_answers_before(aggregate.total_responses)
+        assert aggregate.filtered([("q5", "yes")]).total_responses == 0
+        assert aggregate.bitmaps.values["q2"] == {}
+
+    def test_dict_roundtrip(self):
+        """Sprawdza filtrowanie po odtworzeniu agregatu ze słownika."""
+        import json
+
+        responses = self.make_responses(200)
+        aggregate = SurveyAggregate(self.QUESTIONS)
+        aggregate.add_many(responses)
+
+        data = json.loads(json.dumps(aggregate.to_dict()))
+        restored = SurveyAggregate.from_dict(self.QUESTIONS, data)
+        filters = [("q4", "7"), ("q5", "no")]
+
+        assert (
+            restored.filtered(filters).to_dict()
+            == aggregate.filtered(filters).to_dict()
+        )
+
+    def test_invalid_filters(self):
+        """Sprawdza błędy dla nieznanego pytania, pytania tekstowego i braku warunków."""
+        aggregate = SurveyAggregate(self.QUESTIONS)
+
+        with pytest.raises(ValueError, match="not found"):
+            aggregate.filtered([("qx", "a")])
+        with pytest.raises(ValueError, match="text question"):
+            aggregate.filtered([("q1", "a")])
+        with pytest.raises(ValueError, match="At least one"):
+            aggregate.filtered([])
+
+
+class TestRatingSketch:
+    """Testy szkicu rozkładu ocen."""
+
+    def test_matches_exact_statistics(self):
+        """Sprawdza medianę, percentyl 90 i odchylenie dla ocen całkowitych."""
+        import random
+        import statistics
+
+        rng = random.Random(11)
+        for size in (1, 2, 5, 100, 1001):
+            ratings = [rng.randint(1, 10) for _ in range(size)]
+            sketch = RatingSketch(1, 10)
+            for rating in ratings:
+                sketch.add(rating)
+
+            assert sketch.percentile(0.5) == statistics.median(ratings)
+            if size > 1:
+                p90 = statistics.quantiles(ratings, n=10, method="inclusive")[8]
+                assert sketch.percentile(0.9) == pytest.approx(p90)
+            assert sketch.std_dev == pytest.approx(statistics.pstdev(ratings))
+            assert sketch.stats().histogram == {
+                str(value): ratings.count(value) for value in range(1, 11)
+            }
+
+    def test_empty(self):
+        """Sprawdza podsumowanie bez ocen."""
+        stats = RatingSketch(1, 5).stats()
+
+        assert stats.median is None and stats.p90 is None and stats.std_dev is None
+        assert stats.histogram == {"1": 0, "2": 0, "3": 0, "4": 0, "5": 0}
+
+    def test_merge(self):
+        """Sprawdza łączenie szkiców z różnych okresów."""
+        import statistics
+
+        first, second, together = (RatingSketch(1, 5) for _ in range(3))
+        for value in (1, 2, 2, 5):
+            first.add(value)
+            together.add(value)
+        for value in (3, 4, 4.5):
+            second.add(value)
+            together.add(value)
+        first.merge(second)
+        first.merge(RatingSketch(1, 5))
+
+        assert first.counts == together.counts
+        assert first.std_dev == pytest.approx(
+            statistics.pstdev([1, 2, 2, 5, 3, 4, 4.5])
+        )
+        with pytest.raises(ValueError, match="different scales"):
+            first.merge(RatingSketch(1, 10))
+
+    def test_wide_scale_and_out_of_range(self):
+        """Sprawdza ograniczenie liczby przedziałów i wartości spoza skali."""
+        sketch = RatingSketch(0, 9_999)
+        for value in (0, 5_000, 9_999, 20_000, -3):
+            sketch.add(value)
+
+        assert len(sketch.counts) == 1_000
+        assert sketch.counts[0] == 2 and sketch.counts[-1] == 2
+        assert sketch.percentile(0.5) == pytest.approx(5_004.5)
+
+    def test_question_aggregate_roundtrip(self):
+        """Sprawdza szkic w agregacie pytania, kopii i zapisie do słownika."""
+        question = Question(
+            id="q1", text="Ocena", type=QuestionType.RATING, min_rating=2, max_rating=5
+        )
+        aggregate = SurveyAggregate([question])
+        for value in (2, 5, 5, 3.5):
+            aggregate.add(make_response(uuid4(), [("q1", value)]))
+        rating = aggregate.questions["q1"].rating
+
+        assert rating.stats().histogram == {"2": 1, "3": 0, "4": 1, "5": 2}
+        assert aggregate.copy().questions["q1"].rating.counts == rating.counts
+        data = aggregate.to_dict()
+        restored = SurveyAggregate.from_dict([question], data)
+        assert restored.questions["q1"].rating.stats() == rating.stats()
+
+        # Agregat zapisany przed dodaniem szkicu - odtworzenie z rozkładu
+        del data["questions"]["q1"]["rating"]
+        legacy = SurveyAggregate.from_dict([question], data)
+        assert legacy.questions["q1"].rating.stats() == rating.stats()
+        assert QuestionAggregate(QuestionType.TEXT).rating is None
+
+
+class TestSpaceSaving:
+    """Testy najczęstszych odpowiedzi tekstowych (Space-Saving)."""
+
+    def test_exact_within_capacity(self):
+        """Sprawdza dokładne liczniki, gdy różnych wartości jest mniej niż liczników."""
+        top = SpaceSaving(10)
+        for value in ["b", "a", "b", "c", "a", "b"]:
+            top.add(value)
+
+        assert top.top(2) == [("b", 3), ("a", 2)]
+        assert top.errors == {"b": 0, "a": 0, "c": 0}
+
+    def test_heavy_hitters_in_long_tail(self):
+        """Sprawdza wykrycie częstych wartości wśród wielu unikalnych."""
+        import random
+
+        rng = random.Random(5)
+        stream = ["tak"] * 3_000 + ["nie"] * 2_000 + ["może"] * 1_000
+        stream += [f"unikalna {i}" for i in range(20_000)]
+        rng.shuffle(stream)
+        top = SpaceSaving(40)
+        for value in stream:
+            top.add(value)
+
+        assert len(top.counts) == 40
+        assert [key for key, _ in top.top(3)] == ["tak", "nie", "może"]
+        for key, true_count in [("tak", 3_000), ("nie", 2_000), ("może", 1_000)]:
+            assert true_count <= top.counts[key] <= true_count + top.errors[key]
+        assert sum(top.counts.values()) == len(stream)
+        assert sorted(key for _, key in top._heap) == sorted(top.counts)
+
+    def test_top_above_capacity_rejected(self):
+        """Sprawdza odrzucenie k większego niż liczba liczników."""
+        top = SpaceSaving(4)
+        top.add("a")
+
+        assert top.top(4) == [("a", 1)]
+        with pytest.raises(ValueError, match="exceeds 4 text counters"):
+            top.top(5)
+
+    def test_question_aggregate_bounded(self, config):
+        """Sprawdza ograniczony rozkład odpowiedzi tekstowych w agregacie."""
+        config.set("stats", "text_top_k", 2)
+        question = Question(id="q1", text="Uwagi", type=QuestionType.TEXT)
+        aggregate = SurveyAggregate([question])
+        for value in ["ok", "ok", "ok", "x", "y", "z", "w", "v", "u", "t", "s", "ok"]:
+            aggregate.add(make_response(uuid4(), [("q1", value)]))
+        text = aggregate.questions["q1"]
+
+        assert len(text.distribution) == 8
+        assert text.distribution is text.text.counts
+        assert text.text.top(1) == [("ok", 4)]
+        assert aggregate.copy().questions["q1"].text.top(1) == [("ok", 4)]
+
+        # Rozkład zapisany przed ograniczeniem - przycięcie do liczników
+        data = aggregate.to_dict()
+        data["questions"]["q1"]["distribution"] = {f"v{i}": i for i in range(100)}
+        del data["questions"]["q1"]["text_errors"]
+        restored = SurveyAggregate.from_dict([question], data)
+        assert restored.questions["q1"].text.top(2) == [("v99", 99), ("v98", 98)]
+        assert len(restored.questions["q1"].distribution) == 8
+
+
+class TestRespondentSketches:
+    """Testy przybliżonej liczby unikalnych respondentów."""
+
+    def test_survey_and_daily_counts(self):
+        """Sprawdza liczby respondentów ankiety, dni i okresu wielu dni."""
+        from datetime import date
+
+        questions = [Question(id="q1", text="Imię?", type=QuestionType.TEXT)]
+        start = datetime(2024, 3, 1, 12)
+        aggregate = SurveyAggregate(questions)
+        for day, respondents in enumerate([range(50), range(30, 80), range(10)]):
+            aggregate.add_many(
+                [
+                    make_response(
+                        uuid4(), [("q1", "a")], start + timedelta(day), f"r{i}"
+                    )
+                    for i in respondents
+                ]
+            )
+        aggregate.add(make_response(uuid4(), [("q1", "a")], start))
+        respondents = aggregate.respondents
+
+        assert respondents.total.estimate() == pytest.approx(80, rel=0.05)
+        assert [(d.day, d.unique_respondents) for d in respondents.by_day()] == [
+            (date(2024, 3, 1), pytest.approx(50, rel=0.05)),
+            (date(2024, 3, 2), pytest.approx(50, rel=0.05)),
+            (date(2024, 3, 3), pytest.approx(10, rel=0.05)),
+        ]
+        assert respondents.between(date(2024, 3, 2), date(2024, 3, 3)) == pytest.approx(
+            60, rel=0.05
+        )
+        assert respondents.last_days(2) == pytest.approx(60, rel=0.05)
+        assert respondents.last_days(7) == pytest.approx(80, rel=0.05)
+        assert RespondentSketches().last_days(7) is None
+
+        restored = SurveyAggregate.from_dict(questions, aggregate.to_dict())
+        assert restored.respondents.by_day() == respondents.by_day()
+        assert aggregate.copy().respondents.total.estimate() == (
+            respondents.total.estimate()
+        )
+
+    def test_old_days_dropped(self):
+        """Sprawdza usuwanie dni starszych niż okno szkiców."""
+        from app.aggregates import RESPONDENTS_DAYS
+
+        sketches = RespondentSketches()
+        sketches.add("a", 100)
+        sketches.add("b", 100 + RESPONDENTS_DAYS)
+        sketches.add("c", 99)
+
+        assert list(sketches.daily) == [100 + RESPONDENTS_DAYS]
+        assert sketches.total.estimate() == 3
@@ -0,0 +1,108 @@
+"""
+Testy jednostkowe dla asynchronicznego interfejsu bazy danych (app.async_database).
+"""
+
+import asyncio
+import threading
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from app.models import SurveyResponse
+
+
+class TestAsyncDatabase:
+    """Testy nakładki AsyncDatabase."""
+
+    async def test_memory_reads_run_on_event_loop(
+        self, database, created_survey, monkeypatch
+    ):
+        """Sprawdza odczyty bazy w pamięci bez przełączania do puli wątków."""
+        from app.async_database import AsyncDatabase
+
+        async def fail(*args, **kwargs):
+            raise AssertionError("to_thread should not be used")
+
+        monkeypatch.setattr(asyncio, "to_thread", fail)
+        db = AsyncDatabase(database)
+
+        assert await db.get_survey(created_survey.id) == created_survey
+        assert await db.survey_exists(created_survey.id)
+        assert await db.get_surveys() == [created_survey]
+        assert (await db.get_aggregate(created_survey.id)).total_responses == 0
+        assert await db.ping()
+
+    async def test_sqlite_calls_run_in_thread_pool(self, config, tmp_path):
+        """Sprawdza wykonanie zapytań SQLite poza wątkiem pętli zdarzeń."""
+        from app.async_database import AsyncDatabase
+        from app.database import get_database
+
+        config.set("database", "backend", "sqlite")
+        config.set("database", "sqlite_path", str(tmp_path / "polly.db"))
+        backend = get_database()
+        loop_thread = threading.get_ident()
+        threads = []
+
+        original = backend.get_stats
+
+        def get_stats():
+            threads.append(threading.get_ident())
+            return original()
+
+        backend.get_stats = get_stats
+        db = AsyncDatabase(backend)
+
+        assert (await db.get_stats())["total_surveys"] == 0
+        assert threads and threads[0] != loop_thread
+        await db.close()
+
+    async def test_write_locks_shared_between_wrappers(self, database):
+        """Sprawdza wspólne blokady zapisu dla nakładek na tę samą bazę."""
+        from app.async_database import AsyncDatabase
+
+        first = AsyncDatabase(database)
+        second = AsyncDatabase(database)
+        survey_id = uuid4()
+
+        assert first._lock_for(survey_id) is second._lock_for(survey_id)
+        assert len(first._locks) == 64
+
+    def test_blocking_reads_follow_storage(self, config, tmp_path):
+        """Sprawdza odczyty w puli wątków tylko dla segmentów na dysku."""
+        from app.database import DatabaseMeta, get_database
+
+        assert not get_database().blocking_reads
+
+        config.set("database", "storage_layout", "columnar")
+        DatabaseMeta._instances.clear()
+        assert not get_database().blocking_reads
+
+        config.set("database", "segment_dir", str(tmp_path))
+        DatabaseMeta._instances.clear()
+        assert get_database().blocking_reads
+
+    async def test_blocking_writes_offloaded(
+        self, config, tmp_path, created_survey, sample_answers
+    ):
+        """Sprawdza zapis z dziennikiem WAL i retencję w puli wątków."""
+        from app.async_database import AsyncDatabase
+        from app.database import DatabaseMeta, get_database
+
+        config.set("database", "wal_dir", str(tmp_path))
+        DatabaseMeta._instances.clear()
+        backend = get_database()
+        db = AsyncDatabase(backend)
+        await db.add_survey(created_survey)
+
+        now = datetime.now()
+        response = SurveyResponse(
+            id=uuid4(),
+            survey_id=created_survey.id,
+            answers=sample_answers,
+            submitted_at=now - timedelta(days=2),
+        )
+
+        assert backend.blocking_writes
+        assert await db.add_response(response) == response
+        assert await db.get_responses(created_survey.id) == [response]
+        assert await db.drop_responses_before(created_survey.id, now) == 1
+        await db.close()
@@ -0,0 +1,99 @@
+"""
+Testy jednostkowe dla skompresowanych bitmap (app.bitmaps).
+"""
+
+import random
+
+from app.bitmaps import Bitmap
+
+
+def make_bitmap(ordinals):
+    bitmap = Bitmap()
+    for ordinal in ordinals:
+        bitmap.add(ordinal)
+    return bitmap
+
+
+class TestBitmap:
+    """Testy bitmapy numerów odpowiedzi."""
+
+    def test_sparse_and_dense_blocks(self):
+        """Sprawdza zawartość bloków tablicowych i map bitów."""
+        dense = list(range(0, 20_000, 2))
+        sparse = [70_000, 70_010, 200_000]
+        bitmap = make_bitmap(dense + sparse)
+
+        assert len(bitmap) == len(dense) + len(sparse)
+        assert bitmap.to_list() == dense + sparse
+        assert 70_010 in bitmap and 70_011 not in bitmap and 3 not in bitmap
+        assert 5 not in Bitmap()
+        assert type(bitmap._chunks[0]) is bytearray
+        assert type(bitmap._chunks[1]) is not bytearray
+
+    def test_out_of_order_and_duplicate_add(self):
+        """Sprawdza dodanie numerów spoza kolejności i powtórzonych."""
+        bitmap = make_bitmap([5, 1, 3, 3, 5])
+
+        assert bitmap.to_list() == [1, 3, 5]
+
+    def test_intersection_matches_sets(self):
+        """Sprawdza przecięcie i jego liczność dla wszystkich rodzajów bloków."""
+        rng = random.Random(7)
+        left = sorted(rng.sample(range(140_000), 12_000))
+        right = sorted(rng.sample(range(140_000), 1_000))
+        dense_right = sorted(rng.sample(range(140_000), 16_000))
+
+        for other in (right, dense_right, left):
+            expected = sorted(set(left) & set(other))
+            a, b = make_bitmap(left), make_bitmap(other)
+            assert (a & b).to_list() == expected
+            assert (b & a).to_list() == expected
+            assert a.intersection_count(b) == len(expected)
+            assert b.intersection_count(a) == len(expected)
+
+    def test_below_limit(self):
+        """Sprawdza obcięcie bitmapy do numerów mniejszych od limitu."""
+        ordinals = list(range(0, 140_000, 3))
+        bitmap = make_bitmap(ordinals)
+
+        for limit in (0, 10, 65_536, 65_537, 131_073, 200_000):
+            below = bitmap.below(limit)
+            assert below.to_list() == [o for o in ordinals if o < limit]
+
+        # Kopia nie zmienia się po dopisaniu do oryginału
+        below = bitmap.below(140_000)
+        bitmap.add(140_001)
+        assert 140_001 not in below
+
+    def test_between(self):
+        """Sprawdza kopię z numerami z przedziału (retencja początku bitmapy)."""
+        ordinals = list(range(0, 140_000, 3)) + [140_000, 140_010]
+        bitmap = make_bitmap(ordinals)
+
+        for start, limit in [
+            (0, 10),
+            (7, 65_540),
+            (65_536, 140_011),
+            (70_001, 70_002),
+            (131_073, 140_011),
+            (140_005, 200_000),
+        ]:
+            between = bitmap.between(start, limit)
+            expected = [o for o in ordinals if start <= o < limit]
+            assert between.to_list() == expected
+            assert bool(between) == bool(expected)
+
+        # Po usunięciu całego bloku tablicowego można dalej dopisywać
+        between = bitmap.between(140_011, 140_011)
+        assert not between
+        between.add(140_020)
+        assert between.to_list() == [140_020]
+
+    def test_dict_roundtrip(self):
+        """Sprawdza zapis bitmapy do JSON i odtworzenie."""
+        import json
+
+        bitmap = make_bitmap(list(range(5_000)) + [66_000, 66_001])
+        data = json.loads(json.dumps(bitmap.to_dict()))
+
+        assert Bitmap.from_dict(data).to_list() == bitmap.to_list()
@@ -0,0 +1,425 @@
+"""
+Testy jednostkowe dla kolumnowego magazynu odpowiedzi (app.columnar).
+"""
+
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import pytest
+
+from app.columnar import ColumnarResponseStore, from_micros, to_micros
+from app.models import Answer, Question, QuestionType, SurveyResponse
+
+QUESTIONS = [
+    Question(id="q1", text="Imię", type=QuestionType.TEXT),
+    Question(
+        id="q2",
+        text="Kolor",
+        type=QuestionType.SINGLE_CHOICE,
+        options=["Czerwony", "Niebieski"],
+    ),
+    Question(
+        id="q3",
+        text="Języki",
+        type=QuestionType.MULTIPLE_CHOICE,
+        options=["Python", "Java", "C++"],
+    ),
+    Question(id="q4", text="Ocena", type=QuestionType.RATING),
+    Question(id="q5", text="Polecisz?", type=QuestionType.YES_NO),
+    Question(id="q6", text="Dowolny wybór", type=QuestionType.SINGLE_CHOICE),
+]
+
+
+def make_response(survey_id, answers, respondent_id="r-1", submitted_at=None):
+    return SurveyResponse(
+        id=uuid4(),
+        survey_id=survey_id,
+        answers=[Answer(question_id=qid, value=value) for qid, value in answers],
+        respondent_id=respondent_id,
+        submitted_at=submitted_at or datetime.now(),
+    )
+
+
+@pytest.fixture
+def store():
+    return ColumnarResponseStore(uuid4(), QUESTIONS)
+
+
+class TestColumnarResponseStore:
+    """Testy magazynu kolumnowego."""
+
+    def test_micros_roundtrip(self):
+        """Sprawdza zamianę daty na mikrosekundy i z powrotem."""
+        now = datetime.now()
+        assert from_micros(to_micros(now)) == now
+
+    def test_roundtrip_all_types(self, store):
+        """Sprawdza odtworzenie odpowiedzi ze wszystkimi typami pytań."""
+        response = make_response(
+            store._survey_id,
+            [
+                ("q1", "Zażółć gęślą jaźń"),
+                ("q2", "Niebieski"),
+                ("q3", ["Python", "C++"]),
+                ("q4", 4),
+                ("q5", True),
+                ("q6", "cokolwiek"),
+            ],
+        )
+        store.append(response)
+
+        assert len(store) == 1
+        assert store[0] == response
+        assert store._hot.overflow == {}
+
+    def test_roundtrip_missing_answers(self, store):
+        """Sprawdza odtworzenie odpowiedzi bez części pytań."""
+        first = make_response(store._survey_id, [("q4", 2.5)], respondent_id=None)
+        second = make_response(store._survey_id, [("q1", ""), ("q3", [])])
+        store.append(first)
+        store.append(second)
+
+        assert store.to_list() == [first, second]
+        assert store[-1] == second
+        assert store._hot.overflow == {}
+
+    @pytest.mark.parametrize(
+        "answers",
+        [
+            [("q5", 1)],  # 1 zamiast True
+            [("q4", True)],  # bool jako ocena
+            [("q3", ["C++", "Python"])],  # kolejność inna niż w ankiecie
+            [("q3", ["Python", "Python"])],  # powtórzona opcja
+            [("q3", ["Ruby"])],  # opcja spoza listy
+            [("q3", "Python")],  # pojedyncza wartość zamiast listy
+            [("q2", "Zielony")],  # opcja spoza listy
+            [("q4", 1), ("q1", "x")],  # kolejność odpowiedzi
+            [("q1", "x"), ("q1", "y")],  # powtórzone pytanie
+            [("qx", "x")],  # nieznane pytanie
+            [("q1", 5)],  # liczba jako tekst
+            [("q2", ["Czerwony"])],  # niehashowalna wartość
+        ],
+    )
+    def test_unrepresentable_rows_kept_exactly(self, store, answers):
+        """Sprawdza wierne zachowanie odpowiedzi spoza układu kolumnowego."""
+        response = make_response(store._survey_id, answers)
+        store.append(response)
+
+        assert store[0] == response
+        assert 0 in store._hot.overflow
+
+    def test_timezone_aware_timestamp_kept_exactly(self, store):
+        """Sprawdza zachowanie daty ze strefą czasową."""
+        response = make_response(
+            store._survey_id, [("q1", "x")], submitted_at=datetime.now(UTC)
+        )
+        store.append(response)
+
+        assert store[0] == response
+
+    def test_index_out_of_range(self, store):
+        """Sprawdza błąd dla indeksu spoza zakresu."""
+        with pytest.raises(IndexError):
+            store[0]
+
+    def test_columns_smaller_than_objects(self, store):
+        """Sprawdza że dane kolumnowe zajmują mniej niż jeden obiekt na odpowiedź."""
+        for i in range(100):
+            store.append(
+                make_response(
+                    store._survey_id,
+                    [("q2", "Czerwony"), ("q4", i % 5 + 1), ("q5", "no")],
+                )
+            )
+
+        # Kilkadziesiąt bajtów na odpowiedź zamiast setek bajtów obiektów
+        assert store.nbytes() / len(store) < 100
+
+
+@pytest.fixture
+def segmented_store(tmp_path):
+    return ColumnarResponseStore(
+        uuid4(), QUESTIONS, segment_dir=str(tmp_path), hot_tail_size=4
+    )
+
+
+class TestResponseSegments:
+    """Testy segmentów odpowiedzi mapowanych przez mmap."""
+
+    def test_sealed_segments_roundtrip(self, segmented_store, tmp_path):
+        """Sprawdza odczyt odpowiedzi z zapieczętowanych segmentów."""
+        store = segmented_store
+        responses = [
+            make_response(
+                store._survey_id,
+                [
+                    ("q1", f"tekst {i}"),
+                    ("q2", "Czerwony"),
+                    ("q3", ["Java"]),
+                    ("q4", i),
+                    ("q5", i % 2 == 0),
+                ],
+                respondent_id=None if i % 3 else f"r-{i}",
+            )
+            for i in range(10)
+        ]
+        for response in responses:
+            store.append(response)
+
+        assert store.segment_count == 2
+        assert len(list((tmp_path / str(store._survey_id)).iterdir())) == 2
+        assert store.to_list() == responses
+        assert store[5] == responses[5]
+        assert store[-1] == responses[-1]
+
+    def test_hot_tail_bounds_heap(self, segmented_store):
+        """Sprawdza że na stercie zostaje tylko gorący ogon."""
+        store = segmented_store
+        for i in range(9):
+            store.append(make_response(store._survey_id, [("q1", "x" * 100)]))
+
+        assert len(store._hot.ids) == 16
+        assert store.nbytes() < store.mapped_bytes() / 4
+        assert isinstance(store._segments[0].ids, memoryview)
+
+    def test_overflow_rows_in_segment(self, segmented_store):
+        """Sprawdza odpowiedzi spoza układu kolumnowego zapisane w segmencie."""
+        store = segmented_store
+        responses = [
+            make_response(store._survey_id, [("q5", 1)]),
+            make_response(store._survey_id, [("q5", "yes")]),
+            make_response(
+                store._survey_id,
+                [("q1", "x")],
+                submitted_at=datetime.now(UTC),
+            ),
+            make_response(store._survey_id, [("q4", 1), ("q1", "y")]),
+        ]
+        for response in responses:
+            store.append(response)
+
+        assert store.segment_count == 1
+        assert list(store) == responses
+
+    def test_id_at_reads_id_column(self, segmented_store, monkeypatch):
+        """Sprawdza odczyt identyfikatorów i czasów bez odtwarzania odpowiedzi."""
+        from app.columnar import ResponseChunk
+
+        store = segmented_store
+        responses = [
+            make_response(store._survey_id, [("q5", 1 if i % 2 else True)])
+            for i in range(6)
+        ]
+        for response in responses:
+            store.append(response)
+        view = store.view()
+
+        def forbidden(self, survey_id, row):
+            raise AssertionError("response rebuilt")
+
+        monkeypatch.setattr(ResponseChunk, "get", forbidden)
+        ids = [response.id for response in responses]
+        assert [store.id_at(row) for row in range(6)] == ids
+        assert [view.id_at(row) for row in range(6)] == ids
+        times = [response.submitted_at for response in responses]
+        assert [store.time_at(row) for row in range(6)] == times
+        with pytest.raises(IndexError):
+            view.id_at(6)
+
+    def test_close_removes_files(self, segmented_store, tmp_path):
+        """Sprawdza usunięcie plików segmentów przy zamknięciu magazynu."""
+        store = segmented_store
+        responses = [make_response(store._survey_id, [("q1", "x")]) for _ in range(4)]
+        for response in responses:
+            store.append(response)
+
+        store.close()
+
+        assert not (tmp_path / str(store._survey_id)).exists()
+        # Zmapowane dane pozostają czytelne po usunięciu plików
+        assert store.to_list() == responses
+
+    def test_invalid_segment_rejected(self, segmented_store, tmp_path):
+        """Sprawdza odrzucenie pliku, który nie jest segmentem."""
+        path = tmp_path / "invalid.seg"
+        path.write_bytes(b"\0" * 64)
+
+        with pytest.raises(ValueError):
+            segmented_store._hot._map(str(path), ["B"])
+
+
+class TestDatabaseColumnarLayout:
+    """Testy bazy danych z kolumnowym układem odpowiedzi."""
+
+    async def test_statistics_and_responses(
+        self, config, sample_survey_create_all_types
+    ):
+        """Sprawdza statystyki i odczyt odpowiedzi w układzie kolumnowym."""
+        from app.database import DatabaseMeta, get_database
+        from app.models import AnswerSubmit
+        from app.services import SurveyService
+
+        config.set("database", "storage_layout", "columnar")
+        DatabaseMeta._instances.clear()
+        db = get_database()
+        service = SurveyService(database=db)
+
+        survey = await service.create_survey(sample_survey_create_all_types)
+        submitted = [
+            await service.submit_response(
+                survey.id,
+                AnswerSubmit(
+                    answers=[
+                        Answer(question_id="q1", value=name),
+                        Answer(question_id="q2", value="Zielony"),
+                        Answer(question_id="q3", value=["Python", "Java"]),
+                        Answer(question_id="q4", value=rating),
+                        Answer(question_id="q5", value="yes"),
+                    ],
+                    respondent_id="respondent",
+                ),
+            )
+            for name, rating in [("Anna", 7), ("Jan", 9)]
+        ]
+
+        assert isinstance(db.responses[survey.id], ColumnarResponseStore)
+        assert db.get_responses(survey.id) == submitted
+        assert db.get_responses(uuid4()) == []
+
+        stats = await service.get_statistics(survey.id)
+        assert stats.total_responses == 2
+        rating = next(q for q in stats.questions_stats if q.question_id == "q4")
+        assert rating.average_value == 8.0
+
+    async def test_segments_removed_on_clear(
+        self, config, tmp_path, sample_survey_create, sample_answer_submit
+    ):
+        """Sprawdza segmenty bazy danych i ich usunięcie przy czyszczeniu."""
+        from app.database import DatabaseMeta, get_database
+        from app.services import SurveyService
+
+        config.set("database", "storage_layout", "columnar")
+        config.set("database", "segment_dir", str(tmp_path))
+        config.set("database", "hot_tail_size", 2)
+        DatabaseMeta._instances.clear()
+        db = get_database()
+        service = SurveyService(database=db)
+
+        survey = await service.create_survey(sample_survey_create)
+        for _ in range(5):
+            await service.submit_response(survey.id, sample_answer_submit)
+
+        assert db.responses[survey.id].segment_count == 2
+        assert len(db.get_responses(survey.id)) == 5
+        assert (await service.get_statistics(survey.id)).total_responses == 5
+
+        db.clear()
+        assert list(tmp_path.iterdir()) == []
+
+    def test_drop_before_releases_whole_segments(self, segmented_store, tmp_path):
+        """Sprawdza zwalnianie całych segmentów przez retencję."""
+        store = segmented_store
+        responses = [
+            make_response(store._survey_id, [("q1", f"tekst {i}")]) for i in range(10)
+        ]
+        for response in responses:
+            store.append(response)
+
+        # Wiersz 5 leży w drugim segmencie - zwalniany jest tylko pierwszy
+        assert store.drop_before(5) == 4
+        assert store.first_row == 4
+        assert store.segment_count == 1
+        assert len(list((tmp_path / str(store._survey_id)).iterdir())) == 1
+        assert len(store) == 10
+        assert store.to_list() == responses[4:]
+        assert store[4] == responses[4]
+        with pytest.raises(IndexError):
+            store[3]
+
+        assert store.drop_before(10) == 4
+        assert store.to_list() == responses[8:]
+
+    def test_expired_prefix_stops_at_first_newer_chunk(
+        self, segmented_store, monkeypatch
+    ):
+        """Sprawdza wyznaczanie zwalnianego początku bez czytania czasów wierszy."""
+        from datetime import timedelta
+
+        from app.columnar import ResponseChunk
+        from app.indexes import time_key
+
+        store = segmented_store
+        start = datetime(2024, 1, 1)
+        for minutes in [1, 2, 3, 4, 5, 6, 9, 7, 8, 10]:
+            store.append(
+                make_response(
+                    store._survey_id,
+                    [("q4", 1)],
+                    submitted_at=start + timedelta(minutes=minutes),
+                )
+            )
+
+        def time_at(*args):
+            raise AssertionError("columnar rows should be checked by the time column")
+
+        monkeypatch.setattr(ResponseChunk, "time_at", time_at)
+
+        # Druga porcja ma wiersz nowszy niż cutoff, gorąca porcja jest pomijana
+        assert store.expired_prefix(time_key(start + timedelta(minutes=8))) == 4
+        assert store.expired_prefix(time_key(start + timedelta(minutes=11))) == 8
+        assert store.expired_prefix(time_key(start)) == 0
+
+    def test_expired_prefix_checks_overflow_rows(self, segmented_store):
+        """Sprawdza czasy odpowiedzi spoza układu kolumnowego w porcji."""
+        from datetime import timedelta
+
+        from app.indexes import time_key
+
+        store = segmented_store
+        now = datetime.now(UTC)
+        for hours in [3, 2, 0, 1]:
+            store.append(
+                make_response(
+                    store._survey_id,
+                    [("q1", "x")],
+                    submitted_at=now - timedelta(hours=hours),
+                )
+            )
+
+        assert store.expired_prefix(time_key(now - timedelta(minutes=30))) == 0
+        assert store.expired_prefix(time_key(now + timedelta(minutes=1))) == 4
+
+    def test_chunks_in_memory_without_segment_dir(self):
+        """Sprawdza porcje trzymane w pamięci, gdy nie ustawiono katalogu segmentów."""
+        store = ColumnarResponseStore(uuid4(), QUESTIONS, hot_tail_size=4)
+        responses = [make_response(store._survey_id, [("q4", i)]) for i in range(6)]
+        for response in responses:
+            store.append(response)
+
+        assert store.segment_count == 1
+        assert store.mapped_bytes() == 0
+        assert store.drop_before(6) == 4
+        assert store.to_list() == responses[4:]
+
+    def test_view_unaffected_by_later_writes(self, segmented_store):
+        """Sprawdza niezmienność widoku po dopisaniu i zwolnieniu segmentów."""
+        store = segmented_store
+        responses = [
+            make_response(store._survey_id, [("q1", f"tekst {i}")]) for i in range(10)
+        ]
+        for response in responses[:6]:
+            store.append(response)
+
+        view = store.view()
+        for response in responses[6:]:
+            store.append(response)
+        store.drop_before(8)
+
+        assert len(view) == 6
+        assert view.first_row == 0
+        assert view.to_list() == responses[:6]
+        assert view[5] == responses[5]
+        assert view.id_at(4) == responses[4].id
+        with pytest.raises(IndexError):
+            view[6]
+        assert store.to_list() == responses[8:]
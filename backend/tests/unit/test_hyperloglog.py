@@ -0,0 +1,60 @@
+"""
+Testy jednostkowe dla szkicu HyperLogLog (app.hyperloglog).
+"""
+
+import pytest
+
+from app.hyperloglog import HyperLogLog
+
+
+def make_sketch(values, precision=12):
+    sketch = HyperLogLog(precision)
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+class TestHyperLogLog:
+    """Testy przybliżonej liczby unikalnych wartości."""
+
+    @pytest.mark.parametrize("count", [0, 1, 10, 1_000, 50_000])
+    def test_estimate_within_error(self, count):
+        """Sprawdza oszacowanie w granicach błędu (3 odchylenia standardowe)."""
+        sketch = make_sketch(f"respondent-{i}" for i in range(count))
+
+        assert abs(sketch.estimate() - count) <= max(1, 3 * 0.0163 * count)
+
+    def test_duplicates_not_counted(self):
+        """Sprawdza, że powtórzone wartości nie zwiększają oszacowania."""
+        sketch = make_sketch(["a", "b", "c"] * 1_000)
+
+        assert sketch.estimate() == 3
+
+    def test_merge_is_union(self):
+        """Sprawdza łączenie szkiców (suma zbiorów)."""
+        first = make_sketch(f"r{i}" for i in range(6_000))
+        second = make_sketch(f"r{i}" for i in range(4_000, 10_000))
+        union = make_sketch(f"r{i}" for i in range(10_000))
+
+        first.merge(second)
+
+        assert first.registers == union.registers
+        with pytest.raises(ValueError, match="different precision"):
+            first.merge(HyperLogLog(10))
+
+    def test_invalid_precision(self):
+        """Sprawdza błąd dla precyzji spoza zakresu."""
+        with pytest.raises(ValueError, match="precision"):
+            HyperLogLog(3)
+
+    def test_dict_roundtrip_and_copy(self):
+        """Sprawdza zapis do JSON, odtworzenie i niezależność kopii."""
+        import json
+
+        sketch = make_sketch(f"r{i}" for i in range(500))
+        restored = HyperLogLog.from_dict(json.loads(json.dumps(sketch.to_dict())))
+        clone = sketch.copy()
+        sketch.add("new")
+
+        assert restored.estimate() == clone.estimate()
+        assert clone.registers != sketch.registers or clone.estimate() == 500
@@ -0,0 +1,142 @@
+"""
+Testy jednostkowe dla kluczy idempotencji (app.idempotency).
+"""
+
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from app.idempotency import IdempotencyIndex
+
+
+class FakeClock:
+    """Zegar sterowany ręcznie."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_response(survey_id, sample_answers):
+    from app.models import SurveyResponse
+
+    return SurveyResponse(
+        id=uuid4(),
+        survey_id=survey_id,
+        answers=sample_answers,
+        submitted_at=datetime.now(),
+    )
+
+
+class TestIdempotencyIndex:
+    """Testy indeksu kluczy idempotencji."""
+
+    def test_put_and_get(self, clock):
+        """Sprawdza zapis i odczyt wiersza odpowiedzi pod kluczem."""
+        index = IdempotencyIndex(clock=clock)
+        survey_id = uuid4()
+        response_id = uuid4()
+
+        index.put(survey_id, "klucz", 3, response_id)
+
+        assert index.get(survey_id, "klucz") == (3, response_id)
+        assert index.get(survey_id, "inny") is None
+        # Klucz jest przypisany do ankiety
+        assert index.get(uuid4(), "klucz") is None
+
+    def test_keys_expire(self, clock):
+        """Sprawdza wygasanie kluczy po czasie życia."""
+        index = IdempotencyIndex(ttl_seconds=10, clock=clock)
+        survey_id = uuid4()
+        index.put(survey_id, "a", 0, uuid4())
+        clock.now = 5
+        index.put(survey_id, "b", 0, uuid4())
+
+        clock.now = 10
+        assert index.get(survey_id, "a") is None
+        assert index.get(survey_id, "b") is not None
+
+        # Wygasłe wpisy usuwane przy dodawaniu nowych kluczy
+        clock.now = 20
+        index.put(survey_id, "c", 0, uuid4())
+        assert len(index) == 1
+
+    def test_bounded_size(self, clock):
+        """Sprawdza usuwanie najstarszych kluczy po przekroczeniu limitu."""
+        index = IdempotencyIndex(max_keys=2, clock=clock)
+        survey_id = uuid4()
+        for key in ["a", "b", "c"]:
+            index.put(survey_id, key, 0, uuid4())
+
+        assert len(index) == 2
+        assert index.get(survey_id, "a") is None
+        assert index.get(survey_id, "c") is not None
+
+
+class TestDatabaseIdempotency:
+    """Testy idempotentnego zapisu odpowiedzi w bazie w pamięci."""
+
+    def test_duplicate_returns_original(self, database, created_survey, sample_answers):
+        """Sprawdza zwrot pierwotnej odpowiedzi dla powtórzonego klucza."""
+        first = make_response(created_survey.id, sample_answers)
+        retry = make_response(created_survey.id, sample_answers)
+
+        assert database.add_response(first, idempotency_key="k") is first
+        assert database.add_response(retry, idempotency_key="k") == first
+        assert database.get_idempotent_response(created_survey.id, "k") == first
+        assert database.get_responses(created_survey.id) == [first]
+        assert database.get_aggregate(created_survey.id).total_responses == 1
+
+    async def test_concurrent_retries_write_once(
+        self, survey_service, created_survey, sample_answer_submit
+    ):
+        """Sprawdza pojedynczy zapis przy równoległych powtórzeniach."""
+        import asyncio
+
+        results = await asyncio.gather(
+            *(
+                survey_service.submit_response(
+                    created_survey.id, sample_answer_submit, idempotency_key="retry"
+                )
+                for _ in range(32)
+            )
+        )
+
+        assert len({response.id for response in results}) == 1
+        assert (
+            await survey_service.get_statistics(created_survey.id)
+        ).total_responses == 1
+
+    def test_clear_removes_keys(self, database, created_survey, sample_answers):
+        """Sprawdza usunięcie kluczy przy czyszczeniu bazy."""
+        database.add_response(
+            make_response(created_survey.id, sample_answers), idempotency_key="k"
+        )
+
+        database.clear()
+
+        assert database.get_idempotent_response(created_survey.id, "k") is None
+
+    def test_key_of_dropped_response_ignored(
+        self, database, created_survey, sample_answers
+    ):
+        """Sprawdza brak odpowiedzi dla klucza, którego wiersz zwolniła retencja."""
+        from datetime import timedelta
+
+        database.add_response(
+            make_response(created_survey.id, sample_answers), idempotency_key="k"
+        )
+
+        database.drop_responses_before(
+            created_survey.id, datetime.now() + timedelta(days=1)
+        )
+
+        assert database.get_idempotent_response(created_survey.id, "k") is None
@@ -0,0 +1,207 @@
+"""
+Testy jednostkowe dla indeksów bazy danych (app.indexes).
+"""
+
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+from app.indexes import RespondentIndex, TimeIndex, time_key
+
+
+def build_index(entries):
+    """Buduje indeks z listy (klucz, id) - numer wiersza to pozycja na liście."""
+    index = TimeIndex()
+    ids = [response_id for _, response_id in entries]
+    for row, (key, response_id) in enumerate(entries):
+        index.add(key, row, response_id, ids.__getitem__)
+    return index, ids
+
+
+class TestTimeIndex:
+    """Testy indeksu czasu odpowiedzi."""
+
+    def test_time_key_timezone_aware(self):
+        """Sprawdza sprowadzenie dat ze strefą czasową do UTC."""
+        naive = datetime(2024, 1, 1, 12, 0)
+        aware = datetime(2024, 1, 1, 14, 0, tzinfo=timezone(timedelta(hours=2)))
+
+        assert time_key(aware) == time_key(naive)
+
+    def test_rows_sorted_by_time_and_id(self):
+        """Sprawdza kolejność wierszy dodanych poza kolejnością czasu."""
+        low, high = UUID(int=1), UUID(int=2)
+        index, _ = build_index([(30, uuid4()), (10, high), (20, uuid4()), (10, low)])
+
+        assert len(index) == 4
+        assert index.rows_after(None, 10, None) == [3, 1, 2, 0]
+
+    def test_rows_after_cursor(self):
+        """Sprawdza pobieranie wierszy po kursorze z remisem czasu."""
+        ids = [UUID(int=i) for i in range(4)]
+        index, lookup = build_index(
+            [(10, ids[0]), (10, ids[1]), (10, ids[2]), (20, ids[3])]
+        )
+
+        assert index.rows_after((10, ids[0]), 2, lookup.__getitem__) == [1, 2]
+        assert index.rows_after((10, ids[2]), 5, lookup.__getitem__) == [3]
+        assert index.rows_after((15, ids[0]), 5, lookup.__getitem__) == [3]
+        assert index.rows_after((20, ids[3]), 5, lookup.__getitem__) == []
+
+    def test_rows_between(self):
+        """Sprawdza wyszukiwanie wierszy z przedziału czasu."""
+        index, _ = build_index([(10, uuid4()), (30, uuid4()), (20, uuid4())])
+
+        assert index.rows_between(10, 30) == [0, 2]
+        assert index.rows_between(None, 20) == [0]
+        assert index.rows_between(25, None) == [1]
+
+    def test_prune(self):
+        """Sprawdza usunięcie wierszy zwolnionych przez retencję."""
+        index, _ = build_index([(30, uuid4()), (10, uuid4()), (20, uuid4())])
+
+        index.prune(2)
+        assert index.rows_after(None, 10, None) == [2]
+        assert index.rows_between(None, 25) == [2]
+
+    def test_prune_before_key(self):
+        """Sprawdza przeglądanie tylko kluczy sprzed granicy retencji."""
+        index, _ = build_index(
+            [(10, uuid4()), (30, uuid4()), (20, uuid4()), (5, uuid4()), (40, uuid4())]
+        )
+
+        index.prune(3, 25)
+        assert index.rows_after(None, 10, None) == [3, 1, 4]
+
+
+class TestRespondentIndex:
+    """Testy indeksu respondentów."""
+
+    def test_rows_for_respondent(self):
+        """Sprawdza wiersze odpowiedzi respondentów."""
+        index = RespondentIndex()
+        for row, respondent_id in enumerate(["a", None, "b", "a"]):
+            index.add(respondent_id, row)
+
+        assert len(index) == 2
+        assert "a" in index
+        assert "c" not in index
+        assert index.rows_for("a") == [0, 3]
+        assert index.rows_for("c") == []
+
+    def test_prune(self):
+        """Sprawdza usunięcie wierszy zwolnionych przez retencję."""
+        index = RespondentIndex()
+        for row, respondent_id in enumerate(["a", "b", "a", "c", "c", "c"]):
+            index.add(respondent_id, row)
+
+        index.prune(3)
+        assert "a" not in index
+        assert "b" not in index
+        assert index.rows_for("c") == [3, 4, 5]
+
+        index.prune(5)
+        assert index.rows_for("c") == [5]
+
+
+class TestDatabaseIndexes:
+    """Testy zapytań bazy w pamięci korzystających z indeksów."""
+
+    def test_get_responses_after(self, database, created_survey, sample_answers):
+        """Sprawdza stronicowanie odpowiedzi zapisanych poza kolejnością czasu."""
+        from app.models import SurveyResponse
+
+        start = datetime(2024, 1, 1)
+        responses = [
+            SurveyResponse(
+                id=uuid4(),
+                survey_id=created_survey.id,
+                answers=sample_answers,
+                submitted_at=start + timedelta(minutes=minutes),
+            )
+            for minutes in [5, 1, 3, 1, 4]
+        ]
+        for response in responses:
+            database.add_response(response)
+
+        expected = sorted(responses, key=lambda r: (r.submitted_at, r.id))
+        first = database.get_responses_after(created_survey.id, None, 3)
+        last = first[-1]
+        rest = database.get_responses_after(
+            created_survey.id, (last.submitted_at, last.id), 3
+        )
+
+        assert first + rest == expected
+        assert database.get_responses_after(uuid4(), None, 3) == []
+
+    def test_respondent_and_time_queries(
+        self, database, created_survey, sample_answers
+    ):
+        """Sprawdza zapytania po respondencie i przedziale czasu."""
+        from app.models import SurveyResponse
+
+        start = datetime(2024, 1, 1)
+        responses = [
+            SurveyResponse(
+                id=uuid4(),
+                survey_id=created_survey.id,
+                answers=sample_answers,
+                respondent_id=respondent_id,
+                submitted_at=start + timedelta(hours=hours),
+            )
+            for respondent_id, hours in [("a", 0), ("b", 1), ("a", 2)]
+        ]
+        for response in responses:
+            database.add_response(response)
+
+        assert database.has_respondent(created_survey.id, "a")
+        assert not database.has_respondent(created_survey.id, "c")
+        assert not database.has_respondent(uuid4(), "a")
+        assert database.get_responses_by_respondent(created_survey.id, "a") == [
+            responses[0],
+            responses[2],
+        ]
+        assert database.get_responses_by_respondent(uuid4(), "a") == []
+        assert (
+            database.get_responses_between(
+                created_survey.id, start + timedelta(hours=1), None
+            )
+            == responses[1:]
+        )
+        assert database.get_responses_between(uuid4(), None, None) == []
+
+    def test_drop_responses_before(
+        self, database, created_survey, sample_answers, monkeypatch
+    ):
+        """Sprawdza zwolnienie początku magazynu bez wyszukiwania w indeksie."""
+        from app.models import SurveyResponse
+
+        start = datetime(2024, 1, 1)
+        responses = [
+            SurveyResponse(
+                id=uuid4(),
+                survey_id=created_survey.id,
+                answers=sample_answers,
+                respondent_id=f"r-{minutes}",
+                submitted_at=start + timedelta(minutes=minutes),
+            )
+            for minutes in [1, 2, 5, 3, 6]
+        ]
+        for response in responses:
+            database.add_response(response)
+        database.get_view(created_survey.id)
+
+        def rows_between(*args):
+            raise AssertionError("retention should not query the time index")
+
+        monkeypatch.setattr(TimeIndex, "rows_between", rows_between)
+        index = database._time_indexes[created_survey.id]
+        cutoff = start + timedelta(minutes=4)
+
+        assert database.drop_responses_before(created_survey.id, cutoff) == 2
+        assert created_survey.id not in database._views
+        assert database.drop_responses_before(created_survey.id, cutoff) == 0
+        assert database.get_responses(created_survey.id) == responses[2:]
+        assert index.rows_after(None, 10, None) == [3, 2, 4]
+        assert not database.has_respondent(created_survey.id, "r-1")
+        assert database.has_respondent(created_survey.id, "r-3")
+        assert database.drop_responses_before(uuid4(), cutoff) == 0
@@ -137,6 +137,17 @@ class TestSurveyCreateModel:
                 questions=[],  # Puste
             )
 
+    def test_retention_days_validation(self):
+        """Sprawdza czy czas retencji odpowiedzi jest dodatni."""
+        from pydantic import ValidationError
+
+        from app.models import Question, QuestionType, SurveyCreate
+
+        questions = [Question(id="q1", text="Test?", type=QuestionType.TEXT)]
+        assert SurveyCreate(title="Test", questions=questions).retention_days is None
+        with pytest.raises(ValidationError):
+            SurveyCreate(title="Test", questions=questions, retention_days=0)
+
 
 class TestAnswerModel:
     """Testy dla modelu Answer."""
@@ -0,0 +1,114 @@
+"""
+Testy jednostkowe dla zwartych rekordów odpowiedzi (app.records).
+"""
+
+import sys
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from app.models import Answer, Question, QuestionType, SurveyResponse
+from app.records import ResponseRecord, ResponseRecordStore
+
+QUESTIONS = [
+    Question(id="q1", text="Imię", type=QuestionType.TEXT),
+    Question(id="q2", text="Języki", type=QuestionType.MULTIPLE_CHOICE),
+]
+
+
+@pytest.fixture
+def store():
+    return ResponseRecordStore(uuid4(), QUESTIONS)
+
+
+def make_response(survey_id, respondent_id="r-1"):
+    return SurveyResponse(
+        id=uuid4(),
+        survey_id=survey_id,
+        answers=[
+            Answer(question_id="q1", value="Jan"),
+            Answer(question_id="q2", value=["Python"]),
+            Answer(question_id="qx", value=1),
+        ],
+        respondent_id=respondent_id,
+        submitted_at=datetime.now(),
+    )
+
+
+class TestResponseRecordStore:
+    """Testy magazynu zwartych rekordów."""
+
+    def test_roundtrip(self, store):
+        """Sprawdza odtworzenie modeli odpowiedzi z rekordów."""
+        responses = [
+            make_response(store._survey_id),
+            make_response(store._survey_id, None),
+        ]
+        for response in responses:
+            store.append(response)
+
+        assert len(store) == 2
+        assert store.to_list() == responses
+        assert store[-1] == responses[-1]
+        assert store.id_at(0) == responses[0].id
+
+    def test_index_out_of_range(self, store):
+        """Sprawdza błąd dla indeksu spoza zakresu."""
+        with pytest.raises(IndexError):
+            store[0]
+
+    def test_question_ids_shared_with_survey(self, store):
+        """Sprawdza współdzielenie identyfikatorów pytań z definicją ankiety."""
+        response = make_response(store._survey_id)
+        # Identyfikator pytania jako osobny obiekt (jak po parsowaniu JSON)
+        response.answers[0].question_id = b"q1".decode()
+        store.append(response)
+
+        record = store._records[0]
+        assert record.answers[0] is QUESTIONS[0].id
+        assert record.answers[4] == "qx"
+
+    def test_record_smaller_than_model(self, store):
+        """Sprawdza brak słownika atrybutów w rekordzie."""
+        store.append(make_response(store._survey_id))
+        record = store._records[0]
+
+        assert not hasattr(record, "__dict__")
+        assert isinstance(record, ResponseRecord)
+        assert sys.getsizeof(record) < sys.getsizeof(make_response(uuid4()).__dict__)
+
+    def test_drop_before(self, store):
+        """Sprawdza zwolnienie początkowych rekordów (retencja)."""
+        responses = [make_response(store._survey_id) for _ in range(4)]
+        for response in responses:
+            store.append(response)
+
+        assert store.drop_before(2) == 2
+        assert store.drop_before(1) == 0
+        assert len(store) == 4
+        assert store.first_row == 2
+        assert store[2] == responses[2]
+        assert store.id_at(3) == responses[3].id
+        assert store.to_list() == responses[2:]
+        with pytest.raises(IndexError):
+            store[1]
+
+    def test_view_unaffected_by_later_writes(self, store):
+        """Sprawdza niezmienność widoku po dopisaniu i zwolnieniu rekordów."""
+        responses = [make_response(store._survey_id) for _ in range(4)]
+        for response in responses[:2]:
+            store.append(response)
+
+        view = store.view()
+        for response in responses[2:]:
+            store.append(response)
+        store.drop_before(3)
+
+        assert len(view) == 2
+        assert view.to_list() == responses[:2]
+        assert view[0] == responses[0]
+        assert view.id_at(1) == responses[1].id
+        with pytest.raises(IndexError):
+            view[2]
+        assert store.to_list() == responses[3:]
@@ -103,6 +103,60 @@ class TestDatabaseSingleton:
         database.add_response(response)
         assert database.get_responses(fake_survey_id) == []
 
+    def test_database_add_response_updates_aggregate(
+        self, database, created_survey, sample_answers
+    ):
+        """Sprawdza aktualizację agregatów przy dodaniu odpowiedzi."""
+        from app.models import SurveyResponse
+
+        response = SurveyResponse(
+            id=uuid4(),
+            survey_id=created_survey.id,
+            answers=sample_answers,
+            submitted_at=datetime.now(),
+        )
+
+        database.add_response(response)
+        aggregate = database.get_aggregate(created_survey.id)
+
+        assert aggregate.total_responses == 1
+        assert aggregate.last_response_at == response.submitted_at
+        assert aggregate.questions["q2"].distribution == {"Niebieski": 1}
+
+    def test_database_get_aggregate_nonexistent_survey(self, database):
+        """Sprawdza brak agregatów dla nieistniejącej ankiety."""
+        assert database.get_aggregate(uuid4()) is None
+
+    def test_database_lock_striping(self, database):
+        """Sprawdza rozłożenie blokad na paski wg identyfikatora ankiety."""
+        survey_id = uuid4()
+
+        assert len(database._locks) == 64
+        assert database._lock_for(survey_id) is database._lock_for(survey_id)
+        assert len({id(database._lock_for(uuid4())) for _ in range(200)}) > 1
+
+    async def test_database_concurrent_add_response(
+        self, survey_service, sample_survey_create, sample_answer_submit
+    ):
+        """Sprawdza równoległe zapisy do wielu ankiet."""
+        import asyncio
+
+        surveys = [
+            await survey_service.create_survey(sample_survey_create) for _ in range(4)
+        ]
+
+        async def submit(survey_id):
+            for _ in range(50):
+                await survey_service.submit_response(survey_id, sample_answer_submit)
+
+        await asyncio.gather(*(submit(s.id) for s in surveys * 2))
+
+        for survey in surveys:
+            assert (
+                await survey_service.get_statistics(survey.id)
+            ).total_responses == 100
+        assert (await survey_service._db.get_stats())["total_responses"] == 400
+
     def test_database_get_stats(self, database, created_survey):
         """Sprawdza statystyki bazy danych."""
         stats = database.get_stats()
@@ -120,6 +174,74 @@ class TestDatabaseSingleton:
 
         assert len(database.surveys) == 0
         assert len(database.responses) == 0
+        assert database.get_stats()["total_responses"] == 0
+
+    async def test_database_response_counter(
+        self, database, survey_service, created_survey, sample_answer_submit
+    ):
+        """Sprawdza licznik odpowiedzi (bez odpowiedzi do nieistniejących ankiet)."""
+        from app.models import SurveyResponse
+
+        for _ in range(3):
+            await survey_service.submit_response(
+                created_survey.id, sample_answer_submit
+            )
+        database.add_response(
+            SurveyResponse(
+                id=uuid4(),
+                survey_id=uuid4(),
+                answers=[],
+                submitted_at=datetime.now(),
+            )
+        )
+
+        assert database.get_stats()["total_responses"] == 3
+        assert database.ping()
+
+    async def test_database_view_reused_until_write(
+        self, database, survey_service, created_survey, sample_answer_submit
+    ):
+        """Sprawdza ponowne użycie widoku ankiety do czasu kolejnego zapisu."""
+        await survey_service.submit_response(created_survey.id, sample_answer_submit)
+        view = database.get_view(created_survey.id)
+
+        assert database.get_view(created_survey.id) is view
+        assert database.get_aggregate(created_survey.id) is view.aggregate
+
+        await survey_service.submit_response(created_survey.id, sample_answer_submit)
+        current = database.get_view(created_survey.id)
+
+        assert current is not view
+        assert current.version == view.version + 1
+        assert view.aggregate.total_responses == 1
+        assert len(view.responses.to_list()) == 1
+        assert current.aggregate.total_responses == 2
+        assert database.get_view(uuid4()) is None
+
+    def test_database_concurrent_add_survey(self, database):
+        """Sprawdza publikowanie ankiet dodawanych równolegle (kopia słownika)."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        from app.models import Question, QuestionType, Survey, SurveyLinks
+
+        def make_survey(_):
+            return Survey(
+                id=uuid4(),
+                title="Test",
+                questions=[Question(id="q1", text="Test?", type=QuestionType.TEXT)],
+                created_at=datetime.now(),
+                links=SurveyLinks(survey_url="http://x", stats_url="http://y"),
+            )
+
+        created = [make_survey(i) for i in range(40)]
+        surveys = database.surveys
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(database.add_survey, created))
+
+        assert len(surveys) == 0
+        assert set(database.surveys) == {survey.id for survey in created}
+        assert all(database.get_view(survey.id) for survey in created)
 
 
 class TestConfigManagerSingleton:
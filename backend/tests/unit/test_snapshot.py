@@ -0,0 +1,266 @@
+"""
+Testy jednostkowe dla binarnej migawki bazy danych (app.snapshot).
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.models import Answer, SurveyResponse
+
+
+def restart_database():
+    from app.database import DatabaseMeta, get_database
+
+    get_database().close()
+    DatabaseMeta._instances.clear()
+    return get_database()
+
+
+def make_response(survey_id, answers, respondent_id=None, submitted_at=None):
+    return SurveyResponse(
+        id=uuid4(),
+        survey_id=survey_id,
+        answers=[Answer(question_id=qid, value=value) for qid, value in answers],
+        respondent_id=respondent_id,
+        submitted_at=submitted_at or datetime.now(),
+    )
+
+
+class TestDatabaseSnapshot:
+    """Testy zapisu i odczytu migawki bazy w pamięci."""
+
+    @pytest.fixture(params=["objects", "columnar"])
+    def snapshot_path(self, request, config, tmp_path):
+        path = tmp_path / "polly.snapshot"
+        config.set("database", "storage_layout", request.param)
+        config.set("database", "hot_tail_size", 2)
+        config.set("database", "snapshot_path", str(path))
+        restart_database()
+        return path
+
+    async def test_roundtrip_after_restart(
+        self, snapshot_path, sample_survey_create_all_types
+    ):
+        """Sprawdza odtworzenie ankiet, odpowiedzi, indeksów i statystyk."""
+        from app.services import SurveyService
+
+        service = SurveyService(database=restart_database())
+        survey = await service.create_survey(sample_survey_create_all_types)
+        other = await service.create_survey(sample_survey_create_all_types)
+        now = datetime(2024, 5, 1, 12, 0)
+        responses = [
+            make_response(
+                survey.id,
+                [
+                    ("q1", "Zażółć gęślą jaźń"),
+                    ("q2", "Czerwony"),
+                    ("q3", ["Python", "Java"]),
+                    ("q4", 7.5),
+                    ("q5", True),
+                ],
+                respondent_id="r-1",
+                submitted_at=now,
+            ),
+            # Wartość spoza układu kolumnowego
+            make_response(
+                survey.id,
+                [("q4", {"nested": [1, None]})],
+                submitted_at=now + timedelta(hours=2),
+            ),
+            make_response(
+                survey.id,
+                [("q5", "no")],
+                respondent_id="r-2",
+                submitted_at=now + timedelta(hours=1),
+            ),
+        ]
+        # Odpowiedź ze strefą czasową w osobnej ankiecie
+        aware = make_response(
+            other.id,
+            [("q1", "UTC")],
+            submitted_at=datetime(
+                2024, 5, 1, 14, 0, tzinfo=timezone(timedelta(hours=2))
+            ),
+        )
+        service._db.database.add_response(aware)
+        for response in responses:
+            service._db.database.add_response(response)
+        stats = await service.get_statistics(survey.id)
+
+        db = restart_database()
+        service = SurveyService(database=db)
+
+        assert snapshot_path.exists()
+        assert db.get_stats()["snapshot"]["restored_responses"] == 4
+        assert db.get_survey(survey.id) == survey
+        assert db.get_survey(other.id) == other
+        assert db.get_responses(survey.id) == responses
+        assert db.get_responses(other.id) == [aware]
+        assert db.get_responses(other.id)[0].submitted_at.utcoffset() == timedelta(
+            hours=2
+        )
+        assert await service.get_statistics(survey.id) == stats
+        assert db.get_responses_by_respondent(survey.id, "r-2") == [responses[2]]
+        assert (await service.get_responses_page(survey.id, 10)).items == [
+            responses[0],
+            responses[2],
+            responses[1],
+        ]
+
+    async def test_statistics_keep_retained_responses(
+        self, snapshot_path, sample_survey_create, sample_answers
+    ):
+        """Sprawdza zachowanie statystyk odpowiedzi usuniętych przez retencję."""
+        from app.services import SurveyService
+
+        service = SurveyService(database=restart_database())
+        survey = await service.create_survey(
+            sample_survey_create.model_copy(update={"retention_days": 7})
+        )
+        now = datetime.now()
+        for days in [10, 9, 1]:
+            service._db.database.add_response(
+                SurveyResponse(
+                    id=uuid4(),
+                    survey_id=survey.id,
+                    answers=sample_answers,
+                    submitted_at=now - timedelta(days=days),
+                )
+            )
+        assert await service.apply_retention(now) == 2
+        stats = await service.get_statistics(survey.id)
+
+        db = restart_database()
+
+        assert len(db.get_responses(survey.id)) == 1
+        assert await SurveyService(database=db).get_statistics(survey.id) == stats
+        assert db.get_stats()["total_responses"] == 3
+
+        # Numery odpowiedzi w bitmapach agregatu uwzględniają odpowiedzi
+        # usunięte przed migawką
+        db.add_response(
+            SurveyResponse(
+                id=uuid4(),
+                survey_id=survey.id,
+                answers=sample_answers,
+                submitted_at=now,
+            )
+        )
+        filters = [("q5", "yes")]
+        assert db.get_aggregate(survey.id).filtered(filters).total_responses == 2
+        # Magazyn kolumnowy zwalnia tylko całe bloki
+        dropped = db.drop_responses_before(survey.id, now - timedelta(hours=12))
+        assert len(db.get_responses(survey.id)) == 2 - dropped
+        assert db.get_aggregate(survey.id).filtered(filters).total_responses == (
+            2 - dropped
+        )
+        assert db.get_aggregate(survey.id).total_responses == 4
+
+    def test_snapshot_checkpoints_wal(
+        self, snapshot_path, config, tmp_path, created_survey, sample_answers
+    ):
+        """Sprawdza że dziennik WAL po migawce zawiera tylko nowsze zapisy."""
+        config.set("database", "wal_dir", str(tmp_path / "wal"))
+        db = restart_database()
+        db.add_survey(created_survey)
+        first = make_response(created_survey.id, [("q1", "a")])
+        db.add_response(first)
+
+        db.save_snapshot(str(snapshot_path))
+        second = make_response(created_survey.id, [("q1", "b")])
+        db.add_response(second)
+
+        # Restart bez zapisu migawki przy zamknięciu (np. awaria procesu)
+        config.set("database", "snapshot_path", None)
+        db.close()
+        config.set("database", "snapshot_path", str(snapshot_path))
+        from app.database import DatabaseMeta, get_database
+
+        DatabaseMeta._instances.clear()
+        db = get_database()
+
+        assert db.get_responses(created_survey.id) == [first, second]
+        assert db.get_aggregate(created_survey.id).total_responses == 2
+
+    def test_crash_after_snapshot_replace_not_replayed(
+        self,
+        snapshot_path,
+        config,
+        tmp_path,
+        monkeypatch,
+        created_survey,
+        sample_answers,
+    ):
+        """Sprawdza awarię po podmianie migawki, a przed usunięciem starego WAL."""
+        from app.database import DatabaseMeta, get_database
+        from app.wal import WriteAheadLog
+
+        config.set("database", "wal_dir", str(tmp_path / "wal"))
+        db = restart_database()
+        db.add_survey(created_survey)
+        first = make_response(created_survey.id, [("q1", "a")])
+        db.add_response(first)
+
+        with monkeypatch.context() as patch:
+            patch.setattr(WriteAheadLog, "truncate_before", lambda self, index: None)
+            db.save_snapshot(str(snapshot_path))
+        second = make_response(created_survey.id, [("q1", "b")])
+        db.add_response(second)
+
+        config.set("database", "snapshot_path", None)
+        db.close()
+        config.set("database", "snapshot_path", str(snapshot_path))
+        DatabaseMeta._instances.clear()
+        db = get_database()
+
+        assert db.get_responses(created_survey.id) == [first, second]
+        assert db.get_aggregate(created_survey.id).total_responses == 2
+        # Segment objęty migawką usunięty przy starcie
+        assert len(os.listdir(tmp_path / "wal")) == 1
+
+    def test_load_requires_empty_database(self, snapshot_path, created_survey):
+        """Sprawdza błąd wczytania migawki do niepustej bazy."""
+        db = restart_database()
+        db.add_survey(created_survey)
+        db.save_snapshot(str(snapshot_path))
+
+        with pytest.raises(ValueError, match="empty database"):
+            db.load_snapshot(str(snapshot_path))
+
+
+class TestSnapshotFile:
+    """Testy formatu pliku migawki."""
+
+    def test_truncated_snapshot_raises(self, tmp_path, created_survey):
+        """Sprawdza wykrycie urwanego pliku migawki."""
+        from app.aggregates import SurveyAggregate
+        from app.snapshot import read_snapshot, write_snapshot
+
+        path = tmp_path / "polly.snapshot"
+        count = write_snapshot(
+            str(path),
+            [(created_survey, SurveyAggregate(created_survey.questions), [])],
+        )
+        assert count == 0
+        assert [record_type for record_type, _ in read_snapshot(str(path))] == [1, 2]
+
+        data = path.read_bytes()
+        path.write_bytes(data[:-3])
+        with pytest.raises(ValueError, match="Truncated snapshot"):
+            list(read_snapshot(str(path)))
+
+    def test_invalid_header_raises(self, tmp_path):
+        """Sprawdza odrzucenie pliku, który nie jest migawką."""
+        from app.snapshot import read_snapshot
+
+        path = tmp_path / "polly.snapshot"
+        path.write_bytes(b"not a snapshot")
+        with pytest.raises(ValueError, match="Invalid snapshot"):
+            list(read_snapshot(str(path)))
+
+        path.write_bytes(b"")
+        with pytest.raises(ValueError, match="Invalid snapshot"):
+            list(read_snapshot(str(path)))
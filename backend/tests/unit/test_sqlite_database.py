@@ -0,0 +1,570 @@
+"""
+Testy jednostkowe dla bazy danych SQLite (app.sqlite_database).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from threading import Barrier
+from uuid import uuid4
+
+import pytest
+
+
+@pytest.fixture
+def sqlite_database(config, tmp_path):
+    """Fixture zwracający bazę SQLite w katalogu tymczasowym."""
+    from app.database import get_database
+
+    config.set("database", "backend", "sqlite")
+    config.set("database", "sqlite_path", str(tmp_path / "polly.db"))
+
+    db = get_database()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def sqlite_service(sqlite_database, config, logger):
+    """Fixture zwracający serwis ankiet korzystający z bazy SQLite."""
+    from app.services import SurveyService
+
+    return SurveyService(database=sqlite_database, config=config, logger=logger)
+
+
+class TestSQLiteDatabase:
+    """Testy bazy danych SQLite."""
+
+    def test_get_database_selects_sqlite(self, sqlite_database):
+        """Sprawdza wybór bazy SQLite na podstawie konfiguracji."""
+        from app.database import get_database
+        from app.sqlite_database import SQLiteDatabase
+
+        assert isinstance(sqlite_database, SQLiteDatabase)
+        assert get_database() is sqlite_database
+
+    async def test_add_and_get_survey(
+        self, sqlite_service, sqlite_database, sample_survey_create
+    ):
+        """Sprawdza zapis i odczyt ankiety."""
+        survey = await sqlite_service.create_survey(sample_survey_create)
+
+        assert sqlite_database.survey_exists(survey.id)
+        assert sqlite_database.get_survey(survey.id) == survey
+        assert sqlite_database.surveys == {survey.id: survey}
+
+        # Odczyt z pliku gdy ankiety nie ma w cache procesu
+        sqlite_database._survey_cache.clear()
+        assert sqlite_database.get_survey(survey.id) == survey
+
+    def test_get_nonexistent_survey(self, sqlite_database):
+        """Sprawdza brak nieistniejącej ankiety."""
+        assert sqlite_database.get_survey(uuid4()) is None
+        assert sqlite_database.survey_exists(uuid4()) is False
+        assert sqlite_database.get_aggregate(uuid4()) is None
+
+    async def test_add_and_get_responses(
+        self,
+        sqlite_service,
+        sqlite_database,
+        sample_survey_create,
+        sample_answer_submit,
+    ):
+        """Sprawdza zapis i odczyt odpowiedzi."""
+        survey = await sqlite_service.create_survey(sample_survey_create)
+        first = await sqlite_service.submit_response(survey.id, sample_answer_submit)
+        second = await sqlite_service.submit_response(survey.id, sample_answer_submit)
+
+        assert sqlite_database.get_responses(survey.id) == [first, second]
+        assert sqlite_database.responses == {survey.id: [first, second]}
+
+    async def test_add_responses_batch(
+        self,
+        sqlite_service,
+        sqlite_database,
+        sample_survey_create,
+        sample_answer_submit,
+    ):
+        """Sprawdza import porcji odpowiedzi w jednej transakcji."""
+        survey = await sqlite_service.create_survey(sample_survey_create)
+        responses = await sqlite_service.submit_responses(
+            survey.id, [sample_answer_submit] * 3
+        )
+
+        assert sqlite_database.get_responses(survey.id) == responses
+        assert sqlite_database.get_stats()["total_responses"] == 3
+        assert (await sqlite_service.get_statistics(survey.id)).total_responses == 3
+
+    async def test_responses_page(
+        self, sqlite_service, sample_survey_create, sample_answer_submit
+    ):
+        """Sprawdza stronicowanie odpowiedzi w bazie SQLite."""
+        survey = await sqlite_service.create_survey(sample_survey_create)
+        submitted = [
+            await sqlite_service.submit_response(survey.id, sample_answer_submit)
+            for _ in range(3)
+        ]
+
+        first = await sqlite_service.get_responses_page(survey.id, 2)
+        second = await sqlite_service.get_responses_page(
+            survey.id, 2, first.next_cursor
+        )
+
+        assert first.items + second.items == submitted
+        assert second.next_cursor is None
+
+    async def test_respondent_and_time_queries(
+        self, sqlite_service, sample_survey_create, sample_answer_submit
+    ):
+        """Sprawdza zapytania po respondencie i przedziale czasu w bazie SQLite."""
+        survey = await sqlite_service.create_survey(sample_survey_create)
+        response = await sqlite_service.submit_response(survey.id, sample_answer_submit)
+        respondent_id = sample_answer_submit.respondent_id
+
+        assert await sqlite_service.has_responded(survey.id, respondent_id)
+        assert not await sqlite_service.has_responded(survey.id, "nieznany")
+        assert await sqlite_service.get_respondent_responses(
+            survey.id, respondent_id
+        ) == [response]
+        assert await sqlite_service.get_responses_between(survey.id) == [response]
+        assert (
+            await sqlite_service.get_responses_between(
+                survey.id, end=response.submitted_at
+            )
+            == []
+        )
+
+    async def test_idempotency_key(
+        self,
+        sqlite_service,
+        sqlite_database,
+        sample_survey_create,
+        sample_answer_submit,
+    ):
+        """Sprawdza idempotentny zapis odpowiedzi w bazie SQLite."""
+        survey = await sqlite_service.create_survey(sample_survey_create)
+        first = await sqlite_service.submit_response(
+            survey.id, sample_answer_submit, idempotency_key="klucz"
+        )
+        retry = await sqlite_service.submit_response(
+            survey.id, sample_answer_submit, idempotency_key="klucz"
+        )
+
+        assert retry == first
+        assert sqlite_database.get_responses(survey.id) == [first]
+
+        # Zapis bezpośrednio do bazy (np. wyścig dwóch procesów)
+        duplicate = first.model_copy(update={"id": uuid4()})
+        assert sqlite_database.add_response(duplicate, idempotency_key="klucz") == first
+
+    async def test_idempotency_key_expires(
+        self,
+        config,
+        sqlite_database,
+        sqlite_service,
+        sample_survey_create,
+        sample_answer_submit,
+    ):
+        """Sprawdza wygaśnięcie klucza idempotencji w bazie SQLite."""
+        survey = await sqlite_service.create_survey(sample_survey_create)
+        sqlite_database._idempotency_ttl = 0
+        first = await sqlite_service.submit_response(
+            survey.id, sample_answer_submit, idempotency_key="klucz"
+        )
+        second = await sqlite_service.submit_response(
+            survey.id, sample_answer_submit, idempotency_key="klucz"
+        )
+
+        assert second.id != first.id
+
+    def test_response_for_missing_survey_rejected(
+        self, sqlite_database, sample_answers
+    ):
+        """Sprawdza błąd zapisu odpowiedzi do nieistniejącej ankiety."""
+        from app.models import SurveyResponse
+
+        survey_id = uuid4()
+        response = SurveyResponse(
+            id=uuid4(),
+            survey_id=survey_id,
+            answers=sample_answers,
+            submitted_at=datetime.now(),
+        )
+
+        with pytest.raises(ValueError, match="not found"):
+            sqlite_database.add_response(response)
+        with pytest.raises(ValueError, match="not found"):
+            sqlite_database.add_response(response, idempotency_key="key-1")
+        with pytest.raises(ValueError, match="not found"):
+            sqlite_database.add_responses([response])
+
+        assert sqlite_database.get_responses(survey_id) == []
+        assert sqlite_database.get_idempotent_response(survey_id, "key-1") is None
+        assert sqlite_database.get_stats()["total_responses"] == 0
+
+    async def test_survey_cleared_by_other_process(
+        self,
+        sqlite_service,
+        sqlite_database,
+        sample_survey_create,
+        sample_answer_submit,
+        tmp_path,
+    ):
+        """Sprawdza odrzucenie odpowiedzi do ankiety usuniętej w innym procesie."""
+        from app.models import SurveyResponse
+        from app.sqlite_database import SQLiteDatabase
+
+        survey = await sqlite_service.create_survey(sample_survey_create)
+        kept = await sqlite_service.create_survey(sample_survey_create)
+        other = SQLiteDatabase.__new__(SQLiteDatabase)
+        other.__init__(str(tmp_path / "polly.db"))
+        other.clear()
+        other.close()
+
+        # Ankieta w cache procesu, ale nie w pliku bazy
+        with pytest.raises(ValueError, match="not found"):
+            await sqlite_service.submit_response(survey.id, sample_answer_submit)
+        assert sqlite_database.get_survey(survey.id) is None
+
+        # Import jest wycofywany w całości
+        sqlite_database.add_survey(kept)
+        with pytest.raises(ValueError, match=str(survey.id)):
+            sqlite_database.add_responses(
+                [
+                    SurveyResponse(
+                        id=uuid4(),
+                        survey_id=kept.id,
+                        answers=sample_answer_submit.answers,
+                        submitted_at=datetime.now(),
+                    ),
+                    SurveyResponse(
+                        id=uuid4(),
+                        survey_id=survey.id,
+                        answers=sample_answer_submit.answers,
+                        submitted_at=datetime.now(),
+                    ),
+                ]
+            )
+        assert sqlite_database.get_responses(kept.id) == []
+
+    async def test_statistics_match_memory_backend(
+        self, sqlite_service, survey_service, sample_survey_create_all_types
+    ):
+        """Sprawdza zgodność statystyk z bazą w pamięci."""
+        from app.models import Answer, AnswerSubmit
+
+        submits = [
+            AnswerSubmit(
+                answers=[
+                    Answer(question_id="q1", value=name),
+                    Answer(question_id="q2", value="Zielony"),
+                    Answer(question_id="q3", value=choices),
+                    Answer(question_id="q4", value=rating),
+                    Answer(question_id="q5", value=yes_no),
+                ]
+            )
+            for name, choices, rating, yes_no in [
+                ("Anna", ["Python"], 3, "yes"),
+                ("Jan", ["Python", "Java"], 7.5, False),
+                ("Anna", [], 10, True),
+            ]
+        ]
+
+        results = []
+        for service in (survey_service, sqlite_service):
+            survey = await service.create_survey(sample_survey_create_all_types)
+            for submit in submits:
+                await service.submit_response(survey.id, submit)
+            stats = await service.get_statistics(survey.id)
+            results.append(
+                stats.model_dump(
+                    exclude={"survey_id", "created_at", "last_response_at"}
+                )
+            )
+
+        assert results[0] == results[1]
+
+    async def test_aggregate_sees_writes_from_other_connections(
+        self,
+        sqlite_service,
+        sqlite_database,
+        sample_survey_create,
+        sample_answer_submit,
+        tmp_path,
+    ):
+        """Sprawdza że agregaty uwzględniają zapisy innych procesów (innej instancji)."""
+        from app.sqlite_database import SQLiteDatabase
+
+        survey = await sqlite_service.create_survey(sample_survey_create)
+        await sqlite_service.submit_response(survey.id, sample_answer_submit)
+        assert (await sqlite_service.get_statistics(survey.id)).total_responses == 1
+
+        # Druga instancja na tym samym pliku symuluje innego workera
+        other = SQLiteDatabase.__new__(SQLiteDatabase)
+        other.__init__(str(tmp_path / "polly.db"))
+        for response in sqlite_database.get_responses(survey.id):
+            other.add_response(response.model_copy(update={"id": uuid4()}))
+        other.close()
+
+        assert (await sqlite_service.get_statistics(survey.id)).total_responses == 2
+
+    async def test_retention_rolls_rows_into_aggregate_base(
+        self,
+        sqlite_service,
+        sqlite_database,
+        sample_survey_create,
+        sample_answers,
+        tmp_path,
+    ):
+        """Sprawdza retencję: stare wiersze usunięte, statystyki bez zmian."""
+        from datetime import timedelta
+
+        from app.models import SurveyResponse
+        from app.sqlite_database import SQLiteDatabase
+
+        survey = await sqlite_service.create_survey(
+            sample_survey_create.model_copy(update={"retention_days": 7})
+        )
+        now = datetime.now()
+        responses = [
+            SurveyResponse(
+                id=uuid4(),
+                survey_id=survey.id,
+                answers=sample_answers,
+                respondent_id=f"r-{days}",
+                submitted_at=now - timedelta(days=days),
+            )
+            for days in [10, 9, 8, 2, 1]
+        ]
+        sqlite_database.add_response(responses[0])
+        # Agregat zapamiętany przed retencją (jak w innym workerze)
+        await sqlite_service.get_statistics(survey.id)
+        for response in responses[1:]:
+            sqlite_database.add_response(response)
+        stats = await sqlite_service.get_statistics(survey.id)
+        sqlite_database._aggregates[survey.id] = (
+            1,
+            sqlite_database._aggregates[survey.id][1].copy(),
+        )
+
+        assert await sqlite_service.apply_retention(now) == 3
+        assert await sqlite_service.apply_retention(now) == 0
+        assert sqlite_database.get_responses(survey.id) == responses[3:]
+        assert await sqlite_service.get_statistics(survey.id) == stats
+        assert sqlite_database.get_stats()["total_responses"] == 5
+
+        # Nowy proces odtwarza statystyki z bazy agregatów
+        other = SQLiteDatabase.__new__(SQLiteDatabase)
+        other.__init__(str(tmp_path / "polly.db"))
+        aggregate = other.get_aggregate(survey.id)
+        other.close()
+        assert aggregate.total_responses == 5
+        assert (
+            aggregate.questions["q4"].average == stats.questions_stats[2].average_value
+        )
+        # Statystyki filtrowane obejmują tylko pozostałe odpowiedzi
+        assert aggregate.filtered([("q5", "yes")]).total_responses == 2
+
+    def test_connection_per_thread(self, sqlite_database, created_survey):
+        """Sprawdza że każdy wątek korzysta z własnego połączenia."""
+        # Bariera wymusza równoległe działanie wszystkich czterech wątków
+        barrier = Barrier(4)
+        before = len(sqlite_database._connections)
+
+        def query(_):
+            barrier.wait(timeout=10)
+            return sqlite_database.get_stats()
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(query, range(4)))
+
+        assert all(r["backend"] == "sqlite" for r in results)
+        # Nowe połączenie dla każdego z wątków puli
+        assert len(sqlite_database._connections) == before + 4
+
+    async def test_version_follows_responses(
+        self,
+        sqlite_service,
+        sqlite_database,
+        sample_survey_create,
+        sample_answer_submit,
+    ):
+        """Sprawdza wersję danych ankiety (numer ostatniej odpowiedzi)."""
+        survey = await sqlite_service.create_survey(sample_survey_create)
+        assert sqlite_database.get_version(survey.id) == 0
+
+        await sqlite_service.submit_response(survey.id, sample_answer_submit)
+        version = sqlite_database.get_version(survey.id)
+        await sqlite_service.submit_response(survey.id, sample_answer_submit)
+
+        assert version > 0
+        assert sqlite_database.get_version(survey.id) > version
+        assert sqlite_database.get_version(uuid4()) is None
+
+    async def test_get_stats(
+        self, sqlite_service, sqlite_database, sample_survey_create
+    ):
+        """Sprawdza statystyki bazy danych."""
+        await sqlite_service.create_survey(sample_survey_create)
+
+        stats = sqlite_database.get_stats()
+
+        assert stats["total_surveys"] == 1
+        assert stats["total_responses"] == 0
+        assert "initialized_at" in stats
+        assert sqlite_database.ping()
+
+    async def test_counters_maintained_by_triggers(
+        self,
+        sqlite_service,
+        sqlite_database,
+        sample_survey_create,
+        sample_answer_submit,
+        tmp_path,
+    ):
+        """Sprawdza liczniki ankiet i odpowiedzi (także po ponownym zapisie ankiety)."""
+        import sqlite3
+
+        survey = await sqlite_service.create_survey(sample_survey_create)
+        sqlite_database.add_survey(survey)
+        for _ in range(2):
+            await sqlite_service.submit_response(survey.id, sample_answer_submit)
+
+        stats = sqlite_database.get_stats()
+        assert stats["total_surveys"] == 1
+        assert stats["total_responses"] == 2
+
+        # Plik bazy sprzed liczników - wartości liczone raz przy otwarciu
+        connection = sqlite3.connect(str(tmp_path / "polly.db"))
+        connection.execute("DROP TABLE counters")
+        connection.commit()
+        connection.close()
+        sqlite_database.close()
+        sqlite_database.__init__(str(tmp_path / "polly.db"))
+        assert sqlite_database.get_stats()["total_responses"] == 2
+
+    async def test_clear(
+        self,
+        sqlite_service,
+        sqlite_database,
+        sample_survey_create,
+        sample_answer_submit,
+    ):
+        """Sprawdza czyszczenie bazy danych."""
+        survey = await sqlite_service.create_survey(sample_survey_create)
+        await sqlite_service.submit_response(survey.id, sample_answer_submit)
+        await sqlite_service.get_statistics(survey.id)
+
+        sqlite_database.clear()
+
+        assert sqlite_database.surveys == {}
+        assert sqlite_database.get_stats()["total_responses"] == 0
+        assert sqlite_database.get_survey(survey.id) is None
+
+    async def test_clear_rolled_back_on_failure(
+        self,
+        sqlite_service,
+        sqlite_database,
+        sample_survey_create,
+        sample_answer_submit,
+    ):
+        """Sprawdza że nieudane czyszczenie nie zostawia częściowo pustej bazy."""
+        import sqlite3
+
+        survey = await sqlite_service.create_survey(sample_survey_create)
+        await sqlite_service.submit_response(survey.id, sample_answer_submit)
+        sqlite_database._connection().execute(
+            "CREATE TRIGGER trg_block BEFORE DELETE ON surveys "
+            "BEGIN SELECT RAISE(ABORT, 'blocked'); END"
+        )
+
+        with pytest.raises(sqlite3.IntegrityError):
+            sqlite_database.clear()
+
+        assert sqlite_database.get_survey(survey.id) is not None
+        assert len(sqlite_database.get_responses(survey.id)) == 1
+        assert sqlite_database.get_stats()["total_responses"] == 1
+
+    async def test_aggregate_lock_per_survey(
+        self, sqlite_service, sqlite_database, sample_survey_create
+    ):
+        """Sprawdza że każda ankieta ma własną blokadę agregatów."""
+        first = await sqlite_service.create_survey(sample_survey_create)
+        second = await sqlite_service.create_survey(sample_survey_create)
+
+        lock = sqlite_database._aggregate_lock_for(first.id)
+        assert sqlite_database._aggregate_lock_for(first.id) is lock
+        assert sqlite_database._aggregate_lock_for(second.id) is not lock
+
+        # Odczyt innej ankiety nie czeka na blokadę zajętą przez pierwszą
+        with lock:
+            assert sqlite_database.get_aggregate(second.id) is not None
+
+
+def submit_in_child_process(survey_id, answer_submit):
+    """Zapisuje odpowiedź z osobnego procesu (jak inny worker gunicorna)."""
+    import asyncio
+
+    from app.database import DatabaseMeta
+    from app.services import SurveyService
+
+    # Proces potomny tworzy własne singletony, jak worker po fork()
+    DatabaseMeta._instances.clear()
+    asyncio.run(SurveyService().submit_response(survey_id, answer_submit))
+
+
+class TestMultiWorker:
+    """Testy wspólnego stanu wielu workerów."""
+
+    async def test_response_from_other_process_visible(
+        self, sqlite_service, sample_survey_create, sample_answer_submit
+    ):
+        """Sprawdza widoczność odpowiedzi zapisanej przez inny proces."""
+        import multiprocessing
+
+        survey = await sqlite_service.create_survey(sample_survey_create)
+        assert (await sqlite_service.get_statistics(survey.id)).total_responses == 0
+
+        context = multiprocessing.get_context("fork")
+        worker = context.Process(
+            target=submit_in_child_process, args=(survey.id, sample_answer_submit)
+        )
+        worker.start()
+        worker.join()
+
+        assert worker.exitcode == 0
+        assert (await sqlite_service.get_statistics(survey.id)).total_responses == 1
+
+    @pytest.mark.parametrize(
+        "env, expected_backend",
+        [({"POLLY_WORKERS": "1"}, None), ({"POLLY_WORKERS": "4"}, "sqlite")],
+    )
+    def test_gunicorn_conf_selects_shared_backend(
+        self, monkeypatch, env, expected_backend
+    ):
+        """Sprawdza wybór bazy SQLite przy wielu workerach."""
+        import os
+        import runpy
+
+        # Osobna kopia środowiska - konfiguracja gunicorna ustawia w nim zmienne
+        monkeypatch.setattr(os, "environ", dict(env))
+
+        conf = runpy.run_path(
+            os.path.join(os.path.dirname(__file__), "..", "..", "gunicorn.conf.py")
+        )
+
+        assert conf["workers"] == int(env["POLLY_WORKERS"])
+        assert os.environ.get("POLLY_DB_BACKEND") == expected_backend
+
+    def test_gunicorn_conf_rejects_memory_backend(self, monkeypatch):
+        """Sprawdza odrzucenie bazy w pamięci przy wielu workerach."""
+        import os
+        import runpy
+
+        monkeypatch.setattr(
+            os, "environ", {"POLLY_WORKERS": "4", "POLLY_DB_BACKEND": "memory"}
+        )
+
+        with pytest.raises(SystemExit):
+            runpy.run_path(
+                os.path.join(os.path.dirname(__file__), "..", "..", "gunicorn.conf.py")
+            )
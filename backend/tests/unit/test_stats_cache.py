@@ -0,0 +1,243 @@
+"""
+Testy jednostkowe dla pamięci podręcznej statystyk (app.stats_cache).
+"""
+
+import asyncio
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from app.models import SurveyStats
+
+
+def make_stats(survey_id, total):
+    return SurveyStats(
+        survey_id=survey_id,
+        survey_title="Test",
+        total_responses=total,
+        questions_stats=[],
+        created_at=datetime.now(),
+    )
+
+
+class Source:
+    """Licznik przeliczeń statystyk z ustawianą wersją danych."""
+
+    def __init__(self, survey_id):
+        self.survey_id = survey_id
+        self.version = 0
+        self.calls = 0
+
+    async def compute(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        return self.version, make_stats(self.survey_id, self.version)
+
+
+@pytest.fixture
+def stats_cache(config):
+    from app.stats_cache import get_stats_cache
+
+    config.set("stats", "max_staleness_seconds", 60.0)
+    return get_stats_cache()
+
+
+class TestStatsCache:
+    """Testy pamięci podręcznej statystyk."""
+
+    async def test_same_version_served_from_cache(self, stats_cache):
+        """Sprawdza zwrot statystyk bez przeliczania dla tej samej wersji."""
+        source = Source(uuid4())
+
+        first = await stats_cache.get(source.survey_id, 0, source.compute)
+        second = await stats_cache.get(source.survey_id, 0, source.compute)
+
+        assert source.calls == 1
+        assert second.stats is first.stats
+        assert first.age == 0.0
+        assert second.age >= 0.0
+        assert stats_cache.get_stats()["hits"] == 1
+
+    async def test_stale_served_while_single_refresh_runs(self, stats_cache):
+        """Sprawdza zwrot starszych statystyk i jedno odświeżenie w tle."""
+        source = Source(uuid4())
+        await stats_cache.get(source.survey_id, 0, source.compute)
+
+        source.version = 3
+        results = await asyncio.gather(
+            *(stats_cache.get(source.survey_id, 3, source.compute) for _ in range(5))
+        )
+
+        assert {result.version for result in results} == {0}
+        await asyncio.gather(*(flight.task for flight in stats_cache._flights.values()))
+        assert source.calls == 2
+
+        fresh = await stats_cache.get(source.survey_id, 3, source.compute)
+        assert fresh.version == 3
+        assert fresh.stats.total_responses == 3
+        assert stats_cache.get_stats()["stale_hits"] == 5
+
+    async def test_fresh_by_default(self):
+        """Sprawdza że bez konfiguracji statystyki uwzględniają każdy nowy zapis."""
+        from app.stats_cache import get_stats_cache
+
+        stats_cache = get_stats_cache()
+        source = Source(uuid4())
+        await stats_cache.get(source.survey_id, 0, source.compute)
+
+        source.version = 1
+        result = await stats_cache.get(source.survey_id, 1, source.compute)
+
+        assert result.version == 1
+        assert stats_cache.get_stats()["max_staleness_seconds"] == 0
+
+    async def test_too_old_entry_recomputed_in_request(self, config):
+        """Sprawdza przeliczenie w żądaniu, gdy wpis przekroczył dopuszczalny wiek."""
+        from app.stats_cache import get_stats_cache
+
+        config.set("stats", "max_staleness_seconds", 0)
+        stats_cache = get_stats_cache()
+        source = Source(uuid4())
+        await stats_cache.get(source.survey_id, 0, source.compute)
+
+        source.version = 1
+        result = await stats_cache.get(source.survey_id, 1, source.compute)
+
+        assert result.version == 1
+        assert source.calls == 2
+        assert stats_cache._flights == {}
+
+    async def test_failed_refresh_logged(self, stats_cache, logger):
+        """Sprawdza zalogowanie błędu odświeżania i możliwość ponowienia."""
+        source = Source(uuid4())
+        await stats_cache.get(source.survey_id, 0, source.compute)
+
+        async def failing():
+            raise RuntimeError("boom")
+
+        await stats_cache.get(source.survey_id, 1, failing)
+        flight = stats_cache._flights[source.survey_id]
+        await asyncio.gather(flight.task, return_exceptions=True)
+
+        assert stats_cache._flights == {}
+        assert stats_cache.get_stats()["failures"] == 1
+        assert logger.get_stats()["logs_by_level"]["ERROR"] == 1
+
+        source.version = 1
+        await stats_cache.get(source.survey_id, 1, source.compute)
+        await stats_cache._flights[source.survey_id].task
+        assert (await stats_cache.get(source.survey_id, 1, source.compute)).version == 1
+
+    async def test_concurrent_misses_share_computation(self, stats_cache):
+        """Sprawdza jedno przeliczenie dla równoległych żądań bez wpisu."""
+        source = Source(uuid4())
+
+        results = await asyncio.gather(
+            *(stats_cache.get(source.survey_id, 0, source.compute) for _ in range(5))
+        )
+
+        assert source.calls == 1
+        assert len({id(result.stats) for result in results}) == 1
+        assert stats_cache.get_stats()["misses"] == 5
+
+    async def test_miss_for_newer_version_not_joined_to_older(self, stats_cache):
+        """Sprawdza nowe przeliczenie, gdy trwające dotyczy starszej wersji."""
+        source = Source(uuid4())
+        first = asyncio.create_task(
+            stats_cache.get(source.survey_id, 0, source.compute)
+        )
+        await asyncio.sleep(0)
+
+        source.version = 1
+        second = await stats_cache.get(source.survey_id, 1, source.compute)
+
+        assert second.version == 1
+        assert (await first).version >= 0
+        assert source.calls == 2
+
+    async def test_failed_miss_raised_to_all_waiters(self, stats_cache, logger):
+        """Sprawdza przekazanie błędu przeliczenia wszystkim czekającym."""
+        calls = 0
+
+        async def failing():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            *(stats_cache.get("survey", 0, failing) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+        assert calls == 1
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert stats_cache.get_stats()["failures"] == 1
+        assert stats_cache.get_stats()["entries"] == 0
+
+    async def test_least_recently_used_evicted(self, config):
+        """Sprawdza ograniczenie liczby wpisów i usuwanie najdawniej używanych."""
+        from app.stats_cache import get_stats_cache
+
+        config.set("stats", "cache_max_entries", 2)
+        stats_cache = get_stats_cache()
+        sources = [Source(uuid4()) for _ in range(3)]
+
+        await stats_cache.get(sources[0].survey_id, 0, sources[0].compute)
+        await stats_cache.get(sources[1].survey_id, 0, sources[1].compute)
+        await stats_cache.get(sources[0].survey_id, 0, sources[0].compute)
+        await stats_cache.get(sources[2].survey_id, 0, sources[2].compute)
+
+        assert list(stats_cache._entries) == [
+            sources[0].survey_id,
+            sources[2].survey_id,
+        ]
+        assert stats_cache.get_stats()["evictions"] == 1
+
+    async def test_invalidate_survey(self, stats_cache):
+        """Sprawdza usunięcie wszystkich wpisów ankiety."""
+        source, other = Source(uuid4()), Source(uuid4())
+        await stats_cache.get(source.survey_id, 0, source.compute)
+        await stats_cache.get((source.survey_id, "day"), 0, source.compute)
+        await stats_cache.get(other.survey_id, 0, other.compute)
+
+        stats_cache.invalidate(source.survey_id)
+
+        assert list(stats_cache._entries) == [other.survey_id]
+
+
+class TestCachedStatistics:
+    """Testy statystyk z pamięci podręcznej w serwisie."""
+
+    async def test_version_follows_writes(
+        self, survey_service, created_survey, sample_answer_submit, config
+    ):
+        """Sprawdza wersję statystyk po kolejnych odpowiedziach."""
+        config.set("stats", "max_staleness_seconds", 0)
+        first = await survey_service.get_cached_statistics(created_survey.id)
+        await survey_service.submit_response(created_survey.id, sample_answer_submit)
+        second = await survey_service.get_cached_statistics(created_survey.id)
+
+        assert first.stats.total_responses == 0
+        assert second.version > first.version
+        assert second.stats.total_responses == 1
+
+    async def test_not_found(self, survey_service):
+        """Sprawdza błąd dla nieistniejącej ankiety."""
+        with pytest.raises(ValueError, match="not found"):
+            await survey_service.get_cached_statistics(uuid4())
+
+    async def test_cleared_survey_entries_dropped(
+        self, survey_service, created_survey, database
+    ):
+        """Sprawdza usunięcie statystyk ankiety usuniętej z bazy."""
+        from app.stats_cache import get_stats_cache
+
+        await survey_service.get_cached_statistics(created_survey.id)
+        assert get_stats_cache().get_stats()["entries"] == 1
+
+        database.clear()
+        with pytest.raises(ValueError, match="not found"):
+            await survey_service.get_cached_statistics(created_survey.id)
+        assert get_stats_cache().get_stats()["entries"] == 0
@@ -10,38 +10,40 @@ from uuid import uuid4
 class TestSurveyServiceCreate:
     """Testy tworzenia ankiet."""
 
-    def test_create_survey(self, survey_service, sample_survey_create):
+    async def test_create_survey(self, survey_service, sample_survey_create):
         """Sprawdza tworzenie ankiety."""
-        survey = survey_service.create_survey(sample_survey_create)
+        survey = await survey_service.create_survey(sample_survey_create)
 
         assert survey.id is not None
         assert survey.title == sample_survey_create.title
         assert survey.description == sample_survey_create.description
         assert len(survey.questions) == len(sample_survey_create.questions)
 
-    def test_create_survey_generates_links(
+    async def test_create_survey_generates_links(
         self, survey_service, sample_survey_create, config
     ):
         """Sprawdza generowanie linków."""
-        survey = survey_service.create_survey(sample_survey_create)
+        survey = await survey_service.create_survey(sample_survey_create)
 
         assert survey.links is not None
         assert str(survey.id) in survey.links.survey_url
         assert str(survey.id) in survey.links.stats_url
 
-    def test_create_survey_sets_created_at(self, survey_service, sample_survey_create):
+    async def test_create_survey_sets_created_at(
+        self, survey_service, sample_survey_create
+    ):
         """Sprawdza ustawienie daty utworzenia."""
         before = datetime.now()
-        survey = survey_service.create_survey(sample_survey_create)
+        survey = await survey_service.create_survey(sample_survey_create)
         after = datetime.now()
 
         assert before <= survey.created_at <= after
 
-    def test_create_survey_saves_to_database(
+    async def test_create_survey_saves_to_database(
         self, survey_service, sample_survey_create, database
     ):
         """Sprawdza zapis do bazy danych."""
-        survey = survey_service.create_survey(sample_survey_create)
+        survey = await survey_service.create_survey(sample_survey_create)
 
         assert database.survey_exists(survey.id)
         assert database.get_survey(survey.id) == survey
@@ -50,32 +52,32 @@ class TestSurveyServiceCreate:
 class TestSurveyServiceGet:
     """Testy pobierania ankiet."""
 
-    def test_get_survey(self, survey_service, created_survey):
+    async def test_get_survey(self, survey_service, created_survey):
         """Sprawdza pobieranie ankiety."""
-        survey = survey_service.get_survey(created_survey.id)
+        survey = await survey_service.get_survey(created_survey.id)
 
         assert survey == created_survey
 
-    def test_get_survey_not_found(self, survey_service):
+    async def test_get_survey_not_found(self, survey_service):
         """Sprawdza błąd dla nieistniejącej ankiety."""
         with pytest.raises(ValueError, match="not found"):
-            survey_service.get_survey(uuid4())
+            await survey_service.get_survey(uuid4())
 
-    def test_get_all_surveys(self, survey_service, sample_survey_create):
+    async def test_get_all_surveys(self, survey_service, sample_survey_create):
         """Sprawdza pobieranie wszystkich ankiet."""
-        survey1 = survey_service.create_survey(sample_survey_create)
-        survey2 = survey_service.create_survey(sample_survey_create)
+        survey1 = await survey_service.create_survey(sample_survey_create)
+        survey2 = await survey_service.create_survey(sample_survey_create)
 
-        all_surveys = survey_service.get_all_surveys()
+        all_surveys = await survey_service.get_all_surveys()
 
         assert len(all_surveys) == 2
         survey_ids = [s.id for s in all_surveys]
         assert survey1.id in survey_ids
         assert survey2.id in survey_ids
 
-    def test_get_all_surveys_empty(self, survey_service):
+    async def test_get_all_surveys_empty(self, survey_service):
         """Sprawdza pustą listę ankiet."""
-        all_surveys = survey_service.get_all_surveys()
+        all_surveys = await survey_service.get_all_surveys()
 
         assert all_surveys == []
 
@@ -83,11 +85,11 @@ class TestSurveyServiceGet:
 class TestSurveyServiceSubmitResponse:
     """Testy wysyłania odpowiedzi."""
 
-    def test_submit_response(
+    async def test_submit_response(
         self, survey_service, created_survey, sample_answer_submit
     ):
         """Sprawdza wysyłanie odpowiedzi."""
-        response = survey_service.submit_response(
+        response = await survey_service.submit_response(
             created_survey.id, sample_answer_submit
         )
 
@@ -95,36 +97,58 @@ class TestSurveyServiceSubmitResponse:
         assert response.survey_id == created_survey.id
         assert response.respondent_id == sample_answer_submit.respondent_id
 
-    def test_submit_response_saves_answers(
+    async def test_submit_response_saves_answers(
         self, survey_service, created_survey, sample_answer_submit
     ):
         """Sprawdza zapis odpowiedzi."""
-        response = survey_service.submit_response(
+        response = await survey_service.submit_response(
             created_survey.id, sample_answer_submit
         )
 
         assert len(response.answers) == len(sample_answer_submit.answers)
 
-    def test_submit_response_sets_timestamp(
+    async def test_submit_response_sets_timestamp(
         self, survey_service, created_survey, sample_answer_submit
     ):
         """Sprawdza ustawienie timestampu."""
         before = datetime.now()
-        response = survey_service.submit_response(
+        response = await survey_service.submit_response(
             created_survey.id, sample_answer_submit
         )
         after = datetime.now()
 
         assert before <= response.submitted_at <= after
 
-    def test_submit_response_survey_not_found(
+    async def test_submit_response_idempotency_key(
+        self, survey_service, created_survey, sample_answer_submit
+    ):
+        """Sprawdza że powtórzenie z tym samym kluczem nie tworzy nowej odpowiedzi."""
+        first = await survey_service.submit_response(
+            created_survey.id, sample_answer_submit, idempotency_key="klucz"
+        )
+        retry = await survey_service.submit_response(
+            created_survey.id, sample_answer_submit, idempotency_key="klucz"
+        )
+        other = await survey_service.submit_response(
+            created_survey.id, sample_answer_submit, idempotency_key="inny"
+        )
+
+        assert retry.id == first.id
+        assert other.id != first.id
+        assert (
+            await survey_service.get_statistics(created_survey.id)
+        ).total_responses == 2
+
+    async def test_submit_response_survey_not_found(
         self, survey_service, sample_answer_submit
     ):
         """Sprawdza błąd dla nieistniejącej ankiety."""
         with pytest.raises(ValueError, match="not found"):
-            survey_service.submit_response(uuid4(), sample_answer_submit)
+            await survey_service.submit_response(uuid4(), sample_answer_submit)
 
-    def test_submit_response_missing_required(self, survey_service, created_survey):
+    async def test_submit_response_missing_required(
+        self, survey_service, created_survey
+    ):
         """Sprawdza błąd dla brakującej wymaganej odpowiedzi."""
         from app.models import AnswerSubmit, Answer
 
@@ -134,9 +158,11 @@ class TestSurveyServiceSubmitResponse:
         )
 
         with pytest.raises(ValueError, match="Required question"):
-            survey_service.submit_response(created_survey.id, incomplete)
+            await survey_service.submit_response(created_survey.id, incomplete)
 
-    def test_submit_response_unknown_question(self, survey_service, created_survey):
+    async def test_submit_response_unknown_question(
+        self, survey_service, created_survey
+    ):
         """Sprawdza błąd dla nieznanego pytania."""
         from app.models import AnswerSubmit, Answer
 
@@ -151,13 +177,67 @@ class TestSurveyServiceSubmitResponse:
         )
 
         with pytest.raises(ValueError, match="not found in survey"):
-            survey_service.submit_response(created_survey.id, invalid)
+            await survey_service.submit_response(created_survey.id, invalid)
+
+    async def test_submit_responses_batch(
+        self, survey_service, database, created_survey, sample_answer_submit
+    ):
+        """Sprawdza import porcji odpowiedzi jednym zapisem."""
+        responses = await survey_service.submit_responses(
+            created_survey.id, [sample_answer_submit] * 5
+        )
+
+        assert len({response.id for response in responses}) == 5
+        assert database.get_responses(created_survey.id) == responses
+        stats = await survey_service.get_statistics(created_survey.id)
+        assert stats.total_responses == 5
+        assert database.get_stats()["total_responses"] == 5
+        assert database.has_respondent(
+            created_survey.id, sample_answer_submit.respondent_id
+        )
+
+    async def test_submit_responses_rejects_whole_batch(
+        self, survey_service, database, created_survey, sample_answer_submit
+    ):
+        """Sprawdza odrzucenie całej porcji z błędną odpowiedzią (z jej numerem)."""
+        from app.models import Answer, AnswerSubmit
+
+        invalid = AnswerSubmit(answers=[Answer(question_id="q1", value="Test")])
+
+        with pytest.raises(ValueError, match="^Response 1: Required question"):
+            await survey_service.submit_responses(
+                created_survey.id, [sample_answer_submit, invalid]
+            )
+        assert database.get_responses(created_survey.id) == []
+
+    async def test_submit_responses_validated_off_event_loop(
+        self, survey_service, created_survey, sample_answer_submit, monkeypatch
+    ):
+        """Sprawdza walidację porcji odpowiedzi poza wątkiem pętli zdarzeń."""
+        import threading
+
+        from app.services import survey_service as module
+
+        threads = []
+        get_validator = module.get_validator
+
+        def recording_get_validator(survey):
+            threads.append(threading.current_thread())
+            return get_validator(survey)
+
+        monkeypatch.setattr(module, "get_validator", recording_get_validator)
+
+        await survey_service.submit_responses(created_survey.id, [sample_answer_submit])
+
+        assert threads and threads[0] is not threading.current_thread()
 
 
 class TestSurveyServiceValidation:
     """Testy walidacji odpowiedzi."""
 
-    def test_validate_text_answer_invalid_type(self, survey_service, created_survey):
+    async def test_validate_text_answer_invalid_type(
+        self, survey_service, created_survey
+    ):
         """Sprawdza walidację odpowiedzi tekstowej z błędnym typem."""
         from app.models import AnswerSubmit, Answer
 
@@ -171,9 +251,9 @@ class TestSurveyServiceValidation:
         )
 
         with pytest.raises(ValueError, match="Text answer expected"):
-            survey_service.submit_response(created_survey.id, invalid)
+            await survey_service.submit_response(created_survey.id, invalid)
 
-    def test_validate_single_choice_invalid_option(
+    async def test_validate_single_choice_invalid_option(
         self, survey_service, created_survey
     ):
         """Sprawdza walidację opcji jednokrotnego wyboru."""
@@ -189,9 +269,9 @@ class TestSurveyServiceValidation:
         )
 
         with pytest.raises(ValueError, match="Invalid option"):
-            survey_service.submit_response(created_survey.id, invalid)
+            await survey_service.submit_response(created_survey.id, invalid)
 
-    def test_validate_rating_out_of_range(self, survey_service, created_survey):
+    async def test_validate_rating_out_of_range(self, survey_service, created_survey):
         """Sprawdza walidację oceny poza zakresem."""
         from app.models import AnswerSubmit, Answer
 
@@ -205,9 +285,9 @@ class TestSurveyServiceValidation:
         )
 
         with pytest.raises(ValueError, match="Rating must be between"):
-            survey_service.submit_response(created_survey.id, invalid)
+            await survey_service.submit_response(created_survey.id, invalid)
 
-    def test_validate_rating_invalid_type(self, survey_service, created_survey):
+    async def test_validate_rating_invalid_type(self, survey_service, created_survey):
         """Sprawdza walidację typu oceny."""
         from app.models import AnswerSubmit, Answer
 
@@ -221,9 +301,9 @@ class TestSurveyServiceValidation:
         )
 
         with pytest.raises(ValueError, match="Numeric value expected"):
-            survey_service.submit_response(created_survey.id, invalid)
+            await survey_service.submit_response(created_survey.id, invalid)
 
-    def test_validate_yes_no_invalid_value(self, survey_service, created_survey):
+    async def test_validate_yes_no_invalid_value(self, survey_service, created_survey):
         """Sprawdza walidację odpowiedzi tak/nie."""
         from app.models import AnswerSubmit, Answer
 
@@ -237,15 +317,15 @@ class TestSurveyServiceValidation:
         )
 
         with pytest.raises(ValueError, match="Yes/No answer expected"):
-            survey_service.submit_response(created_survey.id, invalid)
+            await survey_service.submit_response(created_survey.id, invalid)
 
-    def test_validate_multiple_choice_not_list(
+    async def test_validate_multiple_choice_not_list(
         self, survey_service, sample_survey_create_all_types
     ):
         """Sprawdza walidację wielokrotnego wyboru - nie lista."""
         from app.models import AnswerSubmit, Answer
 
-        survey = survey_service.create_survey(sample_survey_create_all_types)
+        survey = await survey_service.create_survey(sample_survey_create_all_types)
 
         invalid = AnswerSubmit(
             answers=[
@@ -258,15 +338,15 @@ class TestSurveyServiceValidation:
         )
 
         with pytest.raises(ValueError, match="List of options expected"):
-            survey_service.submit_response(survey.id, invalid)
+            await survey_service.submit_response(survey.id, invalid)
 
-    def test_validate_multiple_choice_invalid_option(
+    async def test_validate_multiple_choice_invalid_option(
         self, survey_service, sample_survey_create_all_types
     ):
         """Sprawdza walidację wielokrotnego wyboru - nieprawidłowa opcja."""
         from app.models import AnswerSubmit, Answer
 
-        survey = survey_service.create_survey(sample_survey_create_all_types)
+        survey = await survey_service.create_survey(sample_survey_create_all_types)
 
         invalid = AnswerSubmit(
             answers=[
@@ -279,34 +359,275 @@ class TestSurveyServiceValidation:
         )
 
         with pytest.raises(ValueError, match="Invalid option"):
-            survey_service.submit_response(survey.id, invalid)
+            await survey_service.submit_response(survey.id, invalid)
+
+
+class TestSurveyServiceResponsesPage:
+    """Testy stronicowania odpowiedzi."""
+
+    async def test_pages_cover_all_responses(
+        self, survey_service, created_survey, sample_answer_submit
+    ):
+        """Sprawdza przejście po wszystkich stronach odpowiedzi."""
+        submitted = [
+            await survey_service.submit_response(
+                created_survey.id, sample_answer_submit
+            )
+            for _ in range(5)
+        ]
+
+        collected = []
+        cursor = None
+        while True:
+            page = await survey_service.get_responses_page(created_survey.id, 2, cursor)
+            collected += page.items
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        assert len(page.items) == 1
+        assert collected == sorted(submitted, key=lambda r: (r.submitted_at, r.id))
+
+    async def test_iter_response_batches(
+        self, survey_service, created_survey, sample_answer_submit
+    ):
+        """Sprawdza strumień porcji odpowiedzi."""
+        for _ in range(5):
+            await survey_service.submit_response(
+                created_survey.id, sample_answer_submit
+            )
+
+        batches = [
+            batch
+            async for batch in await survey_service.iter_response_batches(
+                created_survey.id, batch_size=2
+            )
+        ]
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+
+    async def test_invalid_cursor(self, survey_service, created_survey):
+        """Sprawdza błąd dla niepoprawnego kursora."""
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            await survey_service.get_responses_page(created_survey.id, 10, "nie-kursor")
+
+    async def test_survey_not_found(self, survey_service):
+        """Sprawdza błąd dla nieistniejącej ankiety."""
+        with pytest.raises(ValueError, match="not found"):
+            await survey_service.get_responses_page(uuid4(), 10)
+
+    async def test_fetched_survey_not_looked_up_again(
+        self, survey_service, created_survey, monkeypatch
+    ):
+        """Sprawdza że przekazana ankieta nie jest ponownie wyszukiwana."""
+
+        async def fail(survey_id):
+            raise AssertionError("survey looked up twice")
+
+        monkeypatch.setattr(survey_service, "get_survey", fail)
+
+        page = await survey_service.get_responses_page(
+            created_survey.id, 10, survey=created_survey
+        )
+        batches = await survey_service.iter_response_batches(
+            created_survey.id, survey=created_survey
+        )
+
+        assert page.items == []
+        assert [batch async for batch in batches] == []
+
+
+class TestSurveyServiceQueries:
+    """Testy zapytań o odpowiedzi respondentów i z przedziału czasu."""
+
+    async def test_has_responded(
+        self, survey_service, created_survey, sample_answer_submit
+    ):
+        """Sprawdza czy respondent odpowiedział na ankietę."""
+        await survey_service.submit_response(created_survey.id, sample_answer_submit)
+
+        respondent_id = sample_answer_submit.respondent_id
+        assert await survey_service.has_responded(created_survey.id, respondent_id)
+        assert not await survey_service.has_responded(created_survey.id, "nieznany")
+
+    async def test_get_respondent_responses(
+        self, survey_service, created_survey, sample_answer_submit
+    ):
+        """Sprawdza pobranie odpowiedzi respondenta."""
+        submitted = [
+            await survey_service.submit_response(
+                created_survey.id, sample_answer_submit
+            )
+            for _ in range(2)
+        ]
+
+        assert (
+            await survey_service.get_respondent_responses(
+                created_survey.id, sample_answer_submit.respondent_id
+            )
+            == submitted
+        )
+
+    async def test_get_responses_between(
+        self, survey_service, created_survey, sample_answer_submit
+    ):
+        """Sprawdza pobranie odpowiedzi z ostatniej godziny."""
+        from datetime import datetime, timedelta
+
+        response = await survey_service.submit_response(
+            created_survey.id, sample_answer_submit
+        )
+        hour_ago = datetime.now() - timedelta(hours=1)
+
+        assert await survey_service.get_responses_between(
+            created_survey.id, start=hour_ago
+        ) == [response]
+        assert (
+            await survey_service.get_responses_between(created_survey.id, end=hour_ago)
+            == []
+        )
+
+    async def test_queries_survey_not_found(self, survey_service):
+        """Sprawdza błąd dla nieistniejącej ankiety."""
+        with pytest.raises(ValueError, match="not found"):
+            await survey_service.has_responded(uuid4(), "r")
+
+
+def add_dated_responses(database, survey_id, answers, dates):
+    """Zapisuje odpowiedzi wysłane w podanych chwilach (z kolejnymi respondentami)."""
+    from app.models import SurveyResponse
+
+    for i, submitted_at in enumerate(dates):
+        database.add_response(
+            SurveyResponse(
+                id=uuid4(),
+                survey_id=survey_id,
+                answers=answers,
+                respondent_id=f"r-{i}",
+                submitted_at=submitted_at,
+            )
+        )
+
+
+class TestSurveyServiceRetention:
+    """Testy retencji surowych odpowiedzi."""
+
+    @pytest.fixture(params=["objects", "columnar"])
+    def retention_service(self, request, config, logger):
+        from app.database import get_database
+        from app.services import SurveyService
+
+        config.set("database", "storage_layout", request.param)
+        config.set("database", "hot_tail_size", 3)
+        return SurveyService(database=get_database(), config=config, logger=logger)
+
+    async def test_apply_retention_keeps_statistics(
+        self, retention_service, sample_survey_create, sample_answers
+    ):
+        """Sprawdza usunięcie starych odpowiedzi bez zmiany statystyk."""
+        from datetime import timedelta
+
+        survey = await retention_service.create_survey(
+            sample_survey_create.model_copy(update={"retention_days": 7})
+        )
+        now = datetime.now()
+        db = retention_service._db.database
+        add_dated_responses(
+            db,
+            survey.id,
+            sample_answers,
+            [now - timedelta(days=days) for days in [10, 9, 8, 2, 1]],
+        )
+        stats = await retention_service.get_statistics(survey.id)
+
+        assert await retention_service.apply_retention(now) == 3
+        assert await retention_service.apply_retention(now) == 0
+        assert await retention_service.get_statistics(survey.id) == stats
+        assert db.get_stats()["total_responses"] == 5
+
+        # Surowe odpowiedzi i indeksy zawierają tylko zachowane odpowiedzi
+        remaining = (await retention_service.get_responses_page(survey.id, 10)).items
+        assert [r.respondent_id for r in remaining] == ["r-3", "r-4"]
+        assert db.get_responses(survey.id) == remaining
+        assert not await retention_service.has_responded(survey.id, "r-0")
+        assert await retention_service.has_responded(survey.id, "r-4")
+
+    async def test_default_retention_from_config(
+        self, retention_service, sample_survey_create, sample_answers, config
+    ):
+        """Sprawdza domyślny czas retencji z konfiguracji."""
+        from datetime import timedelta
+
+        survey = await retention_service.create_survey(sample_survey_create)
+        now = datetime.now()
+        add_dated_responses(
+            retention_service._db.database,
+            survey.id,
+            sample_answers,
+            [now - timedelta(days=10)] * 3,
+        )
+
+        assert await retention_service.apply_retention(now) == 0
+        config.set("retention", "days", 30)
+        assert await retention_service.apply_retention(now) == 0
+        config.set("retention", "days", 5)
+        assert await retention_service.apply_retention(now) == 3
+
+    @pytest.mark.parametrize("error", [OSError("disk full"), RuntimeError("bug")])
+    async def test_retention_task_survives_errors(self, monkeypatch, logger, error):
+        """Sprawdza zalogowanie błędu retencji i kolejny przebieg zadania."""
+        import asyncio
+
+        from app.main import run_retention
+        from app.services import SurveyService
+
+        calls = []
+
+        async def failing(self):
+            calls.append(1)
+            if len(calls) == 2:
+                raise asyncio.CancelledError
+            raise error
+
+        monkeypatch.setattr(SurveyService, "apply_retention", failing)
+        with pytest.raises(asyncio.CancelledError):
+            await run_retention(0)
+
+        assert len(calls) == 2
+        assert logger.get_stats()["logs_by_level"]["ERROR"] == 1
 
 
 class TestSurveyServiceStatistics:
     """Testy statystyk ankiet."""
 
-    def test_get_statistics_empty(self, survey_service, created_survey):
+    async def test_get_statistics_empty(self, survey_service, created_survey):
         """Sprawdza statystyki bez odpowiedzi."""
-        stats = survey_service.get_statistics(created_survey.id)
+        stats = await survey_service.get_statistics(created_survey.id)
 
         assert stats.survey_id == created_survey.id
         assert stats.total_responses == 0
         assert len(stats.questions_stats) == len(created_survey.questions)
 
-    def test_get_statistics_with_responses(
+    async def test_get_statistics_with_responses(
         self, survey_service, created_survey, sample_answer_submit
     ):
         """Sprawdza statystyki z odpowiedziami."""
         # Dodaj kilka odpowiedzi
-        survey_service.submit_response(created_survey.id, sample_answer_submit)
-        survey_service.submit_response(created_survey.id, sample_answer_submit)
+        await survey_service.submit_response(created_survey.id, sample_answer_submit)
+        await survey_service.submit_response(created_survey.id, sample_answer_submit)
 
-        stats = survey_service.get_statistics(created_survey.id)
+        sample_answer_submit.respondent_id = "jan"
+        await survey_service.submit_response(created_survey.id, sample_answer_submit)
 
-        assert stats.total_responses == 2
+        stats = await survey_service.get_statistics(created_survey.id)
+
+        assert stats.total_responses == 3
         assert stats.last_response_at is not None
+        assert stats.unique_respondents == 2
+        assert stats.unique_respondents_last_7_days == 2
+        assert stats.daily_unique_respondents[0].unique_respondents == 2
 
-    def test_get_statistics_rating_average(self, survey_service, created_survey):
+    async def test_get_statistics_rating_average(self, survey_service, created_survey):
         """Sprawdza średnią dla pytań z oceną."""
         from app.models import AnswerSubmit, Answer
 
@@ -320,21 +641,29 @@ class TestSurveyServiceStatistics:
                     Answer(question_id="q5", value="yes"),
                 ],
             )
-            survey_service.submit_response(created_survey.id, submit)
+            await survey_service.submit_response(created_survey.id, submit)
 
-        stats = survey_service.get_statistics(created_survey.id)
+        stats = await survey_service.get_statistics(created_survey.id)
 
         # Znajdź statystyki dla pytania q4 (rating)
         rating_stats = next(q for q in stats.questions_stats if q.question_id == "q4")
 
         assert rating_stats.average_value == 6.0  # (3+5+7+9) / 4
-
-    def test_get_statistics_survey_not_found(self, survey_service):
+        assert rating_stats.rating_stats.median == 6.0
+        assert rating_stats.rating_stats.p90 == pytest.approx(8.4)
+        assert rating_stats.rating_stats.std_dev == pytest.approx(5**0.5)
+        assert rating_stats.rating_stats.histogram["7"] == 1
+        assert len(rating_stats.rating_stats.histogram) == 10
+        assert stats.questions_stats[0].rating_stats is None
+
+    async def test_get_statistics_survey_not_found(self, survey_service):
         """Sprawdza błąd dla nieistniejącej ankiety."""
         with pytest.raises(ValueError, match="not found"):
-            survey_service.get_statistics(uuid4())
+            await survey_service.get_statistics(uuid4())
 
-    def test_get_statistics_distribution_text(self, survey_service, created_survey):
+    async def test_get_statistics_distribution_text(
+        self, survey_service, created_survey
+    ):
         """Sprawdza rozkład odpowiedzi tekstowych."""
         from app.models import AnswerSubmit, Answer
 
@@ -347,16 +676,45 @@ class TestSurveyServiceStatistics:
                     Answer(question_id="q5", value="yes"),
                 ],
             )
-            survey_service.submit_response(created_survey.id, submit)
+            await survey_service.submit_response(created_survey.id, submit)
 
-        stats = survey_service.get_statistics(created_survey.id)
+        stats = await survey_service.get_statistics(created_survey.id)
 
         text_stats = next(q for q in stats.questions_stats if q.question_id == "q1")
 
         assert text_stats.answer_distribution["Anna"] == 2
         assert text_stats.answer_distribution["Jan"] == 1
+        assert text_stats.other_responses == 0
+
+    async def test_get_statistics_text_top_k(
+        self, survey_service, created_survey, config
+    ):
+        """Sprawdza zwrot najczęstszych odpowiedzi tekstowych i reszty łącznie."""
+        from app.models import Answer, AnswerSubmit
 
-    def test_get_statistics_distribution_yes_no(self, survey_service, created_survey):
+        config.set("stats", "text_top_k", 2)
+        for name in ["Anna", "Anna", "Jan", "Ewa", "Anna", "Jan", "Olek"]:
+            submit = AnswerSubmit(
+                answers=[
+                    Answer(question_id="q1", value=name),
+                    Answer(question_id="q2", value="Niebieski"),
+                    Answer(question_id="q4", value=5),
+                    Answer(question_id="q5", value="yes"),
+                ],
+            )
+            await survey_service.submit_response(created_survey.id, submit)
+
+        stats = await survey_service.get_statistics(created_survey.id)
+        text_stats = next(q for q in stats.questions_stats if q.question_id == "q1")
+        choice_stats = next(q for q in stats.questions_stats if q.question_id == "q2")
+
+        assert text_stats.answer_distribution == {"Anna": 3, "Jan": 2}
+        assert text_stats.other_responses == 2
+        assert choice_stats.other_responses is None
+
+    async def test_get_statistics_distribution_yes_no(
+        self, survey_service, created_survey
+    ):
         """Sprawdza rozkład odpowiedzi tak/nie."""
         from app.models import AnswerSubmit, Answer
 
@@ -369,22 +727,22 @@ class TestSurveyServiceStatistics:
                     Answer(question_id="q5", value=answer),
                 ],
             )
-            survey_service.submit_response(created_survey.id, submit)
+            await survey_service.submit_response(created_survey.id, submit)
 
-        stats = survey_service.get_statistics(created_survey.id)
+        stats = await survey_service.get_statistics(created_survey.id)
 
         yes_no_stats = next(q for q in stats.questions_stats if q.question_id == "q5")
 
         assert yes_no_stats.answer_distribution["yes"] == 2
         assert yes_no_stats.answer_distribution["no"] == 2
 
-    def test_get_statistics_distribution_multiple_choice(
+    async def test_get_statistics_distribution_multiple_choice(
         self, survey_service, sample_survey_create_all_types
     ):
         """Sprawdza rozkład odpowiedzi wielokrotnego wyboru."""
         from app.models import AnswerSubmit, Answer
 
-        survey = survey_service.create_survey(sample_survey_create_all_types)
+        survey = await survey_service.create_survey(sample_survey_create_all_types)
 
         for choices in [["Python"], ["Python", "JavaScript"], ["Java"]]:
             submit = AnswerSubmit(
@@ -396,9 +754,9 @@ class TestSurveyServiceStatistics:
                     Answer(question_id="q5", value="yes"),
                 ],
             )
-            survey_service.submit_response(survey.id, submit)
+            await survey_service.submit_response(survey.id, submit)
 
-        stats = survey_service.get_statistics(survey.id)
+        stats = await survey_service.get_statistics(survey.id)
 
         mc_stats = next(q for q in stats.questions_stats if q.question_id == "q3")
 
@@ -407,6 +765,64 @@ class TestSurveyServiceStatistics:
         assert mc_stats.answer_distribution["Java"] == 1
 
 
+class TestSurveyServiceFilteredStatistics:
+    """Testy statystyk filtrowanych."""
+
+    @pytest.fixture(params=["memory", "sqlite"])
+    def service(self, request, survey_service, config, logger, tmp_path):
+        if request.param == "memory":
+            yield survey_service
+            return
+        from app.services import SurveyService
+        from app.sqlite_database import SQLiteDatabase
+
+        database = SQLiteDatabase(str(tmp_path / "polly.db"))
+        yield SurveyService(database, config, logger)
+        database.close()
+
+    async def test_rating_among_yes(self, service, sample_survey_create):
+        """Sprawdza rozkład ocen wśród respondentów, którzy odpowiedzieli 'yes'."""
+        from app.models import Answer, AnswerSubmit
+        from app.services.survey_service import parse_filter
+
+        survey = await service.create_survey(sample_survey_create)
+        for rating, recommend in [(8, "yes"), (6, "no"), (10, True), (8, "yes")]:
+            await service.submit_response(
+                survey.id,
+                AnswerSubmit(
+                    answers=[
+                        Answer(question_id="q1", value="Jan"),
+                        Answer(question_id="q2", value="Niebieski"),
+                        Answer(question_id="q4", value=rating),
+                        Answer(question_id="q5", value=recommend),
+                    ]
+                ),
+            )
+
+        stats = await service.get_filtered_statistics(
+            survey.id, [parse_filter("q5:yes")]
+        )
+        rating = next(q for q in stats.questions_stats if q.question_id == "q4")
+
+        assert stats.total_responses == 3
+        assert stats.filters[0].value == "yes"
+        assert rating.answer_distribution == {"8": 2, "10": 1}
+        assert rating.average_value == pytest.approx(26 / 3)
+        assert rating.rating_stats.median == 8
+        assert rating.rating_stats.histogram["6"] == 0
+
+    async def test_invalid_filter(self, survey_service, created_survey):
+        """Sprawdza błędy niepoprawnego warunku i nieistniejącej ankiety."""
+        from app.services.survey_service import parse_filter
+
+        with pytest.raises(ValueError, match="Invalid filter"):
+            parse_filter("q5")
+        with pytest.raises(ValueError, match="not found"):
+            await survey_service.get_filtered_statistics(
+                uuid4(), [parse_filter("q5:yes")]
+            )
+
+
 class TestSurveyServiceGenerateLinks:
     """Testy generowania linków."""
 
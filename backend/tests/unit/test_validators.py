@@ -0,0 +1,145 @@
+"""
+Testy jednostkowe dla skompilowanych walidatorów odpowiedzi (app.validators).
+"""
+
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from app.models import Answer, Question, QuestionType, Survey, SurveyLinks
+from app.validators import SurveyValidator, get_validator
+
+QUESTIONS = [
+    Question(id="q1", text="Imię", type=QuestionType.TEXT),
+    Question(
+        id="q2",
+        text="Kolor",
+        type=QuestionType.SINGLE_CHOICE,
+        options=["Czerwony", "Niebieski"],
+    ),
+    Question(
+        id="q3",
+        text="Języki",
+        type=QuestionType.MULTIPLE_CHOICE,
+        options=["Python", "Java"],
+        required=False,
+    ),
+    Question(id="q4", text="Ocena", type=QuestionType.RATING, max_rating=10),
+    Question(id="q5", text="Polecisz?", type=QuestionType.YES_NO, required=False),
+    Question(id="q6", text="Dowolny", type=QuestionType.SINGLE_CHOICE, required=False),
+]
+
+
+def make_survey(questions=QUESTIONS):
+    return Survey(
+        id=uuid4(),
+        title="Test",
+        questions=questions,
+        created_at=datetime.now(),
+        links=SurveyLinks(survey_url="http://x", stats_url="http://y"),
+    )
+
+
+def reference_error(survey, answers):
+    """Błąd walidacji pytanie po pytaniu (zachowanie sprzed kompilacji walidatorów)."""
+    question_map = {q.id: q for q in survey.questions}
+    answered_ids = {a.question_id for a in answers}
+    for question in survey.questions:
+        if question.required and question.id not in answered_ids:
+            return f"Required question '{question.text}' was not answered"
+    for answer in answers:
+        if answer.question_id not in question_map:
+            return f"Question with ID {answer.question_id} not found in survey"
+        question, value = question_map[answer.question_id], answer.value
+        match question.type:
+            case QuestionType.TEXT:
+                if not isinstance(value, str):
+                    return f"Text answer expected for question {question.id}"
+            case QuestionType.SINGLE_CHOICE:
+                if question.options and value not in question.options:
+                    return f"Invalid option '{value}' for question {question.id}"
+            case QuestionType.MULTIPLE_CHOICE:
+                if not isinstance(value, list):
+                    return f"List of options expected for question {question.id}"
+                for v in value if question.options else []:
+                    if v not in question.options:
+                        return f"Invalid option '{v}' for question {question.id}"
+            case QuestionType.RATING:
+                if not isinstance(value, (int, float)):
+                    return f"Numeric value expected for question {question.id}"
+                min_val = question.min_rating or 1
+                max_val = question.max_rating or 5
+                if not min_val <= value <= max_val:
+                    return f"Rating must be between {min_val} and {max_val}"
+            case QuestionType.YES_NO:
+                if value not in ("yes", "no", True, False):
+                    return f"Yes/No answer expected for question {question.id}"
+    return None
+
+
+def error_of(validate, *args):
+    try:
+        validate(*args)
+    except ValueError as e:
+        return str(e)
+    return None
+
+
+VALID = {"q1": "Jan", "q2": "Niebieski", "q4": 7}
+CASES = [
+    {},
+    VALID,
+    {"q2": "Niebieski", "q4": 7},
+    {**VALID, "q1": 123},
+    {**VALID, "q2": "Zielony"},
+    {**VALID, "q2": ["Niebieski"]},
+    {**VALID, "q3": ["Python", "Go"]},
+    {**VALID, "q3": "Python"},
+    {**VALID, "q4": 11},
+    {**VALID, "q4": "7"},
+    {**VALID, "q4": True},
+    {**VALID, "q5": "maybe"},
+    {**VALID, "q5": 1},
+    {**VALID, "q5": [1]},
+    {**VALID, "q6": {"dowolna": "wartość"}},
+    {**VALID, "qx": "?"},
+    {"qx": "?", "q1": 1},
+]
+
+
+class TestSurveyValidator:
+    """Testy walidatora skompilowanego dla ankiety."""
+
+    @pytest.mark.parametrize("values", CASES)
+    def test_matches_reference_validation(self, values):
+        """Sprawdza te same błędy (i ich kolejność) co walidacja pytanie po pytaniu."""
+        survey = make_survey()
+        answers = [
+            Answer(question_id=qid, value=value) for qid, value in values.items()
+        ]
+
+        expected = reference_error(survey, answers)
+        assert error_of(SurveyValidator(survey).validate, answers) == expected
+
+    def test_cached_per_survey(self):
+        """Sprawdza ponowne użycie walidatora i kompilację dla nowej definicji."""
+        survey = make_survey()
+        validator = get_validator(survey)
+
+        assert get_validator(survey) is validator
+
+        # Ta sama ankieta wczytana ponownie (np. po restarcie bazy)
+        reloaded = Survey.model_validate_json(survey.model_dump_json())
+        assert get_validator(reloaded) is not validator
+        assert get_validator(reloaded) is get_validator(reloaded)
+
+    async def test_compiled_when_survey_created(
+        self, survey_service, sample_survey_create
+    ):
+        """Sprawdza kompilację walidatora przy tworzeniu ankiety."""
+        from app import validators
+
+        survey = await survey_service.create_survey(sample_survey_create)
+
+        assert validators._validators[survey.id].questions is survey.questions
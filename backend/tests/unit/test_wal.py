@@ -0,0 +1,342 @@
+"""
+Testy jednostkowe dla dziennika WAL (app.wal) i odtwarzania bazy danych.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.wal import RECORD_RESPONSE, RECORD_SURVEY, WriteAheadLog
+
+
+def open_wal(directory, **kwargs):
+    wal = WriteAheadLog(str(directory), **kwargs)
+    records = list(wal.replay())
+    wal.open()
+    return wal, records
+
+
+class TestWriteAheadLog:
+    """Testy dziennika zapisu z wyprzedzeniem."""
+
+    def test_append_and_replay(self, tmp_path):
+        """Sprawdza odtworzenie zapisanych rekordów."""
+        wal, records = open_wal(tmp_path, fsync="always")
+        assert records == []
+
+        wal.append(RECORD_SURVEY, b"survey")
+        wal.append(RECORD_RESPONSE, b"response")
+        wal.close()
+
+        _, records = open_wal(tmp_path)
+        assert records == [(RECORD_SURVEY, b"survey"), (RECORD_RESPONSE, b"response")]
+
+    def test_append_many(self, tmp_path):
+        """Sprawdza zapis porcji rekordów jednym wywołaniem."""
+        wal, _ = open_wal(tmp_path, fsync="always")
+        wal.append_many(RECORD_RESPONSE, [b"first", b"second"])
+        wal.close()
+
+        _, records = open_wal(tmp_path)
+        assert records == [(RECORD_RESPONSE, b"first"), (RECORD_RESPONSE, b"second")]
+
+    def test_torn_tail_is_truncated(self, tmp_path):
+        """Sprawdza odcięcie urwanego ostatniego rekordu."""
+        wal, _ = open_wal(tmp_path, fsync="os")
+        wal.append(RECORD_SURVEY, b"complete")
+        wal.append(RECORD_RESPONSE, b"torn-record")
+        wal.close()
+
+        segment = tmp_path / os.listdir(tmp_path)[0]
+        segment.write_bytes(segment.read_bytes()[:-3])
+
+        wal, records = open_wal(tmp_path)
+        assert records == [(RECORD_SURVEY, b"complete")]
+
+        # Po odcięciu nowe rekordy dopisują się poprawnie
+        wal.append(RECORD_RESPONSE, b"next")
+        wal.close()
+        _, records = open_wal(tmp_path)
+        assert records == [(RECORD_SURVEY, b"complete"), (RECORD_RESPONSE, b"next")]
+
+    def test_segment_rotation(self, tmp_path):
+        """Sprawdza podział dziennika na segmenty."""
+        wal, _ = open_wal(tmp_path, segment_max_bytes=32)
+        for i in range(5):
+            wal.append(RECORD_RESPONSE, f"record-{i}".encode())
+
+        # Dwa rekordy (po 17 bajtów) przekraczają limit 32 bajtów segmentu
+        assert wal.get_stats()["segments"] == 3
+        wal.close()
+
+        _, records = open_wal(tmp_path)
+        assert [payload for _, payload in records] == [
+            f"record-{i}".encode() for i in range(5)
+        ]
+
+    def test_rotation_keeps_segment_open_for_pending_fsync(self, tmp_path):
+        """Sprawdza zamknięcie segmentu dopiero po zakończeniu fsync zapisu."""
+        wal, _ = open_wal(tmp_path, fsync="always", segment_max_bytes=16)
+        pending = wal.write_many(RECORD_RESPONSE, [b"first-record"])
+        segment, _ = pending
+
+        # Rotacja utrwaliła i wycofała segment, ale deskryptor jest otwarty
+        assert wal.get_stats()["segments"] == 2
+        assert segment.retired
+        os.fstat(segment.fd)
+
+        wal.wait_durable(pending)
+        with pytest.raises(OSError):
+            os.fstat(segment.fd)
+        wal.close()
+
+    def test_concurrent_appends_across_rotations(self, tmp_path):
+        """Sprawdza równoległe zapisy z fsync przy częstej rotacji segmentów."""
+        wal, _ = open_wal(tmp_path, fsync="always", segment_max_bytes=64)
+
+        def write(thread):
+            for i in range(50):
+                wal.append(RECORD_RESPONSE, f"{thread}-{i}".encode())
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(write, range(4)))
+        wal.close()
+
+        _, records = open_wal(tmp_path)
+        assert sorted(payload for _, payload in records) == sorted(
+            f"{thread}-{i}".encode() for thread in range(4) for i in range(50)
+        )
+
+    def test_fsync_error_reported(self, tmp_path, monkeypatch):
+        """Sprawdza zgłoszenie błędu fsync i zwolnienie segmentu."""
+        wal, _ = open_wal(tmp_path, fsync="always")
+
+        def failing_fsync(fd):
+            raise OSError("disk failure")
+
+        monkeypatch.setattr("app.wal.os.fsync", failing_fsync)
+        with pytest.raises(OSError, match="disk failure"):
+            wal.append(RECORD_RESPONSE, b"record")
+        monkeypatch.undo()
+
+        assert wal._segment.pins == 0
+        wal.append(RECORD_RESPONSE, b"next")
+        wal.close()
+
+    def test_corrupted_middle_segment_raises(self, tmp_path):
+        """Sprawdza błąd przy uszkodzonym segmencie innym niż ostatni."""
+        wal, _ = open_wal(tmp_path, segment_max_bytes=16)
+        wal.append(RECORD_RESPONSE, b"first-record")
+        wal.append(RECORD_RESPONSE, b"second-record")
+        wal.close()
+
+        first = tmp_path / min(os.listdir(tmp_path))
+        first.write_bytes(first.read_bytes()[:-1])
+
+        with pytest.raises(ValueError, match="Corrupted WAL segment"):
+            open_wal(tmp_path)
+
+    def test_interval_sync(self, tmp_path):
+        """Sprawdza synchronizację w trybie interval."""
+        wal, _ = open_wal(tmp_path, fsync="interval", fsync_interval_ms=1)
+        wal.append(RECORD_SURVEY, b"data")
+        wal.sync()
+        wal.close()
+
+        _, records = open_wal(tmp_path)
+        assert records == [(RECORD_SURVEY, b"data")]
+
+    def test_reset_removes_records(self, tmp_path):
+        """Sprawdza czyszczenie dziennika."""
+        wal, _ = open_wal(tmp_path)
+        wal.append(RECORD_SURVEY, b"data")
+        wal.reset()
+        wal.close()
+
+        _, records = open_wal(tmp_path)
+        assert records == []
+
+    def test_rotate_and_replay_from_segment(self, tmp_path):
+        """Sprawdza odtwarzanie od segmentu rozpoczętego przez rotate()."""
+        wal, _ = open_wal(tmp_path)
+        wal.append(RECORD_SURVEY, b"before")
+        start = wal.rotate()
+        wal.append(RECORD_RESPONSE, b"after")
+        wal.close()
+
+        assert start == 1
+        assert list(WriteAheadLog(str(tmp_path)).replay(start)) == [
+            (RECORD_RESPONSE, b"after")
+        ]
+
+        wal = WriteAheadLog(str(tmp_path))
+        wal.truncate_before(start)
+        assert list(wal.replay()) == [(RECORD_RESPONSE, b"after")]
+
+    def test_reset_continues_numbering(self, tmp_path):
+        """Sprawdza że wyczyszczony dziennik nie wraca do segmentu 0."""
+        wal, _ = open_wal(tmp_path)
+        start = wal.rotate()
+        wal.reset()
+        wal.append(RECORD_SURVEY, b"data")
+        wal.close()
+
+        assert list(WriteAheadLog(str(tmp_path)).replay(start)) == [
+            (RECORD_SURVEY, b"data")
+        ]
+
+    def test_invalid_fsync_mode(self, tmp_path):
+        """Sprawdza błąd dla nieznanego trybu fsync."""
+        with pytest.raises(ValueError, match="Unknown WAL fsync mode"):
+            WriteAheadLog(str(tmp_path), fsync="sometimes")
+
+    def test_append_requires_open(self, tmp_path):
+        """Sprawdza błąd zapisu do nieotwartego dziennika."""
+        wal = WriteAheadLog(str(tmp_path))
+
+        with pytest.raises(RuntimeError, match="not open"):
+            wal.append(RECORD_SURVEY, b"data")
+
+
+class TestDatabaseRecovery:
+    """Testy odtwarzania bazy danych z dziennika WAL."""
+
+    @staticmethod
+    def restart_database():
+        from app.database import DatabaseMeta, get_database
+
+        get_database().close()
+        DatabaseMeta._instances.clear()
+        return get_database()
+
+    async def test_database_recovers_after_restart(
+        self, config, tmp_path, sample_survey_create, sample_answer_submit
+    ):
+        """Sprawdza odtworzenie ankiet, odpowiedzi i statystyk po restarcie."""
+        from app.services import SurveyService
+
+        config.set("database", "wal_dir", str(tmp_path))
+        db = self.restart_database()
+        service = SurveyService(database=db)
+
+        survey = await service.create_survey(sample_survey_create)
+        response = await service.submit_response(survey.id, sample_answer_submit)
+        stats_before = await service.get_statistics(survey.id)
+
+        db = self.restart_database()
+        service = SurveyService(database=db)
+
+        assert db.get_survey(survey.id) == survey
+        assert db.get_responses(survey.id) == [response]
+        assert await service.get_statistics(survey.id) == stats_before
+        db.close()
+
+    async def test_database_recovers_batch_after_restart(
+        self, config, tmp_path, sample_survey_create, sample_answer_submit
+    ):
+        """Sprawdza odtworzenie porcji odpowiedzi zapisanej jednym rekordem WAL."""
+        from app.services import SurveyService
+
+        config.set("database", "wal_dir", str(tmp_path))
+        service = SurveyService(database=self.restart_database())
+        survey = await service.create_survey(sample_survey_create)
+        responses = await service.submit_responses(
+            survey.id, [sample_answer_submit] * 3
+        )
+
+        db = self.restart_database()
+
+        assert db.get_responses(survey.id) == responses
+        assert db.get_aggregate(survey.id).total_responses == 3
+        db.close()
+
+    def test_retention_survives_restart(
+        self, config, tmp_path, created_survey, sample_answers
+    ):
+        """Sprawdza że odpowiedzi usunięte przez retencję nie wracają po restarcie."""
+        from datetime import datetime, timedelta
+        from uuid import uuid4
+
+        from app.models import SurveyResponse
+
+        config.set("database", "wal_dir", str(tmp_path))
+        db = self.restart_database()
+        db.add_survey(created_survey)
+        now = datetime.now()
+        responses = [
+            SurveyResponse(
+                id=uuid4(),
+                survey_id=created_survey.id,
+                answers=sample_answers,
+                submitted_at=now - timedelta(days=days),
+            )
+            for days in [3, 2, 0]
+        ]
+        for response in responses:
+            db.add_response(response)
+        assert db.drop_responses_before(created_survey.id, now - timedelta(days=1)) == 2
+        aggregate = db.get_aggregate(created_survey.id).to_dict()
+
+        db = self.restart_database()
+
+        assert db.get_responses(created_survey.id) == responses[2:]
+        assert db.get_aggregate(created_survey.id).to_dict() == aggregate
+        db.close()
+
+    def test_database_clear_resets_wal(self, config, tmp_path, created_survey):
+        """Sprawdza że wyczyszczenie bazy czyści też dziennik."""
+        config.set("database", "wal_dir", str(tmp_path))
+        db = self.restart_database()
+        db.add_survey(created_survey)
+        db.clear()
+
+        db = self.restart_database()
+
+        assert db.get_stats()["total_surveys"] == 0
+        db.close()
+
+    def test_reads_do_not_wait_for_fsync(
+        self, config, tmp_path, monkeypatch, created_survey, sample_answers
+    ):
+        """Sprawdza odczyty ankiety w trakcie fsync zapisu odpowiedzi."""
+        import threading
+        from datetime import datetime
+        from uuid import uuid4
+
+        from app.models import SurveyResponse
+
+        config.set("database", "wal_dir", str(tmp_path))
+        config.set("database", "wal_fsync", "always")
+        db = self.restart_database()
+        db.add_survey(created_survey)
+
+        fsync = os.fsync
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_fsync(fd):
+            started.set()
+            assert release.wait(5)
+            fsync(fd)
+
+        monkeypatch.setattr("app.wal.os.fsync", slow_fsync)
+        response = SurveyResponse(
+            id=uuid4(),
+            survey_id=created_survey.id,
+            answers=sample_answers,
+            respondent_id="r-1",
+            submitted_at=datetime.now(),
+        )
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            write = executor.submit(db.add_response, response)
+            assert started.wait(5)
+
+            assert db.has_respondent(created_survey.id, "r-1")
+            assert db.get_responses_after(created_survey.id, None, 10) == [response]
+            assert db.get_view(created_survey.id).aggregate.total_responses == 1
+            assert not write.done()
+
+            release.set()
+            assert write.result(5) == response
+        db.close()